@@ -80,6 +80,15 @@ def _from_var(v, device):
     return [_from_var(x, device) for x in v.sequence()]
 
 
+class _NullScope(object):
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *args):
+        pass
+
+
 class RunCompiledModel(chainer.function_node.FunctionNode):
 
     def __init__(self, compiled_model, input_tmpl, runtime_kwargs):
@@ -95,6 +104,18 @@ class RunCompiledModel(chainer.function_node.FunctionNode):
         self.num_inputs = len(_flatten(input_tmpl))
         self.chainerx_device_name = None
         self.runtime_kwargs = runtime_kwargs
+        self.trace_step = compiled_model.trace_step
+        self.end_trace_step = compiled_model._end_trace_step
+        self.chrome_tracer = compiled_model.chrome_tracer
+        if self.chrome_tracer is not None:
+            self.runtime_kwargs = dict(runtime_kwargs,
+                                       chrome_tracer=self.chrome_tracer)
+
+    def _trace_scope(self, name):
+        if self.chrome_tracer is None:
+            return _NullScope()
+        return self.chrome_tracer.scope(
+            'CompiledModel', '%s #%d' % (name, self.trace_step))
 
     def _to_var(self, v):
         if _is_array(v):
@@ -124,7 +145,8 @@ class RunCompiledModel(chainer.function_node.FunctionNode):
             entire_inputs[name] = self._to_var(value)
 
         with chainer.using_device(self.chainerx_device_name):
-            outputs = self.fwd.run(entire_inputs, **self.runtime_kwargs)
+            with self._trace_scope('Forward'):
+                outputs = self.fwd.run(entire_inputs, **self.runtime_kwargs)
         outputs_and_retained = []
         for name in self.fwd_output_names:
             outputs_and_retained.append(outputs[name])
@@ -155,11 +177,14 @@ class RunCompiledModel(chainer.function_node.FunctionNode):
         for name, value in zip(self.bwd_input_names, values):
             inputs[name] = value
 
-        state = self.bwd.prepare(inputs, **self.runtime_kwargs)
-        del inputs
-        del values
-        with chainer.using_device(self.chainerx_device_name):
-            outputs = self.bwd.run(state)
+        with self._trace_scope('Backward'):
+            state = self.bwd.prepare(inputs, **self.runtime_kwargs)
+            del inputs
+            del values
+            with chainer.using_device(self.chainerx_device_name):
+                outputs = self.bwd.run(state)
+            del state
+        self.end_trace_step(self.trace_step)
         gxs = []
         assert len(self.input_tmpl) == len(self.fwd_input_names)
         for name, tmpl in zip(self.fwd_input_names, self.input_tmpl):
@@ -218,7 +243,13 @@ class CompiledModel(chainer.Chain):
                  computation_order=None,
                  compiler_kwargs=None,
                  runtime_kwargs=None,
-                 quiet_period=0):
+                 quiet_period=0,
+                 program_cache_size=0,
+                 shape_buckets=None,
+                 bucket_axes=(1,),
+                 unpad_axes=None,
+                 chrome_tracing=None,
+                 chrome_tracing_steps=1):
         super(CompiledModel, self).__init__()
         with self.init_scope():
             self.mc = model
@@ -229,9 +260,37 @@ class CompiledModel(chainer.Chain):
         self.runtime_kwargs = runtime_kwargs
         self.quiet_period = quiet_period
         self.num_iterations = 0
+        # When `program_cache_size` is positive, inference without
+        # backprop runs programs specialized for input shapes. Inputs
+        # are padded with zeros to `shape_buckets` along `bucket_axes`.
+        # Outputs are returned padded except for axes in `unpad_axes`,
+        # a dict from indices of outputs to dicts from their axes to
+        # pairs of an index of an input and its axis, which are sliced
+        # back to the extents of the inputs.
+        self.program_cache_size = program_cache_size
+        self.shape_buckets = shape_buckets
+        self.bucket_axes = bucket_axes
+        self.unpad_axes = unpad_axes
+        self.program_cache = None
+        # When `chrome_tracing` is set, events of forward and backward
+        # are written to it every `chrome_tracing_steps` steps. A step
+        # starts by `forward` and ends by its backward, or by the next
+        # `forward`. `{step}` in the filename is replaced by the index
+        # of the first step in the trace.
+        self.chrome_tracing = chrome_tracing
+        self.chrome_tracing_steps = chrome_tracing_steps
+        self.chrome_tracer = None
+        if chrome_tracing is not None:
+            self.chrome_tracer = _chainer_compiler_core.ChromeTracing()
+        self.trace_step = -1
+        self.num_traced_steps = 0
+        self.trace_step_running = False
+        self.first_unflushed_step = 0
 
         self.param_names = None
         self.param_values = None
+        # Statistics of compiler passes for forward and backward graphs.
+        self.pass_stats = {'forward': [], 'backward': []}
         # Propagate device from `model` before compiling it.
         self.to_device(model.device)
         self.compile(onnx_file)
@@ -242,6 +301,13 @@ class CompiledModel(chainer.Chain):
 
         graph = _chainer_compiler_core.load(onnx_file)
         self.orig_output_names = graph.output_names()
+        if self.program_cache_size > 0:
+            # This must be done before `backward_to` modifies `graph`.
+            self.program_cache = graph.compile_cached(
+                self.program_cache_size,
+                shape_buckets=list(self.shape_buckets or []),
+                bucket_axes=list(self.bucket_axes),
+                unpad_axes=self._unpad_axes_by_names(graph))
 
         if self.computation_order is None:
             fwd_graph, bwd_graph = graph.backward_to(
@@ -270,8 +336,11 @@ class CompiledModel(chainer.Chain):
         self.fwd_output_names = fwd_graph.output_names()
         self.bwd_input_names = bwd_graph.input_names()
         self.bwd_output_names = bwd_graph.output_names()
-        self.fwd = fwd_graph.compile(skip_scheduling)
-        self.bwd = bwd_graph.compile(skip_scheduling)
+        self.pass_stats = {'forward': [], 'backward': []}
+        self.fwd = fwd_graph.compile(
+            skip_scheduling, pass_stats=self.pass_stats['forward'])
+        self.bwd = bwd_graph.compile(
+            skip_scheduling, pass_stats=self.pass_stats['backward'])
         self.param_names = fwd_graph.param_names()
 
         if self.used_translator == 'ch2o':
@@ -308,6 +377,69 @@ class CompiledModel(chainer.Chain):
             else:
                 raise NotImplementedError('Initial value is uknown: ' + name)
 
+    def _unpad_axes_by_names(self, graph):
+        input_names = graph.input_names()
+        unpad_axes = {}
+        for output_index, axes in (self.unpad_axes or {}).items():
+            name = self.orig_output_names[output_index]
+            unpad_axes[name] = {
+                axis: (input_names[input_index], input_axis)
+                for axis, (input_index, input_axis) in axes.items()}
+        return unpad_axes
+
+    def program_cache_stats(self):
+        """Returns hits, misses, and evictions of the program cache."""
+        if self.program_cache is None:
+            return None
+        return self.program_cache.stats()
+
+    def _begin_trace_step(self):
+        if self.chrome_tracer is None:
+            return
+        if self.trace_step_running:
+            self._end_trace_step(self.trace_step)
+        self.trace_step += 1
+        self.trace_step_running = True
+
+    def _end_trace_step(self, step):
+        # Backward of an old step may run after the next `forward`.
+        if not self.trace_step_running or step != self.trace_step:
+            return
+        self.trace_step_running = False
+        self.num_traced_steps += 1
+        if self.num_traced_steps % self.chrome_tracing_steps == 0:
+            self.flush_chrome_tracing()
+
+    def flush_chrome_tracing(self):
+        """Writes events of steps which have not been written yet."""
+        if self.chrome_tracer is None or not self.chrome_tracer.num_events():
+            return
+        self.chrome_tracer.emit(
+            self.chrome_tracing.format(step=self.first_unflushed_step))
+        self.chrome_tracer.clear()
+        self.first_unflushed_step = self.trace_step + 1
+
+    def _run_cached(self, inputs, runtime_kwargs):
+        runner = RunCompiledModel(self, inputs, runtime_kwargs)
+        flat_inputs = _flatten(inputs)
+        device = chainer.backend.get_device_from_array(*flat_inputs)
+        entire_inputs = {}
+        for name, value in zip(self.fwd_input_names, inputs):
+            entire_inputs[name] = runner._to_var(value)
+        for name, value in zip(self.param_names, self.param_values):
+            entire_inputs[name] = runner._to_var(value)
+
+        with chainer.using_device(runner.chainerx_device_name):
+            with runner._trace_scope('Forward'):
+                outputs = self.program_cache.run(entire_inputs,
+                                                 **runner.runtime_kwargs)
+        self._end_trace_step(runner.trace_step)
+        outputs = [_from_var(outputs[name], device)
+                   for name in self.orig_output_names]
+        if len(outputs) == 1:
+            outputs = outputs[0]
+        return outputs
+
     def forward(self, *args):
         inputs = list(args)
         flat_inputs = _flatten(inputs)
@@ -317,9 +449,16 @@ class CompiledModel(chainer.Chain):
             self.num_iterations % (self.quiet_period + 1) == 0):
             runtime_kwargs.update(self.runtime_kwargs)
         self.num_iterations += 1
+        self._begin_trace_step()
+
+        if (self.program_cache is not None and
+                not chainer.config.enable_backprop):
+            return self._run_cached(inputs, runtime_kwargs)
 
         runner = RunCompiledModel(self, inputs, runtime_kwargs)
         outputs = runner.apply(flat_inputs + self.param_values)
+        if not chainer.config.enable_backprop:
+            self._end_trace_step(runner.trace_step)
         outputs = runner.unflatten_outputs(outputs)
         outputs = outputs[:len(self.orig_output_names)]
         if len(outputs) == 1:
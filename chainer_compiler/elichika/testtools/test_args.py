@@ -19,6 +19,8 @@ def get_test_args(args=None):
                         help='Show less messages.')
     parser.add_argument('--allow-unused-params', action='store_true',
                         help='Allow unused parameters.')
+    parser.add_argument('--data-format', default='pb', choices=['pb', 'npy'],
+                        help='The file format of test inputs and outputs.')
     _args_cache = parser.parse_args(args=args)
     return _args_cache
 
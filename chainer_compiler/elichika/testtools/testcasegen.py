@@ -22,6 +22,7 @@ from onnx import numpy_helper
 from onnx import TensorProto
 
 from chainer_compiler.elichika.testtools.initializer import edit_onnx_protobuf
+from chainer_compiler.utils import test_data
 
 def _validate_inout(xs):
     # print(xs)
@@ -69,6 +70,7 @@ def validate_chainer_output(ys):
 def dump_test_inputs_outputs(inputs, outputs, gradients, test_data_dir):
     if not os.path.exists(test_data_dir):
         os.makedirs(test_data_dir)
+    data_format = get_test_args().data_format
 
     for typ, values in [('input', inputs),
                         ('output', outputs),
@@ -82,31 +84,22 @@ def dump_test_inputs_outputs(inputs, outputs, gradients, test_data_dir):
                 assert value
                 digits = len(str(len(value)))
                 for j, v in enumerate(value):
-                    filename = os.path.join(
+                    test_data.write_tensor(
                         test_data_dir,
-                        '%s_%d_%s.pb' % (typ, i, str(j).zfill(digits)))
-                    tensor = numpy_helper.from_array(v, name)
-                    with open(filename, 'wb') as f:
-                        f.write(tensor.SerializeToString())
+                        '%s_%d_%s' % (typ, i, str(j).zfill(digits)),
+                        v, name, data_format=data_format)
 
                 #value_info.type.CopyFrom(onnx.TypeProto())
                 #sequence_type = value_info.type.sequence_type
                 #tensor_type = sequence_type.elem_type.tensor_type
                 #tensor_type.elem_type = tensor.data_type
             else:
-                filename = os.path.join(test_data_dir,
-                                        '%s_%d.pb' % (typ, i))
                 if value is None:
                     if get_test_args().allow_unused_params:
                         continue
                     raise RuntimeError('Unused parameter: %s' % name)
-                tensor = numpy_helper.from_array(value, name)
-                with open(filename, 'wb') as f:
-                    f.write(tensor.SerializeToString())
-
-                vi = onnx.helper.make_tensor_value_info(
-                    name, tensor.data_type, tensor.dims)
-                #value_info.CopyFrom(vi)
+                test_data.write_tensor(test_data_dir, '%s_%d' % (typ, i),
+                                       value, name, data_format=data_format)
 
 
 _seen_subnames = set()
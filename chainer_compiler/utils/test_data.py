@@ -0,0 +1,92 @@
+"""Reads and writes tensors in ONNX test data directories.
+
+Besides ONNX's `TensorProto` files (`input_0.pb`), tensors can be stored
+as `.npy` files (`input_0.npy`). As `.npy` files do not have names of
+tensors, they are stored in `names.txt` in the same directory. Each line
+of `names.txt` is a tab-separated pair of a filename and a tensor name.
+`.npy` files can be memory-mapped so tensors are loaded lazily.
+"""
+
+import glob
+import os
+
+import numpy as np
+import onnx
+from onnx import numpy_helper
+
+
+NPY_NAMES_FILE = 'names.txt'
+
+DATA_FORMATS = ('pb', 'npy')
+
+
+def write_tensor(test_data_dir, basename, value, name, data_format='pb'):
+    """Writes `value` as `<basename>.<data_format>` in `test_data_dir`."""
+    assert data_format in DATA_FORMATS, data_format
+    filename = os.path.join(test_data_dir,
+                            '%s.%s' % (basename, data_format))
+    if data_format == 'pb':
+        tensor = numpy_helper.from_array(value, name)
+        with open(filename, 'wb') as f:
+            f.write(tensor.SerializeToString())
+        return
+
+    np.save(filename, np.asarray(value), allow_pickle=False)
+    if name:
+        with open(os.path.join(test_data_dir, NPY_NAMES_FILE), 'a') as f:
+            f.write('%s\t%s\n' % (os.path.basename(filename), name))
+
+
+def load_npy_names(test_data_dir):
+    """Returns a dict from `.npy` filenames to tensor names."""
+    names = {}
+    names_file = os.path.join(test_data_dir, NPY_NAMES_FILE)
+    if os.path.exists(names_file):
+        with open(names_file) as f:
+            for line in f:
+                filename, name = line.rstrip('\n').split('\t', 1)
+                names[filename] = name
+    return names
+
+
+def load_tensor(filename, npy_names=None):
+    """Loads a tensor file and returns a pair of its name and value.
+
+    `.npy` files are memory-mapped.
+    """
+    if filename.endswith('.npy'):
+        if npy_names is None:
+            npy_names = load_npy_names(os.path.dirname(filename))
+        name = npy_names.get(os.path.basename(filename), '')
+        return name, np.load(filename, mmap_mode='r')
+
+    tensor = onnx.TensorProto()
+    with open(filename, 'rb') as f:
+        tensor.ParseFromString(f.read())
+    return tensor.name, numpy_helper.to_array(tensor)
+
+
+def convert_test_data_dir(test_data_dir, data_format, remove=True):
+    """Converts all tensor files in `test_data_dir` to `data_format`."""
+    assert data_format in DATA_FORMATS, data_format
+    npy_names = load_npy_names(test_data_dir)
+    filenames = []
+    for ext in DATA_FORMATS:
+        filenames += glob.glob(os.path.join(test_data_dir, '*.' + ext))
+    tensors = []
+    for filename in sorted(filenames):
+        if filename.endswith('.' + data_format):
+            continue
+        name, value = load_tensor(filename, npy_names)
+        tensors.append((filename, name, np.array(value)))
+
+    for filename, name, value in tensors:
+        basename = os.path.splitext(os.path.basename(filename))[0]
+        write_tensor(test_data_dir, basename, value, name,
+                     data_format=data_format)
+        if remove:
+            os.unlink(filename)
+
+    names_file = os.path.join(test_data_dir, NPY_NAMES_FILE)
+    if remove and data_format != 'npy' and os.path.exists(names_file):
+        os.unlink(names_file)
@@ -0,0 +1,47 @@
+import os
+
+import numpy as np
+
+import test_data
+
+
+def _write_inputs(dirname, data_format):
+    test_data.write_tensor(dirname, 'input_0',
+                           np.arange(6, dtype=np.float32).reshape(2, 3),
+                           'x', data_format=data_format)
+    test_data.write_tensor(dirname, 'input_1', np.array(42, dtype=np.int64),
+                           'y', data_format=data_format)
+
+
+def test_npy_roundtrip(tmpdir):
+    dirname = str(tmpdir)
+    _write_inputs(dirname, 'npy')
+    assert os.path.exists(os.path.join(dirname, 'input_0.npy'))
+
+    name, value = test_data.load_tensor(os.path.join(dirname, 'input_0.npy'))
+    assert 'x' == name
+    assert isinstance(value, np.memmap)
+    np.testing.assert_array_equal(
+        np.arange(6, dtype=np.float32).reshape(2, 3), value)
+
+    name, value = test_data.load_tensor(os.path.join(dirname, 'input_1.npy'))
+    assert 'y' == name
+    assert () == value.shape
+    assert 42 == value
+
+
+def test_convert_test_data_dir(tmpdir):
+    dirname = str(tmpdir)
+    _write_inputs(dirname, 'pb')
+    test_data.convert_test_data_dir(dirname, 'npy')
+    assert ['input_0.npy', 'input_1.npy', 'names.txt'] == sorted(
+        os.listdir(dirname))
+    assert {'input_0.npy': 'x', 'input_1.npy': 'y'} == (
+        test_data.load_npy_names(dirname))
+
+    test_data.convert_test_data_dir(dirname, 'pb')
+    assert ['input_0.pb', 'input_1.pb'] == sorted(os.listdir(dirname))
+    name, value = test_data.load_tensor(os.path.join(dirname, 'input_0.pb'))
+    assert 'x' == name
+    np.testing.assert_array_equal(
+        np.arange(6, dtype=np.float32).reshape(2, 3), value)
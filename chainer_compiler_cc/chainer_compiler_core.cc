@@ -1,4 +1,5 @@
 #include <memory>
+#include <set>
 
 #include <compiler/onnx.h>
 
@@ -18,10 +19,19 @@
 #include <compiler/gradient.h>
 #include <compiler/gradient_with_order.h>
 #include <compiler/graph.h>
+#include <compiler/memory_planner.h>
 #include <compiler/memory_simulator.h>
 #include <compiler/model.h>
+#include <compiler/pass_stats.h>
 #include <compiler/passes.h>
 #include <compiler/subgraph_canonicalizer.h>
+#include <compiler/util.h>
+#include <feeder/data_iterator.h>
+#include <feeder/device_feeder.h>
+#ifdef CHAINER_COMPILER_ENABLE_OPENCV
+#include <feeder/imagenet_iterator.h>
+#endif
+#include <feeder/shard_iterator.h>
 #include <runtime/chainerx_util.h>
 #include <runtime/chrome_tracing.h>
 #include <runtime/chxvm.h>
@@ -29,6 +39,8 @@
 #include <runtime/chxvm_state.h>
 #include <runtime/chxvm_var.h>
 #include <runtime/meminfo.h>
+#include <runtime/profiler.h>
+#include <runtime/program_cache.h>
 #include <tools/util.h>
 
 namespace py = pybind11;
@@ -60,9 +72,24 @@ void Configure(
 #include "chainer_compiler_cc/apply_cxx_args.inc"
 }
 
-std::shared_ptr<runtime::ChxVM> Compile(const std::shared_ptr<Graph>& graph, bool skip_scheduling) {
+std::shared_ptr<runtime::ChxVM> Compile(const std::shared_ptr<Graph>& graph, bool skip_scheduling, py::object pass_stats) {
     constexpr bool kBackprop = false;
-    RunDefaultPasses(graph.get(), kBackprop, skip_scheduling);
+    PassStats stats;
+    RunDefaultPasses(graph.get(), kBackprop, skip_scheduling, pass_stats.is_none() ? nullptr : &stats);
+    if (!pass_stats.is_none()) {
+        py::list stats_list = pass_stats.cast<py::list>();
+        for (const PassStat& stat : stats.stats()) {
+            py::dict d;
+            d["name"] = stat.name;
+            d["graph"] = stat.graph;
+            d["elapsed_msec"] = stat.elapsed_msec;
+            d["num_nodes_before"] = stat.num_nodes_before;
+            d["num_nodes_after"] = stat.num_nodes_after;
+            d["num_values_before"] = stat.num_values_before;
+            d["num_values_after"] = stat.num_values_after;
+            stats_list.append(d);
+        }
+    }
     runtime::ChxVMProgramProto chxvm_prog;
     constexpr bool kDumpValueNames = false;
     chxvm::Emit(*graph, &chxvm_prog, kDumpValueNames);
@@ -140,14 +167,82 @@ int64_t GetParamMemoryUsage(const std::shared_ptr<Graph>& graph) {
     return SimulateMemoryUsage(*graph).param;
 }
 
+int64_t GetPlannedArenaSize(const std::shared_ptr<Graph>& graph) {
+    return PlanMemory(*graph).arena_size;
+}
+
 std::string Dump(const std::shared_ptr<Graph>& graph) {
     return graph->DebugString();
 }
 
+// Enables shape inference while alive, even if `g_skip_inference`
+// is set, and restores the flag when passes throw.
+class EnableInferenceScope {
+public:
+    EnableInferenceScope() : orig_skip_inference_(g_skip_inference) {
+        g_skip_inference = false;
+    }
+
+    ~EnableInferenceScope() {
+        g_skip_inference = orig_skip_inference_;
+    }
+
+private:
+    EnableInferenceScope(const EnableInferenceScope&) = delete;
+    EnableInferenceScope& operator=(const EnableInferenceScope&) = delete;
+
+    const bool orig_skip_inference_;
+};
+
+std::shared_ptr<runtime::ProgramCache> CompileCached(
+        const std::shared_ptr<Graph>& graph,
+        int capacity,
+        const std::vector<int64_t>& shape_buckets,
+        const std::vector<int>& bucket_axes,
+        const runtime::ProgramCache::UnpadAxes& unpad_axes,
+        bool skip_scheduling) {
+    // The graph may be modified later (e.g., by `backward_to`), so
+    // programs are compiled from a snapshot.
+    auto xgraph = std::make_shared<onnx::GraphProto>();
+    graph->ToONNX(xgraph.get());
+    std::set<std::string> param_names;
+    for (Value* value : graph->input_values()) {
+        if (IsParam(value)) param_names.insert(value->name());
+    }
+
+    auto compile = [xgraph, skip_scheduling](const runtime::ProgramCache::InputShapes& shapes) {
+        std::map<std::string, std::vector<int64_t>> dims;
+        for (const auto& p : shapes) {
+            dims.emplace(p.first, std::vector<int64_t>(p.second.begin(), p.second.end()));
+        }
+        onnx::GraphProto specialized(*xgraph);
+        SpecializeInputShapes(dims, &specialized);
+        Graph graph(specialized);
+        {
+            // Programs are specialized for input shapes, which is
+            // pointless without shape inference.
+            EnableInferenceScope enable_inference;
+            constexpr bool kBackprop = false;
+            RunDefaultPasses(&graph, kBackprop, skip_scheduling);
+        }
+        runtime::ChxVMProgramProto chxvm_prog;
+        constexpr bool kDumpValueNames = false;
+        chxvm::Emit(graph, &chxvm_prog, kDumpValueNames);
+        return std::make_shared<runtime::ChxVM>(chxvm_prog);
+    };
+
+    return std::make_shared<runtime::ProgramCache>(
+            compile, capacity, shape_buckets, std::set<int>(bucket_axes.begin(), bucket_axes.end()), param_names, unpad_axes);
+}
+
 void InitGraph(py::module& m) {
     py::class_<Graph, std::shared_ptr<Graph>> c{m, "Graph"};
     c.def("params", &LoadParams, "Load parameters of a model");
-    c.def("compile", &Compile, "Compile a model", "skip_scheduling"_a = false);
+    c.def("compile",
+          &Compile,
+          "Compile a model. Statistics of compiler passes are appended to `pass_stats` if a list is given",
+          "skip_scheduling"_a = false,
+          "pass_stats"_a = py::none());
     c.def("input_names", &GetInputNames, "Names of inputs");
     c.def("param_names", &GetParamNames, "Names of params");
     c.def("output_names", &GetOutputNames, "Names of outputs");
@@ -160,7 +255,16 @@ void InitGraph(py::module& m) {
     c.def("peak_memory_usage", &GetPeakMemoryUsage, "Get estimated peak memory usage");
     c.def("all_memory_usage", &GetAllMemoryUsage, "Get estimated all memory usage");
     c.def("param_memory_usage", &GetParamMemoryUsage, "Get estimated param memory usage");
+    c.def("planned_arena_size", &GetPlannedArenaSize, "Get the size of the arena planned for temporaries");
     c.def("dump", &Dump, "Dump a model to a string");
+    c.def("compile_cached",
+          &CompileCached,
+          "Create a cache of programs compiled for shapes of inputs",
+          "capacity"_a,
+          "shape_buckets"_a = std::vector<int64_t>(),
+          "bucket_axes"_a = std::vector<int>({1}),
+          "unpad_axes"_a = runtime::ProgramCache::UnpadAxes(),
+          "skip_scheduling"_a = false);
 }
 
 runtime::ChxVMOptions CreateOptions(
@@ -174,7 +278,9 @@ runtime::ChxVMOptions CreateOptions(
         int64_t base_memory_usage,
         const std::string& chrome_tracing,
         const std::string& dump_outputs_dir,
-        const std::map<std::string, py::function>& custom_funcs) {
+        const std::map<std::string, py::function>& custom_funcs,
+        int num_inter_op_threads,
+        const std::shared_ptr<runtime::ChromeTracingEmitter>& chrome_tracer) {
     runtime::ChxVMOptions chxvm_opts;
     if (trace) chxvm_opts.trace_level = 1;
     if (verbose) chxvm_opts.trace_level = 2;
@@ -187,10 +293,14 @@ runtime::ChxVMOptions CreateOptions(
         runtime::g_meminfo_enabled = true;
     }
     chxvm_opts.base_memory_usage = base_memory_usage;
-    if (!chrome_tracing.empty()) {
-        chxvm_opts.chrome_tracing = new runtime::ChromeTracingEmitter();
+    if (chrome_tracer) {
+        CHECK(chrome_tracing.empty()) << "chrome_tracing and chrome_tracer are exclusive";
+        chxvm_opts.chrome_tracing = chrome_tracer.get();
+    } else if (!chrome_tracing.empty()) {
+        chxvm_opts.chrome_tracing = new runtime::ChromeTracingEmitter(chrome_tracing);
     }
     chxvm_opts.dump_outputs_dir = dump_outputs_dir;
+    chxvm_opts.num_inter_op_threads = num_inter_op_threads;
 
     for (const auto& p : custom_funcs) {
         const std::string& name = p.first;
@@ -231,7 +341,9 @@ std::shared_ptr<runtime::ChxVMState> Prepare(
         int64_t base_memory_usage,
         const std::string& chrome_tracing,
         const std::string& dump_outputs_dir,
-        const std::map<std::string, py::function>& custom_funcs) {
+        const std::map<std::string, py::function>& custom_funcs,
+        int num_inter_op_threads,
+        const std::shared_ptr<runtime::ChromeTracingEmitter>& chrome_tracer) {
     runtime::ChxVMOptions chxvm_opts = CreateOptions(
             trace,
             verbose,
@@ -243,7 +355,9 @@ std::shared_ptr<runtime::ChxVMState> Prepare(
             base_memory_usage,
             chrome_tracing,
             dump_outputs_dir,
-            custom_funcs);
+            custom_funcs,
+            num_inter_op_threads,
+            chrome_tracer);
 
     std::shared_ptr<runtime::ChxVMState> state(chxvm->Prepare(inputs, chxvm_opts));
     return state;
@@ -262,7 +376,10 @@ std::map<std::string, VarPtr> Run(
         int64_t base_memory_usage,
         const std::string& chrome_tracing,
         const std::string& dump_outputs_dir,
-        const std::map<std::string, py::function>& custom_funcs) {
+        const std::map<std::string, py::function>& custom_funcs,
+        int num_inter_op_threads,
+        const std::shared_ptr<runtime::ChromeTracingEmitter>& chrome_tracer,
+        const std::shared_ptr<runtime::ChxVMProfiler>& profiler) {
     runtime::ChxVMOptions chxvm_opts = CreateOptions(
             trace,
             verbose,
@@ -274,11 +391,15 @@ std::map<std::string, VarPtr> Run(
             base_memory_usage,
             chrome_tracing,
             dump_outputs_dir,
-            custom_funcs);
+            custom_funcs,
+            num_inter_op_threads,
+            chrome_tracer);
+
+    chxvm_opts.profiler = profiler.get();
 
     runtime::InOuts outputs(chxvm->Run(inputs, chxvm_opts));
 
-    if (chxvm_opts.chrome_tracing) {
+    if (!chrome_tracing.empty()) {
         chxvm_opts.chrome_tracing->Emit(chrome_tracing);
     }
     return outputs;
@@ -286,13 +407,12 @@ std::map<std::string, VarPtr> Run(
 
 std::map<std::string, VarPtr> RunState(const std::shared_ptr<runtime::ChxVM>& chxvm, const std::shared_ptr<runtime::ChxVMState>& state) {
     chxvm->Run(state.get());
-    // TODO(hamaji): Revive this.
-#if 0
-    const runtime::ChxVMOptions& chxvm_opts = state->options();
-    if (chxvm_opts.chrome_tracing) {
-        chxvm_opts.chrome_tracing->Emit(chxvm_opts.chrome_tracing);
+    // Events are emitted only when the state is prepared with a
+    // filename. Emitters passed as `chrome_tracer` are emitted by users.
+    const runtime::ChromeTracingEmitter* chrome_tracing = state->options().chrome_tracing;
+    if (chrome_tracing && !chrome_tracing->output_filename().empty()) {
+        chrome_tracing->Emit(chrome_tracing->output_filename());
     }
-#endif
     return state->GetOutputs();
 }
 
@@ -301,7 +421,7 @@ void InitChxVM(py::module& m) {
     // TODO(hamaji): Expose ChxVMOptions to Python.
     c.def("prepare",
           &Prepare,
-          "Prepare the model",
+          "Prepare the model. Events of runs are added to `chrome_tracer` if given",
           "inputs"_a,
           "trace"_a = false,
           "verbose"_a = false,
@@ -313,10 +433,13 @@ void InitChxVM(py::module& m) {
           "base_memory_usage"_a = -1,
           "chrome_tracing"_a = "",
           "dump_outputs_dir"_a = "",
-          "custom_funcs"_a = py::dict());
+          "custom_funcs"_a = py::dict(),
+          "num_inter_op_threads"_a = 0,
+          "chrome_tracer"_a = py::none(),
+          py::keep_alive<0, 15>());
     c.def("run",
           &Run,
-          "Run the model",
+          "Run the model. Events and elapsed times of ops are added to `chrome_tracer` and `profiler` if given",
           "inputs"_a,
           "trace"_a = false,
           "verbose"_a = false,
@@ -328,10 +451,314 @@ void InitChxVM(py::module& m) {
           "base_memory_usage"_a = -1,
           "chrome_tracing"_a = "",
           "dump_outputs_dir"_a = "",
-          "custom_funcs"_a = py::dict());
+          "custom_funcs"_a = py::dict(),
+          "num_inter_op_threads"_a = 0,
+          "chrome_tracer"_a = py::none(),
+          "profiler"_a = py::none());
     c.def("run", &RunState, "Run the model", "state"_a);
 }
 
+std::map<std::string, VarPtr> RunCached(
+        const std::shared_ptr<runtime::ProgramCache>& cache,
+        const std::map<std::string, VarPtr>& inputs,
+        bool trace,
+        bool verbose,
+        bool training,
+        bool check_types,
+        bool check_nans,
+        bool check_infs,
+        int dump_memory_usage,
+        int64_t base_memory_usage,
+        const std::string& chrome_tracing,
+        const std::string& dump_outputs_dir,
+        const std::map<std::string, py::function>& custom_funcs,
+        int num_inter_op_threads,
+        const std::shared_ptr<runtime::ChromeTracingEmitter>& chrome_tracer,
+        const std::shared_ptr<runtime::ChxVMProfiler>& profiler) {
+    runtime::ChxVMOptions chxvm_opts = CreateOptions(
+            trace,
+            verbose,
+            training,
+            check_types,
+            check_nans,
+            check_infs,
+            dump_memory_usage,
+            base_memory_usage,
+            chrome_tracing,
+            dump_outputs_dir,
+            custom_funcs,
+            num_inter_op_threads,
+            chrome_tracer);
+
+    chxvm_opts.profiler = profiler.get();
+
+    runtime::InOuts outputs(cache->Run(inputs, chxvm_opts));
+
+    if (!chrome_tracing.empty()) {
+        chxvm_opts.chrome_tracing->Emit(chrome_tracing);
+    }
+    return outputs;
+}
+
+py::dict GetProgramCacheStats(const std::shared_ptr<runtime::ProgramCache>& cache) {
+    py::dict d;
+    d["hits"] = cache->num_hits();
+    d["misses"] = cache->num_misses();
+    d["evictions"] = cache->num_evictions();
+    d["size"] = cache->size();
+    return d;
+}
+
+void InitProgramCache(py::module& m) {
+    py::class_<runtime::ProgramCache, std::shared_ptr<runtime::ProgramCache>> c{m, "ProgramCache"};
+    c.def("run",
+          &RunCached,
+          "Run the model with a program for the shapes of inputs",
+          "inputs"_a,
+          "trace"_a = false,
+          "verbose"_a = false,
+          "training"_a = false,
+          "check_types"_a = true,
+          "check_nans"_a = false,
+          "check_infs"_a = false,
+          "dump_memory_usage"_a = 0,
+          "base_memory_usage"_a = -1,
+          "chrome_tracing"_a = "",
+          "dump_outputs_dir"_a = "",
+          "custom_funcs"_a = py::dict(),
+          "num_inter_op_threads"_a = 0,
+          "chrome_tracer"_a = py::none(),
+          "profiler"_a = py::none());
+    c.def("stats", &GetProgramCacheStats, "Get hits, misses, and evictions of the cache");
+}
+
+py::dict ProfileStatsToDict(const runtime::ChxVMProfiler::Stats& stats) {
+    py::dict d;
+    d["count"] = stats.count;
+    d["total_usec"] = stats.total_usec;
+    d["mean_usec"] = stats.mean_usec();
+    d["max_usec"] = stats.max_usec;
+    d["flops"] = stats.flops;
+    d["gflops_per_sec"] = stats.gflops_per_sec();
+    d["output_bytes"] = stats.output_bytes;
+    return d;
+}
+
+py::dict GetProfilerStats(const std::shared_ptr<runtime::ChxVMProfiler>& profiler) {
+    py::dict op_types;
+    for (const auto& p : profiler->op_type_stats()) {
+        op_types[py::str(p.first)] = ProfileStatsToDict(p.second);
+    }
+    py::list instructions;
+    for (const auto& p : profiler->instruction_stats()) {
+        py::dict inst = ProfileStatsToDict(p.second);
+        inst["id"] = p.second.id;
+        inst["pc"] = p.second.pc;
+        inst["op_type"] = p.second.op_type;
+        inst["debug_info"] = p.second.debug_info;
+        instructions.append(inst);
+    }
+    py::dict d;
+    d["total_usec"] = profiler->total_usec();
+    d["op_types"] = op_types;
+    d["instructions"] = instructions;
+    return d;
+}
+
+void InitProfiler(py::module& m) {
+    py::class_<runtime::ChxVMProfiler, std::shared_ptr<runtime::ChxVMProfiler>> c{m, "Profiler"};
+    c.def(py::init<>());
+    c.def("stats", &GetProfilerStats, "Get elapsed times aggregated per op type and per instruction");
+    c.def("table", &runtime::ChxVMProfiler::ToTable, "Format the stats as tables sorted by elapsed times", "max_instructions"_a = 20);
+    c.def("reset", &runtime::ChxVMProfiler::Reset, "Drop all stats");
+}
+
+// A context manager which records an event while it is entered, e.g.,
+// a training step which consists of runs of forward and backward.
+class ChromeTracingScope {
+public:
+    ChromeTracingScope(
+            const std::shared_ptr<runtime::ChromeTracingEmitter>& chrome_tracer, const std::string& category, const std::string& name)
+        : chrome_tracer_(chrome_tracer), category_(category), name_(name) {
+    }
+
+    void Enter() {
+        CHECK(!event_) << "Scope " << name_ << " is entered twice";
+        event_.reset(new runtime::ChromeTracingEmitter::ScopedEvent(chrome_tracer_.get(), category_, name_));
+    }
+
+    void Exit() {
+        event_.reset();
+    }
+
+private:
+    std::shared_ptr<runtime::ChromeTracingEmitter> chrome_tracer_;
+    std::string category_;
+    std::string name_;
+    std::unique_ptr<runtime::ChromeTracingEmitter::ScopedEvent> event_;
+};
+
+void InitChromeTracing(py::module& m) {
+    py::class_<runtime::ChromeTracingEmitter, std::shared_ptr<runtime::ChromeTracingEmitter>> c{m, "ChromeTracing"};
+    c.def(py::init<>());
+    c.def("emit", &runtime::ChromeTracingEmitter::Emit, "Write events in the Chrome tracing format", "filename"_a);
+    c.def("clear", &runtime::ChromeTracingEmitter::Clear, "Drop all events");
+    c.def("num_events", &runtime::ChromeTracingEmitter::num_events, "Get the number of events");
+    c.def("scope",
+          [](const std::shared_ptr<runtime::ChromeTracingEmitter>& self, const std::string& category, const std::string& name) {
+              return std::make_shared<ChromeTracingScope>(self, category, name);
+          },
+          "Record an event while the returned context manager is entered",
+          "category"_a,
+          "name"_a);
+
+    py::class_<ChromeTracingScope, std::shared_ptr<ChromeTracingScope>> s{m, "ChromeTracingScope"};
+    s.def("__enter__", &ChromeTracingScope::Enter);
+    s.def("__exit__", [](ChromeTracingScope& self, py::args) { self.Exit(); });
+}
+
+// Waits for the next batch without the GIL, so Python threads run
+// while threads of the iterator prepare batches.
+py::tuple GetNextBatch(DataIterator& iter) {
+    std::vector<chainerx::Array> arrays;
+    {
+        py::gil_scoped_release gsr;
+        arrays = iter.GetNext();
+    }
+    if (arrays.empty()) throw py::stop_iteration();
+    py::tuple batch(arrays.size());
+    for (size_t i = 0; i < arrays.size(); ++i) {
+        batch[i] = chainerx::internal::GetArrayBody(arrays[i]);
+    }
+    return batch;
+}
+
+void TerminateIterator(DataIterator& iter) {
+    py::gil_scoped_release gsr;
+    iter.Terminate();
+}
+
+std::shared_ptr<ShardIterator> CreateShardIterator(
+        const std::string& shard_index,
+        int batch_size,
+        const std::vector<float>& mean,
+        int height,
+        int width,
+        int buf_size,
+        int num_workers,
+        bool shuffle,
+        bool random_crop,
+        bool random_flip,
+        float scale,
+        uint32_t seed,
+        int num_epochs) {
+    ShardIteratorOptions options;
+    options.num_workers = num_workers;
+    options.shuffle = shuffle;
+    options.random_crop = random_crop;
+    options.random_flip = random_flip;
+    options.scale = scale;
+    options.seed = seed;
+    options.num_epochs = num_epochs;
+    auto iter = std::make_shared<ShardIterator>(shard_index, buf_size, batch_size, mean, height, width, options);
+    iter->Start();
+    return iter;
+}
+
+#ifdef CHAINER_COMPILER_ENABLE_OPENCV
+std::shared_ptr<ImageNetIterator> CreateImageNetIterator(
+        const std::string& labeled_image_dataset,
+        int batch_size,
+        const std::vector<float>& mean,
+        int height,
+        int width,
+        int buf_size,
+        int num_workers,
+        bool random_crop,
+        bool random_flip,
+        float scale,
+        uint32_t seed) {
+    ImageNetIteratorOptions options;
+    options.num_workers = num_workers;
+    options.random_crop = random_crop;
+    options.random_flip = random_flip;
+    options.scale = scale;
+    options.seed = seed;
+    auto iter = std::make_shared<ImageNetIterator>(labeled_image_dataset, buf_size, batch_size, mean, height, width, options);
+    iter->Start();
+    return iter;
+}
+#endif
+
+std::shared_ptr<DeviceFeeder> CreateDeviceFeeder(
+        const std::shared_ptr<DataIterator>& source, const std::string& device_spec, int buf_size) {
+    chainerx::Device* device = &chainerx::GetDefaultContext().GetDevice(device_spec);
+    auto feeder = std::make_shared<DeviceFeeder>(source.get(), device, buf_size);
+    feeder->Start();
+    return feeder;
+}
+
+// Iterators are started when they are constructed and yield tuples of
+// ChainerX arrays. Batches are prepared by native threads, so neither
+// the GIL nor pickling is involved. Arrays are backed by recycled
+// buffers, which are reused after all references to them are dropped.
+void InitFeeder(py::module& m) {
+    py::class_<DataIterator, std::shared_ptr<DataIterator>> c{m, "DataIterator"};
+    c.def("__iter__", [](py::object self) { return self; });
+    c.def("__next__", &GetNextBatch, "Get the next batch as a tuple of arrays");
+    c.def("terminate", &TerminateIterator, "Stop threads of the iterator");
+    c.def("__enter__", [](py::object self) { return self; });
+    c.def("__exit__", [](DataIterator& self, py::args) { TerminateIterator(self); });
+
+    py::class_<ShardIterator, DataIterator, std::shared_ptr<ShardIterator>> s{m, "ShardIterator"};
+    s.def(py::init(&CreateShardIterator),
+          "Iterate over batches of images in shards made by pack_imagenet",
+          "shard_index"_a,
+          "batch_size"_a,
+          "mean"_a,
+          "height"_a,
+          "width"_a,
+          "buf_size"_a = 3,
+          "num_workers"_a = 1,
+          "shuffle"_a = true,
+          "random_crop"_a = false,
+          "random_flip"_a = false,
+          "scale"_a = 1.0f / 255.0f,
+          "seed"_a = 0,
+          "num_epochs"_a = 1);
+    s.def("num_records", &ShardIterator::num_records, "Get the number of records in shards");
+    s.def("status", &ShardIterator::GetStatus, "Get the progress of the iteration");
+
+#ifdef CHAINER_COMPILER_ENABLE_OPENCV
+    py::class_<ImageNetIterator, DataIterator, std::shared_ptr<ImageNetIterator>> i{m, "ImageNetIterator"};
+    i.def(py::init(&CreateImageNetIterator),
+          "Iterate over batches of images listed with labels in a text file",
+          "labeled_image_dataset"_a,
+          "batch_size"_a,
+          "mean"_a,
+          "height"_a,
+          "width"_a,
+          "buf_size"_a = 3,
+          "num_workers"_a = 1,
+          "random_crop"_a = false,
+          "random_flip"_a = false,
+          "scale"_a = 1.0f / 255.0f,
+          "seed"_a = 0);
+    i.def("status", &ImageNetIterator::GetStatus, "Get the progress of the iteration");
+
+    m.def("load_mean", &LoadMean, "Load a mean image in CHW and crop its center", "filename"_a, "height"_a, "width"_a);
+#endif
+
+    py::class_<DeviceFeeder, DataIterator, std::shared_ptr<DeviceFeeder>> f{m, "DeviceFeeder"};
+    f.def(py::init(&CreateDeviceFeeder),
+          "Transfer batches of another iterator to a device in background",
+          "source"_a,
+          "device"_a,
+          "buf_size"_a = 1,
+          py::keep_alive<1, 2>());
+    f.def("num_buffers", &DeviceFeeder::num_buffers, "Get the number of buffers allocated on the device");
+}
+
 void InitChxVMState(py::module& m) {
     py::class_<runtime::ChxVMState, std::shared_ptr<runtime::ChxVMState>> c{m, "ChxVMState"};
 }
@@ -396,6 +823,14 @@ PYBIND11_MODULE(_chainer_compiler_core, m) {  // NOLINT
 
     InitChxVMState(m);
 
+    InitProgramCache(m);
+
+    InitProfiler(m);
+
+    InitChromeTracing(m);
+
+    InitFeeder(m);
+
     m.def("load", &LoadGraph, "Load an ONNX model");
     m.def("configure", &Configure, "Configure global variables in chainer compiler",
 #include "chainer_compiler_cc/pybind_args.inc"
@@ -0,0 +1,177 @@
+#include "compiler/chxvm/dependency.h"
+
+#include <map>
+#include <set>
+#include <vector>
+
+#include <runtime/chxvm.pb.h>
+
+namespace chainer_compiler {
+namespace chxvm {
+
+using runtime::ChxVMInstructionProto;
+using runtime::ChxVMProgramProto;
+using runtime::ChxVMValueProto;
+
+namespace {
+
+// A pseudo variable which serializes accesses to program inputs and
+// outputs.
+constexpr int kInOutVariable = -1;
+
+bool IsJump(ChxVMInstructionProto::Op op) {
+    return op == ChxVMInstructionProto::Jmp || op == ChxVMInstructionProto::JmpTrue || op == ChxVMInstructionProto::JmpFalse;
+}
+
+// Ops which may touch states shared with other ops. They run after all
+// preceding instructions and before all following instructions.
+bool IsBarrier(ChxVMInstructionProto::Op op) {
+    switch (op) {
+        case ChxVMInstructionProto::Print:
+        case ChxVMInstructionProto::ElementWiseNvrtc:
+        case ChxVMInstructionProto::TVM:
+        case ChxVMInstructionProto::NGraph:
+        case ChxVMInstructionProto::Dldt:
+        case ChxVMInstructionProto::SnpeDlc:
+        case ChxVMInstructionProto::TensorRT:
+            return true;
+        default:
+            return false;
+    }
+}
+
+// Ops whose outputs are shapes or scalars.
+bool HasNonArrayOutputs(ChxVMInstructionProto::Op op) {
+    return op == ChxVMInstructionProto::Shape || op == ChxVMInstructionProto::Dtype || op == ChxVMInstructionProto::IntScalarConstant ||
+           op == ChxVMInstructionProto::FloatScalarConstant;
+}
+
+// Returns variables which may be converted between arrays, shapes, and
+// scalars when they are read. Such conversions update variables
+// in-place so all accesses to them are treated as writes.
+std::set<int> CollectConvertibleVariables(const ChxVMProgramProto& program) {
+    std::set<int> convertibles;
+    for (const ChxVMInstructionProto& inst : program.instructions()) {
+        if (HasNonArrayOutputs(inst.op())) {
+            convertibles.insert(inst.outputs().begin(), inst.outputs().end());
+        }
+        for (const ChxVMValueProto& value : inst.inputs()) {
+            switch (value.type()) {
+                case ChxVMValueProto::SHAPE:
+                    convertibles.insert(value.shape());
+                    break;
+                case ChxVMValueProto::SCALAR:
+                case ChxVMValueProto::OPTIONAL_SCALAR:
+                    convertibles.insert(value.scalar());
+                    break;
+                default:
+                    break;
+            }
+        }
+    }
+    return convertibles;
+}
+
+void CollectVariables(const ChxVMInstructionProto& inst, std::vector<int>* reads, std::vector<int>* writes) {
+    auto add = [](int id, std::vector<int>* ids) {
+        if (id >= 0) ids->push_back(id);
+    };
+
+    const std::set<int> overwritables(inst.overwritable_inputs().begin(), inst.overwritable_inputs().end());
+    for (int i = 0; i < inst.inputs_size(); ++i) {
+        const ChxVMValueProto& value = inst.inputs(i);
+        switch (value.type()) {
+            case ChxVMValueProto::ARRAY:
+            case ChxVMValueProto::OPTIONAL_ARRAY:
+                // Inputs overwritten by in-place ops are written.
+                add(value.array(), overwritables.count(i) ? writes : reads);
+                break;
+            case ChxVMValueProto::ARRAY_LIST:
+                for (int id : value.array_list()) add(id, reads);
+                break;
+            case ChxVMValueProto::SEQUENCE:
+                // Some sequence ops modify their inputs in-place.
+                add(value.sequence(), writes);
+                break;
+            case ChxVMValueProto::OPAQUE:
+                add(value.opaque(), reads);
+                break;
+            case ChxVMValueProto::SHAPE:
+                add(value.shape(), reads);
+                break;
+            case ChxVMValueProto::SCALAR:
+            case ChxVMValueProto::OPTIONAL_SCALAR:
+                add(value.scalar(), reads);
+                break;
+            default:
+                break;
+        }
+    }
+    for (int id : inst.outputs()) add(id, writes);
+
+    if (inst.op() == ChxVMInstructionProto::Free) {
+        writes->insert(writes->end(), reads->begin(), reads->end());
+        reads->clear();
+    }
+    if (inst.op() == ChxVMInstructionProto::In || inst.op() == ChxVMInstructionProto::Out) {
+        writes->push_back(kInOutVariable);
+    }
+}
+
+}  // namespace
+
+void AddInstructionDependencies(ChxVMProgramProto* program) {
+    const std::set<int> convertibles = CollectConvertibleVariables(*program);
+    std::map<int, int> last_writers;
+    std::map<int, std::vector<int>> readers;
+    int last_barrier = -1;
+    bool has_jump = false;
+
+    for (int i = 0; i < program->instructions_size(); ++i) {
+        ChxVMInstructionProto* inst = program->mutable_instructions(i);
+        if (IsJump(inst->op())) has_jump = true;
+
+        std::set<int> deps;
+        if (IsBarrier(inst->op())) {
+            for (int j = last_barrier + 1; j < i; ++j) deps.insert(j);
+            last_barrier = i;
+        } else if (last_barrier >= 0) {
+            deps.insert(last_barrier);
+        }
+
+        std::vector<int> reads, writes;
+        CollectVariables(*inst, &reads, &writes);
+        for (auto iter = reads.begin(); iter != reads.end();) {
+            if (convertibles.count(*iter)) {
+                writes.push_back(*iter);
+                iter = reads.erase(iter);
+            } else {
+                ++iter;
+            }
+        }
+
+        for (int id : reads) {
+            auto found = last_writers.find(id);
+            if (found != last_writers.end()) deps.insert(found->second);
+        }
+        for (int id : writes) {
+            auto found = last_writers.find(id);
+            if (found != last_writers.end()) deps.insert(found->second);
+            for (int reader : readers[id]) deps.insert(reader);
+        }
+        for (int id : reads) readers[id].push_back(i);
+        for (int id : writes) {
+            last_writers[id] = i;
+            readers[id].clear();
+        }
+
+        deps.erase(i);
+        inst->clear_deps();
+        for (int dep : deps) inst->add_deps(dep);
+    }
+
+    program->set_has_deps(!has_jump);
+}
+
+}  // namespace chxvm
+}  // namespace chainer_compiler
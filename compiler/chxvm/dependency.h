@@ -0,0 +1,17 @@
+#pragma once
+
+namespace chainer_compiler {
+
+namespace runtime {
+class ChxVMProgramProto;
+}
+
+namespace chxvm {
+
+// Fills `deps` of each instruction by analyzing variables read and
+// written by instructions. `has_deps` is set only when the program can
+// be run out of order, i.e., it has no jumps.
+void AddInstructionDependencies(runtime::ChxVMProgramProto* program);
+
+}  // namespace chxvm
+}  // namespace chainer_compiler
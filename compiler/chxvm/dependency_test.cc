@@ -0,0 +1,53 @@
+#include <vector>
+
+#include <gtest/gtest.h>
+
+#include <compiler/chxvm/chxvm_value.h>
+#include <compiler/chxvm/dependency.h>
+#include <compiler/gen_chxvm_codegen.h>
+#include <runtime/chxvm.pb.h>
+
+namespace chainer_compiler {
+namespace chxvm {
+namespace {
+
+std::vector<int> GetDeps(const runtime::ChxVMProgramProto& program, int pc) {
+    const runtime::ChxVMInstructionProto& inst = program.instructions(pc);
+    return std::vector<int>(inst.deps().begin(), inst.deps().end());
+}
+
+TEST(DependencyTest, Branches) {
+    runtime::ChxVMProgramProto program;
+    AddInOp(&program, ChxVMValue(1), "x");
+    AddReluOp(&program, ChxVMValue(2), 1);
+    AddMulOp(&program, ChxVMValue(3), 1, 1);
+    AddFreeOp(&program, 1);
+    AddAddOp(&program, ChxVMValue(4), 2, 3);
+    AddOutOp(&program, "y", 4);
+    AddInstructionDependencies(&program);
+
+    EXPECT_TRUE(program.has_deps());
+    EXPECT_EQ(std::vector<int>(), GetDeps(program, 0));
+    // Relu and Mul are independent.
+    EXPECT_EQ(std::vector<int>({0}), GetDeps(program, 1));
+    EXPECT_EQ(std::vector<int>({0}), GetDeps(program, 2));
+    // Free must wait for all readers.
+    EXPECT_EQ(std::vector<int>({0, 1, 2}), GetDeps(program, 3));
+    EXPECT_EQ(std::vector<int>({1, 2}), GetDeps(program, 4));
+    // Outputs are ordered after inputs.
+    EXPECT_EQ(std::vector<int>({0, 4}), GetDeps(program, 5));
+}
+
+TEST(DependencyTest, Jump) {
+    runtime::ChxVMProgramProto program;
+    AddInOp(&program, ChxVMValue(1), "x");
+    AddJmpOp(&program, 2);
+    AddOutOp(&program, "y", 1);
+    AddInstructionDependencies(&program);
+
+    EXPECT_FALSE(program.has_deps());
+}
+
+}  // namespace
+}  // namespace chxvm
+}  // namespace chainer_compiler
@@ -3,10 +3,15 @@
 #include <stdlib.h>
 #include <fstream>
 #include <map>
+#include <set>
+#include <utility>
+#include <vector>
 
 #include <common/log.h>
 #include <common/strutil.h>
 #include <compiler/chxvm/chxvm_value.h>
+#include <compiler/chxvm/dependency.h>
+#include <compiler/chxvm/in_place.h>
 #include <compiler/chxvm/simple_node_emitter.h>
 #include <compiler/chxvm/value_id_manager.h>
 #include <compiler/file_cache.h>
@@ -15,6 +20,7 @@
 #include <compiler/gen_chxvm_codegen.h>
 #include <compiler/graph.h>
 #include <compiler/log.h>
+#include <compiler/memory_planner.h>
 #include <compiler/model.h>
 #include <compiler/node.h>
 #include <compiler/nvrtc_builder.h>
@@ -49,11 +55,79 @@ void FillOpInfo(const Node& node, const std::string& debug_info, ChxVMProgramPro
     inst->set_flops(CalculateFlops(node));
 }
 
+// Nodes whose ChxVM ops can store outputs to offsets in the arena.
+const std::set<Node::OpType>& GetArenaOps() {
+    static const std::set<Node::OpType> ops = {
+            Node::kAdd,
+            Node::kSub,
+            Node::kMul,
+            Node::kDiv,
+            Node::kRelu,
+            Node::kTanh,
+            Node::kSigmoid,
+            Node::kExp,
+            Node::kMatMul,
+            Node::kGemm,
+            Node::kConv,
+    };
+    return ops;
+}
+
+bool CanStoreToArena(runtime::ChxVMInstructionProto::Op op) {
+    switch (op) {
+        case runtime::ChxVMInstructionProto::Add:
+        case runtime::ChxVMInstructionProto::Sub:
+        case runtime::ChxVMInstructionProto::Mul:
+        case runtime::ChxVMInstructionProto::Div:
+        case runtime::ChxVMInstructionProto::Relu:
+        case runtime::ChxVMInstructionProto::Tanh:
+        case runtime::ChxVMInstructionProto::Sigmoid:
+        case runtime::ChxVMInstructionProto::Exp:
+        case runtime::ChxVMInstructionProto::MatMul:
+        case runtime::ChxVMInstructionProto::Gemm:
+        case runtime::ChxVMInstructionProto::Conv:
+            return true;
+        default:
+            return false;
+    }
+}
+
 class ChxVMEmitter {
 public:
     ChxVMEmitter() {
     }
 
+    // Fills `output_offsets` of instructions which produce values
+    // planned by `PlanArena`.
+    void EmitArenaOffsets(const Graph& graph, ChxVMProgramProto* prog) {
+        const MemoryPlan plan = PlanArena(graph, GetArenaOps());
+        // Keyed by the ID of the node and the variable of the value.
+        std::map<std::pair<int64_t, int>, int64_t> offsets;
+        for (const auto& p : plan.offsets) {
+            const Value* value = p.first;
+            offsets.emplace(std::make_pair(value->producer()->chainer_order(), GetValueId(value)), p.second);
+        }
+
+        for (runtime::ChxVMInstructionProto& inst : *prog->mutable_instructions()) {
+            if (!CanStoreToArena(inst.op())) {
+                continue;
+            }
+            std::vector<int64_t> inst_offsets;
+            bool planned = false;
+            for (int output : inst.outputs()) {
+                auto found = offsets.find(std::make_pair(inst.id(), output));
+                inst_offsets.push_back(found == offsets.end() ? -1 : found->second);
+                planned |= found != offsets.end();
+            }
+            if (planned) {
+                for (int64_t offset : inst_offsets) {
+                    inst.add_output_offsets(offset);
+                }
+            }
+        }
+        prog->set_arena_size(plan.arena_size);
+    }
+
     void EmitModel(const Graph& graph, ChxVMProgramProto* program, bool dump_value_names) {
         EmitInputTypes(graph, program);
         AssignValueIds(graph);
@@ -586,6 +660,90 @@ private:
         EMIT(ElementWiseNvrtc, outputs, inputs, outputs.size(), nvrtc, node.chainer_fusion_group());
     }
 
+    // The generated code computes all outputs in the shape broadcasted
+    // from inputs so outputs must have the same static shape. All
+    // values share a single element type of the code.
+    bool CanEmitFusionGroupCpu(const Graph& body) {
+        Dtype dtype = Dtype::kUnknown;
+        auto check_dtype = [&dtype](const Value* value) {
+            Dtype dt = value->type().dtype();
+            if (dt == Dtype::kUnknown) {
+                return true;
+            }
+            if (dtype == Dtype::kUnknown) {
+                dtype = dt;
+            }
+            return dt == dtype;
+        };
+        for (const Node* node : body.nodes()) {
+            for (const Value* value : node->inputs()) {
+                if (!check_dtype(value)) return false;
+            }
+            for (const Value* value : node->outputs()) {
+                if (!check_dtype(value)) return false;
+            }
+        }
+        if (dtype != Dtype::kUnknown && dtype != Dtype::kFloat32 && dtype != Dtype::kFloat64) {
+            return false;
+        }
+
+        const std::vector<int64_t>& dims = body.output_values()[0]->type().dims();
+        for (Value* value : body.output_values()) {
+            if (!value->type().HasKnownShape() || value->type().dims() != dims) {
+                return false;
+            }
+        }
+        for (Value* value : body.input_values()) {
+            const Type& type = value->type();
+            if (!type.HasKnownShape() || type.dims().size() > dims.size()) {
+                return false;
+            }
+            for (size_t i = 0; i < type.dims().size(); ++i) {
+                int64_t dim = type.dims()[type.dims().size() - 1 - i];
+                if (dim != 1 && dim != dims[dims.size() - 1 - i]) {
+                    return false;
+                }
+            }
+        }
+        return true;
+    }
+
+    void EmitFusionGroupCpu(const Node& node, ChxVMProgramProto* prog) {
+        const Graph& body = *node.subgraph();
+        std::string code;
+        Dtype dtype;
+        BuildCpuElementwiseProgram(body.nodes(), node.chainer_fusion_group(), body.input_values(), body.output_values(), &code, &dtype);
+        if (g_compiler_log) {
+            CLOG() << "CPU program: " << code;
+        }
+
+        const std::string compile_command = "c++ -O3 -march=native -fPIC -shared";
+        FileCache cache(CacheBasePath(node), ".so", {code, compile_command});
+        if (!cache.IsReady()) {
+            const std::string& src_filename = cache.GetTmpFilename() + ".cc";
+            {
+                std::ofstream ofs(src_filename);
+                CHECK(ofs) << "Failed to open output file: " << src_filename;
+                ofs << code;
+            }
+            const std::string cmdline = StrCat(compile_command, " -o ", cache.GetTmpFilename(), " ", src_filename);
+            CHECK_CMDLINE(cmdline);
+            cache.Commit();
+        }
+
+        std::vector<int> inputs;
+        std::vector<ChxVMValue> outputs;
+        for (Value* value : node.inputs()) {
+            inputs.push_back(GetValueId(value));
+        }
+        for (Value* value : node.outputs()) {
+            outputs.emplace_back(GetValueId(value), value);
+        }
+        const std::string func_name = StrCat("fusion", node.chainer_fusion_group());
+        const std::vector<int64_t>& shape = body.output_values()[0]->type().dims();
+        EMIT(ElementWiseCpu, outputs, inputs, outputs.size(), dtype, shape, cache.GetFilename(), func_name);
+    }
+
     void EmitFusionGroup(const Node& node, ChxVMProgramProto* prog) {
         const Graph& body = *node.subgraph();
         int num_input_values = 0;
@@ -648,6 +806,11 @@ private:
             return;
         }
 
+        if (g_use_cpu_codegen && node.fusion_type() == "cpu" && CanEmitFusionGroupCpu(body)) {
+            EmitFusionGroupCpu(node, prog);
+            return;
+        }
+
         AssignValueIds(body);
 
         for (size_t i = 0; i < node.inputs().size(); ++i) {
@@ -954,6 +1117,14 @@ void Emit(const Model& model, ChxVMProgramProto* program, bool dump_value_names)
 void Emit(const Graph& graph, ChxVMProgramProto* program, bool dump_value_names) {
     ChxVMEmitter emitter;
     emitter.EmitModel(graph, program, dump_value_names);
+    if (g_use_memory_arena) {
+        emitter.EmitArenaOffsets(graph, program);
+    }
+    if (!g_disable_in_place_ops) {
+        MarkOverwritableInputs(program);
+        ReplaceDeadSequenceCopies(program);
+    }
+    AddInstructionDependencies(program);
 }
 
 void Emit(const Model& model, std::ostream& out, bool dump_value_names) {
@@ -0,0 +1,143 @@
+#include "compiler/chxvm/in_place.h"
+
+#include <set>
+
+#include <runtime/chxvm.pb.h>
+
+namespace chainer_compiler {
+namespace chxvm {
+
+using runtime::ChxVMInstructionProto;
+using runtime::ChxVMProgramProto;
+using runtime::ChxVMValueProto;
+
+namespace {
+
+// Ops whose runtime implementations can write outputs to inputs.
+bool CanRunInPlace(ChxVMInstructionProto::Op op) {
+    switch (op) {
+        case ChxVMInstructionProto::Relu:
+        case ChxVMInstructionProto::Sigmoid:
+        case ChxVMInstructionProto::Tanh:
+        case ChxVMInstructionProto::Add:
+        case ChxVMInstructionProto::Sub:
+        case ChxVMInstructionProto::Mul:
+        case ChxVMInstructionProto::Div:
+            return true;
+        default:
+            return false;
+    }
+}
+
+bool IsJump(ChxVMInstructionProto::Op op) {
+    return op == ChxVMInstructionProto::Jmp || op == ChxVMInstructionProto::JmpTrue || op == ChxVMInstructionProto::JmpFalse;
+}
+
+bool UsesVariable(const ChxVMInstructionProto& inst, int id) {
+    for (const ChxVMValueProto& value : inst.inputs()) {
+        switch (value.type()) {
+            case ChxVMValueProto::ARRAY:
+            case ChxVMValueProto::OPTIONAL_ARRAY:
+                if (value.array() == id) return true;
+                break;
+            case ChxVMValueProto::ARRAY_LIST:
+                for (int v : value.array_list()) {
+                    if (v == id) return true;
+                }
+                break;
+            case ChxVMValueProto::SEQUENCE:
+                if (value.sequence() == id) return true;
+                break;
+            case ChxVMValueProto::OPAQUE:
+                if (value.opaque() == id) return true;
+                break;
+            case ChxVMValueProto::SHAPE:
+                if (value.shape() == id) return true;
+                break;
+            case ChxVMValueProto::SCALAR:
+            case ChxVMValueProto::OPTIONAL_SCALAR:
+                if (value.scalar() == id) return true;
+                break;
+            default:
+                break;
+        }
+    }
+    for (int output : inst.outputs()) {
+        if (output == id) return true;
+    }
+    return false;
+}
+
+}  // namespace
+
+void MarkOverwritableInputs(ChxVMProgramProto* program) {
+    for (int i = 0; i < program->instructions_size(); ++i) {
+        ChxVMInstructionProto* inst = program->mutable_instructions(i);
+        inst->clear_overwritable_inputs();
+        if (!CanRunInPlace(inst->op())) {
+            continue;
+        }
+
+        // Variables freed by the `Free` ops which immediately follow.
+        std::set<int> freed;
+        for (int j = i + 1; j < program->instructions_size(); ++j) {
+            const ChxVMInstructionProto& next = program->instructions(j);
+            if (next.op() != ChxVMInstructionProto::Free) {
+                break;
+            }
+            freed.insert(next.inputs(0).array());
+        }
+
+        std::multiset<int> inputs;
+        for (const ChxVMValueProto& value : inst->inputs()) {
+            if (value.type() == ChxVMValueProto::ARRAY) {
+                inputs.insert(value.array());
+            }
+        }
+
+        for (int j = 0; j < inst->inputs_size(); ++j) {
+            const ChxVMValueProto& value = inst->inputs(j);
+            if (value.type() != ChxVMValueProto::ARRAY) {
+                continue;
+            }
+            const int id = value.array();
+            // An input passed twice, e.g., Mul(x, x), is still read
+            // through the other operand.
+            if (id < 0 || !freed.count(id) || inputs.count(id) != 1) {
+                continue;
+            }
+            inst->add_overwritable_inputs(j);
+        }
+    }
+}
+
+void ReplaceDeadSequenceCopies(ChxVMProgramProto* program) {
+    for (int i = 0; i < program->instructions_size(); ++i) {
+        ChxVMInstructionProto* inst = program->mutable_instructions(i);
+        if (inst->op() != ChxVMInstructionProto::SequenceCopy) {
+            continue;
+        }
+        const int id = inst->inputs(0).sequence();
+
+        // Look for `Free` of the copied sequence in the same basic block.
+        for (int j = i + 1; j < program->instructions_size(); ++j) {
+            const ChxVMInstructionProto& next = program->instructions(j);
+            if (IsJump(next.op())) {
+                break;
+            }
+            if (next.op() == ChxVMInstructionProto::Free) {
+                if (next.inputs(0).array() == id) {
+                    inst->set_op(ChxVMInstructionProto::SequenceMove);
+                    break;
+                }
+                continue;
+            }
+            if (UsesVariable(next, id)) {
+                break;
+            }
+        }
+    }
+}
+
+}  // namespace chxvm
+}  // namespace chainer_compiler
@@ -0,0 +1,22 @@
+#pragma once
+
+namespace chainer_compiler {
+
+namespace runtime {
+class ChxVMProgramProto;
+}
+
+namespace chxvm {
+
+// Fills `overwritable_inputs` of element-wise instructions whose input
+// variables are freed right after them, so the runtime can compute
+// their outputs in the buffers of such inputs.
+void MarkOverwritableInputs(runtime::ChxVMProgramProto* program);
+
+// Replaces `SequenceCopy` by `SequenceMove` when the copied sequence is
+// freed without being used after the copy, so the following in-place
+// updates such as `SequenceAppend` do not copy the whole sequence.
+void ReplaceDeadSequenceCopies(runtime::ChxVMProgramProto* program);
+
+}  // namespace chxvm
+}  // namespace chainer_compiler
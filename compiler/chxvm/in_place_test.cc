@@ -0,0 +1,94 @@
+#include <vector>
+
+#include <gtest/gtest.h>
+
+#include <compiler/chxvm/chxvm_value.h>
+#include <compiler/chxvm/dependency.h>
+#include <compiler/chxvm/in_place.h>
+#include <compiler/gen_chxvm_codegen.h>
+#include <runtime/chxvm.pb.h>
+
+namespace chainer_compiler {
+namespace chxvm {
+namespace {
+
+std::vector<int> GetOverwritableInputs(const runtime::ChxVMProgramProto& program, int pc) {
+    const runtime::ChxVMInstructionProto& inst = program.instructions(pc);
+    return std::vector<int>(inst.overwritable_inputs().begin(), inst.overwritable_inputs().end());
+}
+
+TEST(InPlaceTest, LastUse) {
+    runtime::ChxVMProgramProto program;
+    AddInOp(&program, ChxVMValue(1), "x");
+    AddInOp(&program, ChxVMValue(2), "y");
+    AddReluOp(&program, ChxVMValue(3), 1);
+    AddAddOp(&program, ChxVMValue(4), 3, 1);
+    AddFreeOp(&program, 3);
+    AddFreeOp(&program, 1);
+    AddMulOp(&program, ChxVMValue(5), 4, 2);
+    AddOutOp(&program, "z", 5);
+    AddFreeOp(&program, 5);
+    MarkOverwritableInputs(&program);
+
+    // `x` is used later.
+    EXPECT_EQ(std::vector<int>(), GetOverwritableInputs(program, 2));
+    // Both inputs die here.
+    EXPECT_EQ(std::vector<int>({0, 1}), GetOverwritableInputs(program, 3));
+    // Inputs of Mul are not freed right after it.
+    EXPECT_EQ(std::vector<int>(), GetOverwritableInputs(program, 6));
+}
+
+TEST(InPlaceTest, SameInputs) {
+    runtime::ChxVMProgramProto program;
+    AddInOp(&program, ChxVMValue(1), "x");
+    AddMulOp(&program, ChxVMValue(2), 1, 1);
+    AddFreeOp(&program, 1);
+    AddOutOp(&program, "y", 2);
+    MarkOverwritableInputs(&program);
+
+    EXPECT_EQ(std::vector<int>(), GetOverwritableInputs(program, 1));
+}
+
+TEST(InPlaceTest, Dependency) {
+    runtime::ChxVMProgramProto program;
+    AddInOp(&program, ChxVMValue(1), "x");
+    AddExpOp(&program, ChxVMValue(2), 1);
+    AddReluOp(&program, ChxVMValue(3), 1);
+    AddFreeOp(&program, 1);
+    AddAddOp(&program, ChxVMValue(4), 2, 3);
+    AddOutOp(&program, "y", 4);
+    MarkOverwritableInputs(&program);
+    AddInstructionDependencies(&program);
+
+    EXPECT_EQ(std::vector<int>({0}), GetOverwritableInputs(program, 2));
+    // Relu overwrites `x` so it must wait for Exp which reads `x`.
+    const runtime::ChxVMInstructionProto& relu = program.instructions(2);
+    EXPECT_EQ(std::vector<int>({0, 1}), std::vector<int>(relu.deps().begin(), relu.deps().end()));
+}
+
+TEST(InPlaceTest, DeadSequenceCopy) {
+    runtime::ChxVMProgramProto program;
+    AddInOp(&program, ChxVMValue(1), "x");
+    AddSequenceCreateOp(&program, ChxVMValue(2), {});
+    AddSequenceCopyOp(&program, ChxVMValue(3), 2);
+    AddSequenceAppendOp(&program, 3, 1);
+    AddFreeOp(&program, 2);
+    AddSequenceCopyOp(&program, ChxVMValue(4), 3);
+    AddSequenceSizeOp(&program, ChxVMValue(5), 3);
+    AddFreeOp(&program, 3);
+    AddSequenceCopyOp(&program, ChxVMValue(6), 4);
+    AddJmpOp(&program, 11);
+    AddFreeOp(&program, 4);
+    ReplaceDeadSequenceCopies(&program);
+
+    // The sequence is freed right after it is copied.
+    EXPECT_EQ(runtime::ChxVMInstructionProto::SequenceMove, program.instructions(2).op());
+    // `SequenceSize` reads the sequence after the copy.
+    EXPECT_EQ(runtime::ChxVMInstructionProto::SequenceCopy, program.instructions(5).op());
+    // The sequence may be used after the jump.
+    EXPECT_EQ(runtime::ChxVMInstructionProto::SequenceCopy, program.instructions(8).op());
+}
+
+}  // namespace
+}  // namespace chxvm
+}  // namespace chainer_compiler
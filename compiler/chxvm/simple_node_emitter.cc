@@ -578,7 +578,15 @@ void EmitSimpleNode(const Node& node, const ValueIdManager& id_manager, ChxVMPro
             EMIT(SequenceAppend, o.id(), in(1));
         }
     } else if (node.op_type() == Node::kChainerSequenceExtend) {
-        EMIT(SequenceExtend, out(0), in(0), in(1));
+        ChxVMValue o(out(0));
+        if (node.input(0)->users().size() == 1 && node.input(0) != node.input(1)) {
+            // Avoid O(N^2) copies for the simple case.
+            EMIT(SequenceMove, o, in(0));
+            EMIT(SequenceAppendAll, o.id(), in(1));
+        } else {
+            EMIT(SequenceCopy, o, in(0));
+            EMIT(SequenceAppendAll, o.id(), in(1));
+        }
     } else if (node.op_type() == Node::kSequenceErase || node.op_type() == Node::kChainerSequencePop) {
         if (node.inputs().size() == 2) {
             EMIT(SequenceErase, out(0), in(0), in(1));
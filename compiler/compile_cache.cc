@@ -0,0 +1,48 @@
+#include "compiler/compile_cache.h"
+
+#include <fstream>
+
+#include <compiler/onnx.h>
+
+#include <common/log.h>
+#include <common/protoutil.h>
+#include <compiler/file_cache.h>
+#include <compiler/flags.h>
+#include <compiler/graph.h>
+#include <compiler/log.h>
+
+namespace chainer_compiler {
+
+CompileCache::CompileCache(const std::string& cache_dir, const Graph& graph, const std::string& options) {
+    onnx::GraphProto xgraph;
+    graph.ToONNX(&xgraph);
+    const std::string serialized_graph = xgraph.SerializeAsString();
+    const std::string flags = FlagsToString();
+    cache_.reset(new FileCache(cache_dir + "/compiled", ".onnx", {serialized_graph, flags, options}));
+}
+
+CompileCache::~CompileCache() {
+}
+
+bool CompileCache::Load(Graph* graph) const {
+    if (!cache_->IsReady()) {
+        return false;
+    }
+    CLOG() << "Loading a compiled graph from " << cache_->GetFilename() << std::endl;
+    graph->ResetFromONNX(LoadLargeProto<onnx::GraphProto>(cache_->GetFilename()));
+    return true;
+}
+
+void CompileCache::Store(const Graph& graph) const {
+    onnx::GraphProto xgraph;
+    graph.ToONNX(&xgraph);
+    {
+        std::ofstream ofs(cache_->GetTmpFilename(), std::ios::binary);
+        CHECK(ofs) << "Failed to open " << cache_->GetTmpFilename();
+        CHECK(xgraph.SerializeToOstream(&ofs));
+    }
+    cache_->Commit();
+    CLOG() << "Stored a compiled graph to " << cache_->GetFilename() << std::endl;
+}
+
+}  // namespace chainer_compiler
@@ -0,0 +1,35 @@
+#pragma once
+
+#include <memory>
+#include <string>
+
+namespace chainer_compiler {
+
+class FileCache;
+class Graph;
+
+// Caches graphs optimized by `RunDefaultPasses` in files. The key of a
+// cache entry is a fingerprint of the input graph (including its
+// subgraphs and initializers), values of compiler flags, and `options`.
+//
+// Only whole graphs are reused. Regions of a graph (including If/Loop
+// bodies) are not cached separately because shape inference,
+// subgraph canonicalization, gradient generation, fusion, and
+// scheduling depend on nodes outside of each region, so a graph which
+// differs from a cached one in any node is compiled from scratch.
+class CompileCache {
+public:
+    CompileCache(const std::string& cache_dir, const Graph& graph, const std::string& options);
+    ~CompileCache();
+
+    // Replaces `graph` by the cached one. Returns false if there is
+    // no cache entry for the graph.
+    bool Load(Graph* graph) const;
+
+    void Store(const Graph& graph) const;
+
+private:
+    std::unique_ptr<FileCache> cache_;
+};
+
+}  // namespace chainer_compiler
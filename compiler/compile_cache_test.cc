@@ -0,0 +1,85 @@
+#include <glob.h>
+#include <stdlib.h>
+#include <unistd.h>
+
+#include <memory>
+#include <string>
+
+#include <gtest/gtest.h>
+
+#include <common/log.h>
+#include <compiler/compile_cache.h>
+#include <compiler/graph.h>
+#include <compiler/node.h>
+#include <compiler/type.h>
+#include <compiler/value.h>
+
+namespace chainer_compiler {
+namespace {
+
+// Creates a fresh directory so concurrent runs do not share entries.
+std::string MakeCacheDir() {
+    std::string dir = ::testing::TempDir() + "compile_cache_test_XXXXXX";
+    CHECK(mkdtemp(&dir[0])) << dir;
+    return dir;
+}
+
+void RemoveCacheDir(const std::string& dir) {
+    glob_t gl;
+    glob((dir + "/*").c_str(), 0, nullptr, &gl);
+    for (size_t i = 0; i < gl.gl_pathc; i++) {
+        EXPECT_EQ(0, unlink(gl.gl_pathv[i])) << gl.gl_pathv[i];
+    }
+    globfree(&gl);
+    EXPECT_EQ(0, rmdir(dir.c_str())) << dir;
+}
+
+std::unique_ptr<Graph> MakeGraph(Node::OpType op_type) {
+    const Type type(Dtype::kFloat32, {3});
+    std::unique_ptr<Graph> graph(new Graph("test"));
+    Value* in = graph->AddInputValue("in", type);
+    Value* out = graph->AddOutputValue("out", type);
+    Value* t = graph->AddValue("t", type);
+    graph->AddNode(Node::kRelu, {in}, {t});
+    graph->AddNode(op_type, {t}, {out});
+    return graph;
+}
+
+TEST(CompileCacheTest, Basic) {
+    const std::string cache_dir = MakeCacheDir();
+
+    std::unique_ptr<Graph> graph = MakeGraph(Node::kRelu);
+    {
+        CompileCache cache(cache_dir, *graph, "");
+        EXPECT_FALSE(cache.Load(graph.get()));
+        // Pretend to optimize the graph.
+        graph->nodes()[0]->set_chainer_order(1);
+        cache.Store(*graph);
+    }
+
+    {
+        std::unique_ptr<Graph> same = MakeGraph(Node::kRelu);
+        CompileCache cache(cache_dir, *same, "");
+        ASSERT_TRUE(cache.Load(same.get()));
+        ASSERT_EQ(2, same->nodes().size());
+        EXPECT_EQ(1, same->nodes()[0]->chainer_order());
+        EXPECT_EQ("out", same->output_values()[0]->name());
+    }
+
+    {
+        std::unique_ptr<Graph> other = MakeGraph(Node::kTanh);
+        CompileCache cache(cache_dir, *other, "");
+        EXPECT_FALSE(cache.Load(other.get()));
+    }
+
+    {
+        std::unique_ptr<Graph> same = MakeGraph(Node::kRelu);
+        CompileCache cache(cache_dir, *same, "gen_backprop=1");
+        EXPECT_FALSE(cache.Load(same.get()));
+    }
+
+    RemoveCacheDir(cache_dir);
+}
+
+}  // namespace
+}  // namespace chainer_compiler
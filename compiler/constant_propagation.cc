@@ -1,5 +1,8 @@
 #include "compiler/constant_propagation.h"
 
+#include <map>
+#include <queue>
+#include <set>
 #include <vector>
 
 #include <compiler/evaluator.h>
@@ -28,54 +31,8 @@ bool IsConstantNode(const Node* node) {
     return true;
 }
 
-bool HasConstantInputsOnly(const Node& node) {
-    if (node.inputs().empty()) return false;
-    for (Value* input : node.inputs()) {
-        if (!IsConstantNode(input->producer())) {
-            return false;
-        }
-    }
-    return true;
-}
-
-void DoConstantPropagation(Graph* graph, Node* node) {
-    CLOG() << "Propagate " << node->ToString() << std::endl;
-    std::vector<Node*> inputs;
-    std::set<Value*> seen_inputs;
-    for (Value* input : node->inputs()) {
-        if (seen_inputs.insert(input).second) {
-            inputs.push_back(input->producer());
-        }
-    }
-
-    std::vector<std::unique_ptr<EvaluatedValue>> next_values;
-    std::vector<Node*> nodes = inputs;
-    nodes.push_back(node);
-    Eval(nodes, node->outputs(), &next_values);
-
-    for (size_t i = 0; i < next_values.size(); ++i) {
-        auto& next_value = next_values[i];
-        GraphBuilder gb(graph, "Const", node->output(i));
-        if (next_value->is_tensor()) {
-            gb.Op(Node::kConstant, {}, node->output(i))->producer()->set_tensor_value(next_value->ReleaseTensor());
-        } else {
-            gb.Op(Node::kChainerSequenceConstants, {}, node->output(i))->producer()->set_tensor_values(next_value->ReleaseSequence());
-        }
-    }
-
-    graph->DetachNode(node);
-    for (Node* input : inputs) {
-        Value* output = input->output(0);
-        // Detach node if the value is not uesd by other ops nor a
-        // graph output.
-        if (output->users().empty() && !output->IsOutput()) {
-            graph->DetachNode(input);
-        }
-    }
-}
-
-bool MaybePropagateConstant(Graph* graph, Node* node) {
-    switch (node->op_type()) {
+bool IsFoldableOp(const Node& node) {
+    switch (node.op_type()) {
         // TODO(hamaji): Handle more ops.
         case Node::kAdd:
         case Node::kCast:
@@ -95,28 +52,111 @@ bool MaybePropagateConstant(Graph* graph, Node* node) {
         case Node::kSlice:
         case Node::kSub:
         case Node::kTranspose:
-        case Node::kUnsqueeze: {
-            DoConstantPropagation(graph, node);
-            return true;
-        }
+        case Node::kUnsqueeze:
+            return !node.inputs().empty();
 
         default:
-            CLOG() << "Not propagate " << node->ToString() << std::endl;
+            return false;
     }
-    return false;
+}
+
+// Collects the maximal set of nodes which can be computed only from
+// constants in topological order.
+std::vector<Node*> CollectFoldableNodes(const std::vector<Node*>& nodes) {
+    std::set<Node*> node_set(nodes.begin(), nodes.end());
+    std::map<Node*, size_t> num_unknown_inputs;
+    std::queue<Node*> q;
+    for (Node* node : nodes) {
+        if (!IsFoldableOp(*node)) continue;
+        size_t num_unknowns = 0;
+        for (Value* input : node->inputs()) {
+            if (!IsConstantNode(input->producer())) ++num_unknowns;
+        }
+        num_unknown_inputs.emplace(node, num_unknowns);
+        if (num_unknowns == 0) q.push(node);
+    }
+
+    std::vector<Node*> foldable_nodes;
+    while (!q.empty()) {
+        Node* node = q.front();
+        q.pop();
+        foldable_nodes.push_back(node);
+        for (Value* output : node->outputs()) {
+            // `users` has an entry for each input slot which takes
+            // `output`.
+            for (Node* user : output->users()) {
+                if (!node_set.count(user)) continue;
+                auto found = num_unknown_inputs.find(user);
+                if (found == num_unknown_inputs.end()) continue;
+                CHECK_LT(0, found->second);
+                if (--found->second == 0) q.push(user);
+            }
+        }
+    }
+    return foldable_nodes;
 }
 
 }  // namespace
 
 void PropagateConstants(Graph* graph) {
-    bool replaced = true;
-    while (replaced) {
-        replaced = false;
-        for (Node* node : graph->GetLiveNodes()) {
-            if (!HasConstantInputsOnly(*node)) continue;
-            if (MaybePropagateConstant(graph, node)) {
-                replaced = true;
+    const std::vector<Node*> live_nodes = graph->GetLiveNodes();
+    const std::vector<Node*> foldable_nodes = CollectFoldableNodes(live_nodes);
+    if (foldable_nodes.empty()) {
+        return;
+    }
+    const std::set<Node*> foldable_set(foldable_nodes.begin(), foldable_nodes.end());
+
+    // Constants which are fed to the folded subgraph.
+    std::vector<Node*> input_nodes;
+    std::set<Node*> seen_input_nodes;
+    // Values which are necessary after folding.
+    std::vector<Value*> fetches;
+    for (Node* node : foldable_nodes) {
+        CLOG() << "Propagate " << node->ToString() << std::endl;
+        for (Value* input : node->inputs()) {
+            Node* producer = input->producer();
+            if (!foldable_set.count(producer) && seen_input_nodes.insert(producer).second) {
+                input_nodes.push_back(producer);
+            }
+        }
+        for (Value* output : node->outputs()) {
+            bool used_outside = output->IsOutput() || output->users().empty();
+            for (Node* user : output->users()) {
+                if (!foldable_set.count(user)) used_outside = true;
             }
+            if (used_outside) fetches.push_back(output);
+        }
+    }
+
+    // Evaluate the whole constant subgraph by a single ChxVM program.
+    std::vector<std::unique_ptr<EvaluatedValue>> next_values;
+    std::vector<Node*> eval_nodes = input_nodes;
+    eval_nodes.insert(eval_nodes.end(), foldable_nodes.begin(), foldable_nodes.end());
+    Eval(eval_nodes, fetches, &next_values);
+    CHECK_EQ(fetches.size(), next_values.size());
+
+    for (size_t i = 0; i < next_values.size(); ++i) {
+        auto& next_value = next_values[i];
+        GraphBuilder gb(graph, "Const", fetches[i]);
+        if (next_value->is_tensor()) {
+            gb.Op(Node::kConstant, {}, fetches[i])->producer()->set_tensor_value(next_value->ReleaseTensor());
+        } else {
+            gb.Op(Node::kChainerSequenceConstants, {}, fetches[i])->producer()->set_tensor_values(next_value->ReleaseSequence());
+        }
+    }
+
+    for (Node* node : foldable_nodes) {
+        graph->DetachNode(node);
+    }
+    const std::set<Node*> live_set(live_nodes.begin(), live_nodes.end());
+    for (Node* input : input_nodes) {
+        // Constants in outer graphs are not owned by this graph.
+        if (!live_set.count(input)) continue;
+        Value* output = input->output(0);
+        // Detach node if the value is not uesd by other ops nor a
+        // graph output.
+        if (output->users().empty() && !output->IsOutput()) {
+            graph->DetachNode(input);
         }
     }
 }
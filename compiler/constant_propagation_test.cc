@@ -0,0 +1,109 @@
+#include <gtest/gtest.h>
+
+#include <chainerx/testing/context_session.h>
+
+#include <compiler/constant_propagation.h>
+#include <compiler/graph.h>
+#include <compiler/graph_builder.h>
+#include <compiler/node.h>
+#include <compiler/tensor.h>
+#include <compiler/value.h>
+
+namespace chainer_compiler {
+namespace {
+
+using chainerx::testing::array_detail::ArrayBuilder;
+
+TEST(ConstantPropagationTest, FoldSubgraph) {
+    chainerx::testing::ContextSession sess;
+
+    Graph graph("test");
+    Value* x = graph.AddInputValue("x", Type(Dtype::kInt32, {2}));
+    Value* y = graph.AddOutputValue("y", Type(Dtype::kInt32, {2}));
+    {
+        GraphBuilder gb(&graph, "test", y);
+        Value* a = gb.Const(ArrayBuilder({2}).WithData<int32_t>({3, 10}).Build());
+        Value* b = gb.Const(ArrayBuilder({2}).WithData<int32_t>({7, 32}).Build());
+        Value* c = gb.Op(Node::kAdd, {a, b});
+        Value* d = gb.Op(Node::kMul, {c, b});
+        gb.Op(Node::kAdd, {x, d}, y);
+    }
+
+    PropagateConstants(&graph);
+
+    std::vector<Node*> nodes = graph.GetLiveNodes();
+    ASSERT_EQ(2UL, nodes.size());
+    Node* add = y->producer();
+    ASSERT_EQ(Node::kAdd, add->op_type());
+    ASSERT_EQ(x, add->input(0));
+    Node* folded = add->input(1)->producer();
+    ASSERT_EQ(Node::kConstant, folded->op_type());
+    const Tensor& t = *folded->tensor_value();
+    EXPECT_EQ(Dtype::kInt32, t.dtype());
+    EXPECT_EQ(70, t.Get<int>(0));
+    EXPECT_EQ(1344, t.Get<int>(1));
+}
+
+TEST(ConstantPropagationTest, KeepSharedIntermediate) {
+    chainerx::testing::ContextSession sess;
+
+    Graph graph("test");
+    Value* x = graph.AddInputValue("x", Type(Dtype::kInt32, {2}));
+    Value* y = graph.AddOutputValue("y", Type(Dtype::kInt32, {2}));
+    Value* z = graph.AddOutputValue("z", Type(Dtype::kInt32, {2}));
+    {
+        GraphBuilder gb(&graph, "test", y);
+        Value* a = gb.Const(ArrayBuilder({2}).WithData<int32_t>({3, 10}).Build());
+        Value* c = gb.Op(Node::kAdd, {a, a});
+        Value* d = gb.Op(Node::kMul, {c, a});
+        gb.Op(Node::kAdd, {x, c}, y);
+        gb.Op(Node::kSub, {x, d}, z);
+    }
+
+    PropagateConstants(&graph);
+
+    Node* add = y->producer();
+    ASSERT_EQ(Node::kConstant, add->input(1)->producer()->op_type());
+    EXPECT_EQ(20, add->input(1)->producer()->tensor_value()->Get<int>(1));
+    Node* sub = z->producer();
+    ASSERT_EQ(Node::kConstant, sub->input(1)->producer()->op_type());
+    EXPECT_EQ(200, sub->input(1)->producer()->tensor_value()->Get<int>(1));
+    EXPECT_EQ(4UL, graph.GetLiveNodes().size());
+}
+
+TEST(ConstantPropagationTest, FoldValueUsedTwice) {
+    chainerx::testing::ContextSession sess;
+
+    Graph graph("test");
+    Value* x = graph.AddInputValue("x", Type(Dtype::kInt32, {2}));
+    Value* y = graph.AddOutputValue("y", Type(Dtype::kInt32, {2}));
+    Value* z = graph.AddOutputValue("z", Type(Dtype::kInt32, {4}));
+    {
+        GraphBuilder gb(&graph, "test", y);
+        Value* a = gb.Const(ArrayBuilder({2}).WithData<int32_t>({3, 10}).Build());
+        Value* b = gb.Const(ArrayBuilder({2}).WithData<int32_t>({1, 2}).Build());
+        Value* c = gb.Op(Node::kAdd, {a, b});
+        Value* d = gb.Op(Node::kMul, {c, c});
+        gb.Op(Node::kAdd, {x, d}, y);
+        Value* s = gb.Op(Node::kIdentity, {b});
+        gb.Op(Node::kConcat, {s, s}, z)->producer()->set_axis(0);
+    }
+
+    PropagateConstants(&graph);
+
+    Node* add = y->producer();
+    ASSERT_EQ(Node::kConstant, add->input(1)->producer()->op_type());
+    EXPECT_EQ(16, add->input(1)->producer()->tensor_value()->Get<int>(0));
+    EXPECT_EQ(144, add->input(1)->producer()->tensor_value()->Get<int>(1));
+    Node* folded = z->producer();
+    ASSERT_EQ(Node::kConstant, folded->op_type());
+    const Tensor& t = *folded->tensor_value();
+    ASSERT_EQ(4, t.NumElements());
+    EXPECT_EQ(1, t.Get<int>(0));
+    EXPECT_EQ(2, t.Get<int>(1));
+    EXPECT_EQ(1, t.Get<int>(2));
+    EXPECT_EQ(2, t.Get<int>(3));
+}
+
+}  // namespace
+}  // namespace chainer_compiler
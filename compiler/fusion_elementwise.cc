@@ -1,5 +1,6 @@
 #include <set>
 
+#include <compiler/flags.h>
 #include <compiler/fusion.h>
 #include <compiler/graph.h>
 #include <compiler/node.h>
@@ -9,7 +10,7 @@ namespace chainer_compiler {
 
 void FuseElementwiseOperations(Graph* graph) {
     // TODO(hamaji): Do not try fusing integer ops.
-    const std::set<Node::OpType> fusable_ops = {
+    std::set<Node::OpType> fusable_ops = {
             Node::kIdentity,
             Node::kAdd,
             Node::kSub,
@@ -19,11 +20,22 @@ void FuseElementwiseOperations(Graph* graph) {
             Node::kSigmoid,
             Node::kExp,
     };
+    if (g_use_cpu_codegen) {
+        fusable_ops.insert(Node::kDiv);
+        fusable_ops.insert(Node::kNeg);
+        fusable_ops.insert(Node::kRelu);
+    }
 
-    auto is_fusable = [&fusable_ops](const Node& node) {
+    auto is_fusable_dtype = [](Dtype dtype) {
+        // The generated C++ code does not support float16.
+        if (g_use_cpu_codegen && dtype == Dtype::kFloat16) return false;
+        return dtype.IsFloat();
+    };
+
+    auto is_fusable = [&fusable_ops, is_fusable_dtype](const Node& node) {
         if (node.op_type() == Node::kConstant) {
             Tensor* t = node.tensor_value().get();
-            return t->dtype().IsFloat() && t->NumElements() == 1;
+            return is_fusable_dtype(t->dtype()) && t->NumElements() == 1;
         }
 
         if (!fusable_ops.count(node.op_type())) return false;
@@ -31,12 +43,12 @@ void FuseElementwiseOperations(Graph* graph) {
             Dtype dtype = value->type().dtype();
             // TODO(hamaji): Fix the dtype inference and do not fuse
             // unknown dtypes.
-            if (!dtype.IsFloat() && dtype != Dtype::kUnknown) return false;
+            if (!is_fusable_dtype(dtype) && dtype != Dtype::kUnknown) return false;
         }
         return true;
     };
 
-    FuseAllConnectedNodes("nvrtc", graph, 2, false, is_fusable);
+    FuseAllConnectedNodes(g_use_cpu_codegen ? "cpu" : "nvrtc", graph, 2, false, is_fusable);
 }
 
 }  // namespace chainer_compiler
@@ -29,5 +29,30 @@ TEST(FusionTest, Basic) {
     g_fuse_operations = false;
 }
 
+TEST(FusionTest, CpuCodegen) {
+    g_fuse_operations = true;
+    g_use_cpu_codegen = true;
+    Type type(Dtype::kFloat32, {2, 3});
+    Graph graph("test");
+    Value* input = graph.AddInputValue("input", type);
+    Value* scale = graph.AddInputValue("scale", Type(Dtype::kFloat32, {3}));
+    Value* output = graph.AddOutputValue("output", type);
+    GraphBuilder gb(&graph, "test", output);
+    Value* tmp = gb.Op(Node::kMul, {input, scale});
+    tmp = gb.Op(Node::kRelu, {tmp});
+    gb.Op(Node::kAdd, {tmp, input}, {output});
+
+    FuseOperations(&graph);
+    ASSERT_EQ(1, graph.nodes().size());
+    const Node& node = *graph.nodes()[0];
+    ASSERT_EQ(Node::kChainerFusionGroup, node.op_type());
+    EXPECT_EQ("cpu", node.fusion_type());
+    ASSERT_TRUE(node.subgraph());
+    EXPECT_EQ(3, node.subgraph()->nodes().size());
+    graph.CheckSanity("fused");
+    g_fuse_operations = false;
+    g_use_cpu_codegen = false;
+}
+
 }  // namespace
 }  // namespace chainer_compiler
@@ -88,6 +88,17 @@ void Graph::Construct(const onnx::GraphProto& xgraph) {
 Graph::Graph(const std::string name) : name_(name) {
 }
 
+void Graph::ResetFromONNX(const onnx::GraphProto& xgraph) {
+    nodes_.clear();
+    nodes_buf_.clear();
+    output_values_.clear();
+    input_values_.clear();
+    temp_values_.clear();
+    all_values_.clear();
+    ids_.clear();
+    Construct(xgraph);
+}
+
 Graph::~Graph() {
 }
 
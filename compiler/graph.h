@@ -25,6 +25,8 @@ public:
     Graph& operator=(const Graph&) = delete;
 
     void ToONNX(onnx::GraphProto* xgraph, bool serialize_initializers = true) const;
+    // Discards all nodes and values and reconstructs the graph from `xgraph`.
+    void ResetFromONNX(const onnx::GraphProto& xgraph);
     std::string DebugString() const;
 
     const std::vector<Value*>& input_values() const {
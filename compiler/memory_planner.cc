@@ -0,0 +1,225 @@
+#include "compiler/memory_planner.h"
+
+#include <algorithm>
+#include <functional>
+#include <map>
+#include <set>
+#include <string>
+#include <vector>
+
+#include <common/log.h>
+#include <common/strutil.h>
+#include <compiler/graph.h>
+#include <compiler/log.h>
+#include <compiler/memory_simulator.h>
+#include <compiler/node.h>
+#include <compiler/value.h>
+
+namespace chainer_compiler {
+
+namespace {
+
+struct Interval {
+    const Value* value;
+    int64_t size;
+    // The index of the producer in the computation sequence.
+    int begin;
+    // The index of the last user in the computation sequence.
+    int end;
+    int64_t offset;
+};
+
+bool Overlaps(const Interval& a, const Interval& b) {
+    return a.begin <= b.end && b.begin <= a.end;
+}
+
+int64_t AlignUp(int64_t size, int64_t alignment) {
+    return (size + alignment - 1) / alignment * alignment;
+}
+
+// Returns the indices of the last users of values in `nodes`. Values
+// referred from subgraphs by name are used by the owners of the
+// subgraphs.
+std::map<const Value*, int> GetLastUses(const std::vector<const Node*>& nodes) {
+    std::map<std::string, const Value*> values_by_name;
+    for (const Node* node : nodes) {
+        for (const Value* value : node->outputs()) {
+            values_by_name.emplace(value->name(), value);
+        }
+    }
+
+    std::function<void(const Graph&, int, std::map<const Value*, int>*)> use_in_subgraph =
+            [&values_by_name, &use_in_subgraph](const Graph& graph, int index, std::map<const Value*, int>* last_uses) {
+                for (const Node* node : graph.nodes()) {
+                    for (const Value* value : node->inputs()) {
+                        auto found = values_by_name.find(value->name());
+                        if (found != values_by_name.end()) {
+                            (*last_uses)[found->second] = index;
+                        }
+                    }
+                    for (const Graph* subgraph : node->GetSubGraphs()) {
+                        use_in_subgraph(*subgraph, index, last_uses);
+                    }
+                }
+            };
+
+    std::map<const Value*, int> last_uses;
+    for (size_t i = 0; i < nodes.size(); ++i) {
+        for (const Value* value : nodes[i]->inputs()) {
+            last_uses[value] = i;
+        }
+        for (const Graph* subgraph : nodes[i]->GetSubGraphs()) {
+            use_in_subgraph(*subgraph, i, &last_uses);
+        }
+    }
+    return last_uses;
+}
+
+// Assigns offsets to `intervals` and fills `plan`. Larger values are
+// placed first at the offset of the smallest gap which does not
+// conflict with already placed values alive at the same time.
+void PlaceIntervals(std::vector<Interval>* intervals, MemoryPlan* plan) {
+    std::vector<Interval*> order;
+    for (Interval& interval : *intervals) order.push_back(&interval);
+    std::stable_sort(order.begin(), order.end(), [](const Interval* a, const Interval* b) { return a->size > b->size; });
+
+    std::vector<const Interval*> placed;
+    for (Interval* interval : order) {
+        std::vector<const Interval*> conflicts;
+        for (const Interval* p : placed) {
+            if (Overlaps(*interval, *p)) conflicts.push_back(p);
+        }
+        std::sort(conflicts.begin(), conflicts.end(), [](const Interval* a, const Interval* b) { return a->offset < b->offset; });
+
+        // Pick the smallest gap which is large enough.
+        int64_t best_offset = -1;
+        int64_t best_gap = -1;
+        int64_t prev_end = 0;
+        for (const Interval* c : conflicts) {
+            const int64_t gap = c->offset - prev_end;
+            if (gap >= interval->size && (best_gap < 0 || gap < best_gap)) {
+                best_offset = prev_end;
+                best_gap = gap;
+            }
+            prev_end = std::max(prev_end, c->offset + c->size);
+        }
+        if (best_offset < 0) best_offset = prev_end;
+
+        interval->offset = best_offset;
+        placed.push_back(interval);
+        plan->arena_size = std::max(plan->arena_size, best_offset + interval->size);
+    }
+
+    for (const Interval& interval : *intervals) {
+        CHECK(plan->offsets.emplace(interval.value, interval.offset).second);
+        plan->total_bytes += interval.size;
+        plan->num_planned++;
+    }
+}
+
+}  // namespace
+
+MemoryPlan PlanMemory(const Graph& graph, int64_t alignment) {
+    MemoryPlan plan;
+    std::vector<const Node*> nodes(graph.GetComputationSequence());
+    const std::map<const Value*, int> last_uses = GetLastUses(nodes);
+
+    std::vector<Interval> intervals;
+    for (size_t i = 0; i < nodes.size(); ++i) {
+        for (const Value* value : nodes[i]->outputs()) {
+            // Graph outputs escape from the arena.
+            if (value->IsNull() || value->IsOutput()) continue;
+            if (value->type().kind() != Type::Kind::kTensor) continue;
+            const int64_t nbytes = value->GetNBytes();
+            if (nbytes < 0) {
+                plan.num_unplanned++;
+                continue;
+            }
+            auto found = last_uses.find(value);
+            const int end = found == last_uses.end() ? i : found->second;
+            intervals.push_back(Interval{value, AlignUp(nbytes, alignment), static_cast<int>(i), end, -1});
+        }
+    }
+
+    PlaceIntervals(&intervals, &plan);
+    return plan;
+}
+
+MemoryPlan PlanArena(const Graph& graph, const std::set<Node::OpType>& arena_ops, int64_t alignment) {
+    MemoryPlan plan;
+    std::vector<const Node*> nodes(graph.GetComputationSequence());
+    const std::map<const Value*, int> last_uses = GetLastUses(nodes);
+
+    // Outputs of other ops may be views of their inputs (e.g., Reshape)
+    // or keep references to them (e.g., contexts for backprop). Such
+    // outputs keep the arena values they may refer to alive.
+    std::map<const Value*, std::set<const Value*>> referred_values;
+    std::map<const Value*, int> begins;
+    std::vector<const Value*> candidates;
+    for (size_t i = 0; i < nodes.size(); ++i) {
+        const Node* node = nodes[i];
+        std::set<const Value*> referred;
+        if (!arena_ops.count(node->op_type())) {
+            for (const Value* value : node->inputs()) {
+                auto found = referred_values.find(value);
+                if (found != referred_values.end()) {
+                    referred.insert(found->second.begin(), found->second.end());
+                }
+            }
+        }
+        for (const Value* value : node->outputs()) {
+            if (value->IsNull()) continue;
+            begins.emplace(value, i);
+            if (!arena_ops.count(node->op_type())) {
+                if (!referred.empty()) referred_values.emplace(value, referred);
+                continue;
+            }
+            if (value->type().kind() != Type::Kind::kTensor) continue;
+            referred_values.emplace(value, std::set<const Value*>{value});
+            candidates.push_back(value);
+        }
+    }
+
+    std::map<const Value*, int> ends;
+    std::set<const Value*> escaped;
+    for (const auto& p : referred_values) {
+        const Value* value = p.first;
+        auto found = last_uses.find(value);
+        const int end = found == last_uses.end() ? begins[value] : found->second;
+        for (const Value* referred : p.second) {
+            ends[referred] = std::max(ends[referred], end);
+            // Graph outputs must not be overwritten by later runs.
+            if (value->IsOutput()) escaped.insert(referred);
+        }
+    }
+
+    std::vector<Interval> intervals;
+    for (const Value* value : candidates) {
+        if (escaped.count(value)) continue;
+        const int64_t nbytes = value->GetNBytes();
+        if (nbytes < 0) {
+            plan.num_unplanned++;
+            continue;
+        }
+        intervals.push_back(Interval{value, AlignUp(nbytes, alignment), begins[value], ends[value], -1});
+    }
+
+    PlaceIntervals(&intervals, &plan);
+    return plan;
+}
+
+void ShowMemoryPlan(const Graph& graph) {
+    MemoryPlan plan = PlanMemory(graph);
+    SimulatedMemoryUsage usage = SimulateMemoryUsage(graph);
+    if (plan.num_unplanned) {
+        WARN_ONCE(StrCat(
+                "Incomplete memory plan due to unknown shapes (", plan.num_unplanned, "/", plan.num_planned + plan.num_unplanned, ")"));
+    }
+    int64_t arena_mb = plan.arena_size / 1000 / 1000;
+    int64_t total_mb = plan.total_bytes / 1000 / 1000;
+    int64_t peak_mb = usage.peak / 1000 / 1000;
+    std::cerr << "Memory plan: arena=" << arena_mb << "MB temporaries=" << total_mb << "MB (" << plan.num_planned
+              << " values) simulated peak=" << peak_mb << "MB" << std::endl;
+}
+
+}  // namespace chainer_compiler
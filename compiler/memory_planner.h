@@ -0,0 +1,41 @@
+#pragma once
+
+#include <stdint.h>
+
+#include <map>
+#include <set>
+
+#include <compiler/node.h>
+
+namespace chainer_compiler {
+
+class Graph;
+class Value;
+
+struct MemoryPlan {
+    // Byte offsets of planned temporary values in the arena.
+    std::map<const Value*, int64_t> offsets;
+    // The size of the arena which holds all planned values.
+    int64_t arena_size{0};
+    // The sum of sizes of planned values.
+    int64_t total_bytes{0};
+    int num_planned{0};
+    // Temporaries whose sizes are unknown at compile time.
+    int num_unplanned{0};
+};
+
+// Assigns offsets in a single arena to temporary values so that values
+// whose lifetimes overlap never share bytes. Lifetimes are computed from
+// `Graph::GetComputationSequence`, i.e., this should be called after
+// scheduling.
+MemoryPlan PlanMemory(const Graph& graph, int64_t alignment = 256);
+
+// Plans the arena for outputs of nodes of `arena_ops`, which the
+// runtime writes to their offsets in the arena. Values are kept alive
+// while outputs of other nodes which may refer to them are alive, and
+// values which may be referred from graph outputs are not planned.
+MemoryPlan PlanArena(const Graph& graph, const std::set<Node::OpType>& arena_ops, int64_t alignment = 256);
+
+void ShowMemoryPlan(const Graph& graph);
+
+}  // namespace chainer_compiler
@@ -0,0 +1,109 @@
+#include <gtest/gtest.h>
+
+#include <compiler/graph.h>
+#include <compiler/memory_planner.h>
+#include <compiler/node.h>
+#include <compiler/scheduler.h>
+#include <compiler/type.h>
+#include <compiler/value.h>
+
+namespace chainer_compiler {
+namespace {
+
+TEST(MemoryPlannerTest, ReuseChain) {
+    const Type type(Dtype::kFloat32, {256});
+    Graph graph("test");
+    Value* in = graph.AddInputValue("in", type);
+    Value* out = graph.AddOutputValue("out", type);
+    Value* t1 = graph.AddValue("t1", type);
+    Value* t2 = graph.AddValue("t2", type);
+    Value* t3 = graph.AddValue("t3", type);
+
+    graph.AddNode(Node::kRelu, {in}, {t1});
+    graph.AddNode(Node::kRelu, {t1}, {t2});
+    graph.AddNode(Node::kRelu, {t2}, {t3});
+    graph.AddNode(Node::kRelu, {t3}, {out});
+    ScheduleComputation(graph, 0);
+
+    MemoryPlan plan = PlanMemory(graph);
+    EXPECT_EQ(3, plan.num_planned);
+    EXPECT_EQ(0, plan.num_unplanned);
+    EXPECT_EQ(3 * 1024, plan.total_bytes);
+    // `t1` and `t3` are never alive at the same time.
+    EXPECT_EQ(2 * 1024, plan.arena_size);
+    EXPECT_EQ(plan.offsets[t1], plan.offsets[t3]);
+    EXPECT_NE(plan.offsets[t1], plan.offsets[t2]);
+    EXPECT_EQ(0, plan.offsets.count(out));
+}
+
+TEST(MemoryPlannerTest, SmallValueInGap) {
+    Graph graph("test");
+    Value* in = graph.AddInputValue("in", Type(Dtype::kFloat32, {1024}));
+    Value* out = graph.AddOutputValue("out", Type(Dtype::kFloat32, {64}));
+    Value* big1 = graph.AddValue("big1", Type(Dtype::kFloat32, {1024}));
+    Value* big2 = graph.AddValue("big2", Type(Dtype::kFloat32, {1024}));
+    Value* small = graph.AddValue("small", Type(Dtype::kFloat32, {64}));
+
+    graph.AddNode(Node::kRelu, {in}, {big1});
+    graph.AddNode(Node::kRelu, {big1}, {big2});
+    graph.AddNode(Node::kRelu, {big2}, {small});
+    graph.AddNode(Node::kRelu, {small}, {out});
+    ScheduleComputation(graph, 0);
+
+    MemoryPlan plan = PlanMemory(graph);
+    EXPECT_EQ(3, plan.num_planned);
+    // `small` reuses the space of `big1`.
+    EXPECT_EQ(2 * 4096, plan.arena_size);
+    EXPECT_EQ(plan.offsets[big1], plan.offsets[small]);
+}
+
+TEST(MemoryPlannerTest, ArenaViewExtendsLifetime) {
+    const Type type(Dtype::kFloat32, {256});
+    Graph graph("test");
+    Value* in = graph.AddInputValue("in", type);
+    Value* out = graph.AddOutputValue("out", type);
+    Value* t1 = graph.AddValue("t1", type);
+    Value* view = graph.AddValue("view", type);
+    Value* t2 = graph.AddValue("t2", type);
+    Value* t3 = graph.AddValue("t3", type);
+
+    graph.AddNode(Node::kRelu, {in}, {t1});
+    graph.AddNode(Node::kIdentity, {t1}, {view});
+    graph.AddNode(Node::kRelu, {view}, {t2});
+    graph.AddNode(Node::kRelu, {t2}, {t3});
+    graph.AddNode(Node::kAdd, {view, t3}, {out});
+    ScheduleComputation(graph, 0);
+
+    MemoryPlan plan = PlanArena(graph, {Node::kRelu, Node::kAdd});
+    EXPECT_EQ(3, plan.num_planned);
+    EXPECT_EQ(0, plan.offsets.count(view));
+    EXPECT_EQ(0, plan.offsets.count(out));
+    // `view` may refer to the buffer of `t1` so `t3` cannot reuse it.
+    EXPECT_NE(plan.offsets[t1], plan.offsets[t3]);
+}
+
+TEST(MemoryPlannerTest, ArenaEscapedValue) {
+    const Type type(Dtype::kFloat32, {256});
+    Graph graph("test");
+    Value* in = graph.AddInputValue("in", type);
+    Value* out1 = graph.AddOutputValue("out1", type);
+    Value* out2 = graph.AddOutputValue("out2", type);
+    Value* t1 = graph.AddValue("t1", type);
+    Value* t2 = graph.AddValue("t2", type);
+
+    graph.AddNode(Node::kRelu, {in}, {t1});
+    graph.AddNode(Node::kIdentity, {t1}, {out1});
+    graph.AddNode(Node::kRelu, {in}, {t2});
+    graph.AddNode(Node::kRelu, {t2}, {out2});
+    ScheduleComputation(graph, 0);
+
+    MemoryPlan plan = PlanArena(graph, {Node::kRelu});
+    // `t1` escapes through `out1`, which the next run must not overwrite.
+    EXPECT_EQ(1, plan.num_planned);
+    EXPECT_EQ(0, plan.offsets.count(t1));
+    EXPECT_EQ(1, plan.offsets.count(t2));
+    EXPECT_EQ(0, plan.offsets.count(out2));
+}
+
+}  // namespace
+}  // namespace chainer_compiler
@@ -8,7 +8,9 @@
 #include <set>
 #include <sstream>
 
+#include <common/iterator.h>
 #include <common/log.h>
+#include <common/strutil.h>
 #include <compiler/code_emitter.h>
 #include <compiler/node.h>
 #include <compiler/tensor.h>
@@ -65,6 +67,14 @@ void EmitNode(const Node* node, CodeEmitter* ce) {
             out1("sigmoid(" + ins[0] + ")");
             break;
 
+        case Node::kRelu:
+            out1(ins[0] + " > T(0) ? " + ins[0] + " : T(0)");
+            break;
+
+        case Node::kNeg:
+            out1("-" + ins[0]);
+            break;
+
         case Node::kAdd:
             binary('+');
             break;
@@ -86,16 +96,8 @@ void EmitNode(const Node* node, CodeEmitter* ce) {
     }
 }
 
-}  // namespace
-
-void BuildNvrtcProgram(
-        const std::vector<Node*>& nodes, int id, const std::vector<Value*>& inputs, const std::vector<Value*>& outputs, std::string* prog) {
-    std::set<Node::OpType> seen_ops;
-    for (Node* node : nodes) {
-        seen_ops.insert(node->op_type());
-    }
-
-    // TODO(hamaji): Currently, we assume unknown dtype is float32.
+// TODO(hamaji): Currently, we assume unknown dtype is float32.
+Dtype GetElementwiseDtype(const std::vector<Node*>& nodes) {
     Dtype dtype = Dtype::kUnknown;
     for (Node* node : nodes) {
         for (Value* value : node->inputs()) {
@@ -112,43 +114,36 @@ void BuildNvrtcProgram(
     if (dtype == Dtype::kUnknown) {
         dtype = Dtype::kFloat32;
     }
+    return dtype;
+}
 
-    std::ostringstream oss;
-    CodeEmitter ce(oss);
-    switch (dtype) {
-        case Dtype::kFloat16:
-            ce << "typedef half T;\n";
-            break;
-        case Dtype::kFloat32:
-            ce << "typedef float T;\n";
-            break;
-        case Dtype::kFloat64:
-            ce << "typedef double T;\n";
-            break;
-        default:
-            CHECK(false) << "Unknown dtype: " << dtype;
-    }
-
-    if (seen_ops.count(Node::kSigmoid)) {
-        ce << "__device__ T sigmoid(T x) {\n";
-        ce << "const T half = 0.5;\n";
-        ce << "return tanh(x * half) * half + half;\n";
-        ce << "}\n";
+void EmitSigmoid(const std::vector<Node*>& nodes, const char* qualifier, CodeEmitter* ce) {
+    for (Node* node : nodes) {
+        if (node->op_type() == Node::kSigmoid) {
+            *ce << qualifier << " T sigmoid(T x) {\n";
+            *ce << "const T half = 0.5;\n";
+            *ce << "return tanh(x * half) * half + half;\n";
+            *ce << "}\n";
+            return;
+        }
     }
+}
 
-    ce << "extern \"C\" __global__\n";
-    ce << "void fusion" << id << "(size_t n";
+// Emits the computation of the element at `index`. Inputs and outputs
+// are read from and written to pointers prefixed by `i_` and `o_`.
+// Inputs in `input_indices` are read at their own indices instead.
+void EmitElementwiseBody(
+        const std::vector<Node*>& nodes,
+        const std::vector<Value*>& inputs,
+        const std::vector<Value*>& outputs,
+        const std::string& index,
+        CodeEmitter* ce,
+        const std::map<Value*, std::string>& input_indices = {}) {
     for (Value* value : inputs) {
-        ce << ", T* " << CleanseIdent(value->name(), "i_");
-    }
-    for (Value* value : outputs) {
-        ce << ", T* " << CleanseIdent(value->name(), "o_");
-    }
-    ce << ") {\n";
-    ce << "size_t tid = blockIdx.x * blockDim.x + threadIdx.x;\n";
-    ce << "if (tid >= n) return;\n";
-    for (Value* value : inputs) {
-        ce << "const T " << CleanseIdent(value->name()) << " = " << CleanseIdent(value->name(), "i_") << "[tid];  // input\n";
+        auto found = input_indices.find(value);
+        const std::string& input_index = found == input_indices.end() ? index : found->second;
+        *ce << "const T " << CleanseIdent(value->name()) << " = " << CleanseIdent(value->name(), "i_") << "[" << input_index
+            << "];  // input\n";
     }
 
     std::map<Node*, int> input_counts;
@@ -180,7 +175,7 @@ void BuildNvrtcProgram(
             default:
                 CHECK(false) << t->dtype();
         }
-        ce << "const T " << CleanseIdent(node->output(0)->name()) << " = " << value << ";  // Constant\n";
+        *ce << "const T " << CleanseIdent(node->output(0)->name()) << " = " << value << ";  // Constant\n";
     }
 
     while (!q.empty()) {
@@ -191,15 +186,143 @@ void BuildNvrtcProgram(
             auto found = input_counts.find(node);
             if (found == input_counts.end()) continue;
             if (--found->second != 0) continue;
-            EmitNode(node, &ce);
+            EmitNode(node, ce);
             for (Value* value : node->outputs()) q.push(value);
         }
     }
 
     for (Value* value : outputs) {
-        ce << CleanseIdent(value->name(), "o_") << "[tid] = " << CleanseIdent(value->name()) << ";  // output\n";
+        *ce << CleanseIdent(value->name(), "o_") << "[" << index << "] = " << CleanseIdent(value->name()) << ";  // output\n";
     }
+}
+
+}  // namespace
+
+void BuildNvrtcProgram(
+        const std::vector<Node*>& nodes, int id, const std::vector<Value*>& inputs, const std::vector<Value*>& outputs, std::string* prog) {
+    Dtype dtype = GetElementwiseDtype(nodes);
 
+    std::ostringstream oss;
+    CodeEmitter ce(oss);
+    switch (dtype) {
+        case Dtype::kFloat16:
+            ce << "typedef half T;\n";
+            break;
+        case Dtype::kFloat32:
+            ce << "typedef float T;\n";
+            break;
+        case Dtype::kFloat64:
+            ce << "typedef double T;\n";
+            break;
+        default:
+            CHECK(false) << "Unknown dtype: " << dtype;
+    }
+
+    EmitSigmoid(nodes, "__device__", &ce);
+
+    ce << "extern \"C\" __global__\n";
+    ce << "void fusion" << id << "(size_t n";
+    for (Value* value : inputs) {
+        ce << ", T* " << CleanseIdent(value->name(), "i_");
+    }
+    for (Value* value : outputs) {
+        ce << ", T* " << CleanseIdent(value->name(), "o_");
+    }
+    ce << ") {\n";
+    ce << "size_t tid = blockIdx.x * blockDim.x + threadIdx.x;\n";
+    ce << "if (tid >= n) return;\n";
+    EmitElementwiseBody(nodes, inputs, outputs, "tid", &ce);
+    ce << "}\n";
+
+    *prog = oss.str();
+}
+
+void BuildCpuElementwiseProgram(
+        const std::vector<Node*>& nodes,
+        int id,
+        const std::vector<Value*>& inputs,
+        const std::vector<Value*>& outputs,
+        std::string* prog,
+        Dtype* dtype) {
+    *dtype = GetElementwiseDtype(nodes);
+    CHECK(!outputs.empty());
+    const Type& output_type = outputs[0]->type();
+    CHECK(output_type.HasKnownShape()) << outputs[0]->ToString();
+    const std::vector<int64_t>& dims = output_type.dims();
+    const int ndim = dims.size();
+
+    // Inputs with the output shape are read at the flat index. Others
+    // are broadcast and read at offsets computed from their strides.
+    std::map<Value*, std::string> input_indices;
+    for (Value* value : inputs) {
+        const Type& type = value->type();
+        CHECK(type.HasKnownShape()) << value->ToString();
+        if (type.dims() == dims) {
+            continue;
+        }
+        const int offset = ndim - type.dims().size();
+        CHECK_LE(0, offset) << value->ToString();
+        std::string index;
+        for (int i = offset; i < ndim; ++i) {
+            // Strides of broadcast axes are zero.
+            if (type.dims()[i - offset] == 1) {
+                continue;
+            }
+            if (!index.empty()) {
+                index += " + ";
+            }
+            index += StrCat("d", i, " * ", CleanseIdent(value->name(), "s_"), "[", i, "]");
+        }
+        input_indices.emplace(value, index.empty() ? "0" : index);
+    }
+
+    std::ostringstream oss;
+    CodeEmitter ce(oss);
+    ce << "#include <cmath>\n";
+    ce << "#include <cstdint>\n";
+    ce << "using std::exp;\n";
+    ce << "using std::tanh;\n";
+    switch (*dtype) {
+        case Dtype::kFloat32:
+            ce << "typedef float T;\n";
+            break;
+        case Dtype::kFloat64:
+            ce << "typedef double T;\n";
+            break;
+        default:
+            CHECK(false) << "Unsupported dtype for CPU code generation: " << *dtype;
+    }
+
+    EmitSigmoid(nodes, "static inline", &ce);
+
+    ce << "extern \"C\"\n";
+    ce << "void fusion" << id << "(int64_t n, void* const* inputs, const int64_t* strides, void* const* outputs) {\n";
+    for (const auto& value : Enumerate(inputs)) {
+        ce << "const T* __restrict__ " << CleanseIdent(value.value->name(), "i_") << " = static_cast<const T*>(inputs[" << value.index
+           << "]);\n";
+        if (input_indices.count(value.value)) {
+            ce << "const int64_t* " << CleanseIdent(value.value->name(), "s_") << " = strides + " << value.index * ndim << ";\n";
+        }
+    }
+    for (const auto& value : Enumerate(outputs)) {
+        ce << "T* __restrict__ " << CleanseIdent(value.value->name(), "o_") << " = static_cast<T*>(outputs[" << value.index << "]);\n";
+    }
+    if (input_indices.empty()) {
+        ce << "for (int64_t i = 0; i < n; ++i) {\n";
+        EmitElementwiseBody(nodes, inputs, outputs, "i", &ce);
+        ce << "}\n";
+    } else {
+        // Loops over the output shape so broadcast inputs are read
+        // without being expanded.
+        ce << "int64_t i = 0;\n";
+        for (int i = 0; i < ndim; ++i) {
+            ce << "for (int64_t d" << i << " = 0; d" << i << " < " << dims[i] << "; ++d" << i << (i == ndim - 1 ? ", ++i" : "") << ") {\n";
+        }
+        EmitElementwiseBody(nodes, inputs, outputs, "i", &ce, input_indices);
+        for (int i = 0; i < ndim; ++i) {
+            ce << "}\n";
+        }
+    }
     ce << "}\n";
 
     *prog = oss.str();
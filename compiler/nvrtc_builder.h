@@ -3,6 +3,8 @@
 #include <string>
 #include <vector>
 
+#include <compiler/dtype.h>
+
 namespace chainer_compiler {
 
 class Node;
@@ -11,4 +13,20 @@ class Value;
 void BuildNvrtcProgram(
         const std::vector<Node*>& nodes, int id, const std::vector<Value*>& inputs, const std::vector<Value*>& outputs, std::string* prog);
 
+// Builds C++ code of `void fusion<id>(int64_t n, void* const* inputs,
+// const int64_t* strides, void* const* outputs)` which computes all
+// `nodes` by a single loop over `n` elements of the static output
+// shape. Inputs with the output shape must be contiguous. Inputs of
+// other shapes are broadcast by reading them at offsets computed from
+// `strides`, which has the element strides of the i-th input aligned
+// to the output axes at `strides[i * ndim]`. `dtype` will be the
+// element type of the code.
+void BuildCpuElementwiseProgram(
+        const std::vector<Node*>& nodes,
+        int id,
+        const std::vector<Value*>& inputs,
+        const std::vector<Value*>& outputs,
+        std::string* prog,
+        Dtype* dtype);
+
 }  // namespace chainer_compiler
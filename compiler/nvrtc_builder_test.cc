@@ -0,0 +1,54 @@
+#include <string>
+
+#include <gtest/gtest.h>
+
+#include <compiler/graph.h>
+#include <compiler/graph_builder.h>
+#include <compiler/nvrtc_builder.h>
+
+namespace chainer_compiler {
+namespace {
+
+TEST(NvrtcBuilderTest, CpuElementwise) {
+    Graph graph("test");
+    Value* input = graph.AddInputValue("input", Type(Dtype::kFloat32, {2, 3}));
+    Value* output = graph.AddOutputValue("output", Type(Dtype::kFloat32, {2, 3}));
+    GraphBuilder gb(&graph, "test", output);
+    Value* tmp = gb.Op(Node::kRelu, {input});
+    gb.Op(Node::kNeg, {tmp}, {output});
+
+    std::string prog;
+    Dtype dtype;
+    BuildCpuElementwiseProgram(graph.nodes(), 42, graph.input_values(), graph.output_values(), &prog, &dtype);
+    EXPECT_EQ(Dtype::kFloat32, dtype);
+    EXPECT_NE(std::string::npos, prog.find("void fusion42(")) << prog;
+    // Inputs of the output shape are read by a single flat loop.
+    EXPECT_NE(std::string::npos, prog.find("for (int64_t i = 0; i < n; ++i)")) << prog;
+    EXPECT_NE(std::string::npos, prog.find("i_input[i]")) << prog;
+    EXPECT_EQ(std::string::npos, prog.find("strides +")) << prog;
+}
+
+TEST(NvrtcBuilderTest, CpuElementwiseBroadcast) {
+    Graph graph("test");
+    Value* input = graph.AddInputValue("input", Type(Dtype::kFloat32, {2, 3}));
+    Value* scale = graph.AddInputValue("scale", Type(Dtype::kFloat32, {3}));
+    Value* bias = graph.AddInputValue("bias", Type(Dtype::kFloat32, {2, 1}));
+    Value* output = graph.AddOutputValue("output", Type(Dtype::kFloat32, {2, 3}));
+    GraphBuilder gb(&graph, "test", output);
+    Value* tmp = gb.Op(Node::kMul, {input, scale});
+    gb.Op(Node::kAdd, {tmp, bias}, {output});
+
+    std::string prog;
+    Dtype dtype;
+    BuildCpuElementwiseProgram(graph.nodes(), 0, graph.input_values(), graph.output_values(), &prog, &dtype);
+    // Broadcast inputs are read by their strides without being expanded.
+    EXPECT_NE(std::string::npos, prog.find("for (int64_t d1 = 0; d1 < 3; ++d1, ++i)")) << prog;
+    EXPECT_NE(std::string::npos, prog.find("i_input[i]")) << prog;
+    EXPECT_NE(std::string::npos, prog.find("s_scale = strides + 2;")) << prog;
+    EXPECT_NE(std::string::npos, prog.find("i_scale[d1 * s_scale[1]]")) << prog;
+    EXPECT_NE(std::string::npos, prog.find("s_bias = strides + 4;")) << prog;
+    EXPECT_NE(std::string::npos, prog.find("i_bias[d0 * s_bias[0]]")) << prog;
+}
+
+}  // namespace
+}  // namespace chainer_compiler
@@ -0,0 +1,63 @@
+#include "compiler/pass_stats.h"
+
+#include <chrono>
+#include <iomanip>
+#include <iostream>
+
+#include <compiler/graph.h>
+#include <compiler/node.h>
+
+namespace chainer_compiler {
+
+namespace {
+
+void CountNodesAndValues(const Graph& graph, int64_t* num_nodes, int64_t* num_values) {
+    *num_values += graph.all_values().size();
+    for (const Node* node : graph.GetLiveNodes()) {
+        ++*num_nodes;
+        for (Graph* subgraph : node->GetSubGraphs()) {
+            CountNodesAndValues(*subgraph, num_nodes, num_values);
+        }
+    }
+}
+
+}  // namespace
+
+void PassStats::Run(const std::string& name, const Graph& graph, const std::function<void()>& fn) {
+    PassStat stat;
+    stat.name = name;
+    stat.graph = graph.name();
+    CountNodesAndValues(graph, &stat.num_nodes_before, &stat.num_values_before);
+
+    std::chrono::steady_clock::time_point start = std::chrono::steady_clock::now();
+    fn();
+    std::chrono::steady_clock::time_point end = std::chrono::steady_clock::now();
+    stat.elapsed_msec = std::chrono::duration_cast<std::chrono::microseconds>(end - start).count() * 0.001;
+
+    CountNodesAndValues(graph, &stat.num_nodes_after, &stat.num_values_after);
+    stats_.push_back(stat);
+}
+
+double PassStats::GetTotalElapsedMsec() const {
+    double total = 0;
+    for (const PassStat& stat : stats_) {
+        total += stat.elapsed_msec;
+    }
+    return total;
+}
+
+void PassStats::Show(std::ostream& os) const {
+    const std::ios::fmtflags flags = os.flags();
+    const std::streamsize precision = os.precision();
+    os << "Compiler passes:\n";
+    for (const PassStat& stat : stats_) {
+        os << std::setw(24) << std::left << stat.name << std::right << std::fixed << std::setprecision(3) << std::setw(12)
+           << stat.elapsed_msec << " msec nodes=" << stat.num_nodes_before << "->" << stat.num_nodes_after
+           << " values=" << stat.num_values_before << "->" << stat.num_values_after << "\n";
+    }
+    os << "Total: " << GetTotalElapsedMsec() << " msec" << std::endl;
+    os.flags(flags);
+    os.precision(precision);
+}
+
+}  // namespace chainer_compiler
@@ -0,0 +1,42 @@
+#pragma once
+
+#include <cstdint>
+#include <functional>
+#include <iosfwd>
+#include <string>
+#include <vector>
+
+namespace chainer_compiler {
+
+class Graph;
+
+struct PassStat {
+    std::string name;
+    std::string graph;
+    double elapsed_msec{0};
+    // The numbers of live nodes and values including subgraphs.
+    int64_t num_nodes_before{0};
+    int64_t num_nodes_after{0};
+    int64_t num_values_before{0};
+    int64_t num_values_after{0};
+};
+
+// Records wall time of compiler passes and how they change graphs.
+class PassStats {
+public:
+    // Runs `fn` which updates `graph` and records it as `name`.
+    void Run(const std::string& name, const Graph& graph, const std::function<void()>& fn);
+
+    const std::vector<PassStat>& stats() const {
+        return stats_;
+    }
+
+    double GetTotalElapsedMsec() const;
+
+    void Show(std::ostream& os) const;
+
+private:
+    std::vector<PassStat> stats_;
+};
+
+}  // namespace chainer_compiler
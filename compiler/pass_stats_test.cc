@@ -0,0 +1,39 @@
+#include <gtest/gtest.h>
+
+#include <compiler/graph.h>
+#include <compiler/node.h>
+#include <compiler/pass_stats.h>
+#include <compiler/type.h>
+#include <compiler/value.h>
+
+namespace chainer_compiler {
+namespace {
+
+TEST(PassStatsTest, Run) {
+    const Type type(Dtype::kFloat32, {3});
+    Graph graph("test");
+    Value* in = graph.AddInputValue("in", type);
+    Value* out = graph.AddOutputValue("out", type);
+    Value* t = graph.AddValue("t", type);
+    Node* relu = graph.AddNode(Node::kRelu, {in}, {t});
+    graph.AddNode(Node::kIdentity, {t}, {out});
+
+    PassStats stats;
+    stats.Run("Detach", graph, [&graph, relu]() { graph.DetachNode(relu); });
+    stats.Run("Nop", graph, []() {});
+
+    ASSERT_EQ(2, stats.stats().size());
+    const PassStat& stat = stats.stats()[0];
+    EXPECT_EQ("Detach", stat.name);
+    EXPECT_EQ("test", stat.graph);
+    EXPECT_EQ(2, stat.num_nodes_before);
+    EXPECT_EQ(1, stat.num_nodes_after);
+    EXPECT_EQ(3, stat.num_values_before);
+    EXPECT_EQ(3, stat.num_values_after);
+    EXPECT_LE(0, stat.elapsed_msec);
+    EXPECT_EQ(1, stats.stats()[1].num_nodes_before);
+    EXPECT_LE(stat.elapsed_msec, stats.GetTotalElapsedMsec());
+}
+
+}  // namespace
+}  // namespace chainer_compiler
@@ -5,6 +5,8 @@
 #include <map>
 #include <memory>
 
+#include <common/strutil.h>
+#include <compiler/compile_cache.h>
 #include <compiler/computation_order/core.h>
 #include <compiler/constant_propagation.h>
 #include <compiler/dtype_inference.h>
@@ -14,9 +16,11 @@
 #include <compiler/gradient.h>
 #include <compiler/gradient_with_order.h>
 #include <compiler/graph.h>
+#include <compiler/memory_planner.h>
 #include <compiler/memory_simulator.h>
 #include <compiler/merge.h>
 #include <compiler/model.h>
+#include <compiler/pass_stats.h>
 #include <compiler/quantize.h>
 #include <compiler/scheduler.h>
 #include <compiler/shape_evaluator.h>
@@ -74,15 +78,17 @@ void CheckAllOpsSupported(const BackendConfig& backend_config, Graph* graph) {
     }
 }
 
-}  //  namespace
-
-void RunDefaultPasses(Model* model, bool gen_backprop) {
-    RunDefaultPasses(model->mutable_graph(), gen_backprop);
-}
-
-void RunDefaultPasses(Graph* graph, bool gen_backprop, bool skip_scheduling) {
+void RunDefaultPassesImpl(Graph* graph, bool gen_backprop, bool skip_scheduling, PassStats* stats) {
     std::unique_ptr<BackendConfig> backend_config(BackendConfig::FromName(g_backend_name));
 
+    auto run_pass = [graph, stats](const char* name, const std::function<void()>& fn) {
+        if (stats) {
+            stats->Run(name, *graph, fn);
+        } else {
+            fn();
+        }
+    };
+
     if (g_reset_output_shape) {
         for (Value* value : graph->output_values()) {
             value->set_type(new Type());
@@ -94,8 +100,10 @@ void RunDefaultPasses(Graph* graph, bool gen_backprop, bool skip_scheduling) {
         }
     }
     if (!g_skip_inference) {
-        graph->InferShapes();
-        InferAllDtype(graph);
+        run_pass("InferShapes", [graph]() {
+            graph->InferShapes();
+            InferAllDtype(graph);
+        });
     }
 
     auto dump_onnx = [&graph](bool cond, const char* msg) {
@@ -107,50 +115,64 @@ void RunDefaultPasses(Graph* graph, bool gen_backprop, bool skip_scheduling) {
         Recursively([msg](Graph* g) { g->CheckSanity(msg); }, graph);
     };
 
+    auto simplify = [&](bool preproc) {
+        run_pass("Simplify", [&]() {
+            Recursively(*backend_config, graph, [gen_backprop, preproc](const BackendConfig& bc, Graph* graph) {
+                Simplify(bc, preproc ? bc.GetSimplifyPreproc() : bc.GetSimplify(), graph, gen_backprop, g_simplify_full_sweep);
+            });
+        });
+    };
+
+    auto propagate_constants = [&]() {
+        run_pass("PropagateConstants", [graph]() { Recursively(PropagateConstants, graph); });
+        run_pass("DeleteDetached", [graph]() { Recursively([](Graph* g) { g->DeleteDetached(); }, graph); });
+    };
+
     dump_onnx(g_dump_after_inference, "after inference");
 
     if (!skip_scheduling) {
-        CanonicalizeSubGraphs(graph);
+        run_pass("CanonicalizeSubGraphs", [graph]() { CanonicalizeSubGraphs(graph); });
 
-        Recursively(*backend_config, graph, [gen_backprop](const BackendConfig& bc, Graph* graph) {
-            Simplify(bc, bc.GetSimplifyPreproc(), graph, gen_backprop);
-        });
+        simplify(true /* preproc */);
 
-        CanonicalizeSubGraphs(graph);
+        run_pass("CanonicalizeSubGraphs", [graph]() { CanonicalizeSubGraphs(graph); });
 
         if (g_quantize) {
             QuantizationOptions q_opts;
             q_opts.per_channel = !g_disable_per_channel_quantize;
-            Recursively([q_opts](Graph* graph) { Quantize(q_opts, graph); }, graph);
+            run_pass("Quantize", [graph, q_opts]() { Recursively([q_opts](Graph* graph) { Quantize(q_opts, graph); }, graph); });
         }
 
-        Recursively(
-                [gen_backprop, &backend_config](Graph* graph) { MergeOperations(backend_config->GetMerge(), graph, gen_backprop); }, graph);
+        run_pass("MergeOperations", [&]() {
+            Recursively(
+                    [gen_backprop, &backend_config](Graph* graph) { MergeOperations(backend_config->GetMerge(), graph, gen_backprop); },
+                    graph);
+        });
 
-        Recursively(PropagateConstants, graph);
+        run_pass("PropagateConstants", [graph]() { Recursively(PropagateConstants, graph); });
 
-        Recursively(EvaluateShapes, graph);
+        run_pass("EvaluateShapes", [graph]() { Recursively(EvaluateShapes, graph); });
 
-        Recursively([](Graph* g) { g->DeleteDetached(); }, graph);
+        run_pass("DeleteDetached", [graph]() { Recursively([](Graph* g) { g->DeleteDetached(); }, graph); });
 
         dump_onnx(g_dump_after_simplification, "after simplification");
     }
 
     if (gen_backprop) {
-        Recursively(*backend_config, graph, [gen_backprop](const BackendConfig& bc, Graph* graph) {
-            Simplify(bc, bc.GetSimplify(), graph, gen_backprop);
-        });
+        simplify(false /* preproc */);
 
         if (g_computation_order.empty()) {
             // normal computation order
-            AddGradientNodesForTraining(graph);
+            run_pass("AddGradientNodes", [graph]() { AddGradientNodesForTraining(graph); });
         } else {
             // specified computation order
             skip_scheduling = true;
-            auto orders = GetComputationOrder(*graph, g_computation_order);
-            if (!AddGradientNodesForTrainingWithOrders(graph, orders)) {
-                CHECK(false) << "Computation order is not supported in this graph.";
-            }
+            run_pass("AddGradientNodes", [graph]() {
+                auto orders = GetComputationOrder(*graph, g_computation_order);
+                if (!AddGradientNodesForTrainingWithOrders(graph, orders)) {
+                    CHECK(false) << "Computation order is not supported in this graph.";
+                }
+            });
         }
     }
 
@@ -158,13 +180,8 @@ void RunDefaultPasses(Graph* graph, bool gen_backprop, bool skip_scheduling) {
     // if (!g_skip_inference) graph->InferShapes();
 
     if (!skip_scheduling) {
-        Recursively(*backend_config, graph, [gen_backprop](const BackendConfig& bc, Graph* graph) {
-            Simplify(bc, bc.GetSimplifyPreproc(), graph, gen_backprop);
-        });
-
-        Recursively(PropagateConstants, graph);
-
-        Recursively([](Graph* g) { g->DeleteDetached(); }, graph);
+        simplify(true /* preproc */);
+        propagate_constants();
     }
 
     dump_onnx(g_dump_after_gradient, "after gradient generation");
@@ -174,33 +191,62 @@ void RunDefaultPasses(Graph* graph, bool gen_backprop, bool skip_scheduling) {
     }
 
     if (!skip_scheduling) {
-        FuseOperations(graph);
+        run_pass("FuseOperations", [graph]() { FuseOperations(graph); });
         dump_onnx(g_dump_after_fusion, "after fusion");
     }
 
     if (!skip_scheduling) {
-        Recursively(*backend_config, graph, [gen_backprop](const BackendConfig& bc, Graph* graph) {
-            Simplify(bc, bc.GetSimplify(), graph, gen_backprop);
-        });
-
-        Recursively(PropagateConstants, graph);
-
-        Recursively([](Graph* g) { g->DeleteDetached(); }, graph);
+        simplify(false /* preproc */);
+        propagate_constants();
     }
 
-    int64_t order = 0;
-    Recursively([&order](Graph* g) { order = ScheduleComputation(*g, order); }, graph);
+    run_pass("ScheduleComputation", [graph]() {
+        int64_t order = 0;
+        const SchedulerType scheduler_type = GetSchedulerType(g_scheduler);
+        Recursively([&order, scheduler_type](Graph* g) { order = ScheduleComputation(*g, order, scheduler_type); }, graph);
+    });
 
     if (g_compiler_log) {
         ShowSimulatedMemoryUsage(*graph);
+        ShowMemoryPlan(*graph);
         ShowFlops(*graph);
     }
 
-    Recursively(CollectGarbageNode, graph);
+    run_pass("CollectGarbageNode", [graph]() { Recursively(CollectGarbageNode, graph); });
 
     dump_onnx(g_dump_after_scheduling, "after scheduling");
 
     Recursively(*backend_config, graph, CheckAllOpsSupported);
+
+    if (g_compiler_log && stats) {
+        stats->Show(std::cerr);
+    }
+}
+
+}  //  namespace
+
+void RunDefaultPasses(Model* model, bool gen_backprop) {
+    RunDefaultPasses(model->mutable_graph(), gen_backprop);
+}
+
+void RunDefaultPasses(Graph* graph, bool gen_backprop, bool skip_scheduling, PassStats* stats) {
+    if (g_compile_cache_dir.empty()) {
+        RunDefaultPassesImpl(graph, gen_backprop, skip_scheduling, stats);
+        return;
+    }
+
+    CompileCache cache(g_compile_cache_dir, *graph, StrCat("gen_backprop=", gen_backprop, ";skip_scheduling=", skip_scheduling));
+    bool loaded = false;
+    if (stats) {
+        stats->Run("LoadCompileCache", *graph, [&cache, &loaded, graph]() { loaded = cache.Load(graph); });
+    } else {
+        loaded = cache.Load(graph);
+    }
+    if (loaded) {
+        return;
+    }
+    RunDefaultPassesImpl(graph, gen_backprop, skip_scheduling, stats);
+    cache.Store(*graph);
 }
 
 void RunDefaultPassesBeforeGradient(Graph* graph) {
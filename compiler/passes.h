@@ -7,10 +7,12 @@ namespace chainer_compiler {
 class Graph;
 class Model;
 class Node;
+class PassStats;
 
 void RunDefaultPasses(Model* model, bool gen_backprop = false);
 
-void RunDefaultPasses(Graph* graph, bool gen_backprop = false, bool skip_scheduling = false);
+// Statistics of each pass are recorded to `stats` if it is not null.
+void RunDefaultPasses(Graph* graph, bool gen_backprop = false, bool skip_scheduling = false, PassStats* stats = nullptr);
 
 void RunLoopBodyPasses(Node* loop, const std::vector<Node*>& refs);
 
@@ -4,9 +4,13 @@
 #include <iostream>
 #include <iterator>
 #include <map>
+#include <memory>
 #include <queue>
+#include <random>
+#include <set>
 #include <vector>
 
+#include <compiler/flags.h>
 #include <compiler/graph.h>
 #include <compiler/log.h>
 #include <compiler/node.h>
@@ -199,6 +203,197 @@ std::vector<Node*> ScheduleGreedy(const Graph& graph, const std::vector<Value*>&
     return nodes;
 }
 
+// A beam search scheduler which minimizes the peak of the simulated
+// memory usage. Each state in the beam is a partial schedule. At each
+// step, every state is extended by its schedulable nodes and the
+// `beam_width` states with the smallest (peak, current) memory usage
+// survive. Nodes which do not increase the memory usage are scheduled
+// without branching.
+class BeamScheduler {
+public:
+    BeamScheduler(const Graph& graph, const std::vector<Value*>& input_values, const std::vector<Value*>& output_values, int beam_width)
+        : beam_width_(beam_width) {
+        std::map<Node*, int> input_counts = graph.GetNecessaryNodesAndInputCounts(output_values);
+        std::mt19937_64 rng(0);
+        for (const auto& p : input_counts) {
+            node_ids_.emplace(p.first, nodes_.size());
+            nodes_.push_back(p.first);
+            hash_keys_.push_back(rng());
+        }
+
+        auto add_value = [this](const Value* value) {
+            if (value_ids_.count(value)) return;
+            value_ids_.emplace(value, values_.size());
+            values_.push_back(value);
+            const int64_t nbytes = value->GetNBytes();
+            value_bytes_.push_back(std::max<int64_t>(nbytes, 0));
+            // Graph outputs and parameters are never freed.
+            freeable_.push_back(!value->IsOutput() && !value->initializer());
+        };
+        for (const Value* value : input_values) add_value(value);
+        for (Node* node : nodes_) {
+            for (const Value* value : node->inputs()) add_value(value);
+            for (const Value* value : node->outputs()) add_value(value);
+        }
+
+        std::unique_ptr<State> init(new State());
+        init->input_counts.resize(nodes_.size());
+        for (size_t i = 0; i < nodes_.size(); ++i) init->input_counts[i] = input_counts[nodes_[i]];
+        init->num_users.resize(values_.size());
+        for (Node* node : nodes_) {
+            for (const Value* value : node->inputs()) init->num_users[value_ids_[value]]++;
+        }
+        for (size_t i = 0; i < nodes_.size(); ++i) {
+            if (init->input_counts[i] == 0) init->ready.push_back(i);
+        }
+        for (const Value* value : input_values) {
+            init->mem += value_bytes_[value_ids_[value]];
+            MakeValueReady(value, init.get());
+        }
+        init->peak = init->mem;
+        beam_.push_back(std::move(init));
+    }
+
+    std::vector<Node*> Schedule() {
+        for (size_t step = 0; step < nodes_.size(); ++step) {
+            std::vector<Candidate> candidates;
+            for (size_t i = 0; i < beam_.size(); ++i) {
+                AddCandidates(i, &candidates);
+            }
+            if (candidates.empty()) break;
+            std::stable_sort(candidates.begin(), candidates.end(), [](const Candidate& a, const Candidate& b) {
+                return std::make_pair(a.peak, a.mem) < std::make_pair(b.peak, b.mem);
+            });
+
+            std::vector<std::unique_ptr<State>> next_beam;
+            std::set<uint64_t> seen_hashes;
+            for (const Candidate& c : candidates) {
+                if (next_beam.size() >= static_cast<size_t>(beam_width_)) break;
+                const State& parent = *beam_[c.state];
+                const uint64_t hash = parent.hash ^ hash_keys_[c.node];
+                // Partial schedules which have run the same set of
+                // nodes are equivalent for the rest of scheduling.
+                if (!seen_hashes.insert(hash).second) continue;
+                std::unique_ptr<State> state(new State(parent));
+                Apply(c.node, state.get());
+                next_beam.push_back(std::move(state));
+            }
+            beam_.swap(next_beam);
+        }
+
+        std::vector<Node*> nodes;
+        for (const Trail* t = beam_[0]->trail.get(); t; t = t->prev.get()) {
+            if (t->node->chainer_order() < 0) nodes.push_back(t->node);
+        }
+        std::reverse(nodes.begin(), nodes.end());
+        return nodes;
+    }
+
+private:
+    // A persistent list of scheduled nodes shared by states.
+    struct Trail {
+        Node* node;
+        std::shared_ptr<const Trail> prev;
+    };
+
+    struct State {
+        std::vector<int> input_counts;
+        std::vector<int> num_users;
+        std::vector<int> ready;
+        std::shared_ptr<const Trail> trail;
+        uint64_t hash{0};
+        int64_t mem{0};
+        int64_t peak{0};
+    };
+
+    struct Candidate {
+        size_t state;
+        int node;
+        int64_t peak;
+        int64_t mem;
+    };
+
+    // Returns the memory usage after `node` allocates its outputs and
+    // the memory usage after it frees inputs no longer needed.
+    std::pair<int64_t, int64_t> Simulate(int node_id, const State& state) const {
+        const Node* node = nodes_[node_id];
+        int64_t mem = state.mem;
+        for (const Value* value : node->outputs()) {
+            mem += value_bytes_[value_ids_.at(value)];
+        }
+        const int64_t allocated = mem;
+
+        std::map<int, int> uses;
+        for (const Value* value : node->inputs()) uses[value_ids_.at(value)]++;
+        for (const auto& p : uses) {
+            if (freeable_[p.first] && state.num_users[p.first] == p.second) mem -= value_bytes_[p.first];
+        }
+        for (const Value* value : node->outputs()) {
+            const int id = value_ids_.at(value);
+            if (freeable_[id] && state.num_users[id] == 0) mem -= value_bytes_[id];
+        }
+        return std::make_pair(allocated, mem);
+    }
+
+    void AddCandidates(size_t state_index, std::vector<Candidate>* candidates) const {
+        const State& state = *beam_[state_index];
+        std::vector<Candidate> cs;
+        for (int node_id : state.ready) {
+            const std::pair<int64_t, int64_t> mems = Simulate(node_id, state);
+            cs.push_back(Candidate{state_index, node_id, std::max(state.peak, mems.first), mems.second});
+        }
+
+        // Nodes which reduce the memory without raising the peak
+        // should be scheduled immediately.
+        for (const Candidate& c : cs) {
+            if (c.peak == state.peak && c.mem <= state.mem) {
+                candidates->push_back(c);
+                return;
+            }
+        }
+        candidates->insert(candidates->end(), cs.begin(), cs.end());
+    }
+
+    void MakeValueReady(const Value* value, State* state) {
+        if (value->IsNull()) return;
+        for (Node* user : value->users()) {
+            auto found = node_ids_.find(user);
+            if (found == node_ids_.end()) continue;
+            const int cnt = --state->input_counts[found->second];
+            CHECK_LE(0, cnt) << user->ToString();
+            if (cnt == 0) state->ready.push_back(found->second);
+        }
+    }
+
+    void Apply(int node_id, State* state) {
+        Node* node = nodes_[node_id];
+        const std::pair<int64_t, int64_t> mems = Simulate(node_id, *state);
+        state->peak = std::max(state->peak, mems.first);
+        state->mem = mems.second;
+        for (const Value* value : node->inputs()) state->num_users[value_ids_[value]]--;
+        state->ready.erase(std::find(state->ready.begin(), state->ready.end(), node_id));
+        state->hash ^= hash_keys_[node_id];
+        state->trail = std::make_shared<const Trail>(Trail{node, state->trail});
+        for (const Value* value : node->outputs()) MakeValueReady(value, state);
+    }
+
+    const int beam_width_;
+    std::vector<Node*> nodes_;
+    std::map<const Node*, int> node_ids_;
+    std::vector<uint64_t> hash_keys_;
+    std::vector<const Value*> values_;
+    std::map<const Value*, int> value_ids_;
+    std::vector<int64_t> value_bytes_;
+    std::vector<bool> freeable_;
+    std::vector<std::unique_ptr<State>> beam_;
+};
+
+std::vector<Node*> ScheduleBeam(const Graph& graph, const std::vector<Value*>& input_values, const std::vector<Value*>& output_values) {
+    const int beam_width = g_scheduler_beam_width > 0 ? g_scheduler_beam_width : 8;
+    BeamScheduler scheduler(graph, input_values, output_values, beam_width);
+    return scheduler.Schedule();
+}
+
 void CheckSanity(
         const Graph& graph,
         const std::vector<Value*>& input_values,
@@ -250,6 +445,9 @@ int64_t ScheduleComputation(
         case SchedulerType::kGreedy:
             nodes = ScheduleGreedy(graph, input_values, output_values);
             break;
+        case SchedulerType::kBeam:
+            nodes = ScheduleBeam(graph, input_values, output_values);
+            break;
     }
 
     CheckSanity(graph, input_values, output_values, nodes);
@@ -260,6 +458,17 @@ int64_t ScheduleComputation(
     return order;
 }
 
+SchedulerType GetSchedulerType(const std::string& name) {
+    if (name.empty() || name == "greedy") {
+        return SchedulerType::kGreedy;
+    } else if (name == "naive") {
+        return SchedulerType::kNaive;
+    } else if (name == "beam") {
+        return SchedulerType::kBeam;
+    }
+    CHECK(false) << "Unknown scheduler: " << name;
+}
+
 int64_t ScheduleComputation(const Graph& graph, int64_t order, SchedulerType scheduler_type) {
     return ScheduleComputation(graph, graph.input_values(), graph.output_values(), order, scheduler_type);
 }
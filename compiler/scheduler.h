@@ -1,4 +1,5 @@
 #include <stdint.h>
+#include <string>
 #include <vector>
 
 namespace chainer_compiler {
@@ -9,8 +10,14 @@ class Value;
 enum class SchedulerType {
     kNaive,
     kGreedy,
+    // Beam search which minimizes the simulated peak memory usage.
+    kBeam,
 };
 
+// Returns the scheduler specified by its name ("naive", "greedy", or
+// "beam"). An empty name means the default scheduler.
+SchedulerType GetSchedulerType(const std::string& name);
+
 int64_t ScheduleComputation(
         const Graph& graph,
         const std::vector<Value*>& input_values,
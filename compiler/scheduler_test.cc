@@ -4,6 +4,7 @@
 
 #include <common/log.h>
 #include <compiler/graph.h>
+#include <compiler/memory_simulator.h>
 #include <compiler/node.h>
 #include <compiler/scheduler.h>
 
@@ -94,7 +95,34 @@ TEST_P(SchedulerTest, MultipleTimes) {
     EXPECT_EQ(2, n3->chainer_order());
 }
 
-INSTANTIATE_TEST_CASE_P(ForEachScheduler, SchedulerTest, ::testing::Values(SchedulerType::kNaive, SchedulerType::kGreedy));
+TEST(BeamSchedulerTest, ReducePeakMemory) {
+    Graph graph("test");
+    Value* in = graph.AddInputValue("in", Type(Dtype::kFloat32, {16}));
+    Value* out = graph.AddOutputValue("out", Type(Dtype::kFloat32, {16}));
+    Value* a1 = graph.AddValue("a1", Type(Dtype::kFloat32, {1024}));
+    Value* a2 = graph.AddValue("a2", Type(Dtype::kFloat32, {16}));
+    Value* b1 = graph.AddValue("b1", Type(Dtype::kFloat32, {1024}));
+    Value* b2 = graph.AddValue("b2", Type(Dtype::kFloat32, {16}));
+
+    graph.AddNode(Node::kExpand, {in}, {a1});
+    graph.AddNode(Node::kExpand, {in}, {b1});
+    graph.AddNode(Node::kReduceSum, {a1}, {a2});
+    graph.AddNode(Node::kReduceSum, {b1}, {b2});
+    graph.AddNode(Node::kAdd, {a2, b2}, {out});
+
+    ScheduleComputation(graph, 0, SchedulerType::kNaive);
+    const int64_t naive_peak = SimulateMemoryUsage(graph).peak;
+    for (Node* node : graph.nodes()) node->set_chainer_order(-1);
+    ScheduleComputation(graph, 0, SchedulerType::kBeam);
+    const int64_t beam_peak = SimulateMemoryUsage(graph).peak;
+
+    // Only one of `a1` and `b1` is alive at the same time.
+    EXPECT_EQ(4 * (16 + 1024 + 16), beam_peak);
+    EXPECT_LT(beam_peak, naive_peak);
+}
+
+INSTANTIATE_TEST_CASE_P(
+        ForEachScheduler, SchedulerTest, ::testing::Values(SchedulerType::kNaive, SchedulerType::kGreedy, SchedulerType::kBeam));
 
 }  // namespace
 }  // namespace chainer_compiler
@@ -2,6 +2,9 @@
 
 #include <iostream>
 #include <limits>
+#include <map>
+#include <set>
+#include <unordered_map>
 
 #include <chainerx/array.h>
 #include <chainerx/routines/manipulation.h>
@@ -814,9 +817,104 @@ SimplifierFn FunctionExpander(const std::string& fn, const onnx::OpSchema* schem
     };
 }
 
+// Nodes which may be simplified after `node` is replaced, i.e., the
+// producers and the users of its inputs and outputs.
+void CollectNeighbors(Node* node, std::vector<Node*>* neighbors) {
+    for (Value* value : node->inputs()) {
+        if (value->producer()) neighbors->push_back(value->producer());
+        for (Node* user : value->users()) neighbors->push_back(user);
+    }
+    for (Value* value : node->outputs()) {
+        for (Node* user : value->users()) neighbors->push_back(user);
+    }
+}
+
+bool ApplySimplifier(const std::map<Node::OpType, Simplifier>& simplifiers, Graph* graph, Node* node) {
+    auto found = simplifiers.find(node->op_type());
+    if (found == simplifiers.end()) {
+        return false;
+    }
+    const Simplifier& simplifier = found->second;
+    if (!simplifier.fn(graph, node)) {
+        return false;
+    }
+    CLOG() << node->op_type() << " simplified" << std::endl;
+    graph->DetachNode(node);
+    return true;
+}
+
+void SimplifyByFullSweeps(const std::map<Node::OpType, Simplifier>& simplifiers, Graph* graph) {
+    bool replaced = true;
+    while (replaced) {
+        replaced = false;
+        for (Node* node : graph->GetLiveNodes()) {
+            if (ApplySimplifier(simplifiers, graph, node)) {
+                replaced = true;
+            }
+        }
+    }
+}
+
+// Visits nodes in rounds. The first round visits all nodes and later
+// rounds only visit nodes added or next to replaced nodes in the
+// previous round. Nodes are visited in the order of `Graph::nodes()` in
+// each round so the result is the same as `SimplifyByFullSweeps`.
+void SimplifyByWorklist(const std::map<Node::OpType, Simplifier>& simplifiers, Graph* graph) {
+    std::unordered_map<Node*, size_t> node_indices;
+    size_t num_indexed_nodes = 0;
+    auto index_new_nodes = [graph, &node_indices, &num_indexed_nodes]() {
+        const std::vector<Node*>& nodes = graph->nodes();
+        for (; num_indexed_nodes < nodes.size(); ++num_indexed_nodes) {
+            node_indices.emplace(nodes[num_indexed_nodes], num_indexed_nodes);
+        }
+    };
+
+    std::map<size_t, Node*> worklist;
+    auto push = [&simplifiers, &node_indices](Node* node, std::map<size_t, Node*>* worklist) {
+        if (node->detached() || !simplifiers.count(node->op_type())) {
+            return;
+        }
+        auto found = node_indices.find(node);
+        CHECK(found != node_indices.end()) << node->DebugString();
+        worklist->emplace(found->second, node);
+    };
+
+    index_new_nodes();
+    for (Node* node : graph->nodes()) {
+        push(node, &worklist);
+    }
+
+    while (!worklist.empty()) {
+        std::map<size_t, Node*> next_worklist;
+        for (const auto& p : worklist) {
+            Node* node = p.second;
+            if (node->detached()) {
+                continue;
+            }
+
+            std::vector<Node*> neighbors;
+            CollectNeighbors(node, &neighbors);
+            const size_t num_nodes_before = graph->nodes().size();
+            if (!ApplySimplifier(simplifiers, graph, node)) {
+                continue;
+            }
+
+            index_new_nodes();
+            CollectNeighbors(node, &neighbors);
+            for (Node* neighbor : neighbors) {
+                push(neighbor, &next_worklist);
+            }
+            for (size_t i = num_nodes_before; i < graph->nodes().size(); ++i) {
+                push(graph->nodes()[i], &next_worklist);
+            }
+        }
+        worklist.swap(next_worklist);
+    }
+}
+
 }  // namespace
 
-void Simplify(const BackendConfig& bc, const std::set<std::string>& simplifier_names, Graph* graph, bool gen_backprop) {
+void Simplify(const BackendConfig& bc, const std::set<std::string>& simplifier_names, Graph* graph, bool gen_backprop, bool full_sweep) {
     std::set<std::string> all_simplifier_names;
     std::map<Node::OpType, Simplifier> simplifiers;
 
@@ -893,21 +991,10 @@ void Simplify(const BackendConfig& bc, const std::set<std::string>& simplifier_n
         }
     }
 
-    bool replaced = true;
-    while (replaced) {
-        replaced = false;
-        for (Node* node : graph->GetLiveNodes()) {
-            auto found = simplifiers.find(node->op_type());
-            if (found == simplifiers.end()) {
-                continue;
-            }
-            const Simplifier& simplifier = found->second;
-            if (simplifier.fn(graph, node)) {
-                CLOG() << node->op_type() << " simplified" << std::endl;
-                graph->DetachNode(node);
-                replaced = true;
-            }
-        }
+    if (full_sweep) {
+        SimplifyByFullSweeps(simplifiers, graph);
+    } else {
+        SimplifyByWorklist(simplifiers, graph);
     }
 }
 
@@ -8,6 +8,11 @@ namespace chainer_compiler {
 class Graph;
 class BackendConfig;
 
-void Simplify(const BackendConfig& cfg, const std::set<std::string>& simplifier_names, Graph* graph, bool gen_backprop);
+// Applies simplifiers until no node can be simplified. By default, only
+// nodes next to simplified nodes are revisited. `full_sweep` visits all
+// nodes until the graph converges, which is slower but gives the same
+// result.
+void Simplify(
+        const BackendConfig& cfg, const std::set<std::string>& simplifier_names, Graph* graph, bool gen_backprop, bool full_sweep = false);
 
 }  // namespace chainer_compiler
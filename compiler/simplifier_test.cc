@@ -4,6 +4,7 @@
 #include <common/strutil.h>
 #include <compiler/graph.h>
 #include <compiler/graph_builder.h>
+#include <compiler/onnx.h>
 #include <compiler/simplifier.h>
 #include <configs/backend_config.h>
 
@@ -81,6 +82,35 @@ TEST(SimplifyTest, ReduceSumTo) {
             TestSimplify("ReplaceChainerReduceSumTo", Node::kChainerReduceSumTo, Types({{2, 3, 4, 5}, {2}}), Types({{2, 3, 4, 5}})));
 }
 
+std::string SimplifyAndSerialize(bool full_sweep) {
+    Graph graph("test");
+    Type type(Dtype::kFloat32, {2, 3});
+    Value* a = graph.AddInputValue("a", type);
+    Value* b = graph.AddInputValue("b", type);
+    Value* c = graph.AddInputValue("c", type);
+    Value* output = graph.AddOutputValue("output", Type(Dtype::kBool, {2, 3}));
+
+    {
+        GraphBuilder gb(&graph, "test", output);
+        Value* t = gb.Op(Node::kMean, {a, b, c});
+        t = gb.Op(Node::kIdentity, {t});
+        t = gb.Op(Node::kSum, {t, a, b, c});
+        t = gb.Op(Node::kIdentity, {t});
+        t = gb.Op(Node::kLess, {t, c});
+        gb.Op(Node::kIdentity, {t}, output);
+    }
+    auto bc = BackendConfig::FromName("chxvm_test");
+    Simplify(*bc, {"ReplaceMean", "ReplaceSum", "ReplaceLess", "ReplaceIdentity"}, &graph, true /* gen_backprop */, full_sweep);
+
+    onnx::GraphProto xgraph;
+    graph.ToONNX(&xgraph);
+    return xgraph.SerializeAsString();
+}
+
+TEST(SimplifyTest, WorklistMatchesFullSweep) {
+    EXPECT_EQ(SimplifyAndSerialize(true /* full_sweep */), SimplifyAndSerialize(false /* full_sweep */));
+}
+
 // TODO(hamaji): Write tests for other ops.
 
 }  // namespace
@@ -2,6 +2,7 @@
 
 #include <locale>
 
+#include <common/log.h>
 #include <common/strutil.h>
 #include <compiler/tensor.h>
 
@@ -67,4 +68,27 @@ std::string CleanseIdent(const std::string& s) {
     return o;
 }
 
+void SpecializeInputShapes(const std::map<std::string, std::vector<int64_t>>& shapes, onnx::GraphProto* graph) {
+    for (int i = 0; i < graph->input_size(); ++i) {
+        onnx::ValueInfoProto* input = graph->mutable_input(i);
+        auto found = shapes.find(input->name());
+        if (found == shapes.end()) {
+            continue;
+        }
+        CHECK(input->type().has_tensor_type()) << "Only tensor_type is supported: " << input->name();
+        onnx::TensorShapeProto* shape = input->mutable_type()->mutable_tensor_type()->mutable_shape();
+        shape->Clear();
+        for (int64_t dim : found->second) {
+            shape->add_dim()->set_dim_value(dim);
+        }
+    }
+    graph->clear_value_info();
+    for (int i = 0; i < graph->output_size(); ++i) {
+        onnx::TypeProto* type = graph->mutable_output(i)->mutable_type();
+        if (type->has_tensor_type()) {
+            type->mutable_tensor_type()->clear_shape();
+        }
+    }
+}
+
 }  // namespace chainer_compiler
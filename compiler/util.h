@@ -1,5 +1,9 @@
 #pragma once
 
+#include <map>
+#include <string>
+#include <vector>
+
 #include <compiler/onnx.h>
 
 namespace chainer_compiler {
@@ -14,4 +18,8 @@ void StripONNXModel(onnx::ModelProto* model);
 
 std::string CleanseIdent(const std::string& s);
 
+// Sets dims of inputs in `shapes` and clears shapes of the other
+// values so shape inference runs for the new input shapes.
+void SpecializeInputShapes(const std::map<std::string, std::vector<int64_t>>& shapes, onnx::GraphProto* graph);
+
 }  // namespace chainer_compiler
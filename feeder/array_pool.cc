@@ -0,0 +1,18 @@
+#include "array_pool.h"
+
+#include <chainerx/routines/creation.h>
+
+ArrayPool::ArrayPool(chainerx::Device* device) : device_(device) {
+}
+
+chainerx::Array ArrayPool::Allocate(chainerx::Dtype dtype, const chainerx::Shape& shape) {
+    const int64_t size = chainerx::GetItemSize(dtype) * shape.GetTotalSize();
+    for (const Buffer& buffer : buffers_) {
+        // Only this pool refers the buffer.
+        if (buffer.size == size && buffer.data.use_count() == 1) {
+            return chainerx::FromData(shape, dtype, buffer.data, absl::nullopt, 0, *device_);
+        }
+    }
+    buffers_.push_back(Buffer{size, device_->Allocate(size)});
+    return chainerx::FromData(shape, dtype, buffers_.back().data, absl::nullopt, 0, *device_);
+}
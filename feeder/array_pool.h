@@ -0,0 +1,39 @@
+#pragma once
+
+#include <stdint.h>
+
+#include <memory>
+#include <vector>
+
+#include <chainerx/array.h>
+#include <chainerx/device.h>
+#include <chainerx/dtype.h>
+#include <chainerx/shape.h>
+
+// Recycles buffers of arrays on a device. A buffer is reused once all
+// arrays returned by `Allocate` for it are destructed, so producers of
+// batches do not allocate memory for each batch. Not thread-safe.
+class ArrayPool {
+public:
+    explicit ArrayPool(chainerx::Device* device);
+
+    // Returns a contiguous array whose contents are uninitialized.
+    chainerx::Array Allocate(chainerx::Dtype dtype, const chainerx::Shape& shape);
+
+    chainerx::Device* device() const {
+        return device_;
+    }
+
+    size_t num_buffers() const {
+        return buffers_.size();
+    }
+
+private:
+    struct Buffer {
+        int64_t size;
+        std::shared_ptr<void> data;
+    };
+
+    chainerx::Device* device_;
+    std::vector<Buffer> buffers_;
+};
@@ -0,0 +1,40 @@
+#include <gtest/gtest.h>
+
+#include <chainerx/array.h>
+#include <chainerx/context.h>
+
+#include <feeder/array_pool.h>
+
+namespace {
+
+TEST(TestArrayPool, Recycle) {
+    chainerx::Context ctx;
+    chainerx::SetGlobalDefaultContext(&ctx);
+
+    ArrayPool pool(&ctx.GetDevice({"native", 0}));
+    void* data = nullptr;
+    {
+        chainerx::Array a = pool.Allocate(chainerx::Dtype::kFloat32, {2, 3});
+        EXPECT_EQ(chainerx::Shape({2, 3}), a.shape());
+        EXPECT_EQ(chainerx::Dtype::kFloat32, a.dtype());
+        data = a.raw_data();
+    }
+    // The buffer is reused after `a` is destructed.
+    chainerx::Array b = pool.Allocate(chainerx::Dtype::kFloat32, {3, 2});
+    EXPECT_EQ(data, b.raw_data());
+    EXPECT_EQ(1, pool.num_buffers());
+
+    // The buffer is still used by `b`.
+    chainerx::Array c = pool.Allocate(chainerx::Dtype::kInt32, {6});
+    EXPECT_NE(b.raw_data(), c.raw_data());
+    EXPECT_EQ(2, pool.num_buffers());
+
+    // A view keeps the buffer alive.
+    chainerx::Array view = c.Reshape({2, 3});
+    c = chainerx::Array();
+    chainerx::Array d = pool.Allocate(chainerx::Dtype::kInt32, {6});
+    EXPECT_NE(view.raw_data(), d.raw_data());
+    EXPECT_EQ(3, pool.num_buffers());
+}
+
+}  // namespace
@@ -2,7 +2,8 @@
 
 #include <common/log.h>
 
-DataIterator::DataIterator(int buf_size) : buf_size_(buf_size) {
+DataIterator::DataIterator(int buf_size, int num_threads) : buf_size_(buf_size), num_threads_(num_threads) {
+    CHECK_LT(0, num_threads);
 }
 
 DataIterator::~DataIterator() {
@@ -11,9 +12,11 @@ DataIterator::~DataIterator() {
 
 std::vector<chainerx::Array> DataIterator::GetNext() {
     std::unique_lock<std::mutex> lock{mu_};
-    CHECK(thread_.get());
+    CHECK(!threads_.empty());
+    // No batches are returned after the termination.
+    if (should_finish_) return {};
     while (buf_.empty()) {
-        if (is_iteration_finished_) return {};
+        if (num_finished_threads_ == num_threads_ || should_finish_) return {};
         cond_.wait(lock);
     }
     auto ret = buf_.front();
@@ -24,44 +27,45 @@ std::vector<chainerx::Array> DataIterator::GetNext() {
 
 void DataIterator::Start() {
     std::unique_lock<std::mutex> lock{mu_};
-    thread_.reset(new std::thread([this]() { Loop(); }));
+    for (int i = 0; i < num_threads_; ++i) {
+        threads_.emplace_back([this]() { Loop(); });
+    }
 }
 
 void DataIterator::Terminate() {
-    std::unique_lock<std::mutex> lock{mu_};
-    CHECK(thread_.get());
-    if (should_finish_) return;
-    should_finish_ = true;
-    cond_.notify_all();
-    cond_.wait(lock);
-    thread_->join();
+    {
+        std::unique_lock<std::mutex> lock{mu_};
+        // Iterators which are not started have nothing to stop.
+        if (threads_.empty() || should_finish_) return;
+        should_finish_ = true;
+        cond_.notify_all();
+    }
+    for (std::thread& thread : threads_) {
+        thread.join();
+    }
 }
 
 void DataIterator::Loop() {
     while (true) {
+        {
+            std::unique_lock<std::mutex> lock{mu_};
+            if (should_finish_) return;
+        }
+
         auto next = GetNextImpl();
 
         std::unique_lock<std::mutex> lock{mu_};
         if (next.empty()) {
-            is_iteration_finished_ = true;
+            ++num_finished_threads_;
             cond_.notify_all();
-            while (!should_finish_) {
-                cond_.wait(lock);
-                cond_.notify_all();
-            }
             return;
         }
+        while (!should_finish_ && buf_.size() >= buf_size_) {
+            cond_.wait(lock);
+        }
         if (should_finish_) {
-            cond_.notify_all();
             return;
         }
-        while (buf_.size() == buf_size_) {
-            cond_.wait(lock);
-            if (should_finish_) {
-                cond_.notify_all();
-                return;
-            }
-        }
         buf_.push(next);
         cond_.notify_all();
     }
@@ -10,26 +10,34 @@
 
 class DataIterator {
 public:
+    // Subclasses must call `Terminate` in their destructors, as threads
+    // may call `GetNextImpl` until they are joined.
     virtual ~DataIterator();
 
     std::vector<chainerx::Array> GetNext();
 
+    // Called by `num_threads` threads concurrently, so implementations
+    // must be thread-safe when `num_threads` is larger than one.
+    // Batches are returned in the order they are finished.
     virtual std::vector<chainerx::Array> GetNextImpl() = 0;
 
     void Start();
     void Terminate();
 
 protected:
-    explicit DataIterator(int buf_size);
+    // At most `buf_size` batches are prefetched in addition to the
+    // batches which are being produced by threads.
+    explicit DataIterator(int buf_size, int num_threads = 1);
 
 private:
     void Loop();
 
-    std::unique_ptr<std::thread> thread_;
+    std::vector<std::thread> threads_;
     std::mutex mu_;
     std::condition_variable cond_;
     std::queue<std::vector<chainerx::Array>> buf_;
     const int buf_size_;
+    const int num_threads_;
+    int num_finished_threads_ = 0;
     bool should_finish_ = false;
-    bool is_iteration_finished_ = false;
 };
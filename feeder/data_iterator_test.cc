@@ -1,5 +1,7 @@
+#include <atomic>
 #include <cstring>
 #include <memory>
+#include <set>
 
 #include <gtest/gtest.h>
 
@@ -17,6 +19,10 @@ public:
     explicit MyDataIterator(int end = 999) : DataIterator(3), end_(end) {
     }
 
+    ~MyDataIterator() override {
+        Terminate();
+    }
+
     std::vector<chainerx::Array> GetNextImpl() override {
         if (counter_ == end_) return {};
         std::shared_ptr<void> data(new char[sizeof(counter_)], std::default_delete<char[]>());
@@ -58,4 +64,74 @@ TEST(TestDataIterator, Finish) {
     iter.Terminate();
 }
 
+class ThreadedDataIterator : public DataIterator {
+public:
+    ThreadedDataIterator(int num_threads, int end) : DataIterator(2, num_threads), end_(end) {
+    }
+
+    ~ThreadedDataIterator() override {
+        Terminate();
+    }
+
+    std::vector<chainerx::Array> GetNextImpl() override {
+        int value = counter_++;
+        if (value >= end_) return {};
+        std::shared_ptr<void> data(new char[sizeof(value)], std::default_delete<char[]>());
+        std::memcpy(data.get(), &value, sizeof(value));
+        return {chainerx::FromContiguousHostData({}, chainerx::Dtype::kInt32, data)};
+    }
+
+private:
+    std::atomic<int> counter_{0};
+    int end_;
+};
+
+TEST(TestDataIterator, MultiThreads) {
+    chainerx::Context ctx;
+    chainerx::SetGlobalDefaultContext(&ctx);
+
+    ThreadedDataIterator iter(4, 100);
+    iter.Start();
+    std::set<int> values;
+    while (true) {
+        std::vector<chainerx::Array> a = iter.GetNext();
+        if (a.empty()) break;
+        EXPECT_TRUE(values.emplace(int64_t(chainerx::AsScalar(a[0]))).second);
+    }
+    EXPECT_EQ(100, values.size());
+    EXPECT_EQ(0, *values.begin());
+    EXPECT_EQ(99, *values.rbegin());
+    iter.Terminate();
+}
+
+TEST(TestDataIterator, TerminateWhileRunning) {
+    chainerx::Context ctx;
+    chainerx::SetGlobalDefaultContext(&ctx);
+
+    ThreadedDataIterator iter(4, 1000000);
+    iter.Start();
+    EXPECT_EQ(1, iter.GetNext().size());
+    iter.Terminate();
+    // No more batches come after the termination.
+    EXPECT_TRUE(iter.GetNext().empty());
+}
+
+TEST(TestDataIterator, DestroyWhileRunning) {
+    chainerx::Context ctx;
+    chainerx::SetGlobalDefaultContext(&ctx);
+
+    for (int i = 0; i < 10; ++i) {
+        // Threads are joined before members of the subclass are destructed.
+        std::unique_ptr<ThreadedDataIterator> iter(new ThreadedDataIterator(4, 1000000));
+        iter->Start();
+        EXPECT_EQ(1, iter->GetNext().size());
+        iter.reset();
+    }
+}
+
+TEST(TestDataIterator, NotStarted) {
+    ThreadedDataIterator iter(4, 10);
+    iter.Terminate();
+}
+
 }  // namespace
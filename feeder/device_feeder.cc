@@ -0,0 +1,31 @@
+#include "device_feeder.h"
+
+#include <common/log.h>
+
+DeviceFeeder::DeviceFeeder(DataIterator* source, chainerx::Device* device, int buf_size)
+    : DataIterator(buf_size), source_(source), pool_(device) {
+}
+
+std::vector<chainerx::Array> DeviceFeeder::GetNextImpl() {
+    std::vector<chainerx::Array> arrays = source_->GetNext();
+    for (chainerx::Array& array : arrays) {
+        if (&array.device() == pool_.device()) {
+            continue;
+        }
+        CHECK(array.IsContiguous());
+        chainerx::Array transferred = pool_.Allocate(array.dtype(), array.shape());
+        // Copies from the host are finished when this returns, so the
+        // source buffer can be recycled right after this.
+        pool_.device()->MemoryCopyFrom(
+                static_cast<char*>(transferred.raw_data()) + transferred.offset(),
+                static_cast<const char*>(array.raw_data()) + array.offset(),
+                array.GetNBytes(),
+                array.device());
+        array = transferred;
+    }
+    return arrays;
+}
+
+size_t DeviceFeeder::num_buffers() const {
+    return pool_.num_buffers();
+}
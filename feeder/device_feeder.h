@@ -0,0 +1,35 @@
+#pragma once
+
+#include <vector>
+
+#include <chainerx/array.h>
+#include <chainerx/device.h>
+
+#include <feeder/array_pool.h>
+#include <feeder/data_iterator.h>
+
+// Transfers batches of `source` to `device` on a background thread, so
+// the transfer of the next batch overlaps with the computation of the
+// current one. With the default `buf_size`, a batch is transferred
+// while another one is ready (i.e., double buffering). Device buffers
+// are recycled once the arrays of a batch are destructed. Arrays which
+// are already on `device` are passed through without copies.
+//
+// `source` must be started before this iterator and outlive it.
+class DeviceFeeder : public DataIterator {
+public:
+    DeviceFeeder(DataIterator* source, chainerx::Device* device, int buf_size = 1);
+
+    ~DeviceFeeder() override {
+        Terminate();
+    }
+
+    std::vector<chainerx::Array> GetNextImpl() override;
+
+    // The number of buffers allocated on the device so far.
+    size_t num_buffers() const;
+
+private:
+    DataIterator* source_;
+    ArrayPool pool_;
+};
@@ -0,0 +1,59 @@
+#include <cstring>
+#include <memory>
+
+#include <gtest/gtest.h>
+
+#include <chainerx/array.h>
+#include <chainerx/context.h>
+#include <chainerx/routines/creation.h>
+#include <chainerx/routines/manipulation.h>
+
+#include <feeder/device_feeder.h>
+
+namespace {
+
+class CountIterator : public DataIterator {
+public:
+    explicit CountIterator(int end) : DataIterator(3), end_(end) {
+    }
+
+    ~CountIterator() override {
+        Terminate();
+    }
+
+    std::vector<chainerx::Array> GetNextImpl() override {
+        if (counter_ == end_) return {};
+        std::shared_ptr<void> data(new char[sizeof(counter_)], std::default_delete<char[]>());
+        std::memcpy(data.get(), &counter_, sizeof(counter_));
+        chainerx::Array array = chainerx::FromContiguousHostData({}, chainerx::Dtype::kInt32, data);
+        counter_++;
+        return {array};
+    }
+
+private:
+    int counter_ = 0;
+    int end_;
+};
+
+TEST(TestDeviceFeeder, PassThrough) {
+    chainerx::Context ctx;
+    chainerx::SetGlobalDefaultContext(&ctx);
+
+    CountIterator source(4);
+    source.Start();
+    DeviceFeeder feeder(&source, &ctx.GetDevice({"native", 0}));
+    feeder.Start();
+    for (int i = 0; i < 4; ++i) {
+        std::vector<chainerx::Array> a = feeder.GetNext();
+        ASSERT_EQ(1, a.size());
+        EXPECT_EQ(&ctx.GetDevice({"native", 0}), &a[0].device());
+        EXPECT_EQ(i, int64_t(chainerx::AsScalar(a[0])));
+    }
+    EXPECT_TRUE(feeder.GetNext().empty());
+    // Arrays on the destination device are not copied.
+    EXPECT_EQ(0, feeder.num_buffers());
+    feeder.Terminate();
+    source.Terminate();
+}
+
+}  // namespace
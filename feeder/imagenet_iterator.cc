@@ -1,38 +1,44 @@
 #include "imagenet_iterator.h"
 
 #include <algorithm>
-#include <cstring>
+#include <cmath>
 #include <fstream>
 #include <random>
 
 #include <opencv2/highgui/highgui.hpp>
+#include <opencv2/imgproc/imgproc.hpp>
 
-#include <chainerx/routines/creation.h>
+#include <chainerx/context.h>
 
 #include <common/log.h>
 #include <common/strutil.h>
 
-namespace {
-
-chainerx::Array MakeArray(chainerx::Dtype dtype, chainerx::Shape shape, const void* src) {
-    int64_t size = chainerx::GetItemSize(dtype) * shape.GetTotalSize();
-    std::shared_ptr<void> data(new char[size], std::default_delete<char[]>());
-    std::memcpy(data.get(), src, size);
-    chainerx::Array array(chainerx::FromContiguousHostData(shape, dtype, data));
-    return array;
+cv::Mat DecodeImage(const std::string& filename) {
+    return cv::imread(filename, cv::IMREAD_COLOR);
 }
 
-}  // namespace
-
 ImageNetIterator::ImageNetIterator(
-        const std::string& labeled_image_dataset, int buf_size, int batch_size, const std::vector<float>& mean, int height, int width)
-    : DataIterator(buf_size), batch_size_(batch_size), mean_(mean), height_(height), width_(width) {
+        const std::string& labeled_image_dataset,
+        int buf_size,
+        int batch_size,
+        const std::vector<float>& mean,
+        int height,
+        int width,
+        const ImageNetIteratorOptions& options)
+    : DataIterator(buf_size, options.num_workers),
+      batch_size_(batch_size),
+      mean_(mean),
+      height_(height),
+      width_(width),
+      options_(options),
+      pool_(&chainerx::GetDefaultContext().GetDevice({"native", 0})) {
     CHECK_EQ(3 * height * width, mean_.size());
+    CHECK(options_.decoder);
     std::ifstream ifs(labeled_image_dataset);
-    while (ifs) {
-        std::string filename;
-        int label;
-        ifs >> filename >> label;
+    CHECK(ifs) << "Failed to open: " << labeled_image_dataset;
+    std::string filename;
+    int label;
+    while (ifs >> filename >> label) {
         dataset_.emplace_back(filename, label);
     }
     std::mt19937 mt;
@@ -40,47 +46,76 @@ ImageNetIterator::ImageNetIterator(
     // std::cerr << dataset_.size() << " examples" << std::endl;
 }
 
-std::vector<chainerx::Array> ImageNetIterator::GetNextImpl() {
-    std::vector<std::pair<std::string, int>> batch;
-    while (batch_size_ > batch.size()) {
-        if (iter_ == dataset_.size()) {
-            std::cerr << batch.size() << std::endl;
-            break;
-        }
-        batch.push_back(dataset_[iter_++]);
+void ImageNetIterator::LoadImage(const std::string& filename, uint32_t seed, float* out) const {
+    cv::Mat image = options_.decoder(filename);
+    CHECK(!image.empty()) << "Failed to decode: " << filename;
+    CHECK_EQ(CV_8UC3, image.type()) << filename;
+
+    std::seed_seq seq{options_.seed, seed};
+    std::mt19937 rng(seq);
+    cv::Mat cropped;
+    if (options_.random_crop) {
+        const double area = static_cast<double>(image.rows) * image.cols;
+        const double scale_ratio = std::uniform_real_distribution<double>(0.08, 1.0)(rng);
+        const double aspect_ratio = std::exp(std::uniform_real_distribution<double>(std::log(3.0 / 4.0), std::log(4.0 / 3.0))(rng));
+        const int crop_height = std::max(1, std::min(image.rows, static_cast<int>(std::sqrt(area * scale_ratio * aspect_ratio))));
+        const int crop_width = std::max(1, std::min(image.cols, static_cast<int>(std::sqrt(area * scale_ratio / aspect_ratio))));
+        const int y = std::uniform_int_distribution<int>(0, image.rows - crop_height)(rng);
+        const int x = std::uniform_int_distribution<int>(0, image.cols - crop_width)(rng);
+        cv::resize(image(cv::Rect(x, y, crop_width, crop_height)), cropped, cv::Size(width_, height_));
+    } else {
+        CHECK_GE(image.rows, height_) << filename;
+        CHECK_GE(image.cols, width_) << filename;
+        cropped = image(cv::Rect((image.cols - width_) / 2, (image.rows - height_) / 2, width_, height_));
+    }
+    if (options_.random_flip && std::bernoulli_distribution(0.5)(rng)) {
+        cv::Mat flipped;
+        cv::flip(cropped, flipped, 1);
+        cropped = flipped;
     }
-    if (batch.empty()) return {};
 
-    std::vector<float> image_data(batch.size() * 3 * height_ * width_);
-    std::vector<int> label_data(batch.size());
-    for (size_t i = 0; i < batch.size(); ++i) {
-        label_data[i] = batch[i].second;
-        cv::Mat image = cv::imread(batch[i].first);
-        int bi = i * 3 * height_ * width_;
-        CHECK_GE(image.rows, height_);
-        CHECK_GE(image.cols, width_);
-        int by = (image.rows - height_) / 2;
-        int bx = (image.cols - width_) / 2;
-        for (int y = 0; y < height_; ++y) {
-            for (int x = 0; x < width_; ++x) {
-                int ii = (y * width_ + x) * 3;
-                for (int k = 0; k < 3; ++k) {
-                    image_data[bi + ii + k] = image.at<cv::Vec3b>(by + y, bx + x)(2 - k);
-                    image_data[bi + ii + k] -= mean_[ii + k];
-                    image_data[bi + ii + k] *= 1.0 / 255.0;
-                }
-            }
-        }
+    // Each channel is converted by vectorized OpenCV routines which
+    // write to `out` directly.
+    cv::Mat channels[3];
+    cv::split(cropped, channels);
+    const int plane_size = height_ * width_;
+    for (int c = 0; c < 3; ++c) {
+        cv::Mat plane(height_, width_, CV_32F, out + c * plane_size);
+        const cv::Mat mean(height_, width_, CV_32F, const_cast<float*>(&mean_[c * plane_size]));
+        // BGR to RGB.
+        channels[2 - c].convertTo(plane, CV_32F);
+        cv::subtract(plane, mean, plane);
+        plane.convertTo(plane, CV_32F, options_.scale);
+    }
+}
+
+std::vector<chainerx::Array> ImageNetIterator::GetNextImpl() {
+    size_t first;
+    int bs;
+    chainerx::Array images, labels;
+    {
+        std::lock_guard<std::mutex> lock(mu_);
+        first = iter_;
+        bs = static_cast<int>(std::min<size_t>(batch_size_, dataset_.size() - iter_));
+        if (bs == 0) return {};
+        iter_ += bs;
+        // Batches are written to recycled host buffers directly.
+        images = pool_.Allocate(chainerx::Dtype::kFloat32, {bs, 3, height_, width_});
+        labels = pool_.Allocate(chainerx::Dtype::kInt32, {bs});
     }
 
-    std::vector<chainerx::Array> arrays;
-    int bs = static_cast<int>(batch.size());
-    arrays.push_back(MakeArray(chainerx::Dtype::kFloat32, {bs, 3, height_, width_}, image_data.data()));
-    arrays.push_back(MakeArray(chainerx::Dtype::kInt32, {bs}, label_data.data()));
-    return arrays;
+    float* image_data = static_cast<float*>(images.raw_data());
+    int32_t* label_data = static_cast<int32_t*>(labels.raw_data());
+    for (int i = 0; i < bs; ++i) {
+        const std::pair<std::string, int>& example = dataset_[first + i];
+        label_data[i] = example.second;
+        LoadImage(example.first, first + i, image_data + i * 3 * height_ * width_);
+    }
+    return {images, labels};
 }
 
 std::string ImageNetIterator::GetStatus() const {
+    std::lock_guard<std::mutex> lock(mu_);
     return chainer_compiler::StrCat(iter_, "/", dataset_.size());
 }
 
@@ -99,10 +134,10 @@ std::vector<float> LoadMean(const std::string& filename, int height, int width)
     std::vector<float> cropped(3 * height * width);
     int by = (ORIG_HEIGHT - height) / 2;
     int bx = (ORIG_WIDTH - width) / 2;
-    for (int y = 0; y < height; ++y) {
-        for (int x = 0; x < width; ++x) {
-            for (int k = 0; k < 3; ++k) {
-                cropped[(y * width + x) * 3 + k] = mean[((by + y) * width + (bx + x)) * 3 + k];
+    for (int k = 0; k < 3; ++k) {
+        for (int y = 0; y < height; ++y) {
+            for (int x = 0; x < width; ++x) {
+                cropped[(k * height + y) * width + x] = mean[(k * ORIG_HEIGHT + by + y) * ORIG_WIDTH + bx + x];
             }
         }
     }
@@ -1,29 +1,78 @@
 #pragma once
 
+#include <stdint.h>
+
+#include <functional>
+#include <mutex>
 #include <string>
 #include <utility>
 #include <vector>
 
+#include <opencv2/core/core.hpp>
+
 #include <chainerx/array.h>
 
+#include <feeder/array_pool.h>
 #include <feeder/data_iterator.h>
 
+// Decodes an image file into a BGR `CV_8UC3` image.
+typedef std::function<cv::Mat(const std::string& filename)> ImageDecoder;
+
+cv::Mat DecodeImage(const std::string& filename);
+
+struct ImageNetIteratorOptions {
+    // The number of threads which decode and preprocess batches.
+    int num_workers{1};
+    // Crops a random region whose area is 8%-100% of the image and
+    // whose aspect ratio is 3/4-4/3, and resizes it to the output
+    // size, like `random_sized_crop` of ChainerCV. Images are
+    // cropped at their centers otherwise.
+    bool random_crop{false};
+    // Flips images horizontally with the probability of 0.5.
+    bool random_flip{false};
+    // Images are multiplied by this after the mean is subtracted.
+    float scale{1.0f / 255.0f};
+    // The seed of random augmentations. Each batch uses its own
+    // random engine, so results do not depend on `num_workers`.
+    uint32_t seed{0};
+    ImageDecoder decoder{DecodeImage};
+};
+
+// Produces batches of RGB images in NCHW and int32 labels from a text
+// file of pairs of an image filename and a label.
 class ImageNetIterator : public DataIterator {
 public:
     explicit ImageNetIterator(
-            const std::string& labeled_image_dataset, int buf_size, int batch_size, const std::vector<float>& mean, int height, int width);
+            const std::string& labeled_image_dataset,
+            int buf_size,
+            int batch_size,
+            const std::vector<float>& mean,
+            int height,
+            int width,
+            const ImageNetIteratorOptions& options = ImageNetIteratorOptions());
+
+    ~ImageNetIterator() override {
+        Terminate();
+    }
 
     std::vector<chainerx::Array> GetNextImpl() override;
 
     std::string GetStatus() const;
 
 private:
+    void LoadImage(const std::string& filename, uint32_t seed, float* out) const;
+
     std::vector<std::pair<std::string, int>> dataset_;
-    size_t iter_ = 0;
     int batch_size_;
     std::vector<float> mean_;
     int height_;
     int width_;
+    ImageNetIteratorOptions options_;
+
+    mutable std::mutex mu_;
+    size_t iter_ = 0;
+    ArrayPool pool_;
 };
 
+// Loads a mean image in CHW and crops its center.
 std::vector<float> LoadMean(const std::string& filename, int height, int width);
@@ -1,9 +1,14 @@
 #include <fstream>
+#include <set>
 
 #include <gtest/gtest.h>
 
+#include <opencv2/core/core.hpp>
+
 #include <chainerx/context.h>
+#include <chainerx/numeric.h>
 #include <chainerx/routines/manipulation.h>
+#include <chainerx/routines/statistics.h>
 
 #include <common/log.h>
 #include <feeder/imagenet_iterator.h>
@@ -46,4 +51,88 @@ TEST(TestImageNetIterator, Basic) {
     iter.Terminate();
 }
 
+// Writes a list of `num_examples` dummy filenames whose labels are
+// their indices.
+std::string WriteDataset(int num_examples) {
+    std::string filename = ::testing::TempDir() + "imagenet_iterator_test.txt";
+    std::ofstream ofs(filename);
+    for (int i = 0; i < num_examples; ++i) {
+        ofs << "image" << i << ".jpg " << i << "\n";
+    }
+    return filename;
+}
+
+// Returns an image of 40x50 whose B, G, and R are 10, 20, and 30.
+cv::Mat DecodeConstantImage(const std::string& filename) {
+    return cv::Mat(40, 50, CV_8UC3, cv::Scalar(10, 20, 30));
+}
+
+TEST(TestImageNetIterator, CenterCrop) {
+    chainerx::Context ctx;
+    chainerx::SetGlobalDefaultContext(&ctx);
+
+    std::vector<float> mean(3 * 32 * 24, 5.0f);
+    ImageNetIteratorOptions options;
+    options.num_workers = 3;
+    options.scale = 0.5f;
+    options.decoder = DecodeConstantImage;
+    ImageNetIterator iter(WriteDataset(10), 2, 4, mean, 32, 24, options);
+    iter.Start();
+    std::set<int> labels;
+    int num_batches = 0;
+    while (true) {
+        std::vector<chainerx::Array> a(iter.GetNext());
+        if (a.empty()) break;
+        ++num_batches;
+        ASSERT_EQ(2, a.size());
+        const int64_t bs = a[1].shape()[0];
+        EXPECT_EQ(chainerx::Shape({bs, 3, 32, 24}), a[0].shape());
+        for (int64_t i = 0; i < bs; ++i) {
+            labels.insert(int(chainerx::AsScalar(a[1].At({i}))));
+            // RGB in NCHW.
+            EXPECT_EQ((30 - 5) * 0.5, double(chainerx::AsScalar(a[0].At({i, 0, 31, 23}))));
+            EXPECT_EQ((20 - 5) * 0.5, double(chainerx::AsScalar(a[0].At({i, 1, 0, 0}))));
+            EXPECT_EQ((10 - 5) * 0.5, double(chainerx::AsScalar(a[0].At({i, 2, 16, 12}))));
+        }
+    }
+    EXPECT_EQ(3, num_batches);
+    EXPECT_EQ(10, labels.size());
+    iter.Terminate();
+}
+
+TEST(TestImageNetIterator, Augmentation) {
+    chainerx::Context ctx;
+    chainerx::SetGlobalDefaultContext(&ctx);
+
+    std::vector<float> mean(3 * 64 * 64, 0.0f);
+    ImageNetIteratorOptions options;
+    options.random_crop = true;
+    options.random_flip = true;
+    options.scale = 1.0f;
+    // An image with a gradient along x.
+    options.decoder = [](const std::string& filename) {
+        cv::Mat image(40, 50, CV_8UC3);
+        for (int x = 0; x < image.cols; ++x) {
+            image.col(x).setTo(cv::Scalar(x, x, x));
+        }
+        return image;
+    };
+
+    std::vector<chainerx::Array> results;
+    for (int num_workers : {1, 4}) {
+        options.num_workers = num_workers;
+        ImageNetIterator iter(WriteDataset(8), 2, 8, mean, 64, 64, options);
+        iter.Start();
+        std::vector<chainerx::Array> a(iter.GetNext());
+        ASSERT_EQ(2, a.size());
+        EXPECT_EQ(chainerx::Shape({8, 3, 64, 64}), a[0].shape());
+        EXPECT_LE(0, double(chainerx::AsScalar(chainerx::AMin(a[0]))));
+        EXPECT_GE(49, double(chainerx::AsScalar(chainerx::AMax(a[0]))));
+        results.push_back(a[0].Copy());
+        iter.Terminate();
+    }
+    // Random crops do not depend on the number of workers.
+    EXPECT_TRUE(chainerx::AllClose(results[0], results[1]));
+}
+
 }  // namespace
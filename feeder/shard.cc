@@ -0,0 +1,153 @@
+#include "shard.h"
+
+#include <stdio.h>
+#include <string.h>
+
+#ifndef _WIN32
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
+
+#include <fstream>
+
+#include <common/log.h>
+
+namespace {
+
+const char kShardMagic[8] = {'C', 'H', 'X', 'S', 'H', 'A', 'R', 'D'};
+const int32_t kShardVersion = 1;
+
+std::string Dirname(const std::string& filename) {
+    size_t found = filename.rfind('/');
+    if (found == std::string::npos) return "";
+    return filename.substr(0, found + 1);
+}
+
+}  // namespace
+
+int64_t ShardRecordSize(int channels, int height, int width) {
+    const int64_t size = kShardRecordPixelOffset + static_cast<int64_t>(channels) * height * width;
+    return (size + kShardRecordAlignment - 1) / kShardRecordAlignment * kShardRecordAlignment;
+}
+
+Shard::Shard(const std::string& filename) : filename_(filename) {
+#ifdef _WIN32
+    FILE* fp = fopen(filename.c_str(), "rb");
+    CHECK(fp) << "Failed to open: " << filename;
+    fseek(fp, 0, SEEK_END);
+    size_ = ftell(fp);
+    fseek(fp, 0, SEEK_SET);
+    data_ = new uint8_t[size_];
+    CHECK_EQ(size_, fread(data_, 1, size_, fp)) << "Failed to read: " << filename;
+    fclose(fp);
+#else
+    int fd = open(filename.c_str(), O_RDONLY);
+    CHECK_LE(0, fd) << "Failed to open: " << filename;
+    struct stat st;
+    CHECK_EQ(0, fstat(fd, &st)) << "Failed to stat: " << filename;
+    size_ = st.st_size;
+    CHECK_LE(sizeof(ShardHeader), size_) << "Broken shard: " << filename;
+    void* addr = mmap(nullptr, size_, PROT_READ, MAP_SHARED, fd, 0);
+    CHECK_NE(MAP_FAILED, addr) << "Failed to mmap: " << filename;
+    close(fd);
+    data_ = static_cast<uint8_t*>(addr);
+#endif
+
+    header_ = reinterpret_cast<const ShardHeader*>(data_);
+    CHECK_EQ(0, memcmp(header_->magic, kShardMagic, sizeof(kShardMagic))) << "Not a shard: " << filename;
+    CHECK_EQ(kShardVersion, header_->version) << "Unsupported shard version: " << filename;
+    CHECK_EQ(ShardRecordSize(header_->channels, header_->height, header_->width), header_->record_size) << filename;
+    CHECK_LE(sizeof(ShardHeader) + header_->num_records * header_->record_size, size_) << "Truncated shard: " << filename;
+}
+
+Shard::Shard(const std::string& filename, int channels, int height, int width, int64_t num_records) : filename_(filename), writable_(true) {
+    const int64_t record_size = ShardRecordSize(channels, height, width);
+    size_ = sizeof(ShardHeader) + num_records * record_size;
+#ifdef _WIN32
+    data_ = new uint8_t[size_]();
+#else
+    int fd = open(filename.c_str(), O_RDWR | O_CREAT | O_TRUNC, 0644);
+    CHECK_LE(0, fd) << "Failed to open: " << filename;
+    CHECK_EQ(0, ftruncate(fd, size_)) << "Failed to truncate: " << filename;
+    void* addr = mmap(nullptr, size_, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+    CHECK_NE(MAP_FAILED, addr) << "Failed to mmap: " << filename;
+    close(fd);
+    data_ = static_cast<uint8_t*>(addr);
+#endif
+
+    ShardHeader* header = reinterpret_cast<ShardHeader*>(data_);
+    memset(header, 0, sizeof(ShardHeader));
+    memcpy(header->magic, kShardMagic, sizeof(kShardMagic));
+    header->version = kShardVersion;
+    header->channels = channels;
+    header->height = height;
+    header->width = width;
+    header->num_records = num_records;
+    header->record_size = record_size;
+    header_ = header;
+}
+
+Shard::~Shard() {
+#ifdef _WIN32
+    if (writable_) {
+        FILE* fp = fopen(filename_.c_str(), "wb");
+        CHECK(fp) << "Failed to open: " << filename_;
+        CHECK_EQ(size_, fwrite(data_, 1, size_, fp)) << "Failed to write: " << filename_;
+        fclose(fp);
+    }
+    delete[] data_;
+#else
+    munmap(data_, size_);
+#endif
+}
+
+uint8_t* Shard::record(int64_t i) const {
+    CHECK_LE(0, i);
+    CHECK_LT(i, header_->num_records);
+    return data_ + sizeof(ShardHeader) + i * header_->record_size;
+}
+
+int32_t Shard::label(int64_t i) const {
+    int32_t label;
+    memcpy(&label, record(i), sizeof(label));
+    return label;
+}
+
+const uint8_t* Shard::pixels(int64_t i) const {
+    return record(i) + kShardRecordPixelOffset;
+}
+
+void Shard::set_label(int64_t i, int32_t label) {
+    CHECK(writable_);
+    memcpy(record(i), &label, sizeof(label));
+}
+
+uint8_t* Shard::mutable_pixels(int64_t i) {
+    CHECK(writable_);
+    return record(i) + kShardRecordPixelOffset;
+}
+
+ShardIndex LoadShardIndex(const std::string& filename) {
+    std::ifstream ifs(filename);
+    CHECK(ifs) << "Failed to open: " << filename;
+    ShardIndex index;
+    CHECK(ifs >> index.channels >> index.height >> index.width) << "Broken shard index: " << filename;
+    const std::string dir = Dirname(filename);
+    std::string shard;
+    int64_t num_records;
+    while (ifs >> shard >> num_records) {
+        index.shards.emplace_back(shard[0] == '/' ? shard : dir + shard, num_records);
+    }
+    return index;
+}
+
+void SaveShardIndex(const std::string& filename, const ShardIndex& index) {
+    std::ofstream ofs(filename);
+    CHECK(ofs) << "Failed to open: " << filename;
+    ofs << index.channels << ' ' << index.height << ' ' << index.width << '\n';
+    for (const auto& p : index.shards) {
+        ofs << p.first << ' ' << p.second << '\n';
+    }
+}
@@ -0,0 +1,84 @@
+#pragma once
+
+#include <stdint.h>
+
+#include <memory>
+#include <string>
+#include <utility>
+#include <vector>
+
+// A shard file consists of a header and fixed-size records so a record
+// is found by its index without reading others. Each record has an
+// int32 label and an RGB image of uint8 in CHW. Shards are listed in a
+// text index file whose first line is "<channels> <height> <width>"
+// and whose following lines are "<shard filename> <number of records>".
+// Filenames are relative to the directory of the index.
+
+struct ShardHeader {
+    char magic[8];
+    int32_t version;
+    int32_t channels;
+    int32_t height;
+    int32_t width;
+    int64_t num_records;
+    int64_t record_size;
+    char padding[24];
+};
+
+static_assert(sizeof(ShardHeader) == 64, "ShardHeader must be 64 bytes");
+
+// Records are aligned to this, and pixels follow the label and padding.
+constexpr int64_t kShardRecordAlignment = 64;
+constexpr int64_t kShardRecordPixelOffset = 8;
+
+int64_t ShardRecordSize(int channels, int height, int width);
+
+// A shard file mapped to memory.
+class Shard {
+public:
+    // Maps an existing shard for reading.
+    explicit Shard(const std::string& filename);
+
+    // Creates a shard of `num_records` records for writing. Records
+    // are written to memory directly, so threads can fill different
+    // records concurrently.
+    Shard(const std::string& filename, int channels, int height, int width, int64_t num_records);
+
+    ~Shard();
+
+    const ShardHeader& header() const {
+        return *header_;
+    }
+
+    int64_t num_records() const {
+        return header_->num_records;
+    }
+
+    int32_t label(int64_t i) const;
+    const uint8_t* pixels(int64_t i) const;
+
+    void set_label(int64_t i, int32_t label);
+    uint8_t* mutable_pixels(int64_t i);
+
+private:
+    uint8_t* record(int64_t i) const;
+
+    std::string filename_;
+    uint8_t* data_{nullptr};
+    size_t size_{0};
+    bool writable_{false};
+    const ShardHeader* header_{nullptr};
+};
+
+struct ShardIndex {
+    int channels{3};
+    int height{0};
+    int width{0};
+    // Pairs of a filename and the number of records.
+    std::vector<std::pair<std::string, int64_t>> shards;
+};
+
+// Filenames of shards in the returned index are resolved.
+ShardIndex LoadShardIndex(const std::string& filename);
+
+void SaveShardIndex(const std::string& filename, const ShardIndex& index);
@@ -0,0 +1,131 @@
+#include "shard_iterator.h"
+
+#include <algorithm>
+#include <numeric>
+#include <random>
+
+#include <chainerx/context.h>
+
+#include <common/log.h>
+#include <common/strutil.h>
+
+ShardIterator::ShardIterator(
+        const std::string& shard_index,
+        int buf_size,
+        int batch_size,
+        const std::vector<float>& mean,
+        int height,
+        int width,
+        const ShardIteratorOptions& options)
+    : DataIterator(buf_size, options.num_workers),
+      batch_size_(batch_size),
+      mean_(mean),
+      height_(height),
+      width_(width),
+      options_(options),
+      pool_(&chainerx::GetDefaultContext().GetDevice({"native", 0})) {
+    CHECK_EQ(3 * height * width, mean_.size());
+    const ShardIndex index = LoadShardIndex(shard_index);
+    CHECK_EQ(3, index.channels) << shard_index;
+    CHECK_LE(height, index.height) << "Records in " << shard_index << " are smaller than the output";
+    CHECK_LE(width, index.width) << "Records in " << shard_index << " are smaller than the output";
+    record_height_ = index.height;
+    record_width_ = index.width;
+
+    for (const auto& p : index.shards) {
+        shards_.emplace_back(new Shard(p.first));
+        const Shard& shard = *shards_.back();
+        CHECK_EQ(p.second, shard.num_records()) << p.first;
+        CHECK_EQ(index.channels, shard.header().channels) << p.first;
+        CHECK_EQ(index.height, shard.header().height) << p.first;
+        CHECK_EQ(index.width, shard.header().width) << p.first;
+        for (int64_t i = 0; i < shard.num_records(); ++i) {
+            records_.emplace_back(shards_.size() - 1, i);
+        }
+    }
+    num_records_ = records_.size();
+    ShuffleRecords();
+}
+
+void ShardIterator::ShuffleRecords() {
+    order_.resize(num_records_);
+    std::iota(order_.begin(), order_.end(), 0);
+    if (options_.shuffle) {
+        std::seed_seq seq{options_.seed, static_cast<uint32_t>(epoch_)};
+        std::mt19937 rng(seq);
+        std::shuffle(order_.begin(), order_.end(), rng);
+    }
+}
+
+void ShardIterator::LoadRecord(int64_t record, uint32_t epoch, int64_t position, float* out, int32_t* label) const {
+    const Shard& shard = *shards_[records_[record].first];
+    const int64_t index = records_[record].second;
+    *label = shard.label(index);
+    const uint8_t* pixels = shard.pixels(index);
+
+    std::seed_seq seq{options_.seed, epoch, static_cast<uint32_t>(position)};
+    std::mt19937 rng(seq);
+    int offset_y = (record_height_ - height_) / 2;
+    int offset_x = (record_width_ - width_) / 2;
+    if (options_.random_crop) {
+        offset_y = std::uniform_int_distribution<int>(0, record_height_ - height_)(rng);
+        offset_x = std::uniform_int_distribution<int>(0, record_width_ - width_)(rng);
+    }
+    const bool flip = options_.random_flip && std::bernoulli_distribution(0.5)(rng);
+
+    // Each row of the output is a contiguous run in the record.
+    const float scale = options_.scale;
+    for (int c = 0; c < 3; ++c) {
+        for (int y = 0; y < height_; ++y) {
+            const uint8_t* src = pixels + (static_cast<int64_t>(c) * record_height_ + offset_y + y) * record_width_ + offset_x;
+            const float* mean = &mean_[(c * height_ + y) * width_];
+            float* dst = out + (c * height_ + y) * width_;
+            if (flip) {
+                for (int x = 0; x < width_; ++x) {
+                    dst[x] = (src[width_ - 1 - x] - mean[x]) * scale;
+                }
+            } else {
+                for (int x = 0; x < width_; ++x) {
+                    dst[x] = (src[x] - mean[x]) * scale;
+                }
+            }
+        }
+    }
+}
+
+std::vector<chainerx::Array> ShardIterator::GetNextImpl() {
+    std::vector<int64_t> records;
+    size_t first;
+    uint32_t epoch;
+    chainerx::Array images, labels;
+    {
+        std::lock_guard<std::mutex> lock(mu_);
+        if (num_records_ == 0) return {};
+        if (iter_ == order_.size()) {
+            if (options_.num_epochs > 0 && epoch_ + 1 >= options_.num_epochs) return {};
+            ++epoch_;
+            iter_ = 0;
+            ShuffleRecords();
+        }
+        first = iter_;
+        epoch = epoch_;
+        const size_t bs = std::min<size_t>(batch_size_, order_.size() - iter_);
+        records.assign(order_.begin() + iter_, order_.begin() + iter_ + bs);
+        iter_ += bs;
+        const int64_t n = static_cast<int64_t>(bs);
+        images = pool_.Allocate(chainerx::Dtype::kFloat32, {n, 3, height_, width_});
+        labels = pool_.Allocate(chainerx::Dtype::kInt32, {n});
+    }
+
+    float* image_data = static_cast<float*>(images.raw_data());
+    int32_t* label_data = static_cast<int32_t*>(labels.raw_data());
+    for (size_t i = 0; i < records.size(); ++i) {
+        LoadRecord(records[i], epoch, first + i, image_data + i * 3 * height_ * width_, &label_data[i]);
+    }
+    return {images, labels};
+}
+
+std::string ShardIterator::GetStatus() const {
+    std::lock_guard<std::mutex> lock(mu_);
+    return chainer_compiler::StrCat(iter_, "/", num_records_, " epoch=", epoch_);
+}
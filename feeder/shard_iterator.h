@@ -0,0 +1,83 @@
+#pragma once
+
+#include <stdint.h>
+
+#include <memory>
+#include <mutex>
+#include <string>
+#include <vector>
+
+#include <chainerx/array.h>
+
+#include <feeder/array_pool.h>
+#include <feeder/data_iterator.h>
+#include <feeder/shard.h>
+
+struct ShardIteratorOptions {
+    // The number of threads which assemble batches.
+    int num_workers{1};
+    // Permutes records for each epoch.
+    bool shuffle{true};
+    // Crops images at random offsets when records are larger than the
+    // output size. Images are cropped at their centers otherwise.
+    bool random_crop{false};
+    // Flips images horizontally with the probability of 0.5.
+    bool random_flip{false};
+    // Images are multiplied by this after the mean is subtracted.
+    float scale{1.0f / 255.0f};
+    uint32_t seed{0};
+    // The iteration finishes after this number of epochs. The last
+    // batch of each epoch may be smaller than the batch size.
+    int num_epochs{1};
+};
+
+// Produces batches of RGB images in NCHW and int32 labels from
+// memory-mapped shards made by `pack_imagenet`, so assembling a batch
+// is mostly contiguous copies of records. The output is compatible
+// with `ImageNetIterator`.
+class ShardIterator : public DataIterator {
+public:
+    ShardIterator(
+            const std::string& shard_index,
+            int buf_size,
+            int batch_size,
+            const std::vector<float>& mean,
+            int height,
+            int width,
+            const ShardIteratorOptions& options = ShardIteratorOptions());
+
+    ~ShardIterator() override {
+        Terminate();
+    }
+
+    std::vector<chainerx::Array> GetNextImpl() override;
+
+    std::string GetStatus() const;
+
+    int64_t num_records() const {
+        return num_records_;
+    }
+
+private:
+    void ShuffleRecords();
+
+    void LoadRecord(int64_t record, uint32_t epoch, int64_t position, float* out, int32_t* label) const;
+
+    std::vector<std::unique_ptr<Shard>> shards_;
+    // Pairs of a shard and an index in the shard for each record.
+    std::vector<std::pair<int, int64_t>> records_;
+    int64_t num_records_{0};
+    int record_height_;
+    int record_width_;
+    int batch_size_;
+    std::vector<float> mean_;
+    int height_;
+    int width_;
+    ShardIteratorOptions options_;
+
+    mutable std::mutex mu_;
+    std::vector<int64_t> order_;
+    size_t iter_ = 0;
+    int epoch_ = 0;
+    ArrayPool pool_;
+};
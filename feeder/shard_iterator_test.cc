@@ -0,0 +1,189 @@
+#include <algorithm>
+#include <memory>
+#include <set>
+#include <string>
+#include <vector>
+
+#include <gtest/gtest.h>
+
+#include <chainerx/array.h>
+#include <chainerx/context.h>
+#include <chainerx/numeric.h>
+#include <chainerx/routines/statistics.h>
+
+#include <feeder/shard.h>
+#include <feeder/shard_iterator.h>
+
+namespace {
+
+// Writes `num_shards` shards of `records_per_shard` records of 3x6x8
+// and returns the filename of their index. Labels of records are their
+// global indices and pixels are `label + x`.
+std::string WriteShards(int num_shards, int records_per_shard) {
+    const std::string dir = ::testing::TempDir();
+    ShardIndex index;
+    index.height = 6;
+    index.width = 8;
+    for (int s = 0; s < num_shards; ++s) {
+        const std::string basename = "shard_iterator_test_" + std::to_string(s) + ".shard";
+        Shard shard(dir + basename, 3, index.height, index.width, records_per_shard);
+        for (int i = 0; i < records_per_shard; ++i) {
+            const int label = s * records_per_shard + i;
+            shard.set_label(i, label);
+            uint8_t* pixels = shard.mutable_pixels(i);
+            for (int c = 0; c < 3; ++c) {
+                for (int y = 0; y < index.height; ++y) {
+                    for (int x = 0; x < index.width; ++x) {
+                        *pixels++ = label + x;
+                    }
+                }
+            }
+        }
+        index.shards.emplace_back(basename, records_per_shard);
+    }
+    const std::string filename = dir + "shard_iterator_test.index";
+    SaveShardIndex(filename, index);
+    return filename;
+}
+
+TEST(TestShard, ReadWrite) {
+    const ShardIndex index = LoadShardIndex(WriteShards(2, 3));
+    EXPECT_EQ(3, index.channels);
+    EXPECT_EQ(6, index.height);
+    EXPECT_EQ(8, index.width);
+    ASSERT_EQ(2, index.shards.size());
+    EXPECT_EQ(::testing::TempDir() + "shard_iterator_test_1.shard", index.shards[1].first);
+    EXPECT_EQ(3, index.shards[1].second);
+
+    Shard shard(index.shards[1].first);
+    EXPECT_EQ(3, shard.num_records());
+    EXPECT_EQ(ShardRecordSize(3, 6, 8), shard.header().record_size);
+    EXPECT_EQ(0, shard.header().record_size % kShardRecordAlignment);
+    EXPECT_EQ(4, shard.label(1));
+    EXPECT_EQ(4, shard.pixels(1)[0]);
+    EXPECT_EQ(4 + 7, shard.pixels(1)[3 * 6 * 8 - 1]);
+}
+
+TEST(TestShardIterator, Basic) {
+    chainerx::Context ctx;
+    chainerx::SetGlobalDefaultContext(&ctx);
+
+    std::vector<float> mean(3 * 4 * 6, 1.0f);
+    ShardIteratorOptions options;
+    options.num_workers = 3;
+    options.scale = 0.5f;
+    options.num_epochs = 2;
+    ShardIterator iter(WriteShards(3, 4), 2, 5, mean, 4, 6, options);
+    EXPECT_EQ(12, iter.num_records());
+    iter.Start();
+    std::multiset<int> labels;
+    int num_batches = 0;
+    while (true) {
+        std::vector<chainerx::Array> a(iter.GetNext());
+        if (a.empty()) break;
+        ++num_batches;
+        ASSERT_EQ(2, a.size());
+        const int64_t bs = a[1].shape()[0];
+        EXPECT_EQ(chainerx::Shape({bs, 3, 4, 6}), a[0].shape());
+        for (int64_t i = 0; i < bs; ++i) {
+            const int label = int(chainerx::AsScalar(a[1].At({i})));
+            labels.insert(label);
+            // Cropped at the center, i.e., x starts from 1.
+            EXPECT_EQ((label + 1 - 1) * 0.5, double(chainerx::AsScalar(a[0].At({i, 0, 0, 0}))));
+            EXPECT_EQ((label + 6 - 1) * 0.5, double(chainerx::AsScalar(a[0].At({i, 2, 3, 5}))));
+        }
+    }
+    // 3 batches (5, 5, and 2) for each epoch.
+    EXPECT_EQ(6, num_batches);
+    EXPECT_EQ(24, labels.size());
+    for (int i = 0; i < 12; ++i) {
+        EXPECT_EQ(2, labels.count(i)) << i;
+    }
+    iter.Terminate();
+}
+
+TEST(TestShardIterator, Shuffle) {
+    chainerx::Context ctx;
+    chainerx::SetGlobalDefaultContext(&ctx);
+
+    std::vector<float> mean(3 * 6 * 8, 0.0f);
+    const std::string index = WriteShards(2, 8);
+    std::vector<std::vector<int>> orders;
+    for (bool shuffle : {false, true}) {
+        ShardIteratorOptions options;
+        options.shuffle = shuffle;
+        ShardIterator iter(index, 2, 16, mean, 6, 8, options);
+        iter.Start();
+        std::vector<chainerx::Array> a(iter.GetNext());
+        ASSERT_EQ(2, a.size());
+        std::vector<int> order;
+        for (int64_t i = 0; i < 16; ++i) {
+            order.push_back(int(chainerx::AsScalar(a[1].At({i}))));
+        }
+        orders.push_back(order);
+        EXPECT_TRUE(iter.GetNext().empty());
+        iter.Terminate();
+    }
+    for (int i = 0; i < 16; ++i) {
+        EXPECT_EQ(i, orders[0][i]);
+    }
+    EXPECT_NE(orders[0], orders[1]);
+    std::sort(orders[1].begin(), orders[1].end());
+    EXPECT_EQ(orders[0], orders[1]);
+}
+
+TEST(TestShardIterator, DestroyWhileRunning) {
+    chainerx::Context ctx;
+    chainerx::SetGlobalDefaultContext(&ctx);
+
+    std::vector<float> mean(3 * 6 * 8, 0.0f);
+    ShardIteratorOptions options;
+    options.num_workers = 4;
+    options.num_epochs = 0;
+    const std::string index = WriteShards(2, 8);
+    for (int i = 0; i < 10; ++i) {
+        // Dropped without `Terminate` while workers read the shards.
+        std::unique_ptr<ShardIterator> iter(new ShardIterator(index, 2, 3, mean, 6, 8, options));
+        iter->Start();
+        EXPECT_EQ(2, iter->GetNext().size());
+        iter.reset();
+    }
+}
+
+TEST(TestShardIterator, Augmentation) {
+    chainerx::Context ctx;
+    chainerx::SetGlobalDefaultContext(&ctx);
+
+    std::vector<float> mean(3 * 4 * 4, 0.0f);
+    ShardIteratorOptions options;
+    options.shuffle = false;
+    options.random_crop = true;
+    options.random_flip = true;
+    options.scale = 1.0f;
+
+    std::vector<chainerx::Array> results;
+    for (int num_workers : {1, 4}) {
+        options.num_workers = num_workers;
+        ShardIterator iter(WriteShards(1, 8), 2, 2, mean, 4, 4, options);
+        iter.Start();
+        std::vector<chainerx::Array> images;
+        while (true) {
+            std::vector<chainerx::Array> a(iter.GetNext());
+            if (a.empty()) break;
+            images.push_back(a[0].Copy());
+        }
+        ASSERT_EQ(4, images.size());
+        iter.Terminate();
+        // Batches may come in any order with multiple workers.
+        chainerx::Array sum = images[0] * 0;
+        for (const chainerx::Array& image : images) {
+            sum += image;
+        }
+        results.push_back(sum);
+    }
+    // Pixels are `label + x` where x is in [0, 8).
+    EXPECT_LE(0, double(chainerx::AsScalar(chainerx::AMin(results[0]))));
+    EXPECT_TRUE(chainerx::AllClose(results[0], results[1]));
+}
+
+}  // namespace
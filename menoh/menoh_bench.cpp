@@ -0,0 +1,186 @@
+// Measures the latency of `menoh::model::run` for a small MLP, where
+// copies of inputs and outputs are a large part of each run. Modes are
+//
+// - copy: inputs and outputs are copied from/to buffers of the user
+//   through buffers allocated by menoh, as `run_onnx_menoh` does.
+// - external: buffers of the user are attached by
+//   `attach_external_buffer`, so no copies are made by the user.
+//
+// Usage:
+//
+// $ ./build/menoh/menoh_bench --hidden 256 --layers 3 -I 1000
+
+#include <algorithm>
+#include <chrono>
+#include <cmath>
+#include <cstdio>
+#include <iostream>
+#include <random>
+#include <string>
+#include <vector>
+
+#include <nlohmann/json.hpp>
+
+#include <common/strutil.h>
+#include <compiler/onnx.h>
+#include <tools/cmdline.h>
+#include <menoh/menoh.hpp>
+
+namespace {
+
+void set_float_type(onnx::ValueInfoProto* value_info, const std::string& name, const std::vector<int64_t>& dims) {
+    value_info->set_name(name);
+    onnx::TypeProto_Tensor* tensor_type = value_info->mutable_type()->mutable_tensor_type();
+    tensor_type->set_elem_type(onnx::TensorProto::FLOAT);
+    for (int64_t d : dims) {
+        tensor_type->mutable_shape()->add_dim()->set_dim_value(d);
+    }
+}
+
+void add_parameter(onnx::GraphProto* graph, const std::string& name, const std::vector<int64_t>& dims, std::mt19937* rng) {
+    set_float_type(graph->add_input(), name, dims);
+    onnx::TensorProto* tensor = graph->add_initializer();
+    tensor->set_name(name);
+    tensor->set_data_type(onnx::TensorProto::FLOAT);
+    int64_t size = 1;
+    for (int64_t d : dims) {
+        tensor->add_dims(d);
+        size *= d;
+    }
+    std::normal_distribution<float> dist(0.0f, 1.0f / std::sqrt(static_cast<float>(dims[0])));
+    for (int64_t i = 0; i < size; ++i) {
+        tensor->add_float_data(dims.size() == 1 ? 0.0f : dist(*rng));
+    }
+}
+
+// Gemm and Relu layers followed by Softmax.
+std::string make_mlp(int batch_size, int in_size, int hidden_size, int out_size, int num_layers) {
+    onnx::ModelProto model;
+    model.set_ir_version(onnx::IR_VERSION);
+    model.add_opset_import()->set_version(chainer_compiler::DEFAULT_OPSET_VERSION);
+    onnx::GraphProto* graph = model.mutable_graph();
+    graph->set_name("mlp");
+    set_float_type(graph->add_input(), "x", {batch_size, in_size});
+
+    std::mt19937 rng;
+    std::string h = "x";
+    int64_t prev_size = in_size;
+    for (int i = 0; i < num_layers; ++i) {
+        const int64_t size = i == num_layers - 1 ? out_size : hidden_size;
+        const std::string w = "W" + std::to_string(i);
+        const std::string b = "b" + std::to_string(i);
+        add_parameter(graph, w, {prev_size, size}, &rng);
+        add_parameter(graph, b, {size}, &rng);
+        onnx::NodeProto* gemm = graph->add_node();
+        gemm->set_op_type("Gemm");
+        gemm->add_input(h);
+        gemm->add_input(w);
+        gemm->add_input(b);
+        h = "gemm" + std::to_string(i);
+        gemm->add_output(h);
+        onnx::NodeProto* act = graph->add_node();
+        act->set_op_type(i == num_layers - 1 ? "Softmax" : "Relu");
+        act->add_input(h);
+        h = (i == num_layers - 1 ? "y" : "relu" + std::to_string(i));
+        act->add_output(h);
+        prev_size = size;
+    }
+    set_float_type(graph->add_output(), "y", {batch_size, out_size});
+
+    std::string serialized;
+    model.SerializeToString(&serialized);
+    return serialized;
+}
+
+struct latency_stats {
+    double mean;
+    double p50;
+    double p90;
+};
+
+latency_stats run_benchmark(const cmdline::parser& a, const std::string& mode, const std::string& onnx) {
+    const int batch_size = a.get<int>("batchsize");
+    const int in_size = a.get<int>("in_size");
+    const int out_size = a.get<int>("out_size");
+
+    auto model_data = menoh::make_model_data_from_onnx_data_on_memory(reinterpret_cast<const uint8_t*>(onnx.data()), onnx.size());
+    menoh::variable_profile_table_builder vpt_builder;
+    vpt_builder.add_input_profile("x", menoh::dtype_t::float_, {batch_size, in_size});
+    vpt_builder.add_output_name("y");
+    auto vpt = vpt_builder.build_variable_profile_table(model_data);
+
+    // Buffers of the user.
+    std::vector<float> x_data(batch_size * in_size);
+    std::vector<float> y_data(batch_size * out_size);
+    std::mt19937 rng;
+    std::uniform_real_distribution<float> dist(-1.0f, 1.0f);
+    for (float& v : x_data) v = dist(rng);
+
+    menoh::model_builder model_builder(vpt);
+    if (mode == "external") {
+        model_builder.attach_external_buffer("x", static_cast<void*>(x_data.data()));
+        model_builder.attach_external_buffer("y", static_cast<void*>(y_data.data()));
+    }
+    nlohmann::json config;
+    if (!a.get<std::string>("device").empty()) {
+        config["device"] = a.get<std::string>("device");
+    }
+    auto model = model_builder.build_model(model_data, "", config.dump());
+
+    auto run = [&]() {
+        if (mode == "copy") {
+            float* x = static_cast<float*>(model.get_variable("x").buffer_handle);
+            std::copy(x_data.begin(), x_data.end(), x);
+        }
+        model.run();
+        if (mode == "copy") {
+            const float* y = static_cast<const float*>(model.get_variable("y").buffer_handle);
+            std::copy(y, y + y_data.size(), y_data.begin());
+        }
+    };
+
+    for (int i = 0; i < a.get<int>("warmup"); ++i) {
+        run();
+    }
+    std::vector<double> elapsed;
+    for (int i = 0; i < a.get<int>("iterations"); ++i) {
+        auto start = std::chrono::steady_clock::now();
+        run();
+        auto end = std::chrono::steady_clock::now();
+        elapsed.push_back(std::chrono::duration_cast<std::chrono::nanoseconds>(end - start).count() * 1e-3);
+    }
+    std::sort(elapsed.begin(), elapsed.end());
+    double total = 0;
+    for (double e : elapsed) total += e;
+    return {total / elapsed.size(), elapsed[elapsed.size() / 2], elapsed[elapsed.size() * 9 / 10]};
+}
+
+}  // namespace
+
+int main(int argc, char** argv) {
+    cmdline::parser a;
+    a.add<std::string>("device", 'd', "ChainerX device to be used", false, "");
+    a.add<std::string>("modes", '\0', "Comma separated modes", false, "copy,external");
+    a.add<int>("batchsize", 'B', "Batch size", false, 1);
+    a.add<int>("in_size", '\0', "Input size of the MLP", false, 64);
+    a.add<int>("hidden", '\0', "Hidden size of the MLP", false, 64);
+    a.add<int>("out_size", '\0', "Output size of the MLP", false, 10);
+    a.add<int>("layers", '\0', "Number of layers of the MLP", false, 3);
+    a.add<int>("warmup", '\0', "Number of warmup runs", false, 10);
+    a.add<int>("iterations", 'I', "Number of runs", false, 1000);
+    a.parse_check(argc, argv);
+
+    const std::string onnx =
+            make_mlp(a.get<int>("batchsize"), a.get<int>("in_size"), a.get<int>("hidden"), a.get<int>("out_size"), a.get<int>("layers"));
+
+    std::printf("%-10s %10s %10s %10s\n", "mode", "mean(us)", "p50(us)", "p90(us)");
+    for (const std::string& mode : chainer_compiler::SplitString(a.get<std::string>("modes"), ",")) {
+        if (mode != "copy" && mode != "external") {
+            std::cerr << "Unknown mode: " << mode << std::endl;
+            return 1;
+        }
+        latency_stats stats = run_benchmark(a, mode, onnx);
+        std::printf("%-10s %10.1f %10.1f %10.1f\n", mode.c_str(), stats.mean, stats.p50, stats.p90);
+    }
+    return 0;
+}
@@ -11,7 +11,9 @@
 
 #include <chainerx/array.h>
 #include <chainerx/backprop_mode.h>
+#include <chainerx/native/native_backend.h>
 #include <chainerx/routines/creation.h>
+#include <chainerx/routines/manipulation.h>
 
 #include <common/log.h>
 #include <common/protoutil.h>
@@ -26,6 +28,7 @@
 #include <runtime/chainerx_util.h>
 #include <runtime/chxvm.h>
 #include <runtime/chxvm.pb.h>
+#include <runtime/chxvm_state.h>
 #include <runtime/chxvm_var.h>
 #include <tools/util.h>
 
@@ -594,11 +597,21 @@ struct menoh_model {
     std::unordered_map<std::string, menoh_impl::array_profile> variable_profiles;
     std::unique_ptr<chainerx::Context> context;
     chainerx::Device* device;
+    // Inputs on the host, which are bound to external buffers if any.
     chainer_compiler::runtime::InOuts inputs;
     chainer_compiler::runtime::InOuts outputs;
     std::unique_ptr<chainer_compiler::runtime::ChxVM> chxvm;
     chainer_compiler::runtime::ChxVMOptions chxvm_options;
     std::vector<std::shared_ptr<void>> buffer_holder;
+    // Inputs on `device`. Parameters are transferred only once and
+    // user inputs not on `device` are copied by `input_transfers`.
+    chainer_compiler::runtime::InOuts device_inputs;
+    // Pairs of a user input on the host and its buffer on `device`.
+    std::vector<std::pair<chainerx::Array, chainerx::Array>> input_transfers;
+    // Outputs are copied to these external buffers.
+    std::unordered_map<std::string, void*> output_buffers;
+    // Prepared once and reused by all runs.
+    std::unique_ptr<chainer_compiler::runtime::ChxVMState> state;
 };
 void menoh_delete_model(menoh_model_handle model) {
     delete model;
@@ -618,6 +631,18 @@ std::shared_ptr<void> allocate_buffer(menoh_impl::array_profile const& profile)
     return allocate_buffer(chainerx::Shape(profile.dims()), menoh_dtype_to_chx_dtype(profile.dtype()));
 }
 
+// Binds `data` as a host array without copies. The caller owns `data`.
+chainerx::Array wrap_external_buffer(menoh_impl::array_profile const& profile, void* data) {
+    std::shared_ptr<void> borrowed(data, [](void*) {});
+    return chainerx::FromData(
+            chainerx::Shape(profile.dims()),
+            menoh_dtype_to_chx_dtype(profile.dtype()),
+            borrowed,
+            absl::nullopt /* strides */,
+            0 /* offset */,
+            chainerx::GetNativeBackend().GetDevice(0));
+}
+
 /* You can (and should) delete model_data after the model creation. */
 menoh_error_code menoh_build_model(
         const menoh_model_builder_handle builder,
@@ -678,19 +703,43 @@ menoh_error_code menoh_build_model(
                         buffer_holder.push_back(data);
                         datap = data.get();
                     }
-                    auto arr = chainer_compiler::runtime::MakeHostArray(
-                            menoh_dtype_to_chx_dtype(p->second.dtype()), chainerx::Shape(p->second.dims()), datap);
+                    auto arr = wrap_external_buffer(p->second, datap);
                     auto var = std::make_shared<chainer_compiler::runtime::ChxVMVar>(std::move(arr));
                     inputs.emplace(input->name(), std::move(var));
                 }
             }
 
+            // Inputs which are not on the device get their buffers on
+            // the device, so runs do not allocate them.
+            chainer_compiler::runtime::InOuts device_inputs;
+            std::vector<std::pair<chainerx::Array, chainerx::Array>> input_transfers;
+            for (const auto& p : inputs) {
+                const chainerx::Array& array = p.second->GetArray();
+                if (device == &array.device()) {
+                    device_inputs.emplace(p.first, p.second);
+                } else if (builder->input_profile_table.count(p.first)) {
+                    chainerx::Array device_array = chainerx::Empty(array.shape(), array.dtype(), *device);
+                    input_transfers.emplace_back(array, device_array);
+                    device_inputs.emplace(p.first, std::make_shared<chainer_compiler::runtime::ChxVMVar>(device_array));
+                } else {
+                    device_inputs.emplace(p.first, std::make_shared<chainer_compiler::runtime::ChxVMVar>(array.ToDevice(*device)));
+                }
+            }
+
+            std::unordered_map<std::string, void*> output_buffers;
+            for (const auto& p : builder->external_buffer_handle_table) {
+                if (builder->output_profile_table.count(p.first)) {
+                    output_buffers.emplace(p.first, p.second);
+                }
+            }
+
             chainer_compiler::runtime::ChxVMOptions chxvm_opts;
             chxvm_opts.trace_level = value_or(j, "trace_level", 0);
             chxvm_opts.is_training = value_or(j, "is_training", false);
             chxvm_opts.check_types = value_or(j, "check_types", false);
             chxvm_opts.check_nans = value_or(j, "check_nans", false);
             chxvm_opts.check_infs = value_or(j, "check_infs", false);
+            std::unique_ptr<chainer_compiler::runtime::ChxVMState> state(chxvm->Prepare(device_inputs, chxvm_opts));
 
             std::unordered_map<std::string, menoh_impl::array_profile> variable_profiles(
                     builder->input_profile_table.begin(), builder->input_profile_table.end());
@@ -702,7 +751,11 @@ menoh_error_code menoh_build_model(
                                                                           {},
                                                                           std::move(chxvm),
                                                                           chxvm_opts,
-                                                                          std::move(buffer_holder)})
+                                                                          std::move(buffer_holder),
+                                                                          std::move(device_inputs),
+                                                                          std::move(input_transfers),
+                                                                          std::move(output_buffers),
+                                                                          std::move(state)})
                                         .release();
         }
         return menoh_error_code_success;
@@ -797,22 +850,43 @@ menoh_error_code menoh_model_run(menoh_model_handle model) {
         chainerx::DeviceScope device_scope(*model->device);
         {
             chainerx::NoBackpropModeScope scope;
-            chainer_compiler::runtime::InOuts inputs(model->inputs);
-            for (auto& p : inputs) {
-                if (model->device != &p.second->GetArray().device()) {
-                    p.second = std::make_shared<chainer_compiler::runtime::ChxVMVar>(p.second->GetArray().ToDevice(*model->device));
-                }
+            for (const auto& p : model->input_transfers) {
+                const chainerx::Array& src = p.first;
+                const chainerx::Array& dst = p.second;
+                model->device->MemoryCopyFrom(
+                        chainer_compiler::runtime::RawStartPtr(dst),
+                        chainer_compiler::runtime::RawStartPtr(src),
+                        src.GetNBytes(),
+                        src.device());
             }
 
-            auto outputs = model->chxvm->Run(inputs, model->chxvm_options);
+            model->state->Reset(model->device_inputs);
+            model->chxvm->Run(model->state.get());
+            const chainer_compiler::runtime::InOuts& outputs = model->state->GetOutputs();
             model->outputs.clear();
             for (auto p : outputs) {
                 CHECK(p.second->IsArray()) << "menoh does not support non-array outputs";
                 chainerx::Array array = p.second->GetArray();
-                if (!chainer_compiler::runtime::IsNativeDevice(model->device)) {
-                    array = array.ToNative();
+                auto found = model->output_buffers.find(p.first);
+                if (found != model->output_buffers.end()) {
+                    // Copied to the external buffer directly from the device.
+                    const menoh_impl::array_profile& profile = model->variable_profiles.at(p.first);
+                    CHECK_EQ(menoh_dtype_to_chx_dtype(profile.dtype()), array.dtype()) << p.first;
+                    CHECK_EQ(chainerx::Shape(profile.dims()), array.shape()) << p.first;
+                    chainerx::Array out = wrap_external_buffer(profile, found->second);
+                    array = chainerx::AsContiguous(array);
+                    array.device().MemoryCopyTo(
+                            chainer_compiler::runtime::RawStartPtr(out),
+                            chainer_compiler::runtime::RawStartPtr(array),
+                            array.GetNBytes(),
+                            out.device());
+                    array = out;
+                } else {
+                    if (!chainer_compiler::runtime::IsNativeDevice(model->device)) {
+                        array = array.ToNative();
+                    }
+                    array = chainerx::AsContiguous(array);
                 }
-                array = chainerx::AsContiguous(array);
                 CHECK(model->outputs.emplace(p.first, std::make_shared<chainer_compiler::runtime::ChxVMVar>(array)).second);
             }
         }
@@ -317,10 +317,21 @@ chainerx::Array GroupedConv(
         const Int64StackVector& strides,
         const Int64StackVector& in_pads,
         int group,
-        const std::string& auto_pad) {
+        const std::string& auto_pad,
+        const absl::optional<chainerx::Array>& out) {
     Int64StackVector pads = CalculateAutoPad(auto_pad, in_x, Int64StackVector(w.shape().begin() + 2, w.shape().end()), strides, in_pads);
     chainerx::Array x = ApplyAsymmetricPad(in_x, &pads);
 
+    if (group == 1 && out.has_value()) {
+        chainerx::Shape y_shape{x.shape()[0], w.shape()[0]};
+        for (size_t i = 0; i < strides.size(); ++i) {
+            y_shape.push_back((x.shape()[i + 2] + pads[i] * 2 - w.shape()[i + 2]) / strides[i] + 1);
+        }
+        if (y_shape == out->shape()) {
+            return x.device().backend().CallKernel<chainerx::ConvKernel>(x, w, b, strides, pads, false /* cover_all */, out->dtype(), out);
+        }
+    }
+
     if (group == 1) {
         return chainerx::Conv(x, w, b, strides, pads);
     }
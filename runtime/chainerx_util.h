@@ -61,7 +61,8 @@ chainerx::Array GroupedConv(
         const Int64StackVector& strides,
         const Int64StackVector& pads,
         int group,
-        const std::string& auto_pad);
+        const std::string& auto_pad,
+        const absl::optional<chainerx::Array>& out = absl::nullopt);
 chainerx::Array GroupedConvTranspose(
         const chainerx::Array& x,
         const chainerx::Array& w,
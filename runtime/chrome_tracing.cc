@@ -6,13 +6,18 @@
 namespace chainer_compiler {
 namespace runtime {
 
-ChromeTracingEmitter::ChromeTracingEmitter() : base_time_(std::chrono::system_clock::now()) {
+ChromeTracingEmitter::ChromeTracingEmitter(const std::string& output_filename)
+    : output_filename_(output_filename), base_time_(std::chrono::system_clock::now()) {
 }
 
 void ChromeTracingEmitter::AddEvent(Event* event) {
     events_.emplace_back(event);
 }
 
+void ChromeTracingEmitter::Clear() {
+    events_.clear();
+}
+
 ChromeTracingEmitter::Event::Event(const std::string& c, const std::string& n, int p, int64_t f)
     : category(c), name(n), pc(p), flops(f), start_time(std::chrono::system_clock::now()) {
 }
@@ -55,11 +60,16 @@ void ChromeTracingEmitter::Emit(const std::string& output_filename) const {
         ofs << "\"dur\":" << dur << ",";
         ofs << "\"tid\":1,";
         ofs << "\"pid\":1,";
-        if (event->pc >= 0) {
-            ofs << "\"args\":{\"pc\":" << event->pc << "},";
-        }
-        if (event->flops > 0) {
-            ofs << "\"args\":{\"flops\":" << event->flops << "},";
+        if (event->pc >= 0 || event->flops > 0) {
+            ofs << "\"args\":{";
+            if (event->pc >= 0) {
+                ofs << "\"pc\":" << event->pc;
+            }
+            if (event->flops > 0) {
+                if (event->pc >= 0) ofs << ",";
+                ofs << "\"flops\":" << event->flops;
+            }
+            ofs << "},";
         }
         ofs << "\"ph\":\"X\"";
         ofs << "}";
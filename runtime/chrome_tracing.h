@@ -33,15 +33,31 @@ public:
         Event* event_;
     };
 
-    ChromeTracingEmitter();
+    // When `output_filename` is not empty, users of a prepared
+    // `ChxVMState` emit events to it after each run.
+    explicit ChromeTracingEmitter(const std::string& output_filename = "");
 
     // Takes the ownership of `event`.
     void AddEvent(Event* event);
 
     void Emit(const std::string& output_filename) const;
 
+    // Drops all events so the next `Emit` outputs only new events.
+    // Timestamps are still relative to the construction of the
+    // emitter. Must not be called while a `ScopedEvent` is alive.
+    void Clear();
+
+    size_t num_events() const {
+        return events_.size();
+    }
+
+    const std::string& output_filename() const {
+        return output_filename_;
+    }
+
 private:
     std::vector<std::unique_ptr<Event>> events_;
+    std::string output_filename_;
     std::chrono::system_clock::time_point base_time_;
 };
 
@@ -1,7 +1,12 @@
 #include "runtime/chxvm.h"
 
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <exception>
 #include <iomanip>
 #include <numeric>
+#include <set>
 #include <sstream>
 
 #ifdef CHAINER_COMPILER_ENABLE_NVTX
@@ -9,6 +14,9 @@
 #endif  // CHAINER_COMPILER_ENABLE_NVTX
 
 #include <chainerx/array.h>
+#include <chainerx/backprop_mode.h>
+#include <chainerx/context.h>
+#include <chainerx/device.h>
 
 #include <common/log.h>
 #include <common/strutil.h>
@@ -19,6 +27,8 @@
 #include <runtime/chxvm_state.h>
 #include <runtime/meminfo.h>
 #include <runtime/npy.h>
+#include <runtime/profiler.h>
+#include <runtime/thread_pool.h>
 
 #define RANGE(x) (x).begin(), (x).end()
 
@@ -91,6 +101,60 @@ void DumpOutput(ChxVMState* st, const ChxVMOp* op, const std::string& output_dir
     }
 }
 
+void RecordMemoryStats(ChxVMState* st, const ChxVMOp* op, ChxVMMemoryStats* stats) {
+    std::set<void*> input_buffers;
+    for (const ChxVMValueProto& value : op->instruction().inputs()) {
+        std::vector<int> ids;
+        if (value.type() == ChxVMValueProto::ARRAY || value.type() == ChxVMValueProto::OPTIONAL_ARRAY) {
+            ids.push_back(value.array());
+        } else if (value.type() == ChxVMValueProto::ARRAY_LIST) {
+            ids.assign(value.array_list().begin(), value.array_list().end());
+        }
+        for (int id : ids) {
+            ChxVMVar* var = id >= 0 ? st->FindVar(id) : nullptr;
+            if (var && var->IsArray()) {
+                input_buffers.insert(var->GetArray().raw_data());
+            }
+        }
+    }
+
+    // Inputs of the program are owned by the caller.
+    const bool is_input = op->op() == ChxVMInstructionProto::In;
+    for (int id : op->instruction().outputs()) {
+        if (id <= 0 || is_input) {
+            continue;
+        }
+        ChxVMVar* var = st->FindVar(id);
+        if (!var || !var->IsArray()) {
+            continue;
+        }
+        const chainerx::Array& a = var->GetArray();
+        if (st->IsInArena(a)) {
+            ++stats->num_arena_outputs;
+        } else if (!input_buffers.count(a.raw_data())) {
+            ++stats->num_allocations;
+        }
+    }
+    stats->peak_bytes = std::max(stats->peak_bytes, st->GetTotalVariableSize());
+}
+
+// Bytes of arrays and sequences output by `op`.
+int64_t GetOutputBytes(ChxVMState* st, const ChxVMOp* op) {
+    int64_t bytes = 0;
+    // Inputs of the program are owned by the caller.
+    const bool is_input = op->op() == ChxVMInstructionProto::In;
+    for (int id : op->instruction().outputs()) {
+        if (id <= 0 || is_input) {
+            continue;
+        }
+        ChxVMVar* var = st->FindVar(id);
+        if (var && (var->kind() == ChxVMVar::Kind::kArray || var->kind() == ChxVMVar::Kind::kSequence)) {
+            bytes += var->GetNBytes();
+        }
+    }
+    return bytes;
+}
+
 }  // namespace
 
 ChxVMOptions::ChxVMOptions() {
@@ -123,6 +187,22 @@ ChxVM::ChxVM(const ChxVMProgramProto& program, bool should_init) {
         input_descs_.emplace_back(new ChxVMInputDesc(name, dtype, shape));
     }
 
+    arena_size_ = program.arena_size();
+
+    if (program.has_deps()) {
+        has_deps_ = true;
+        num_deps_.resize(program.instructions_size());
+        users_.resize(program.instructions_size());
+        for (int i = 0; i < program.instructions_size(); ++i) {
+            const ChxVMInstructionProto& inst = program.instructions(i);
+            num_deps_[i] = inst.deps_size();
+            for (int dep : inst.deps()) {
+                CHECK_LT(dep, i) << inst.DebugString();
+                users_[dep].push_back(i);
+            }
+        }
+    }
+
     if (should_init) {
         Init();
     }
@@ -156,7 +236,13 @@ std::unique_ptr<ChxVMState> ChxVM::Prepare(const InOuts& program_inputs, const C
             CHECK_EQ(static_cast<int>(input->dtype), 0) << "Input '" << input->name << "' must be a tensor";
         }
     }
-    return std::make_unique<ChxVMState>(options, num_variables_, program_inputs);
+    std::unique_ptr<ChxVMState> state = std::make_unique<ChxVMState>(options, num_variables_, program_inputs);
+    // Arrays in the arena must not be retained for backprop. Parallel
+    // runs do not know which variables share bytes of the arena.
+    if (arena_size_ > 0 && !options.is_training && !CanRunInParallel(options)) {
+        state->InitArena(arena_size_);
+    }
+    return state;
 }
 
 InOuts ChxVM::Run(const InOuts& program_inputs, const ChxVMOptions& options) {
@@ -168,6 +254,10 @@ InOuts ChxVM::Run(const InOuts& program_inputs, const ChxVMOptions& options) {
 void ChxVM::Run(ChxVMState* state) {
     state->SetProgram(&program_);
     const ChxVMOptions& options = state->options();
+    if (CanRunInParallel(options)) {
+        RunInParallel(state);
+        return;
+    }
     int64_t peak_used_mbs = 0, peak_total_mbs = 0;
 
     while (true) {
@@ -176,6 +266,11 @@ void ChxVM::Run(ChxVMState* state) {
 
         ChxVMOp* op = program_[pc].get();
 
+        std::chrono::steady_clock::time_point start_time;
+        if (options.profiler) {
+            start_time = std::chrono::steady_clock::now();
+        }
+
         {
             ChromeTracingEmitter::ScopedEvent se(options.chrome_tracing, "ChxVM", op->name(), pc, op->instruction().flops());
 #ifdef CHAINER_COMPILER_ENABLE_NVTX
@@ -196,6 +291,20 @@ void ChxVM::Run(ChxVMState* state) {
 #endif
         }
 
+        if (options.profiler) {
+            // Kernels launched asynchronously are counted for the op.
+            chainerx::GetDefaultDevice().Synchronize();
+            const double usec = std::chrono::duration<double, std::micro>(std::chrono::steady_clock::now() - start_time).count();
+            options.profiler->Add(
+                    op->id(),
+                    pc,
+                    ChxVMInstructionProto::Op_Name(op->op()),
+                    op->debug_info(),
+                    usec,
+                    op->instruction().flops(),
+                    GetOutputBytes(state, op));
+        }
+
         state->set_pc(state->pc() + 1);
 
         if (options.check_types) {
@@ -206,6 +315,10 @@ void ChxVM::Run(ChxVMState* state) {
             DumpOutput(state, op, options.dump_outputs_dir);
         }
 
+        if (options.memory_stats) {
+            RecordMemoryStats(state, op, options.memory_stats);
+        }
+
         if (options.dump_memory_usage >= 1) {
             int64_t used_mbs = InMbs(state->GetTotalVariableSize());
             peak_used_mbs = std::max(used_mbs, peak_used_mbs);
@@ -235,5 +348,126 @@ void ChxVM::Run(ChxVMState* state) {
     }
 }
 
+bool ChxVM::CanRunInParallel(const ChxVMOptions& options) const {
+    if (!has_deps_ || options.num_inter_op_threads <= 1) {
+        return false;
+    }
+    // Debug features assume ops run one by one in the program order.
+    // Custom ops may call Python functions which need the GIL. Types
+    // only depend on outputs of each op so they can be checked in
+    // worker threads.
+    return !options.is_training && !options.trace_level && !options.check_nans && !options.check_infs && !options.dump_memory_usage &&
+           !options.chrome_tracing && !options.profiler && !options.memory_stats && options.dump_outputs_dir.empty() &&
+           options.custom_op_funcs.empty();
+}
+
+ThreadPool* ChxVM::GetThreadPool(int num_threads) {
+    std::lock_guard<std::mutex> lock(thread_pool_mu_);
+    // Pools are never replaced as other runs may be using them.
+    std::unique_ptr<ThreadPool>& pool = thread_pools_[num_threads];
+    if (!pool) {
+        pool.reset(new ThreadPool(num_threads));
+    }
+    return pool.get();
+}
+
+void ChxVM::RunInParallel(ChxVMState* state) {
+    const ChxVMOptions& options = state->options();
+    ThreadPool* pool = GetThreadPool(options.num_inter_op_threads);
+
+    const size_t num_ops = program_.size();
+    std::unique_ptr<std::atomic<int>[]> num_waits(new std::atomic<int>[num_ops]);
+    for (size_t i = 0; i < num_ops; ++i) {
+        num_waits[i] = num_deps_[i];
+    }
+
+    std::mutex mu;
+    std::condition_variable cond;
+    int num_tasks = 0;
+    size_t num_done = 0;
+    std::exception_ptr error;
+    std::atomic<bool> failed{false};
+
+    // Ops run in worker threads with the context and the device of the
+    // caller. Variables are not freed until all readers finish as
+    // `Free` instructions depend on them.
+    chainerx::Context& context = chainerx::GetDefaultContext();
+    chainerx::Device& device = chainerx::GetDefaultDevice();
+
+    std::function<void(int)> submit;
+    auto run_ops = [&](int pc) {
+        chainerx::ContextScope context_scope(context);
+        chainerx::DeviceScope device_scope(device);
+        chainerx::NoBackpropModeScope no_backprop;
+        size_t done = 0;
+        // Run one of ready users in this thread to save a round trip
+        // to the thread pool.
+        while (pc >= 0 && !failed) {
+            ChxVMOp* op = program_[pc].get();
+            try {
+                op->Run(state);
+                // Outputs are alive until users of them, which have
+                // not been submitted yet, finish.
+                if (options.check_types) {
+                    CheckType(state, op);
+                }
+            } catch (...) {
+                if (options.catch_exception) {
+                    std::cerr << "Exception in " << op->debug_info() << std::endl;
+                }
+                std::lock_guard<std::mutex> lock(mu);
+                if (!error) {
+                    error = std::current_exception();
+                }
+                failed = true;
+                break;
+            }
+            ++done;
+
+            int next = -1;
+            for (int user : users_[pc]) {
+                if (--num_waits[user] == 0) {
+                    if (next < 0) {
+                        next = user;
+                    } else {
+                        submit(user);
+                    }
+                }
+            }
+            pc = next;
+        }
+
+        std::lock_guard<std::mutex> lock(mu);
+        num_done += done;
+        if (--num_tasks == 0) {
+            cond.notify_all();
+        }
+    };
+    submit = [&](int pc) {
+        {
+            std::lock_guard<std::mutex> lock(mu);
+            ++num_tasks;
+        }
+        pool->Submit([&run_ops, pc]() { run_ops(pc); });
+    };
+
+    for (size_t i = 0; i < num_ops; ++i) {
+        if (num_deps_[i] == 0) {
+            submit(i);
+        }
+    }
+
+    {
+        std::unique_lock<std::mutex> lock(mu);
+        cond.wait(lock, [&num_tasks]() { return num_tasks == 0; });
+    }
+
+    if (error) {
+        std::rethrow_exception(error);
+    }
+    CHECK_EQ(num_ops, num_done);
+    state->set_pc(num_ops);
+}
+
 }  // namespace runtime
 }  // namespace chainer_compiler
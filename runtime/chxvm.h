@@ -2,7 +2,9 @@
 
 #include <cstdint>
 #include <functional>
+#include <map>
 #include <memory>
+#include <mutex>
 #include <string>
 #include <utility>
 #include <vector>
@@ -20,13 +22,26 @@ namespace runtime {
 
 class ChromeTracingEmitter;
 class ChxVMOp;
+class ChxVMProfiler;
 class ChxVMState;
 class ChxVMVar;
+class ThreadPool;
 
 typedef std::map<std::string, std::shared_ptr<ChxVMVar>> InOuts;
 
 typedef std::function<std::vector<chainerx::Array>(std::vector<chainerx::Array>)> CustomOpFunc;
 
+// Memory usage measured while programs run.
+struct ChxVMMemoryStats {
+    // The peak of `ChxVMState::GetTotalVariableSize`.
+    int64_t peak_bytes{0};
+    // Array outputs of ops stored to newly allocated buffers, i.e.,
+    // neither to the arena nor to buffers of inputs.
+    int64_t num_allocations{0};
+    // Array outputs of ops stored to the arena.
+    int64_t num_arena_outputs{0};
+};
+
 struct ChxVMOptions {
 public:
     ChxVMOptions();
@@ -56,9 +71,21 @@ public:
 
     ChromeTracingEmitter* chrome_tracing{nullptr};
 
+    // Aggregates elapsed times of ops. Each op waits for the device.
+    ChxVMProfiler* profiler{nullptr};
+
+    // Measures memory usage after each op.
+    ChxVMMemoryStats* memory_stats{nullptr};
+
     std::string dump_outputs_dir;
 
     std::map<std::string, CustomOpFunc> custom_op_funcs;
+
+    // Runs independent ops concurrently by this number of threads if
+    // the program has dependencies between instructions. Ignored when
+    // options for debugging or training, or custom ops are enabled,
+    // except for `check_types`.
+    int num_inter_op_threads{0};
 };
 
 struct ChxVMInputDesc;
@@ -78,13 +105,32 @@ public:
         return num_variables_;
     }
 
+    int64_t arena_size() const {
+        return arena_size_;
+    }
+
 private:
     ChxVM(const ChxVM&) = delete;
     ChxVM& operator=(const ChxVM&) = delete;
 
+    bool CanRunInParallel(const ChxVMOptions& options) const;
+    void RunInParallel(ChxVMState* state);
+    ThreadPool* GetThreadPool(int num_threads);
+
     std::vector<std::unique_ptr<ChxVMOp>> program_;
     std::vector<std::unique_ptr<ChxVMInputDesc>> input_descs_;
     int num_variables_;
+    int64_t arena_size_{0};
+
+    // Dependencies between instructions, which are available only when
+    // `has_deps` of the program is set.
+    bool has_deps_{false};
+    std::vector<int> num_deps_;
+    std::vector<std::vector<int>> users_;
+
+    std::mutex thread_pool_mu_;
+    // Thread pools keyed by the number of threads.
+    std::map<int, std::unique_ptr<ThreadPool>> thread_pools_;
 };
 
 }  // namespace runtime
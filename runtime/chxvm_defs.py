@@ -481,6 +481,10 @@ CHX_CUSTOM_FIELD_OPS = [
      [ArrayList('inputs'), Int('num_outputs'),
       String('dso_filename'), String('func_name'), Ints('output_shape')],
      [ArrayList('outputs')]),
+    ('ElementWiseCpu',
+     [ArrayList('inputs'), Int('num_outputs'), Int('dtype'), Ints('shape'),
+      String('dso_filename'), String('func_name')],
+     [ArrayList('outputs')]),
     ('NGraph',
      [ArrayList('inputs'), String('onnx'), String('backend')],
      [ArrayList('outputs')]),
@@ -534,16 +538,17 @@ CHX_SEQ_OPS = [
      [Sequence('output')]),
     ('SequenceSize', [Sequence('seq')], ['output']),
     ('SequenceLengths', [Sequence('seq')], [Sequence('output')]),
-    ('SequenceCopy', [Sequence('seq')], [Sequence('output')]),
 ]
 
-# Ops which modify the input in-place.
+# Ops which modify or share the input in-place.
 CHX_SEQ_OPS_UNTYPED = [
     ('SequenceClear', [Sequence('seq')], []),
     ('SequenceAppend', [Sequence('seq'), Array('value')],
      []),
+    ('SequenceAppendAll', [Sequence('seq'), Sequence('values')], []),
     ('SequencePop', [Sequence('seq')], ['output']),
     ('SequenceMove', [Sequence('seq')], [Sequence('output')]),
+    ('SequenceCopy', [Sequence('seq')], [Sequence('output')]),
 ]
 
 CHX_GENERIC_OPS = [
@@ -1,6 +1,12 @@
 #include "runtime/chxvm_op.h"
 
+#include <algorithm>
+
+#include <chainerx/graph.h>
+
 #include <common/strutil.h>
+#include <runtime/chxvm_state.h>
+#include <runtime/chxvm_var.h>
 
 namespace chainer_compiler {
 namespace runtime {
@@ -9,5 +15,49 @@ ChxVMOp::ChxVMOp(const ChxVMInstructionProto& inst)
     : inst_(inst), id_(inst.id()), op_(inst.op()), name_(StrCat(ChxVMInstructionProto_Op_Name(inst.op()), inst.id())) {
 }
 
+bool ChxVMOp::CanOverwriteInput(ChxVMState* st, int index, const chainerx::Array& a) const {
+    const auto& overwritables = inst_.overwritable_inputs();
+    if (std::find(overwritables.begin(), overwritables.end(), index) == overwritables.end()) {
+        return false;
+    }
+    // Inputs are checked after the op runs.
+    if (st->check_nans() || st->check_infs()) {
+        return false;
+    }
+    if (!a.IsContiguous() || a.IsBackpropRequired(chainerx::AnyGraph{})) {
+        return false;
+    }
+    // Views share the buffer.
+    if (a.data().use_count() != 1) {
+        return false;
+    }
+    // The array must be referred only from its variable and the copy
+    // passed to the op, e.g., not from other variables or constants
+    // cached by ops.
+    const chainerx::Array& var_array = st->GetVar(inst_.inputs(index).array())->GetArray();
+    const long num_refs = &var_array == &a ? 1 : 2;
+    return chainerx::internal::GetArrayBody(a).use_count() == num_refs;
+}
+
+absl::optional<chainerx::Array> ChxVMOp::GetArenaOutput(
+        ChxVMState* st, int index, const chainerx::Shape& shape, chainerx::Dtype dtype, chainerx::Device& device) const {
+    if (index >= inst_.output_offsets_size() || inst_.output_offsets(index) < 0) {
+        return absl::nullopt;
+    }
+    const ChxVMTypeProto& type = inst_.output_types(index);
+    if (static_cast<chainerx::Dtype>(type.dtype()) != dtype || chainerx::Shape(type.shape().begin(), type.shape().end()) != shape) {
+        return absl::nullopt;
+    }
+    return st->GetArenaArray(inst_.output_offsets(index), shape, dtype, device);
+}
+
+absl::optional<chainerx::Array> ChxVMOp::GetArenaOutput(ChxVMState* st, int index, chainerx::Dtype dtype, chainerx::Device& device) const {
+    if (index >= inst_.output_types_size()) {
+        return absl::nullopt;
+    }
+    const ChxVMTypeProto& type = inst_.output_types(index);
+    return GetArenaOutput(st, index, chainerx::Shape(type.shape().begin(), type.shape().end()), dtype, device);
+}
+
 }  // namespace runtime
 }  // namespace chainer_compiler
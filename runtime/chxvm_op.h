@@ -3,6 +3,10 @@
 #include <stdint.h>
 #include <string>
 
+#include <absl/types/optional.h>
+
+#include <chainerx/array.h>
+
 #include <runtime/chxvm.pb.h>
 
 namespace chainer_compiler {
@@ -41,6 +45,21 @@ public:
     }
 
 protected:
+    // Returns true if the `index`-th input `a` is listed in
+    // `overwritable_inputs` and no one else refers to its buffer, i.e.,
+    // the op can store its output to `a`.
+    bool CanOverwriteInput(ChxVMState* st, int index, const chainerx::Array& a) const;
+
+    // Returns an array in the arena for the `index`-th output if the
+    // compiler planned the output and the array has the type which the
+    // compiler expected. Otherwise, the op must allocate the output.
+    absl::optional<chainerx::Array> GetArenaOutput(
+            ChxVMState* st, int index, const chainerx::Shape& shape, chainerx::Dtype dtype, chainerx::Device& device) const;
+
+    // Same as above for the shape the compiler inferred. The op must
+    // check the shape of the returned array.
+    absl::optional<chainerx::Array> GetArenaOutput(ChxVMState* st, int index, chainerx::Dtype dtype, chainerx::Device& device) const;
+
     ChxVMInstructionProto inst_;
     const int64_t id_;
     const ChxVMInstructionProto::Op op_;
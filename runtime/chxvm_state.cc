@@ -2,6 +2,8 @@
 
 #include <map>
 
+#include <chainerx/context.h>
+#include <chainerx/routines/creation.h>
 #include <chainerx/routines/logic.h>
 #include <chainerx/routines/manipulation.h>
 #include <chainerx/routines/reduction.h>
@@ -22,6 +24,15 @@ ChxVMState::ChxVMState(const ChxVMOptions& options, int num_variables, const InO
 ChxVMState::~ChxVMState() {
 }
 
+void ChxVMState::Reset(const InOuts& inputs) {
+    pc_ = 0;
+    for (std::unique_ptr<ChxVMVar>& var : variables_) {
+        var.reset();
+    }
+    inputs_ = inputs;
+    outputs_.clear();
+}
+
 chainerx::Array ChxVMState::GetArray(int index) {
     CHECK_LE(0, index) << index;
     CHECK_GT(variables_.size(), index) << index;
@@ -59,6 +70,13 @@ ChxVMSequence* ChxVMState::GetSequence(int index) {
     return variables_[index]->GetSequence();
 }
 
+ChxVMSequence* ChxVMState::GetMutableSequence(int index) {
+    CHECK_LE(0, index) << index;
+    CHECK_GT(variables_.size(), index) << index;
+    CHECK(variables_[index].get());
+    return variables_[index]->GetMutableSequence();
+}
+
 const ChxVMOpaque& ChxVMState::GetOpaque(int index) {
     CHECK_LE(0, index) << index;
     CHECK_GT(variables_.size(), index) << index;
@@ -80,6 +98,12 @@ ChxVMVar* ChxVMState::GetVar(int index) {
     return variables_[index].get();
 }
 
+ChxVMVar* ChxVMState::FindVar(int index) {
+    CHECK_LE(0, index) << index;
+    CHECK_GT(variables_.size(), index) << index;
+    return variables_[index].get();
+}
+
 absl::optional<ChxVMVar*> ChxVMState::GetOptionalVar(int index) {
     if (index < 0) return absl::nullopt;
     return GetVar(index);
@@ -273,31 +297,48 @@ void ChxVMState::ShowVariableStatus() const {
 
 int64_t ChxVMState::GetTotalVariableSize() const {
     std::map<void*, int64_t> array_sizes;
+    auto add_arrays = [this, &array_sizes](const ChxVMVar& var) {
+        for (const chainerx::Array& a : var.GetArrays()) {
+            if (IsInArena(a)) continue;
+            array_sizes[a.raw_data()] = std::max(array_sizes[a.raw_data()], a.GetNBytes());
+        }
+    };
     for (const auto& v : variables_) {
         if (!v) {
             continue;
         }
-        for (const chainerx::Array& a : v->GetArrays()) {
-            array_sizes[a.raw_data()] = std::max(array_sizes[a.raw_data()], a.GetNBytes());
-        }
+        add_arrays(*v);
     }
     for (const auto& p : inputs_) {
-        for (const chainerx::Array& a : p.second->GetArrays()) {
-            array_sizes[a.raw_data()] = std::max(array_sizes[a.raw_data()], a.GetNBytes());
-        }
+        add_arrays(*p.second);
     }
     for (const auto& p : outputs_) {
-        for (const chainerx::Array& a : p.second->GetArrays()) {
-            array_sizes[a.raw_data()] = std::max(array_sizes[a.raw_data()], a.GetNBytes());
-        }
+        add_arrays(*p.second);
     }
 
-    int64_t total_size = 0;
+    int64_t total_size = arena_ ? arena_size_ : 0;
     for (const auto& p : array_sizes) {
         total_size += p.second;
     }
     return total_size;
 }
 
+void ChxVMState::InitArena(int64_t size) {
+    CHECK(!arena_);
+    chainerx::Device& device = chainerx::GetDefaultDevice();
+    arena_ = device.Allocate(size);
+    arena_size_ = size;
+    arena_device_ = &device;
+}
+
+absl::optional<chainerx::Array> ChxVMState::GetArenaArray(
+        int64_t offset, const chainerx::Shape& shape, chainerx::Dtype dtype, chainerx::Device& device) {
+    if (!arena_ || &device != arena_device_) {
+        return absl::nullopt;
+    }
+    CHECK_LE(offset + shape.GetTotalSize() * chainerx::GetItemSize(dtype), arena_size_);
+    return chainerx::FromData(shape, dtype, arena_, absl::nullopt, offset, device);
+}
+
 }  // namespace runtime
 }  // namespace chainer_compiler
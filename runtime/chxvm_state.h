@@ -1,5 +1,6 @@
 #pragma once
 
+#include <memory>
 #include <stack>
 #include <string>
 #include <vector>
@@ -23,6 +24,10 @@ public:
     ChxVMState(const ChxVMOptions& options, int num_variables, const InOuts& inputs);
     ~ChxVMState();
 
+    // Makes the state ready for another run with `inputs`, which must
+    // have the same types as the inputs given to `ChxVM::Prepare`.
+    void Reset(const InOuts& inputs);
+
     int pc() const {
         return pc_;
     }
@@ -40,11 +45,15 @@ public:
 
     ChxVMSequence* CreateSequence(int index);
     ChxVMSequence* GetSequence(int index);
+    // Use this to update a sequence in-place.
+    ChxVMSequence* GetMutableSequence(int index);
 
     const ChxVMOpaque& GetOpaque(int index);
     void SetOpaque(int index, ChxVMOpaque* opaque);
 
     ChxVMVar* GetVar(int index);
+    // Returns nullptr if the variable is not set.
+    ChxVMVar* FindVar(int index);
     absl::optional<ChxVMVar*> GetOptionalVar(int index);
     void SetVar(int index, const ChxVMVar& var);
 
@@ -92,8 +101,23 @@ public:
         program_ = program;
     }
 
+    // Bytes of buffers referred from variables. The arena counts as a
+    // whole.
     int64_t GetTotalVariableSize() const;
 
+    // Allocates the arena of `size` bytes on the default device. The
+    // arena is kept across `Reset`.
+    void InitArena(int64_t size);
+
+    // Returns an array at `offset` in the arena or nullopt if the
+    // arena is not on `device`.
+    absl::optional<chainerx::Array> GetArenaArray(
+            int64_t offset, const chainerx::Shape& shape, chainerx::Dtype dtype, chainerx::Device& device);
+
+    bool IsInArena(const chainerx::Array& a) const {
+        return arena_ && a.raw_data() == arena_.get();
+    }
+
 private:
     void ReportInvalidInOuts(const std::vector<int>& inputs, const std::vector<int>& outputs);
 
@@ -103,6 +127,9 @@ private:
     InOuts outputs_;
     ChxVMOptions options_;
     const std::vector<std::unique_ptr<ChxVMOp>>* program_;
+    std::shared_ptr<void> arena_;
+    int64_t arena_size_{0};
+    chainerx::Device* arena_device_{nullptr};
 };
 
 }  // namespace runtime
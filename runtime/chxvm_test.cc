@@ -1,4 +1,6 @@
 #include <iostream>
+#include <string>
+#include <vector>
 
 #include <gtest/gtest.h>
 
@@ -10,10 +12,14 @@
 #include <chainerx/testing/context_session.h>
 
 #include <compiler/chxvm/chxvm_value.h>
+#include <compiler/chxvm/dependency.h>
+#include <compiler/chxvm/in_place.h>
 #include <compiler/gen_chxvm_codegen.h>
 #include <runtime/chxvm.h>
 #include <runtime/chxvm.pb.h>
+#include <runtime/chxvm_state.h>
 #include <runtime/chxvm_var.h>
+#include <runtime/profiler.h>
 
 namespace chainer_compiler {
 namespace runtime {
@@ -40,6 +46,276 @@ TEST(ChxVMTest, Run) {
     EXPECT_ARRAY_EQ(e, outputs["out"]->GetArray());
 }
 
+TEST(ChxVMTest, ResetState) {
+    chainerx::testing::ContextSession sess;
+
+    ChxVMProgramProto program;
+    chxvm::AddInOp(&program, chxvm::ChxVMValue(0), "in1");
+    chxvm::AddInOp(&program, chxvm::ChxVMValue(1), "in2");
+    chxvm::AddAddOp(&program, chxvm::ChxVMValue(2), 0, 1);
+    chxvm::AddFreeOp(&program, 0);
+    chxvm::AddFreeOp(&program, 1);
+    chxvm::AddOutOp(&program, "out", 2);
+
+    ChxVM chxvm(program);
+    InOuts inputs;
+    chainerx::Array in1 = chainerx::testing::BuildArray({2}).WithData<float>({1, 2});
+    inputs.emplace("in1", std::shared_ptr<ChxVMVar>(new ChxVMVar(in1)));
+    inputs.emplace("in2", std::shared_ptr<ChxVMVar>(new ChxVMVar(chainerx::OnesLike(in1))));
+    std::unique_ptr<ChxVMState> state(chxvm.Prepare(inputs, ChxVMOptions()));
+    for (int i = 0; i < 3; ++i) {
+        // Inputs are updated in-place between runs.
+        static_cast<float*>(in1.raw_data())[0] = i;
+        state->Reset(inputs);
+        chxvm.Run(state.get());
+        InOuts outputs = state->GetOutputs();
+        ASSERT_EQ(1, outputs.count("out"));
+        chainerx::Array e = chainerx::testing::BuildArray({2}).WithData<float>({i + 1.0f, 3});
+        EXPECT_ARRAY_EQ(e, outputs["out"]->GetArray());
+    }
+}
+
+TEST(ChxVMTest, RunInParallel) {
+    chainerx::testing::ContextSession sess;
+
+    ChxVMProgramProto program;
+    chxvm::AddInOp(&program, chxvm::ChxVMValue(0), "in1");
+    chxvm::AddInOp(&program, chxvm::ChxVMValue(1), "in2");
+    chxvm::AddAddOp(&program, chxvm::ChxVMValue(2), 0, 1);
+    chxvm::AddMulOp(&program, chxvm::ChxVMValue(3), 0, 1);
+    chxvm::AddFreeOp(&program, 0);
+    chxvm::AddFreeOp(&program, 1);
+    chxvm::AddAddOp(&program, chxvm::ChxVMValue(4), 2, 3);
+    chxvm::AddFreeOp(&program, 2);
+    chxvm::AddFreeOp(&program, 3);
+    chxvm::AddOutOp(&program, "out", 4);
+    chxvm::AddInstructionDependencies(&program);
+    ASSERT_TRUE(program.has_deps());
+
+    ChxVM chxvm(program);
+    ChxVMOptions options;
+    options.check_types = true;
+    for (int i = 0; i < 10; ++i) {
+        // Pools for different numbers of threads coexist.
+        options.num_inter_op_threads = 2 + i % 2 * 2;
+        InOuts inputs;
+        chainerx::Array in1 = chainerx::Eye(2, absl::nullopt, absl::nullopt, chainerx::Dtype::kFloat32);
+        inputs.emplace("in1", std::shared_ptr<ChxVMVar>(new ChxVMVar(in1)));
+        inputs.emplace("in2", std::shared_ptr<ChxVMVar>(new ChxVMVar(chainerx::OnesLike(in1))));
+        InOuts outputs = chxvm.Run(inputs, options);
+        ASSERT_EQ(1, outputs.count("out"));
+        chainerx::Array e = chainerx::testing::BuildArray({2, 2}).WithData<float>({3, 1, 1, 3});
+        EXPECT_ARRAY_EQ(e, outputs["out"]->GetArray());
+    }
+}
+
+TEST(ChxVMTest, RunInPlace) {
+    chainerx::testing::ContextSession sess;
+
+    ChxVMProgramProto program;
+    chxvm::AddInOp(&program, chxvm::ChxVMValue(0), "in");
+    chxvm::AddNegOp(&program, chxvm::ChxVMValue(1), 0);
+    chxvm::AddReluOp(&program, chxvm::ChxVMValue(2), 0);
+    chxvm::AddFreeOp(&program, 0);
+    chxvm::AddReluOp(&program, chxvm::ChxVMValue(3), 1);
+    chxvm::AddFreeOp(&program, 1);
+    chxvm::AddSubOp(&program, chxvm::ChxVMValue(4), 3, 2);
+    chxvm::AddFreeOp(&program, 3);
+    chxvm::AddFreeOp(&program, 2);
+    chxvm::AddOutOp(&program, "out", 4);
+    chxvm::MarkOverwritableInputs(&program);
+    ASSERT_EQ(1, program.instructions(2).overwritable_inputs_size());
+    ASSERT_EQ(2, program.instructions(6).overwritable_inputs_size());
+
+    ChxVM chxvm(program);
+    InOuts inputs;
+    chainerx::Array in = chainerx::testing::BuildArray({4}).WithData<float>({-2, -1, 1, 2});
+    inputs.emplace("in", std::shared_ptr<ChxVMVar>(new ChxVMVar(in)));
+    InOuts outputs = chxvm.Run(inputs, ChxVMOptions());
+    ASSERT_EQ(1, outputs.count("out"));
+    chainerx::Array e = chainerx::testing::BuildArray({4}).WithData<float>({2, 1, -1, -2});
+    EXPECT_ARRAY_EQ(e, outputs["out"]->GetArray());
+    // The input is owned by the caller so it must not be overwritten.
+    chainerx::Array orig = chainerx::testing::BuildArray({4}).WithData<float>({-2, -1, 1, 2});
+    EXPECT_ARRAY_EQ(orig, in);
+}
+
+TEST(ChxVMTest, RunWithArena) {
+    chainerx::testing::ContextSession sess;
+
+    ChxVMProgramProto program;
+    chxvm::AddInOp(&program, chxvm::ChxVMValue(0), "in1");
+    chxvm::AddInOp(&program, chxvm::ChxVMValue(1), "in2");
+    chxvm::AddAddOp(&program, chxvm::ChxVMValue(2), 0, 1);
+    chxvm::AddReluOp(&program, chxvm::ChxVMValue(3), 2);
+    chxvm::AddFreeOp(&program, 2);
+    chxvm::AddMulOp(&program, chxvm::ChxVMValue(4), 3, 0);
+    chxvm::AddFreeOp(&program, 3);
+    chxvm::AddOutOp(&program, "out", 4);
+    // Place outputs of Add and Relu in the arena.
+    for (int pc : {2, 3}) {
+        ChxVMInstructionProto* inst = program.mutable_instructions(pc);
+        ChxVMTypeProto* type = inst->add_output_types();
+        type->set_dtype(static_cast<int>(chainerx::Dtype::kFloat32));
+        type->add_shape(4);
+        inst->add_output_offsets(pc == 2 ? 0 : 256);
+    }
+    program.set_arena_size(512);
+
+    ChxVM chxvm(program);
+    EXPECT_EQ(512, chxvm.arena_size());
+    ChxVMMemoryStats memory_stats;
+    ChxVMOptions options;
+    options.memory_stats = &memory_stats;
+    for (int i = 0; i < 2; ++i) {
+        InOuts inputs;
+        chainerx::Array in1 = chainerx::testing::BuildArray({4}).WithData<float>({-2, -1, 1, 2});
+        chainerx::Array in2 = chainerx::testing::BuildArray({4}).WithData<float>({1, 1, 1, 1});
+        inputs.emplace("in1", std::shared_ptr<ChxVMVar>(new ChxVMVar(in1)));
+        inputs.emplace("in2", std::shared_ptr<ChxVMVar>(new ChxVMVar(in2)));
+        InOuts outputs = chxvm.Run(inputs, options);
+        ASSERT_EQ(1, outputs.count("out"));
+        chainerx::Array e = chainerx::testing::BuildArray({4}).WithData<float>({0, 0, 2, 6});
+        EXPECT_ARRAY_EQ(e, outputs["out"]->GetArray());
+    }
+    // Only the output of Mul is allocated.
+    EXPECT_EQ(4, memory_stats.num_arena_outputs);
+    EXPECT_EQ(2, memory_stats.num_allocations);
+    EXPECT_LE(512, memory_stats.peak_bytes);
+}
+
+TEST(ChxVMTest, SequenceCopyOnWrite) {
+    chainerx::testing::ContextSession sess;
+
+    ChxVMProgramProto program;
+    chxvm::AddInOp(&program, chxvm::ChxVMValue(0), "in");
+    chxvm::AddSequenceCreateOp(&program, chxvm::ChxVMValue(1), {0});
+    chxvm::AddSequenceCopyOp(&program, chxvm::ChxVMValue(2), 1);
+    chxvm::AddSequenceAppendOp(&program, 2, 0);
+    chxvm::AddSequenceSizeOp(&program, chxvm::ChxVMValue(3), 1);
+    chxvm::AddSequenceSizeOp(&program, chxvm::ChxVMValue(4), 2);
+    chxvm::AddOutOp(&program, "size1", 3);
+    chxvm::AddOutOp(&program, "size2", 4);
+
+    ChxVM chxvm(program);
+    InOuts inputs;
+    chainerx::Array in = chainerx::testing::BuildArray({2}).WithData<float>({1, 2});
+    inputs.emplace("in", std::shared_ptr<ChxVMVar>(new ChxVMVar(in)));
+    InOuts outputs = chxvm.Run(inputs, ChxVMOptions());
+    // Appending to the copy does not change the original sequence.
+    EXPECT_EQ(1, static_cast<int64_t>(outputs["size1"]->GetScalar()));
+    EXPECT_EQ(2, static_cast<int64_t>(outputs["size2"]->GetScalar()));
+}
+
+TEST(ChxVMTest, LSTMWithoutBackwardContext) {
+    chainerx::testing::ContextSession sess;
+
+    ChxVMProgramProto program;
+    const std::vector<std::string> names = {"x", "w", "r", "b", "sequence_lens", "initial_h", "initial_c", "p"};
+    for (size_t i = 0; i < names.size(); ++i) {
+        chxvm::AddInOp(&program, chxvm::ChxVMValue(i), names[i]);
+    }
+    // LSTM with `ctx` records the graph for LSTMGrad.
+    chxvm::AddLSTMOp(
+            &program,
+            chxvm::ChxVMValue(10),
+            chxvm::ChxVMValue(11),
+            chxvm::ChxVMValue(12),
+            chxvm::ChxVMValue(13),
+            0,
+            1,
+            2,
+            3,
+            4,
+            5,
+            6,
+            7,
+            3,
+            2);
+    chxvm::AddLSTMOp(
+            &program,
+            chxvm::ChxVMValue(20),
+            chxvm::ChxVMValue(21),
+            chxvm::ChxVMValue(22),
+            chxvm::ChxVMValue(-1),
+            0,
+            1,
+            2,
+            3,
+            4,
+            5,
+            6,
+            7,
+            3,
+            2);
+    chxvm::AddOutOp(&program, "y_bwd", 10);
+    chxvm::AddOutOp(&program, "h_bwd", 11);
+    chxvm::AddOutOp(&program, "c_bwd", 12);
+    chxvm::AddOutOp(&program, "y", 20);
+    chxvm::AddOutOp(&program, "h", 21);
+    chxvm::AddOutOp(&program, "c", 22);
+
+    ChxVM chxvm(program);
+    chainerx::Array initial_h = chainerx::testing::BuildArray({2, 2, 3}).WithLinearData<float>(0.1f, 0.05f);
+    std::vector<chainerx::Array> ins = {
+            chainerx::testing::BuildArray({3, 2, 4}).WithLinearData<float>(-1.0f, 0.08f),
+            chainerx::testing::BuildArray({2, 12, 4}).WithLinearData<float>(-0.5f, 0.01f),
+            chainerx::testing::BuildArray({2, 12, 3}).WithLinearData<float>(0.3f, -0.01f),
+            chainerx::testing::BuildArray({2, 24}).WithLinearData<float>(-0.2f, 0.01f),
+            chainerx::testing::BuildArray({2}).WithData<int32_t>({3, 2}),
+            initial_h,
+            chainerx::testing::BuildArray({2, 2, 3}).WithLinearData<float>(-0.2f, 0.04f),
+            chainerx::testing::BuildArray({2, 9}).WithLinearData<float>(-0.3f, 0.03f),
+    };
+    InOuts inputs;
+    for (size_t i = 0; i < names.size(); ++i) {
+        inputs.emplace(names[i], std::shared_ptr<ChxVMVar>(new ChxVMVar(ins[i])));
+    }
+    InOuts outputs = chxvm.Run(inputs, ChxVMOptions());
+    EXPECT_ARRAY_ALL_CLOSE(outputs["y_bwd"]->GetArray(), outputs["y"]->GetArray());
+    EXPECT_ARRAY_ALL_CLOSE(outputs["h_bwd"]->GetArray(), outputs["h"]->GetArray());
+    EXPECT_ARRAY_ALL_CLOSE(outputs["c_bwd"]->GetArray(), outputs["c"]->GetArray());
+    // States are updated in-place on a copy of initial states.
+    EXPECT_ARRAY_EQ(chainerx::testing::BuildArray({2, 2, 3}).WithLinearData<float>(0.1f, 0.05f), initial_h);
+}
+
+TEST(ChxVMTest, Profiler) {
+    chainerx::testing::ContextSession sess;
+
+    ChxVMProgramProto program;
+    chxvm::AddInOp(&program, chxvm::ChxVMValue(0), "in");
+    chxvm::AddReluOp(&program, chxvm::ChxVMValue(1), 0);
+    chxvm::AddReluOp(&program, chxvm::ChxVMValue(2), 1);
+    chxvm::AddOutOp(&program, "out", 2);
+
+    ChxVM chxvm(program);
+    InOuts inputs;
+    chainerx::Array in = chainerx::testing::BuildArray({4}).WithData<float>({-2, -1, 1, 2});
+    inputs.emplace("in", std::shared_ptr<ChxVMVar>(new ChxVMVar(in)));
+    ChxVMProfiler profiler;
+    ChxVMOptions options;
+    options.profiler = &profiler;
+    chxvm.Run(inputs, options);
+    chxvm.Run(inputs, options);
+
+    ASSERT_EQ(1, profiler.op_type_stats().count("Relu"));
+    const ChxVMProfiler::Stats& relu = profiler.op_type_stats().at("Relu");
+    EXPECT_EQ(4, relu.count);
+    EXPECT_EQ(static_cast<int64_t>(4 * 4 * sizeof(float)), relu.output_bytes);
+    EXPECT_EQ(1, profiler.op_type_stats().count("In"));
+    EXPECT_EQ(1, profiler.op_type_stats().count("Out"));
+    // Instructions are distinguished by program counters.
+    EXPECT_EQ(4, profiler.instruction_stats().size());
+    for (const auto& p : profiler.instruction_stats()) {
+        EXPECT_EQ(p.first, p.second.pc);
+        EXPECT_EQ(2, p.second.count);
+    }
+    EXPECT_EQ("Relu", profiler.instruction_stats().at(2).op_type);
+
+    profiler.Reset();
+    EXPECT_TRUE(profiler.op_type_stats().empty());
+}
+
 }  // namespace
 }  // namespace runtime
 }  // namespace chainer_compiler
@@ -63,6 +63,14 @@ ChxVMSequence* ChxVMVar::GetSequence() const {
     return absl::get<std::shared_ptr<ChxVMSequence>>(val_).get();
 }
 
+ChxVMSequence* ChxVMVar::GetMutableSequence() {
+    std::shared_ptr<ChxVMSequence>& seq = absl::get<std::shared_ptr<ChxVMSequence>>(val_);
+    if (seq.use_count() > 1) {
+        seq = std::make_shared<ChxVMSequence>(*seq);
+    }
+    return seq.get();
+}
+
 ChxVMOpaque* ChxVMVar::GetOpaque() const {
     return absl::get<std::shared_ptr<ChxVMOpaque>>(val_).get();
 }
@@ -60,6 +60,9 @@ public:
 
     const chainerx::Array& GetArray() const;
     ChxVMSequence* GetSequence() const;
+    // Sequences are shared by copies of `ChxVMVar`. This copies the
+    // sequence when it is shared so updates are not visible to others.
+    ChxVMSequence* GetMutableSequence();
     ChxVMOpaque* GetOpaque() const;
     const StrictScalar& GetScalar() const;
     const chainerx::Shape& GetShape() const;
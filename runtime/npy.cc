@@ -1,8 +1,17 @@
 #include "runtime/npy.h"
 
 #include <stdio.h>
+#include <string.h>
+
+#ifndef _WIN32
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
 
 #include <chainerx/array.h>
+#include <chainerx/native/native_backend.h>
 #include <chainerx/routines/creation.h>
 
 #include <common/log.h>
@@ -74,5 +83,116 @@ void SaveNpy(const chainerx::Array& orig_a, const std::string& filename) {
     fclose(fp);
 }
 
+namespace {
+
+chainerx::Dtype DtypeFromDescr(const std::string& descr) {
+    if (descr == "|b1") return chainerx::Dtype::kBool;
+    if (descr == "|i1") return chainerx::Dtype::kInt8;
+    if (descr == "<i2") return chainerx::Dtype::kInt16;
+    if (descr == "<i4") return chainerx::Dtype::kInt32;
+    if (descr == "<i8") return chainerx::Dtype::kInt64;
+    if (descr == "|u1") return chainerx::Dtype::kUInt8;
+    if (descr == "<f2") return chainerx::Dtype::kFloat16;
+    if (descr == "<f4") return chainerx::Dtype::kFloat32;
+    if (descr == "<f8") return chainerx::Dtype::kFloat64;
+    CHECK(false) << "Unsupported npy dtype: " << descr;
+}
+
+// Returns the value of `key` in the Python dict literal of an npy header.
+std::string FindHeaderValue(const std::string& header, const std::string& key, const std::string& filename) {
+    const std::string pattern = StrCat("'", key, "':");
+    size_t pos = header.find(pattern);
+    CHECK_NE(std::string::npos, pos) << "No " << key << " in npy header: " << filename;
+    pos += pattern.size();
+    while (pos < header.size() && header[pos] == ' ') ++pos;
+    CHECK_LT(pos, header.size()) << "Broken npy header: " << filename;
+
+    size_t end;
+    if (header[pos] == '\'') {
+        end = header.find('\'', pos + 1);
+        CHECK_NE(std::string::npos, end) << "Broken npy header: " << filename;
+        return header.substr(pos + 1, end - pos - 1);
+    }
+    if (header[pos] == '(') {
+        end = header.find(')', pos);
+        CHECK_NE(std::string::npos, end) << "Broken npy header: " << filename;
+        return header.substr(pos + 1, end - pos - 1);
+    }
+    end = header.find_first_of(",}", pos);
+    CHECK_NE(std::string::npos, end) << "Broken npy header: " << filename;
+    return header.substr(pos, end - pos);
+}
+
+chainerx::Shape ParseShape(const std::string& shape_str, const std::string& filename) {
+    chainerx::Shape shape;
+    size_t pos = 0;
+    while (pos < shape_str.size()) {
+        size_t end = shape_str.find(',', pos);
+        if (end == std::string::npos) end = shape_str.size();
+        std::string dim = shape_str.substr(pos, end - pos);
+        dim.erase(0, dim.find_first_not_of(' '));
+        dim.erase(dim.find_last_not_of(' ') + 1);
+        if (!dim.empty()) {
+            char* dim_end;
+            int64_t d = strtoll(dim.c_str(), &dim_end, 10);
+            CHECK_EQ('\0', *dim_end) << "Broken shape in npy header: " << filename;
+            shape.push_back(d);
+        }
+        pos = end + 1;
+    }
+    return shape;
+}
+
+}  // namespace
+
+chainerx::Array LoadNpy(const std::string& filename) {
+    FILE* fp = fopen(filename.c_str(), "rb");
+    CHECK(fp) << "Failed to open: " << filename;
+    char magic[10];
+    CHECK_EQ(sizeof(magic), fread(magic, 1, sizeof(magic), fp)) << "Broken npy file: " << filename;
+    CHECK_EQ(0, memcmp(magic, "\x93NUMPY", 6)) << "Not an npy file: " << filename;
+    const int major_version = magic[6];
+    size_t header_len = static_cast<uint8_t>(magic[8]) | (static_cast<uint8_t>(magic[9]) << 8);
+    size_t offset = sizeof(magic);
+    if (major_version >= 2) {
+        uint8_t len_hi[2];
+        CHECK_EQ(sizeof(len_hi), fread(len_hi, 1, sizeof(len_hi), fp)) << "Broken npy file: " << filename;
+        header_len |= (len_hi[0] << 16) | (len_hi[1] << 24);
+        offset += sizeof(len_hi);
+    }
+    std::string header(header_len, '\0');
+    CHECK_EQ(header_len, fread(&header[0], 1, header_len, fp)) << "Broken npy file: " << filename;
+    offset += header_len;
+
+    const chainerx::Dtype dtype = DtypeFromDescr(FindHeaderValue(header, "descr", filename));
+    CHECK_EQ("False", FindHeaderValue(header, "fortran_order", filename)) << "Fortran order is not supported: " << filename;
+    const chainerx::Shape shape = ParseShape(FindHeaderValue(header, "shape", filename), filename);
+    const size_t nbytes = shape.GetTotalSize() * chainerx::GetItemSize(dtype);
+
+    std::shared_ptr<void> data;
+#ifdef _WIN32
+    data.reset(new char[nbytes], std::default_delete<char[]>());
+    CHECK_EQ(nbytes, fread(data.get(), 1, nbytes, fp)) << "Broken npy file: " << filename;
+    fclose(fp);
+    offset = 0;
+#else
+    fclose(fp);
+    const size_t map_size = offset + nbytes;
+    int fd = open(filename.c_str(), O_RDONLY);
+    CHECK_LE(0, fd) << "Failed to open: " << filename;
+    struct stat st;
+    CHECK_EQ(0, fstat(fd, &st)) << "Failed to stat: " << filename;
+    CHECK_LE(map_size, static_cast<size_t>(st.st_size)) << "Truncated npy file: " << filename;
+    // Private writable mappings let ChainerX modify arrays without
+    // touching the file.
+    void* addr = mmap(nullptr, map_size, PROT_READ | PROT_WRITE, MAP_PRIVATE, fd, 0);
+    CHECK_NE(MAP_FAILED, addr) << "Failed to mmap: " << filename;
+    close(fd);
+    data.reset(addr, [map_size](void* p) { munmap(p, map_size); });
+#endif
+
+    return chainerx::FromData(shape, dtype, data, absl::nullopt /* strides */, offset, chainerx::GetNativeBackend().GetDevice(0));
+}
+
 }  // namespace runtime
 }  // namespace chainer_compiler
@@ -9,5 +9,9 @@ namespace runtime {
 
 void SaveNpy(const chainerx::Array& a, const std::string& filename);
 
+// Loads a native array from an .npy file. The file is memory-mapped
+// when possible so the data is read lazily.
+chainerx::Array LoadNpy(const std::string& filename);
+
 }  // namespace runtime
 }  // namespace chainer_compiler
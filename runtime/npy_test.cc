@@ -3,7 +3,9 @@
 #include <gtest/gtest.h>
 
 #include <chainerx/array.h>
+#include <chainerx/numeric.h>
 #include <chainerx/routines/creation.h>
+#include <chainerx/routines/manipulation.h>
 #include <chainerx/testing/context_session.h>
 
 #include <runtime/npy.h>
@@ -37,6 +39,23 @@ TEST(NpyTest, SaveNpy) {
     EXPECT_EQ(expected, actual);
 }
 
+TEST(NpyTest, LoadNpy) {
+    chainerx::testing::ContextSession sess;
+
+    chainerx::Array a = chainerx::Arange(6, chainerx::Dtype::kInt64).Reshape({2, 3});
+    SaveNpy(a, "out/t_load.npy");
+    chainerx::Array b = LoadNpy("out/t_load.npy");
+    EXPECT_EQ(a.shape(), b.shape());
+    EXPECT_EQ(a.dtype(), b.dtype());
+    EXPECT_TRUE(chainerx::AllClose(a, b));
+
+    chainerx::Array s = chainerx::Full({}, 4.2, chainerx::Dtype::kFloat32);
+    SaveNpy(s, "out/t_scalar.npy");
+    chainerx::Array t = LoadNpy("out/t_scalar.npy");
+    EXPECT_EQ(0, t.ndim());
+    EXPECT_TRUE(chainerx::AllClose(s, t));
+}
+
 }  // namespace
 }  // namespace runtime
 }  // namespace chainer_compiler
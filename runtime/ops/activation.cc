@@ -1,5 +1,7 @@
 #include <limits>
 
+#include <chainerx/kernels/arithmetic.h>
+#include <chainerx/kernels/hyperbolic.h>
 #include <chainerx/kernels/misc.h>
 #include <chainerx/routines/activation.h>
 #include <chainerx/routines/creation.h>
@@ -18,6 +20,14 @@ namespace chainer_compiler {
 namespace runtime {
 
 chainerx::Array ReluOp::RunImpl(ChxVMState* st, const chainerx::Array& x) {
+    if (CanOverwriteInput(st, 0, x)) {
+        x.device().backend().CallKernel<chainerx::MaximumASKernel>(x, chainerx::Scalar(0.0), x);
+        return x;
+    }
+    if (auto out = GetArenaOutput(st, 0, x.shape(), x.dtype(), x.device())) {
+        x.device().backend().CallKernel<chainerx::MaximumASKernel>(x, chainerx::Scalar(0.0), *out);
+        return *out;
+    }
     return chainerx::Relu(x);
 }
 
@@ -53,10 +63,39 @@ chainerx::Array EluOp::RunImpl(ChxVMState* st, const chainerx::Array& x) {
 }
 
 chainerx::Array TanhOp::RunImpl(ChxVMState* st, const chainerx::Array& a) {
+    if (IsFloat(a.dtype()) && CanOverwriteInput(st, 0, a)) {
+        a.device().backend().CallKernel<chainerx::TanhKernel>(a, a);
+        return a;
+    }
+    if (IsFloat(a.dtype())) {
+        if (auto out = GetArenaOutput(st, 0, a.shape(), a.dtype(), a.device())) {
+            a.device().backend().CallKernel<chainerx::TanhKernel>(a, *out);
+            return *out;
+        }
+    }
     return chainerx::Tanh(a);
 }
 
 chainerx::Array SigmoidOp::RunImpl(ChxVMState* st, const chainerx::Array& a) {
+    if (IsFloat(a.dtype()) && CanOverwriteInput(st, 0, a)) {
+        // sigmoid(x) = tanh(x / 2) / 2 + 1 / 2
+        chainerx::Array y = a;
+        y *= chainerx::Scalar(0.5);
+        y.device().backend().CallKernel<chainerx::TanhKernel>(y, y);
+        y *= chainerx::Scalar(0.5);
+        y += chainerx::Scalar(0.5);
+        return y;
+    }
+    if (IsFloat(a.dtype())) {
+        if (auto out = GetArenaOutput(st, 0, a.shape(), a.dtype(), a.device())) {
+            chainerx::Array y = *out;
+            y.device().backend().CallKernel<chainerx::MultiplyASKernel>(a, chainerx::Scalar(0.5), y);
+            y.device().backend().CallKernel<chainerx::TanhKernel>(y, y);
+            y *= chainerx::Scalar(0.5);
+            y += chainerx::Scalar(0.5);
+            return y;
+        }
+    }
     return Sigmoid(a);
 }
 
@@ -26,7 +26,11 @@ chainerx::Array ConvOp::RunImpl(
     Int64StackVector comp_strides = ComplementStride(strides, x);
     Int64StackVector comp_pads = ComplementPad(pads, x);
 
-    return GroupedConv(x, w, b, comp_strides, comp_pads, group, auto_pad);
+    absl::optional<chainerx::Array> out;
+    if (group == 1 && x.dtype() == w.dtype() && (!b.has_value() || b->dtype() == x.dtype())) {
+        out = GetArenaOutput(st, 0, x.dtype(), x.device());
+    }
+    return GroupedConv(x, w, b, comp_strides, comp_pads, group, auto_pad, out);
 }
 
 chainerx::Array ConvTransposeOp::RunImpl(
@@ -0,0 +1,89 @@
+#include <dlfcn.h>
+
+#include <chainerx/array.h>
+#include <chainerx/routines/creation.h>
+#include <chainerx/shape.h>
+
+#include <common/log.h>
+#include <runtime/chainerx_util.h>
+#include <runtime/gen_chxvm_ops.h>
+
+namespace chainer_compiler {
+namespace runtime {
+
+class ElementWiseCpuOp::ElementWiseCpuImpl {
+public:
+    typedef void (*FusionFunc)(int64_t n, void* const* inputs, const int64_t* strides, void* const* outputs);
+
+    void* dso{nullptr};
+    FusionFunc fn{nullptr};
+};
+
+void ElementWiseCpuOp::InitImpl() {
+    impl_ = new ElementWiseCpuImpl();
+    impl_->dso = dlopen(dso_filename.c_str(), RTLD_NOW | RTLD_LOCAL);
+    CHECK(impl_->dso) << "Failed to load " << dso_filename << ": " << dlerror();
+    impl_->fn = reinterpret_cast<ElementWiseCpuImpl::FusionFunc>(dlsym(impl_->dso, func_name.c_str()));
+    CHECK(impl_->fn) << "Failed to find " << func_name << " in " << dso_filename << ": " << dlerror();
+}
+
+ElementWiseCpuOp::~ElementWiseCpuOp() {
+    if (impl_->dso) {
+        dlclose(impl_->dso);
+    }
+    delete impl_;
+}
+
+std::vector<chainerx::Array> ElementWiseCpuOp::RunImpl(
+        chainer_compiler::runtime::ChxVMState* st, const std::vector<chainerx::Array>& orig_inputs) {
+    CHECK(!orig_inputs.empty());
+    chainerx::Device& device = orig_inputs[0].device();
+    CHECK(IsNativeDevice(&device)) << "ElementWiseCpu runs only on CPU: " << device.name();
+
+    const chainerx::Dtype dtype = static_cast<chainerx::Dtype>(this->dtype);
+    const chainerx::Shape shape(this->shape.begin(), this->shape.end());
+    chainerx::Shape broadcast_shape = orig_inputs[0].shape();
+    for (const chainerx::Array& input : orig_inputs) {
+        CHECK_EQ(dtype, input.dtype());
+        broadcast_shape = chainerx::internal::BroadcastShapes(broadcast_shape, input.shape());
+    }
+    CHECK_EQ(shape, broadcast_shape) << "ElementWiseCpu was compiled for a different shape";
+
+    // Inputs with the output shape are read by the flat index. Others
+    // are read by element strides of their axes aligned to the output,
+    // which are zero for broadcast axes.
+    // Keeps contiguous copies alive while the function runs.
+    std::vector<chainerx::Array> contiguous_inputs;
+    std::vector<void*> input_ptrs;
+    std::vector<int64_t> strides;
+    for (chainerx::Array input : orig_inputs) {
+        if (input.shape() == shape && !input.IsContiguous()) {
+            input = chainerx::AsContiguous(input);
+        }
+        contiguous_inputs.push_back(input);
+        input_ptrs.push_back(static_cast<char*>(input.raw_data()) + input.offset());
+
+        const int offset = shape.ndim() - input.ndim();
+        CHECK_LE(0, offset);
+        for (int i = 0; i < shape.ndim(); ++i) {
+            if (i < offset || input.shape()[i - offset] == 1) {
+                strides.push_back(0);
+            } else {
+                strides.push_back(input.strides()[i - offset] / input.GetItemSize());
+            }
+        }
+    }
+
+    std::vector<chainerx::Array> outputs;
+    std::vector<void*> output_ptrs;
+    for (int i = 0; i < num_outputs; ++i) {
+        outputs.push_back(chainerx::Empty(shape, dtype, device));
+        output_ptrs.push_back(RawStartPtr(outputs.back()));
+    }
+
+    impl_->fn(shape.GetTotalSize(), input_ptrs.data(), strides.data(), output_ptrs.data());
+    return outputs;
+}
+
+}  // namespace runtime
+}  // namespace chainer_compiler
@@ -1,3 +1,9 @@
+#include <algorithm>
+#include <array>
+#include <queue>
+#include <utility>
+#include <vector>
+
 #include <chainerx/index_iterator.h>
 #include <chainerx/indexable_array.h>
 #include <chainerx/routines/creation.h>
@@ -7,7 +13,7 @@
 #include <common/log.h>
 #include <runtime/chainerx_util.h>
 #include <runtime/gen_chxvm_ops.h>
-#include <queue>
+#include <runtime/thread_pool.h>
 
 namespace chainer_compiler {
 namespace runtime {
@@ -54,57 +60,115 @@ inline void MaxMin(float lhs, float rhs, float& min, float& max) {
     }
 }
 
-inline bool SuppressByIOU(const float* boxes_data, int64_t box_idx1, int64_t box_idx2, int64_t center_point_box, float iou_threshold) {
-    float x1_min, y1_min, x1_max, y1_max, x2_min, y2_min, x2_max, y2_max;
-
-    const float* box1 = boxes_data + 4 * box_idx1;
-    const float* box2 = boxes_data + 4 * box_idx2;
-
-    if (center_point_box == 0) {
-        MaxMin(box1[1], box1[3], x1_min, x1_max);
-        MaxMin(box1[0], box1[2], y1_min, y1_max);
-        MaxMin(box2[1], box2[3], x2_min, x2_max);
-        MaxMin(box2[0], box2[2], y2_min, y2_max);
-    } else {
-        const float box1_width_half = box1[2] / 2;
-        const float box1_height_half = box1[3] / 2;
-        const float box2_width_half = box2[2] / 2;
-        const float box2_height_half = box2[3] / 2;
-
-        x1_min = box1[0] - box1_width_half;
-        x1_max = box1[0] + box1_width_half;
-        y1_min = box1[1] - box1_height_half;
-        y1_max = box1[1] + box1_height_half;
-
-        x2_min = box2[0] - box2_width_half;
-        x2_max = box2[0] + box2_width_half;
-        y2_min = box2[1] - box2_height_half;
-        y2_max = box2[1] + box2_height_half;
+// Corners and areas of boxes in the struct-of-arrays layout, so IoUs
+// against many boxes are computed by vectorizable loops.
+struct NmsBoxes {
+    void Push(float x0, float y0, float x1, float y1) {
+        x_min.push_back(x0);
+        y_min.push_back(y0);
+        x_max.push_back(x1);
+        y_max.push_back(y1);
+        area.push_back((x1 - x0) * (y1 - y0));
     }
 
-    const float intersection_x_min = std::max(x1_min, x2_min);
-    const float intersection_y_min = std::max(y1_min, y2_min);
-    const float intersection_x_max = std::min(x1_max, x2_max);
-    const float intersection_y_max = std::min(y1_max, y2_max);
-
-    const float intersection_area =
-            std::max(intersection_x_max - intersection_x_min, 0.f) * std::max(intersection_y_max - intersection_y_min, 0.f);
+    void Push(const NmsBoxes& boxes, int64_t i) {
+        Push(boxes.x_min[i], boxes.y_min[i], boxes.x_max[i], boxes.y_max[i]);
+    }
 
-    if (intersection_area <= 0.f) {
-        return false;
+    size_t size() const {
+        return area.size();
     }
 
-    const float area1 = (x1_max - x1_min) * (y1_max - y1_min);
-    const float area2 = (x2_max - x2_min) * (y2_max - y2_min);
-    const float union_area = area1 + area2 - intersection_area;
+    std::vector<float> x_min, y_min, x_max, y_max, area;
+};
+
+NmsBoxes MakeNmsBoxes(const float* boxes_data, int64_t num_boxes, int64_t center_point_box) {
+    NmsBoxes boxes;
+    for (int64_t i = 0; i < num_boxes; ++i) {
+        const float* box = boxes_data + 4 * i;
+        float x_min, y_min, x_max, y_max;
+        if (center_point_box == 0) {
+            MaxMin(box[1], box[3], x_min, x_max);
+            MaxMin(box[0], box[2], y_min, y_max);
+        } else {
+            const float width_half = box[2] / 2;
+            const float height_half = box[3] / 2;
+            x_min = box[0] - width_half;
+            x_max = box[0] + width_half;
+            y_min = box[1] - height_half;
+            y_max = box[1] + height_half;
+        }
+        boxes.Push(x_min, y_min, x_max, y_max);
+    }
+    return boxes;
+}
 
-    if (area1 <= 0.f || area2 <= 0.f || union_area <= 0.f) {
-        return false;
+// Checks if the IoU of the `i`-th box in `boxes` and any box in
+// `selected` exceeds `iou_threshold`. All boxes must have positive
+// areas.
+bool SuppressByIOU(const NmsBoxes& boxes, int64_t i, const NmsBoxes& selected, float iou_threshold) {
+    const float x_min = boxes.x_min[i];
+    const float y_min = boxes.y_min[i];
+    const float x_max = boxes.x_max[i];
+    const float y_max = boxes.y_max[i];
+    const float area = boxes.area[i];
+    // Each block is evaluated without branches.
+    const size_t kBlockSize = 16;
+    for (size_t begin = 0; begin < selected.size(); begin += kBlockSize) {
+        const size_t end = std::min(selected.size(), begin + kBlockSize);
+        bool suppressed = false;
+        for (size_t j = begin; j < end; ++j) {
+            const float width = std::max(std::min(x_max, selected.x_max[j]) - std::max(x_min, selected.x_min[j]), 0.f);
+            const float height = std::max(std::min(y_max, selected.y_max[j]) - std::max(y_min, selected.y_min[j]), 0.f);
+            const float intersection_area = width * height;
+            const float union_area = area + selected.area[j] - intersection_area;
+            suppressed |= (intersection_area > 0.f) & (intersection_area / union_area > iou_threshold);
+        }
+        if (suppressed) {
+            return true;
+        }
     }
+    return false;
+}
 
-    const float intersection_over_union = intersection_area / union_area;
+// Runs NMS for boxes of a class and returns indices of selected boxes.
+std::vector<int64_t> SelectBoxes(
+        const NmsBoxes& boxes, const float* scores, int64_t max_boxes, float iou_threshold, const absl::optional<float>& score_threshold) {
+    std::vector<std::pair<float, int64_t>> candidates;
+    for (size_t i = 0; i < boxes.size(); ++i) {
+        if (!score_threshold.has_value() || scores[i] > *score_threshold) {
+            candidates.emplace_back(scores[i], i);
+        }
+    }
 
-    return intersection_over_union > iou_threshold;
+    // Higher scores come first and ties are broken by indices.
+    auto higher = [](const std::pair<float, int64_t>& lhs, const std::pair<float, int64_t>& rhs) {
+        return lhs.first > rhs.first || (lhs.first == rhs.first && lhs.second < rhs.second);
+    };
+    // Candidates are sorted by chunks as only a few of them are visited
+    // before `max_boxes` boxes are selected.
+    const size_t chunk_size = std::max<int64_t>(64, std::min<int64_t>(2 * max_boxes, candidates.size()));
+    size_t sorted_end = 0;
+
+    std::vector<int64_t> selected_indices;
+    // Boxes without areas are selected but suppress nothing.
+    NmsBoxes selected;
+    for (size_t c = 0; c < candidates.size() && static_cast<int64_t>(selected_indices.size()) < max_boxes; ++c) {
+        if (c == sorted_end) {
+            sorted_end = std::min(candidates.size(), sorted_end + chunk_size);
+            std::partial_sort(candidates.begin() + c, candidates.begin() + sorted_end, candidates.end(), higher);
+        }
+        const int64_t i = candidates[c].second;
+        const bool has_area = boxes.area[i] > 0.f;
+        if (has_area && SuppressByIOU(boxes, i, selected, iou_threshold)) {
+            continue;
+        }
+        selected_indices.push_back(i);
+        if (has_area) {
+            selected.Push(boxes, i);
+        }
+    }
+    return selected_indices;
 }
 
 inline std::vector<chainerx::ArrayIndex> ArrayToIndex(const chainerx::Array& ary) {
@@ -359,22 +423,10 @@ chainerx::Array NonMaxSuppressionOp::RunImpl(
         return chainerx::Full({0, 3}, 0, boxes.device());
     }
 
-    struct score_index {
-        float score_{};
-        int64_t index_{};
-
-        score_index() = default;
-        explicit score_index(float s, int64_t i) : score_(s), index_(i) {
-        }
-
-        bool operator<(const score_index& rhs) const {
-            return score_ < rhs.score_;
-        }
-    };
-
-    chainerx::Array raw_scores = chainerx::AsContiguous(scores).AsType(chainerx::Dtype::kFloat32).ToNative();
+    // Inputs are not copied if they are contiguous float32 arrays on CPU.
+    chainerx::Array raw_scores = chainerx::AsContiguous(scores.AsType(chainerx::Dtype::kFloat32, false).ToNative());
     const float* scores_data = reinterpret_cast<const float*>(RawStartPtr(raw_scores));
-    chainerx::Array raw_boxes = chainerx::AsContiguous(boxes).AsType(chainerx::Dtype::kFloat32).ToNative();
+    chainerx::Array raw_boxes = chainerx::AsContiguous(boxes.AsType(chainerx::Dtype::kFloat32, false).ToNative());
     const float* boxes_data = reinterpret_cast<const float*>(RawStartPtr(raw_boxes));
 
     const int64_t num_batches = boxes.shape()[0];
@@ -383,50 +435,40 @@ chainerx::Array NonMaxSuppressionOp::RunImpl(
 
     const float iou_threshold = opt_iou_threshold ? static_cast<float>(*opt_iou_threshold) : 0;
     CHECK(0.f <= iou_threshold && iou_threshold <= 1.f);
-
-    std::function<bool(float)> check_score_threshold = [](float cls_score) { return true; };
+    const int64_t max_boxes = opt_max_output_boxes_per_class ? static_cast<int64_t>(*opt_max_output_boxes_per_class) : num_boxes;
+    absl::optional<float> score_threshold;
     if (opt_score_threshold) {
-        const float score_threshold = static_cast<float>(*opt_score_threshold);
-        check_score_threshold = [score_threshold](float cls_score) { return cls_score > score_threshold; };
+        score_threshold = static_cast<float>(*opt_score_threshold);
     }
 
-    std::vector<std::array<int64_t, 3>> selected_indices;
+    // Corners and areas are shared by all classes.
+    std::vector<NmsBoxes> batch_boxes;
     for (int64_t batch_idx = 0; batch_idx < num_batches; ++batch_idx) {
-        for (int64_t class_idx = 0; class_idx < num_classes; ++class_idx) {
-            int64_t box_score_offset = (batch_idx * num_classes + class_idx) * num_boxes;
-            int64_t box_offset = batch_idx * num_boxes * 4;
-
-            std::priority_queue<score_index, std::vector<score_index>> sorted_score_indices;
-            const float* cls_scores = scores_data + box_score_offset;
-
-            for (int64_t box_idx = 0; box_idx < num_boxes; ++box_idx, ++cls_scores) {
-                if (check_score_threshold(*cls_scores)) {
-                    sorted_score_indices.push(score_index(*cls_scores, box_idx));
-                }
-            }
+        batch_boxes.push_back(MakeNmsBoxes(boxes_data + batch_idx * num_boxes * 4, num_boxes, center_point_box));
+    }
 
-            std::vector<int64_t> selected_indices_inside_class;
-            while (!sorted_score_indices.empty()) {
-                score_index next_top_score = sorted_score_indices.top();
-                sorted_score_indices.pop();
-
-                bool selected = true;
-                for (int64_t selected_idx : selected_indices_inside_class) {
-                    if (SuppressByIOU(boxes_data + box_offset, selected_idx, next_top_score.index_, center_point_box, iou_threshold)) {
-                        selected = false;
-                        break;
-                    }
-                }
+    // Pairs of a batch and a class are independent.
+    const int64_t num_tasks = num_batches * num_classes;
+    std::vector<std::vector<int64_t>> selected_per_task(num_tasks);
+    auto select = [&](int64_t task) {
+        const int64_t batch_idx = task / num_classes;
+        selected_per_task[task] =
+                SelectBoxes(batch_boxes[batch_idx], scores_data + task * num_boxes, max_boxes, iou_threshold, score_threshold);
+    };
+    // Small inputs are not worth the synchronization.
+    const int64_t kMinBoxesForParallel = 4096;
+    if (num_tasks * num_boxes >= kMinBoxesForParallel) {
+        ParallelFor(num_tasks, select);
+    } else {
+        for (int64_t task = 0; task < num_tasks; ++task) {
+            select(task);
+        }
+    }
 
-                if (selected) {
-                    if (opt_max_output_boxes_per_class &&
-                        static_cast<int64_t>(selected_indices_inside_class.size()) >= static_cast<int>(*opt_max_output_boxes_per_class)) {
-                        break;
-                    }
-                    selected_indices_inside_class.push_back(next_top_score.index_);
-                    selected_indices.push_back({batch_idx, class_idx, next_top_score.index_});
-                }
-            }
+    std::vector<std::array<int64_t, 3>> selected_indices;
+    for (int64_t task = 0; task < num_tasks; ++task) {
+        for (int64_t box_idx : selected_per_task[task]) {
+            selected_indices.push_back({task / num_classes, task % num_classes, box_idx});
         }
     }
 
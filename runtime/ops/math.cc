@@ -1,3 +1,6 @@
+#include <chainerx/kernels/arithmetic.h>
+#include <chainerx/kernels/explog.h>
+#include <chainerx/kernels/linalg.h>
 #include <chainerx/routines/activation.h>
 #include <chainerx/routines/arithmetic.h>
 #include <chainerx/routines/connection.h>
@@ -10,6 +13,7 @@
 #include <chainerx/routines/misc.h>
 #include <chainerx/routines/rounding.h>
 #include <chainerx/routines/trigonometric.h>
+#include <chainerx/shape.h>
 
 #include <common/log.h>
 #include <runtime/chainerx_util.h>
@@ -26,21 +30,85 @@ chainerx::Array Pow(chainerx::Array a, chainerx::Array b) {
     return chainerx::Power(a, b);
 }
 
+// Returns true if `x` can hold the result of an element-wise binary op
+// of `x` and `other` without type promotion or broadcast.
+bool CanStoreResult(const chainerx::Array& x, const chainerx::Array& other) {
+    return &x.device() == &other.device() && x.dtype() == other.dtype() &&
+           x.shape() == chainerx::internal::BroadcastShapes(x.shape(), other.shape());
+}
+
+// Returns true if a kernel can compute `a` and `b` into an arena array
+// without type promotion.
+bool CanStoreToArena(const chainerx::Array& a, const chainerx::Array& b) {
+    return &a.device() == &b.device() && a.dtype() == b.dtype();
+}
+
+// Runs a binary element-wise `Kernel` for `a` and `b` into `out`.
+template <typename Kernel>
+chainerx::Array RunBinaryKernel(const chainerx::Array& a, const chainerx::Array& b, const chainerx::Array& out) {
+    a.device().backend().CallKernel<Kernel>(a.BroadcastTo(out.shape()), b.BroadcastTo(out.shape()), out);
+    return out;
+}
+
 }  // namespace
 
 chainerx::Array AddOp::RunImpl(ChxVMState* st, const chainerx::Array& a, const chainerx::Array& b) {
+    if (CanStoreResult(a, b) && CanOverwriteInput(st, 0, a)) {
+        chainerx::Array c = a;
+        return c += b;
+    }
+    if (CanStoreResult(b, a) && CanOverwriteInput(st, 1, b)) {
+        chainerx::Array c = b;
+        return c += a;
+    }
+    if (CanStoreToArena(a, b)) {
+        if (auto out = GetArenaOutput(st, 0, chainerx::internal::BroadcastShapes(a.shape(), b.shape()), a.dtype(), a.device())) {
+            return RunBinaryKernel<chainerx::AddKernel>(a, b, *out);
+        }
+    }
     return a + b;
 }
 
 chainerx::Array SubOp::RunImpl(ChxVMState* st, const chainerx::Array& a, const chainerx::Array& b) {
+    if (CanStoreResult(a, b) && CanOverwriteInput(st, 0, a)) {
+        chainerx::Array c = a;
+        return c -= b;
+    }
+    if (CanStoreToArena(a, b)) {
+        if (auto out = GetArenaOutput(st, 0, chainerx::internal::BroadcastShapes(a.shape(), b.shape()), a.dtype(), a.device())) {
+            return RunBinaryKernel<chainerx::SubtractKernel>(a, b, *out);
+        }
+    }
     return a - b;
 }
 
 chainerx::Array MulOp::RunImpl(ChxVMState* st, const chainerx::Array& a, const chainerx::Array& b) {
+    if (CanStoreResult(a, b) && CanOverwriteInput(st, 0, a)) {
+        chainerx::Array c = a;
+        return c *= b;
+    }
+    if (CanStoreResult(b, a) && CanOverwriteInput(st, 1, b)) {
+        chainerx::Array c = b;
+        return c *= a;
+    }
+    if (CanStoreToArena(a, b)) {
+        if (auto out = GetArenaOutput(st, 0, chainerx::internal::BroadcastShapes(a.shape(), b.shape()), a.dtype(), a.device())) {
+            return RunBinaryKernel<chainerx::MultiplyKernel>(a, b, *out);
+        }
+    }
     return a * b;
 }
 
 chainerx::Array DivOp::RunImpl(ChxVMState* st, const chainerx::Array& a, const chainerx::Array& b) {
+    if (IsFloat(a.dtype()) && CanStoreResult(a, b) && CanOverwriteInput(st, 0, a)) {
+        chainerx::Array c = a;
+        return c /= b;
+    }
+    if (IsFloat(a.dtype()) && CanStoreToArena(a, b)) {
+        if (auto out = GetArenaOutput(st, 0, chainerx::internal::BroadcastShapes(a.shape(), b.shape()), a.dtype(), a.device())) {
+            return RunBinaryKernel<chainerx::DivideKernel>(a, b, *out);
+        }
+    }
     // TODO(hamaji): Come up with a better idea to handle cross device ops.
     if (&a.device() != &b.device() && b.GetTotalSize() == 1) {
         if (IsFloat(a.dtype()) || IsFloat(b.dtype())) {
@@ -102,7 +170,6 @@ chainerx::Array IsInfOp::RunImpl(ChxVMState* st, const chainerx::Array& a) {
         CHECK(false) << "TODO(hamaji): " #op " op not implemented";             \
     }
 
-DEFINE_UNARY_OP(Exp);
 DEFINE_UNARY_OP(Log);
 DEFINE_UNARY_OP(Sqrt);
 DEFINE_UNARY_OP(Reciprocal);
@@ -119,6 +186,16 @@ DEFINE_UNARY_OP(Arccosh);
 DEFINE_UNARY_OP_TODO(Arctanh);
 DEFINE_UNARY_OP(Erf);
 
+chainerx::Array ExpOp::RunImpl(ChxVMState* st, const chainerx::Array& a) {
+    if (IsFloat(a.dtype())) {
+        if (auto out = GetArenaOutput(st, 0, a.shape(), a.dtype(), a.device())) {
+            a.device().backend().CallKernel<chainerx::ExpKernel>(a, *out);
+            return *out;
+        }
+    }
+    return chainerx::Exp(a);
+}
+
 chainerx::Array AbsOp::RunImpl(ChxVMState* st, const chainerx::Array& x) {
     return chainerx::Absolute(x);
 }
@@ -154,11 +231,31 @@ chainerx::Array ClipOp::RunImpl(
 }
 
 chainerx::Array MatMulOp::RunImpl(ChxVMState* st, const chainerx::Array& a, const chainerx::Array& b) {
+    if (a.ndim() == 2 && b.ndim() == 2 && CanStoreToArena(a, b)) {
+        if (auto out = GetArenaOutput(st, 0, {a.shape()[0], b.shape()[1]}, a.dtype(), a.device())) {
+            a.device().backend().CallKernel<chainerx::DotKernel>(a, b, *out);
+            return *out;
+        }
+    }
     return NumpyMatMul(a, b);
 }
 
 chainerx::Array GemmOp::RunImpl(
         ChxVMState* st, const chainerx::Array& a, const chainerx::Array& b, const absl::optional<chainerx::Array>& c) {
+    if (a.ndim() == 2 && b.ndim() == 2 && CanStoreToArena(a, b) && (!c.has_value() || CanStoreToArena(a, *c))) {
+        chainerx::Array xa = trans_a ? chainerx::Transpose(a) : a;
+        chainerx::Array xb = trans_b ? chainerx::Transpose(b) : b;
+        if (auto out = GetArenaOutput(st, 0, {xa.shape()[0], xb.shape()[1]}, a.dtype(), a.device())) {
+            chainerx::Device& device = a.device();
+            device.backend().CallKernel<chainerx::DotKernel>(xa, xb, *out);
+            if (alpha != 1.0) device.backend().CallKernel<chainerx::MultiplyASKernel>(*out, chainerx::Scalar(alpha), *out);
+            if (beta == 0.0 || !c.has_value()) return *out;
+            chainerx::Array xc = *c;
+            if (beta != 1.0) xc = xc * beta;
+            return RunBinaryKernel<chainerx::AddKernel>(*out, xc, *out);
+        }
+    }
+
     if (alpha == 1.0 && beta == 1.0 && !trans_a && trans_b && (!c.has_value() || c->ndim() == 1)) {
         return Linear(a, b, c);
     }
@@ -1,4 +1,10 @@
+#include <algorithm>
+#include <cmath>
+#include <tuple>
+#include <vector>
+
 #include <chainerx/backprop_mode.h>
+#include <chainerx/kernels/linalg.h>
 #include <chainerx/routines/activation.h>
 #include <chainerx/routines/creation.h>
 #include <chainerx/routines/hyperbolic.h>
@@ -62,6 +68,284 @@ private:
     chainerx::Array pmask_, nmask_;
 };
 
+// Whether RNNs can run by the CPU implementations below, which read
+// and write raw buffers of `x` and the parameters.
+bool CanRunRNNOnCpu(const chainerx::Array& x, const std::vector<absl::optional<chainerx::Array>>& params) {
+    if (!IsNativeDevice(&x.device())) return false;
+    if (x.dtype() != chainerx::Dtype::kFloat32 && x.dtype() != chainerx::Dtype::kFloat64) return false;
+    for (const absl::optional<chainerx::Array>& a : params) {
+        if (a.has_value() && (!IsNativeDevice(&a->device()) || a->dtype() != x.dtype())) return false;
+    }
+    return true;
+}
+
+std::vector<int64_t> SequenceLengthsOnHost(const absl::optional<chainerx::Array>& sequence_lens, int64_t batch_size) {
+    std::vector<int64_t> lens;
+    if (!sequence_lens.has_value()) return lens;
+    CHECK_EQ(1, sequence_lens->ndim());
+    CHECK_EQ(batch_size, sequence_lens->shape()[0]);
+    chainerx::Array a = chainerx::AsContiguous(sequence_lens->ToNative().AsType(chainerx::Dtype::kInt64));
+    const int64_t* p = static_cast<const int64_t*>(RawStartPtr(a));
+    lens.assign(p, p + batch_size);
+    return lens;
+}
+
+// Computes X·Wᵀ of all timesteps by a single GEMM. The result is a
+// contiguous [seq_length * batch_size, num_gates * hidden_size] array.
+chainerx::Array ProjectInputs(const chainerx::Array& x, const chainerx::Array& w) {
+    chainerx::Array xs = chainerx::Reshape(x, {x.shape()[0] * x.shape()[1], x.shape()[2]});
+    return chainerx::AsContiguous(chainerx::Dot(xs, chainerx::Transpose(w)));
+}
+
+// Writes a·b to a preallocated `out`.
+void DotTo(const chainerx::Array& a, const chainerx::Array& b, const chainerx::Array& out) {
+    a.device().backend().CallKernel<chainerx::DotKernel>(a, b, out);
+}
+
+chainerx::Array InitialState(
+        const absl::optional<chainerx::Array>& initial, int d, int64_t batch_size, int64_t hidden_size, const chainerx::Array& x) {
+    // States are updated in-place so inputs must be copied.
+    if (initial.has_value()) return chainerx::Copy(initial->At({d}));
+    return chainerx::Zeros({batch_size, hidden_size}, x.dtype(), x.device());
+}
+
+// Packs per-direction arrays into the layout of ONNX outputs.
+chainerx::Array StackDirections(const std::vector<chainerx::Array>& xs, int axis) {
+    if (xs.size() == 1) return chainerx::ExpandDims(xs[0], axis);
+    return chainerx::Stack(xs, axis);
+}
+
+template <typename T>
+T SigmoidScalar(T x) {
+    return 1 / (1 + std::exp(-x));
+}
+
+// Runs a direction of GRU. `h` is updated in-place and `output` is
+// filled for all timesteps.
+template <typename T>
+void RunGRUDirectionCpu(
+        const chainerx::Array& xw,
+        const chainerx::Array& r,
+        const absl::optional<chainerx::Array>& bias,
+        bool linear_before_reset,
+        const std::vector<int64_t>& lens,
+        bool reverse,
+        const chainerx::Array& h,
+        const chainerx::Array& output) {
+    const int64_t seq_length = output.shape()[0];
+    const int64_t batch_size = output.shape()[1];
+    const int64_t hidden_size = output.shape()[2];
+    // Without `linear_before_reset`, the recurrent projection for the
+    // hidden gate depends on the reset gate so it needs another GEMM.
+    const int64_t num_gates = linear_before_reset ? 3 : 2;
+    chainerx::Array rt = chainerx::AsContiguous(chainerx::Transpose(r.At({chainerx::Slice(0, num_gates * hidden_size)})));
+    chainerx::Array gates = chainerx::Empty({batch_size, num_gates * hidden_size}, h.dtype(), h.device());
+    chainerx::Array rt_h, rh, hh;
+    if (!linear_before_reset) {
+        rt_h = chainerx::AsContiguous(chainerx::Transpose(r.At({chainerx::Slice(2 * hidden_size, 3 * hidden_size)})));
+        rh = chainerx::Empty({batch_size, hidden_size}, h.dtype(), h.device());
+        hh = chainerx::Empty({batch_size, hidden_size}, h.dtype(), h.device());
+    }
+
+    const T* xw_ptr = static_cast<const T*>(RawStartPtr(xw));
+    // W biases come first and R biases follow.
+    const T* b_ptr = bias.has_value() ? static_cast<const T*>(RawStartPtr(*bias)) : nullptr;
+    auto wb = [b_ptr](int64_t i) { return b_ptr ? b_ptr[i] : T(0); };
+    auto rb = [b_ptr, hidden_size](int64_t i) { return b_ptr ? b_ptr[3 * hidden_size + i] : T(0); };
+    T* g_ptr = static_cast<T*>(RawStartPtr(gates));
+    T* h_ptr = static_cast<T*>(RawStartPtr(h));
+    T* y_ptr = static_cast<T*>(RawStartPtr(output));
+    T* rh_ptr = linear_before_reset ? nullptr : static_cast<T*>(RawStartPtr(rh));
+    const T* hh_ptr = linear_before_reset ? nullptr : static_cast<const T*>(RawStartPtr(hh));
+
+    for (int64_t t = 0; t < seq_length; ++t) {
+        const int64_t time = reverse ? seq_length - t - 1 : t;
+        DotTo(h, rt, gates);
+
+        // Update and reset gates.
+        for (int64_t bi = 0; bi < batch_size; ++bi) {
+            const T* xg = xw_ptr + (time * batch_size + bi) * 3 * hidden_size;
+            T* g = g_ptr + bi * num_gates * hidden_size;
+            const T* hb = h_ptr + bi * hidden_size;
+            for (int64_t k = 0; k < hidden_size; ++k) {
+                g[k] = SigmoidScalar(xg[k] + g[k] + wb(k) + rb(k));
+                const int64_t ri = hidden_size + k;
+                g[ri] = SigmoidScalar(xg[ri] + g[ri] + wb(ri) + rb(ri));
+                if (!linear_before_reset) rh_ptr[bi * hidden_size + k] = g[ri] * hb[k];
+            }
+        }
+        if (!linear_before_reset) DotTo(rh, rt_h, hh);
+
+        for (int64_t bi = 0; bi < batch_size; ++bi) {
+            T* y = y_ptr + (time * batch_size + bi) * hidden_size;
+            if (!lens.empty() && time >= lens[bi]) {
+                std::fill(y, y + hidden_size, T(0));
+                continue;
+            }
+            const T* xg = xw_ptr + (time * batch_size + bi) * 3 * hidden_size;
+            const T* g = g_ptr + bi * num_gates * hidden_size;
+            T* hb = h_ptr + bi * hidden_size;
+            for (int64_t k = 0; k < hidden_size; ++k) {
+                const int64_t hi = 2 * hidden_size + k;
+                const T z = g[k];
+                T n = xg[hi] + wb(hi);
+                if (linear_before_reset) {
+                    n += g[hidden_size + k] * (g[hi] + rb(hi));
+                } else {
+                    n += hh_ptr[bi * hidden_size + k] + rb(hi);
+                }
+                n = std::tanh(n);
+                hb[k] = (1 - z) * n + z * hb[k];
+                y[k] = hb[k];
+            }
+        }
+    }
+}
+
+std::tuple<chainerx::Array, chainerx::Array> GRUCpu(
+        const chainerx::Array& x,
+        const chainerx::Array& w,
+        const chainerx::Array& r,
+        const absl::optional<chainerx::Array>& b,
+        const absl::optional<chainerx::Array>& sequence_lens,
+        const absl::optional<chainerx::Array>& initial_h,
+        bool linear_before_reset,
+        int direction) {
+    const int64_t seq_length = x.shape()[0];
+    const int64_t batch_size = x.shape()[1];
+    const int64_t hidden_size = r.shape()[2];
+    const int num_direction = w.shape()[0];
+    const std::vector<int64_t> lens = SequenceLengthsOnHost(sequence_lens, batch_size);
+
+    std::vector<chainerx::Array> outputs, hs;
+    for (int d = 0; d < num_direction; ++d) {
+        chainerx::Array xw = ProjectInputs(x, w.At({d}));
+        absl::optional<chainerx::Array> bias;
+        if (b.has_value()) bias = chainerx::AsContiguous(b->At({d}));
+        chainerx::Array h = InitialState(initial_h, d, batch_size, hidden_size, x);
+        chainerx::Array output = chainerx::Empty({seq_length, batch_size, hidden_size}, x.dtype(), x.device());
+        const bool reverse = direction == 1 || d == 1;
+        if (x.dtype() == chainerx::Dtype::kFloat32) {
+            RunGRUDirectionCpu<float>(xw, r.At({d}), bias, linear_before_reset, lens, reverse, h, output);
+        } else {
+            RunGRUDirectionCpu<double>(xw, r.At({d}), bias, linear_before_reset, lens, reverse, h, output);
+        }
+        outputs.push_back(output);
+        hs.push_back(h);
+    }
+    return std::make_tuple(StackDirections(outputs, 1), StackDirections(hs, 0));
+}
+
+// Runs a direction of LSTM. `h` and `c` are updated in-place and
+// `output` is filled for all timesteps.
+template <typename T>
+void RunLSTMDirectionCpu(
+        const chainerx::Array& xw,
+        const chainerx::Array& r,
+        const absl::optional<chainerx::Array>& bias,
+        const absl::optional<chainerx::Array>& peephole,
+        const std::vector<int64_t>& lens,
+        bool reverse,
+        const chainerx::Array& h,
+        const chainerx::Array& c,
+        const chainerx::Array& output) {
+    const int64_t seq_length = output.shape()[0];
+    const int64_t batch_size = output.shape()[1];
+    const int64_t hidden_size = output.shape()[2];
+    chainerx::Array rt = chainerx::AsContiguous(chainerx::Transpose(r));
+    chainerx::Array gates = chainerx::Empty({batch_size, 4 * hidden_size}, h.dtype(), h.device());
+
+    const T* xw_ptr = static_cast<const T*>(RawStartPtr(xw));
+    const T* b_ptr = bias.has_value() ? static_cast<const T*>(RawStartPtr(*bias)) : nullptr;
+    const T* p_ptr = peephole.has_value() ? static_cast<const T*>(RawStartPtr(*peephole)) : nullptr;
+    const T* g_ptr = static_cast<const T*>(RawStartPtr(gates));
+    T* h_ptr = static_cast<T*>(RawStartPtr(h));
+    T* c_ptr = static_cast<T*>(RawStartPtr(c));
+    T* y_ptr = static_cast<T*>(RawStartPtr(output));
+
+    for (int64_t t = 0; t < seq_length; ++t) {
+        const int64_t time = reverse ? seq_length - t - 1 : t;
+        DotTo(h, rt, gates);
+
+        for (int64_t bi = 0; bi < batch_size; ++bi) {
+            T* y = y_ptr + (time * batch_size + bi) * hidden_size;
+            if (!lens.empty() && time >= lens[bi]) {
+                std::fill(y, y + hidden_size, T(0));
+                continue;
+            }
+            const T* xg = xw_ptr + (time * batch_size + bi) * 4 * hidden_size;
+            const T* g = g_ptr + bi * 4 * hidden_size;
+            T* hb = h_ptr + bi * hidden_size;
+            T* cb = c_ptr + bi * hidden_size;
+            for (int64_t k = 0; k < hidden_size; ++k) {
+                // Gates are in the order of i, o, f, and c.
+                T gi = xg[k] + g[k];
+                T go = xg[hidden_size + k] + g[hidden_size + k];
+                T gf = xg[2 * hidden_size + k] + g[2 * hidden_size + k];
+                T gc = xg[3 * hidden_size + k] + g[3 * hidden_size + k];
+                if (b_ptr) {
+                    gi += b_ptr[k];
+                    go += b_ptr[hidden_size + k];
+                    gf += b_ptr[2 * hidden_size + k];
+                    gc += b_ptr[3 * hidden_size + k];
+                }
+                const T pc = cb[k];
+                if (p_ptr) {
+                    gi += p_ptr[k] * pc;
+                    go += p_ptr[hidden_size + k] * pc;
+                    gf += p_ptr[2 * hidden_size + k] * pc;
+                }
+                const T nc = SigmoidScalar(gf) * pc + SigmoidScalar(gi) * std::tanh(gc);
+                cb[k] = nc;
+                hb[k] = SigmoidScalar(go) * std::tanh(nc);
+                y[k] = hb[k];
+            }
+        }
+    }
+}
+
+std::tuple<chainerx::Array, chainerx::Array, chainerx::Array> LSTMCpu(
+        const chainerx::Array& x,
+        const chainerx::Array& w,
+        const chainerx::Array& r,
+        const absl::optional<chainerx::Array>& b,
+        const absl::optional<chainerx::Array>& sequence_lens,
+        const absl::optional<chainerx::Array>& initial_h,
+        const absl::optional<chainerx::Array>& initial_c,
+        const absl::optional<chainerx::Array>& p,
+        int direction) {
+    const int64_t seq_length = x.shape()[0];
+    const int64_t batch_size = x.shape()[1];
+    const int64_t hidden_size = r.shape()[2];
+    const int num_direction = w.shape()[0];
+    const std::vector<int64_t> lens = SequenceLengthsOnHost(sequence_lens, batch_size);
+
+    std::vector<chainerx::Array> outputs, hs, cs;
+    for (int d = 0; d < num_direction; ++d) {
+        chainerx::Array xw = ProjectInputs(x, w.At({d}));
+        absl::optional<chainerx::Array> bias;
+        if (b.has_value()) {
+            chainerx::Array bs = b->At({d});
+            bias = bs.At({chainerx::Slice(0, 4 * hidden_size)}) + bs.At({chainerx::Slice(4 * hidden_size, 8 * hidden_size)});
+        }
+        absl::optional<chainerx::Array> peephole;
+        if (p.has_value()) peephole = chainerx::AsContiguous(p->At({d}));
+        chainerx::Array h = InitialState(initial_h, d, batch_size, hidden_size, x);
+        chainerx::Array c = InitialState(initial_c, d, batch_size, hidden_size, x);
+        chainerx::Array output = chainerx::Empty({seq_length, batch_size, hidden_size}, x.dtype(), x.device());
+        const bool reverse = direction == 1 || d == 1;
+        if (x.dtype() == chainerx::Dtype::kFloat32) {
+            RunLSTMDirectionCpu<float>(xw, r.At({d}), bias, peephole, lens, reverse, h, c, output);
+        } else {
+            RunLSTMDirectionCpu<double>(xw, r.At({d}), bias, peephole, lens, reverse, h, c, output);
+        }
+        outputs.push_back(output);
+        hs.push_back(h);
+        cs.push_back(c);
+    }
+    return std::make_tuple(StackDirections(outputs, 1), StackDirections(hs, 0), StackDirections(cs, 0));
+}
+
 }  // namespace
 
 std::tuple<chainerx::Array, chainerx::Array> RNNOp::RunImpl(
@@ -150,6 +434,10 @@ std::tuple<chainerx::Array, chainerx::Array> GRUOp::RunImpl(
         WARN_ONCE("Bidirectional GRU has huge error");
     }
 
+    if (CanRunRNNOnCpu(x, {w, r, b, initial_h})) {
+        return GRUCpu(x, w, r, b, sequence_lens, initial_h, linear_before_reset, direction);
+    }
+
     SequenceLengthMask mask(sequence_lens, x.dtype(), seq_length, batch_size);
     chainerx::Array outputs[2];
     chainerx::Array hs[2];
@@ -237,10 +525,6 @@ std::tuple<chainerx::Array, chainerx::Array, chainerx::Array, ChxVMOpaque*> LSTM
     }
 #endif  // CHAINER_COMPILER_ENABLE_CUDNN
 
-    std::vector<chainerx::Array> xs = {x, w, r};
-    if (b.has_value()) xs.push_back(*b);
-    std::unique_ptr<BackwardContext> bwd(new BackwardContext("LSTM", xs));
-    chainerx::ForceBackpropModeScope bp_scope{bwd->backprop_id()};
     // X: [seq_length, batch_size, input_size]
     // W: [num_directions, 4 * hidden_size, input_size]
     // R: [num_directions, 4 * hidden_size, hidden_size]
@@ -261,6 +545,23 @@ std::tuple<chainerx::Array, chainerx::Array, chainerx::Array, ChxVMOpaque*> LSTM
         WARN_ONCE("Reverse LSTM is not tested yet");
     }
 
+    // The graph for backprop is recorded only when LSTMGrad consumes
+    // `ctx`, which is not emitted for inference.
+    if (ctx < 0 && CanRunRNNOnCpu(x, {w, r, b, initial_h, initial_c, p})) {
+        chainerx::Array output, h, c;
+        std::tie(output, h, c) = LSTMCpu(x, w, r, b, sequence_lens, initial_h, initial_c, p, direction);
+        return std::make_tuple(output, h, c, nullptr);
+    }
+
+    std::unique_ptr<BackwardContext> bwd;
+    absl::optional<chainerx::ForceBackpropModeScope> bp_scope;
+    if (ctx >= 0) {
+        std::vector<chainerx::Array> xs = {x, w, r};
+        if (b.has_value()) xs.push_back(*b);
+        bwd.reset(new BackwardContext("LSTM", xs));
+        bp_scope.emplace(bwd->backprop_id());
+    }
+
     SequenceLengthMask mask(sequence_lens, x.dtype(), seq_length, batch_size);
     chainerx::Array outputs[2];
     chainerx::Array hs[2];
@@ -339,6 +640,10 @@ std::tuple<chainerx::Array, chainerx::Array, chainerx::Array, ChxVMOpaque*> LSTM
         c = chainerx::Stack({cs[0], cs[1]}, 0);
     }
 
+    if (!bwd) {
+        return std::make_tuple(output, h, c, nullptr);
+    }
+
     if (st->options().dump_memory_usage >= 1) {
         WARN_ONCE("Retained arrays for LSTM on CPU is inaccurate");
         std::vector<chainerx::Array> retained_arrays = {x, w, r, output, h, c};
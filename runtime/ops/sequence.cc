@@ -22,11 +22,18 @@ int64_t GetOptionalInt(const absl::optional<StrictScalar>& array, int64_t defaul
 }  // namespace
 
 void SequenceClearOp::RunImpl(ChxVMState* st) {
-    st->GetSequence(seq)->clear();
+    st->GetMutableSequence(seq)->clear();
 }
 
 void SequenceAppendOp::RunImpl(ChxVMState* st) {
-    st->GetSequence(seq)->emplace_back(*st->GetVar(value));
+    st->GetMutableSequence(seq)->emplace_back(*st->GetVar(value));
+}
+
+void SequenceAppendAllOp::RunImpl(ChxVMState* st) {
+    // Holds `values` so appending to the same sequence copies it first.
+    const ChxVMVar values_var(*st->GetVar(values));
+    ChxVMSequence* s = st->GetMutableSequence(seq);
+    for (const ChxVMVar& v : *values_var.GetSequence()) s->push_back(v);
 }
 
 void SequenceInsertOp::RunImpl(
@@ -49,7 +56,7 @@ void SequencePopOp::RunImpl(ChxVMState* st) {
         st->SetVar(output, ChxVMVar());
         return;
     }
-    ChxVMSequence* v = st->GetSequence(seq);
+    ChxVMSequence* v = st->GetMutableSequence(seq);
     CHECK(!v->empty());
     st->SetVar(output, v->back());
     v->pop_back();
@@ -255,8 +262,9 @@ void SequenceLengthsOp::RunImpl(ChxVMState* st, const ChxVMSequence& seq, ChxVMS
     }
 }
 
-void SequenceCopyOp::RunImpl(ChxVMState* st, const ChxVMSequence& seq, ChxVMSequence* output) {
-    *output = seq;
+void SequenceCopyOp::RunImpl(ChxVMState* st) {
+    // The sequence is shared until either of them is updated.
+    st->SetVar(output, *st->GetVar(seq));
 }
 
 void SequenceMoveOp::RunImpl(ChxVMState* st) {
@@ -265,10 +273,11 @@ void SequenceMoveOp::RunImpl(ChxVMState* st) {
         st->SetVar(output, ChxVMVar());
         return;
     }
-    ChxVMSequence* s = st->GetSequence(seq);
-    ChxVMSequence* d = st->CreateSequence(output);
-    CHECK(d->empty());
-    std::swap(*d, *s);
+    // Hand the sequence over so `output` does not share it with `seq`.
+    ChxVMVar* s = st->GetVar(seq);
+    CHECK_EQ(ChxVMVar::Kind::kSequence, s->kind());
+    st->SetVar(output, *s);
+    *s = ChxVMVar(std::make_shared<ChxVMSequence>());
 }
 
 }  // namespace runtime
@@ -0,0 +1,90 @@
+#include "runtime/profiler.h"
+
+#include <algorithm>
+#include <iomanip>
+#include <sstream>
+
+namespace chainer_compiler {
+namespace runtime {
+
+namespace {
+
+template <class Map>
+std::vector<typename Map::const_iterator> SortByTotalTime(const Map& stats) {
+    std::vector<typename Map::const_iterator> sorted;
+    for (auto it = stats.begin(); it != stats.end(); ++it) {
+        sorted.push_back(it);
+    }
+    std::stable_sort(sorted.begin(), sorted.end(), [](auto lhs, auto rhs) { return lhs->second.total_usec > rhs->second.total_usec; });
+    return sorted;
+}
+
+void PrintStats(const ChxVMProfiler::Stats& stats, double total_usec, std::ostream& os) {
+    os << std::setw(8) << stats.count << std::setw(12) << stats.total_usec / 1000 << std::setw(7)
+       << (total_usec > 0 ? stats.total_usec * 100 / total_usec : 0) << "%" << std::setw(12) << stats.mean_usec() << std::setw(12)
+       << stats.max_usec << std::setw(10) << stats.gflops_per_sec() << std::setw(12) << stats.output_bytes / stats.count / 1024;
+}
+
+}  // namespace
+
+void ChxVMProfiler::Stats::Add(double usec, int64_t f, int64_t b) {
+    ++count;
+    total_usec += usec;
+    max_usec = std::max(max_usec, usec);
+    flops += f;
+    output_bytes += b;
+}
+
+void ChxVMProfiler::Add(
+        int64_t id, int pc, const std::string& op_type, const std::string& debug_info, double usec, int64_t flops, int64_t bytes) {
+    op_type_stats_[op_type].Add(usec, flops, bytes);
+    InstructionStats& stats = instruction_stats_[pc];
+    if (!stats.count) {
+        stats.pc = pc;
+        stats.id = id;
+        stats.op_type = op_type;
+        stats.debug_info = debug_info;
+    }
+    stats.Add(usec, flops, bytes);
+}
+
+void ChxVMProfiler::Reset() {
+    op_type_stats_.clear();
+    instruction_stats_.clear();
+}
+
+double ChxVMProfiler::total_usec() const {
+    double total = 0;
+    for (const auto& p : op_type_stats_) {
+        total += p.second.total_usec;
+    }
+    return total;
+}
+
+std::string ChxVMProfiler::ToTable(int max_instructions) const {
+    const double total = total_usec();
+    std::ostringstream oss;
+    oss << std::fixed << std::setprecision(2);
+    const char* kHeader = "   count    total_ms  ratio   mean_usec    max_usec   GFLOP/s  out_kb/run";
+
+    oss << std::left << std::setw(24) << "op_type" << std::right << kHeader << "\n";
+    for (auto it : SortByTotalTime(op_type_stats_)) {
+        oss << std::left << std::setw(24) << it->first << std::right;
+        PrintStats(it->second, total, oss);
+        oss << "\n";
+    }
+
+    oss << "\n" << std::left << std::setw(6) << "pc" << std::setw(18) << "op_type" << std::right << kHeader << "  debug_info\n";
+    int num_rows = 0;
+    for (auto it : SortByTotalTime(instruction_stats_)) {
+        if (num_rows++ >= max_instructions) break;
+        const InstructionStats& stats = it->second;
+        oss << std::left << std::setw(6) << stats.pc << std::setw(18) << stats.op_type << std::right;
+        PrintStats(stats, total, oss);
+        oss << "  " << stats.debug_info << "\n";
+    }
+    return oss.str();
+}
+
+}  // namespace runtime
+}  // namespace chainer_compiler
@@ -0,0 +1,69 @@
+#pragma once
+
+#include <cstdint>
+#include <map>
+#include <string>
+
+namespace chainer_compiler {
+namespace runtime {
+
+// Aggregates elapsed times of ChxVM ops per op type and per
+// instruction. Unlike ChromeTracingEmitter, memory usage does not grow
+// with the number of runs.
+class ChxVMProfiler {
+public:
+    struct Stats {
+        int64_t count{0};
+        double total_usec{0};
+        double max_usec{0};
+        // FLOPs estimated by the compiler and bytes of output arrays,
+        // summed over all runs.
+        int64_t flops{0};
+        int64_t output_bytes{0};
+
+        double mean_usec() const {
+            return count ? total_usec / count : 0;
+        }
+
+        double gflops_per_sec() const {
+            return total_usec > 0 ? flops / total_usec / 1000 : 0;
+        }
+
+        void Add(double usec, int64_t flops, int64_t bytes);
+    };
+
+    struct InstructionStats : public Stats {
+        int pc{-1};
+        // The ID of the node in the compiler, which may not be unique.
+        int64_t id{-1};
+        std::string op_type;
+        std::string debug_info;
+    };
+
+    void Add(int64_t id, int pc, const std::string& op_type, const std::string& debug_info, double usec, int64_t flops, int64_t bytes);
+
+    // Drops all stats, e.g., after warmup runs.
+    void Reset();
+
+    const std::map<std::string, Stats>& op_type_stats() const {
+        return op_type_stats_;
+    }
+
+    // Keyed by program counters.
+    const std::map<int, InstructionStats>& instruction_stats() const {
+        return instruction_stats_;
+    }
+
+    double total_usec() const;
+
+    // Returns tables of op types and the top `max_instructions`
+    // instructions sorted by their total elapsed times.
+    std::string ToTable(int max_instructions = 20) const;
+
+private:
+    std::map<std::string, Stats> op_type_stats_;
+    std::map<int, InstructionStats> instruction_stats_;
+};
+
+}  // namespace runtime
+}  // namespace chainer_compiler
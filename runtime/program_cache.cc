@@ -0,0 +1,185 @@
+#include "runtime/program_cache.h"
+
+#include <algorithm>
+
+#include <chainerx/array.h>
+#include <chainerx/array_index.h>
+#include <chainerx/routines/creation.h>
+#include <chainerx/routines/manipulation.h>
+#include <chainerx/slice.h>
+
+#include <common/log.h>
+#include <runtime/chxvm_var.h>
+
+namespace chainer_compiler {
+namespace runtime {
+
+namespace {
+
+chainerx::Array PadArray(chainerx::Array a, const chainerx::Shape& shape) {
+    CHECK_EQ(a.ndim(), shape.ndim());
+    for (int i = 0; i < a.ndim(); ++i) {
+        if (a.shape()[i] == shape[i]) {
+            continue;
+        }
+        CHECK_LT(a.shape()[i], shape[i]);
+        chainerx::Shape pad_shape = a.shape();
+        pad_shape[i] = shape[i] - a.shape()[i];
+        chainerx::Array pad = chainerx::Zeros(pad_shape, a.dtype(), a.device());
+        a = chainerx::Concatenate({a, pad}, i);
+    }
+    return a;
+}
+
+}  // namespace
+
+chainerx::Shape BucketShape(const chainerx::Shape& shape, const std::vector<int64_t>& boundaries, const std::set<int>& axes) {
+    chainerx::Shape bucket = shape;
+    for (int i = 0; i < shape.ndim(); ++i) {
+        if (!axes.count(i)) {
+            continue;
+        }
+        auto found = std::lower_bound(boundaries.begin(), boundaries.end(), shape[i]);
+        if (found != boundaries.end()) {
+            bucket[i] = *found;
+        }
+    }
+    return bucket;
+}
+
+ProgramCache::ProgramCache(
+        CompileFunc compile,
+        int capacity,
+        const std::vector<int64_t>& bucket_boundaries,
+        const std::set<int>& bucket_axes,
+        const std::set<std::string>& fixed_inputs,
+        const UnpadAxes& unpad_axes)
+    : compile_(compile),
+      capacity_(capacity),
+      bucket_boundaries_(bucket_boundaries),
+      bucket_axes_(bucket_axes),
+      fixed_inputs_(fixed_inputs),
+      unpad_axes_(unpad_axes) {
+    CHECK_LT(0, capacity_);
+    CHECK(std::is_sorted(bucket_boundaries_.begin(), bucket_boundaries_.end())) << "Bucket boundaries must be sorted";
+    CHECK(bucket_boundaries_.empty() || !bucket_axes_.empty()) << "No axes are specified for shape buckets";
+}
+
+std::shared_ptr<ChxVM> ProgramCache::Get(InOuts* inputs) {
+    Key key;
+    InputShapes shapes;
+    for (auto& p : *inputs) {
+        const std::string& name = p.first;
+        if (fixed_inputs_.count(name)) {
+            continue;
+        }
+        const ChxVMVar& var = *p.second;
+        if (var.kind() != ChxVMVar::Kind::kArray) {
+            // Only kinds of non-array inputs matter.
+            key.emplace_back(name, -1 - static_cast<int>(var.kind()), std::vector<int64_t>());
+            continue;
+        }
+        const chainerx::Array& a = var.GetArray();
+        chainerx::Shape shape = BucketShape(a.shape(), bucket_boundaries_, bucket_axes_);
+        if (shape != a.shape()) {
+            p.second = std::make_shared<ChxVMVar>(PadArray(a, shape));
+        }
+        key.emplace_back(name, static_cast<int>(a.dtype()), std::vector<int64_t>(shape.begin(), shape.end()));
+        shapes.emplace(name, shape);
+    }
+
+    auto find = [this, &key]() -> std::shared_ptr<ChxVM> {
+        std::lock_guard<std::mutex> lock(mu_);
+        auto found = index_.find(key);
+        if (found == index_.end()) {
+            return nullptr;
+        }
+        ++num_hits_;
+        entries_.splice(entries_.begin(), entries_, found->second);
+        return found->second->second;
+    };
+    if (std::shared_ptr<ChxVM> chxvm = find()) {
+        return chxvm;
+    }
+
+    std::lock_guard<std::mutex> compile_lock(compile_mu_);
+    // Another thread may have compiled the program meanwhile.
+    if (std::shared_ptr<ChxVM> chxvm = find()) {
+        return chxvm;
+    }
+    std::shared_ptr<ChxVM> chxvm = compile_(shapes);
+    CHECK(chxvm);
+
+    std::lock_guard<std::mutex> lock(mu_);
+    ++num_misses_;
+    entries_.emplace_front(key, chxvm);
+    index_.emplace(key, entries_.begin());
+    while (static_cast<int>(entries_.size()) > capacity_) {
+        ++num_evictions_;
+        CHECK_EQ(1, index_.erase(entries_.back().first));
+        entries_.pop_back();
+    }
+    return chxvm;
+}
+
+InOuts ProgramCache::Run(const InOuts& inputs, const ChxVMOptions& options) {
+    InOuts padded_inputs(inputs);
+    std::shared_ptr<ChxVM> chxvm = Get(&padded_inputs);
+    InOuts outputs = chxvm->Run(padded_inputs, options);
+
+    for (const auto& p : unpad_axes_) {
+        const std::string& name = p.first;
+        auto found = outputs.find(name);
+        CHECK(found != outputs.end()) << "Unknown output to unpad: " << name;
+        if (found->second->kind() != ChxVMVar::Kind::kArray) {
+            continue;
+        }
+        const chainerx::Array& a = found->second->GetArray();
+        std::vector<chainerx::ArrayIndex> indices(a.ndim(), chainerx::Slice());
+        bool padded = false;
+        for (const auto& q : p.second) {
+            const int axis = q.first;
+            const std::string& input_name = q.second.first;
+            const int input_axis = q.second.second;
+            CHECK_LT(axis, a.ndim()) << "Output " << name << " has no axis " << axis;
+            auto input = inputs.find(input_name);
+            CHECK(input != inputs.end()) << "Unknown input for unpadding " << name << ": " << input_name;
+            const int64_t extent = input->second->GetArray().shape()[input_axis];
+            const int64_t padded_extent = padded_inputs[input_name]->GetArray().shape()[input_axis];
+            if (extent == padded_extent) {
+                continue;
+            }
+            CHECK_EQ(padded_extent, a.shape()[axis])
+                    << "Axis " << axis << " of output " << name << " does not follow axis " << input_axis << " of input " << input_name;
+            indices[axis] = chainerx::Slice(0, extent);
+            padded = true;
+        }
+        if (padded) {
+            found->second = std::make_shared<ChxVMVar>(a.At(indices));
+        }
+    }
+    return outputs;
+}
+
+int64_t ProgramCache::num_hits() const {
+    std::lock_guard<std::mutex> lock(mu_);
+    return num_hits_;
+}
+
+int64_t ProgramCache::num_misses() const {
+    std::lock_guard<std::mutex> lock(mu_);
+    return num_misses_;
+}
+
+int64_t ProgramCache::num_evictions() const {
+    std::lock_guard<std::mutex> lock(mu_);
+    return num_evictions_;
+}
+
+int ProgramCache::size() const {
+    std::lock_guard<std::mutex> lock(mu_);
+    return entries_.size();
+}
+
+}  // namespace runtime
+}  // namespace chainer_compiler
@@ -0,0 +1,97 @@
+#pragma once
+
+#include <cstdint>
+#include <functional>
+#include <list>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <set>
+#include <string>
+#include <tuple>
+#include <utility>
+#include <vector>
+
+#include <chainerx/shape.h>
+
+#include <runtime/chxvm.h>
+
+namespace chainer_compiler {
+namespace runtime {
+
+// Rounds up each dimension in `axes` of `shape` to the smallest
+// boundary which is not smaller than it. Dimensions larger than all
+// boundaries are kept as is.
+chainerx::Shape BucketShape(const chainerx::Shape& shape, const std::vector<int64_t>& boundaries, const std::set<int>& axes);
+
+// A cache of ChxVM programs specialized for shapes of their inputs.
+//
+// Input arrays are padded with zeros to the shape bucket decided by
+// `bucket_boundaries` and `bucket_axes` so inputs in the same bucket
+// share a program. Outputs are computed for padded inputs, so models
+// must tolerate the padding (e.g., masked sequences). Outputs are
+// returned padded unless `unpad_axes` declares which axis of an input
+// each axis of an output follows, in which case `Run` slices the
+// output axis back to the original extent of the input axis. Without
+// boundaries, programs are cached for exact input shapes. The least
+// recently used program is evicted when more than `capacity` programs
+// are cached.
+class ProgramCache {
+public:
+    typedef std::map<std::string, chainerx::Shape> InputShapes;
+    // Compiles a program for inputs with `shapes`.
+    typedef std::function<std::shared_ptr<ChxVM>(const InputShapes& shapes)> CompileFunc;
+    // Maps names of outputs to maps from their axes to pairs of the
+    // name of an input and its axis.
+    typedef std::map<std::string, std::map<int, std::pair<std::string, int>>> UnpadAxes;
+
+    ProgramCache(
+            CompileFunc compile,
+            int capacity,
+            const std::vector<int64_t>& bucket_boundaries = {},
+            const std::set<int>& bucket_axes = {},
+            const std::set<std::string>& fixed_inputs = {},
+            const UnpadAxes& unpad_axes = {});
+
+    // Pads `inputs` to their shape bucket and returns a program for
+    // them. Inputs in `fixed_inputs` (e.g., parameters) are neither
+    // padded nor used as the key. Programs are compiled without
+    // blocking runs of cached programs.
+    std::shared_ptr<ChxVM> Get(InOuts* inputs);
+
+    // Runs a program for `inputs` and slices padding off axes of
+    // outputs in `unpad_axes`.
+    InOuts Run(const InOuts& inputs, const ChxVMOptions& options);
+
+    int64_t num_hits() const;
+    int64_t num_misses() const;
+    int64_t num_evictions() const;
+    int size() const;
+
+private:
+    ProgramCache(const ProgramCache&) = delete;
+    ProgramCache& operator=(const ProgramCache&) = delete;
+
+    typedef std::vector<std::tuple<std::string, int, std::vector<int64_t>>> Key;
+    typedef std::list<std::pair<Key, std::shared_ptr<ChxVM>>> Entries;
+
+    const CompileFunc compile_;
+    const int capacity_;
+    const std::vector<int64_t> bucket_boundaries_;
+    const std::set<int> bucket_axes_;
+    const std::set<std::string> fixed_inputs_;
+    const UnpadAxes unpad_axes_;
+
+    // Serializes compiles, which may update global flags.
+    std::mutex compile_mu_;
+    mutable std::mutex mu_;
+    // The most recently used program comes first.
+    Entries entries_;
+    std::map<Key, Entries::iterator> index_;
+    int64_t num_hits_{0};
+    int64_t num_misses_{0};
+    int64_t num_evictions_{0};
+};
+
+}  // namespace runtime
+}  // namespace chainer_compiler
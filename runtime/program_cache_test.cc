@@ -0,0 +1,147 @@
+#include <gtest/gtest.h>
+
+#include <chainerx/array.h>
+#include <chainerx/testing/array.h>
+#include <chainerx/testing/array_check.h>
+#include <chainerx/testing/context_session.h>
+
+#include <compiler/chxvm/chxvm_value.h>
+#include <compiler/gen_chxvm_codegen.h>
+#include <runtime/chxvm.pb.h>
+#include <runtime/chxvm_var.h>
+#include <runtime/program_cache.h>
+
+namespace chainer_compiler {
+namespace runtime {
+namespace {
+
+std::shared_ptr<ChxVM> CompileIdentity(const ProgramCache::InputShapes& shapes) {
+    ChxVMProgramProto program;
+    chxvm::AddInOp(&program, chxvm::ChxVMValue(0), "in");
+    chxvm::AddIdentityOp(&program, chxvm::ChxVMValue(1), 0);
+    chxvm::AddOutOp(&program, "out", 1);
+    return std::make_shared<ChxVM>(program);
+}
+
+InOuts MakeInputs(const chainerx::Array& a) {
+    InOuts inputs;
+    inputs.emplace("in", std::make_shared<ChxVMVar>(a));
+    return inputs;
+}
+
+TEST(ProgramCacheTest, BucketShape) {
+    const std::vector<int64_t> boundaries = {8, 16, 32};
+    EXPECT_EQ(chainerx::Shape({3, 8}), BucketShape({3, 5}, boundaries, {1}));
+    EXPECT_EQ(chainerx::Shape({3, 16}), BucketShape({3, 16}, boundaries, {1}));
+    EXPECT_EQ(chainerx::Shape({8, 32}), BucketShape({3, 17}, boundaries, {0, 1}));
+    EXPECT_EQ(chainerx::Shape({3, 40}), BucketShape({3, 40}, boundaries, {1}));
+}
+
+TEST(ProgramCacheTest, LRU) {
+    chainerx::testing::ContextSession sess;
+
+    int num_compiles = 0;
+    ProgramCache cache(
+            [&num_compiles](const ProgramCache::InputShapes& shapes) {
+                ++num_compiles;
+                return CompileIdentity(shapes);
+            },
+            2);
+
+    chainerx::Array a = chainerx::testing::BuildArray({2}).WithData<float>({1, 2});
+    chainerx::Array b = chainerx::testing::BuildArray({3}).WithData<float>({1, 2, 3});
+    chainerx::Array c = chainerx::testing::BuildArray({4}).WithData<float>({1, 2, 3, 4});
+
+    InOuts outputs = cache.Run(MakeInputs(a), ChxVMOptions());
+    EXPECT_ARRAY_EQ(a, outputs["out"]->GetArray());
+    cache.Run(MakeInputs(b), ChxVMOptions());
+    cache.Run(MakeInputs(a), ChxVMOptions());
+    EXPECT_EQ(2, num_compiles);
+    EXPECT_EQ(1, cache.num_hits());
+    EXPECT_EQ(2, cache.num_misses());
+
+    // `b` is the least recently used one.
+    cache.Run(MakeInputs(c), ChxVMOptions());
+    EXPECT_EQ(1, cache.num_evictions());
+    EXPECT_EQ(2, cache.size());
+    cache.Run(MakeInputs(a), ChxVMOptions());
+    EXPECT_EQ(3, num_compiles);
+    cache.Run(MakeInputs(b), ChxVMOptions());
+    EXPECT_EQ(4, num_compiles);
+    EXPECT_EQ(2, cache.num_hits());
+    EXPECT_EQ(4, cache.num_misses());
+}
+
+TEST(ProgramCacheTest, Bucket) {
+    chainerx::testing::ContextSession sess;
+
+    std::vector<chainerx::Shape> compiled_shapes;
+    ProgramCache cache(
+            [&compiled_shapes](const ProgramCache::InputShapes& shapes) {
+                compiled_shapes.push_back(shapes.at("in"));
+                return CompileIdentity(shapes);
+            },
+            4,
+            {4, 8},
+            {1},
+            {},
+            {{"out", {{1, {"in", 1}}}}});
+
+    chainerx::Array a = chainerx::testing::BuildArray({1, 3}).WithData<float>({1, 2, 3});
+    chainerx::Array b = chainerx::testing::BuildArray({1, 2}).WithData<float>({4, 5});
+    // Programs see padded inputs but outputs are sliced back.
+    InOuts padded_inputs = MakeInputs(a);
+    cache.Get(&padded_inputs);
+    chainerx::Array e = chainerx::testing::BuildArray({1, 4}).WithData<float>({1, 2, 3, 0});
+    EXPECT_ARRAY_EQ(e, padded_inputs["in"]->GetArray());
+    InOuts outputs = cache.Run(MakeInputs(b), ChxVMOptions());
+    EXPECT_ARRAY_EQ(b, outputs["out"]->GetArray());
+    outputs = cache.Run(MakeInputs(a), ChxVMOptions());
+    EXPECT_ARRAY_EQ(a, outputs["out"]->GetArray());
+
+    ASSERT_EQ(1, compiled_shapes.size());
+    EXPECT_EQ(chainerx::Shape({1, 4}), compiled_shapes[0]);
+    EXPECT_EQ(2, cache.num_hits());
+    EXPECT_EQ(1, cache.num_misses());
+}
+
+TEST(ProgramCacheTest, UnpadOnlyDeclaredAxes) {
+    chainerx::testing::ContextSession sess;
+
+    auto compile = [](const ProgramCache::InputShapes& shapes) {
+        ChxVMProgramProto program;
+        chxvm::AddInOp(&program, chxvm::ChxVMValue(0), "in");
+        chxvm::AddInOp(&program, chxvm::ChxVMValue(1), "w");
+        chxvm::AddIdentityOp(&program, chxvm::ChxVMValue(2), 0);
+        chxvm::AddIdentityOp(&program, chxvm::ChxVMValue(3), 1);
+        chxvm::AddOutOp(&program, "out", 2);
+        chxvm::AddOutOp(&program, "logits", 3);
+        return std::make_shared<ChxVM>(program);
+    };
+
+    chainerx::Array a = chainerx::testing::BuildArray({1, 3}).WithData<float>({1, 2, 3});
+    // The extent of `w` equals the bucket of `a` by coincidence.
+    chainerx::Array w = chainerx::testing::BuildArray({1, 4}).WithData<float>({6, 7, 8, 9});
+    InOuts inputs = MakeInputs(a);
+    inputs.emplace("w", std::make_shared<ChxVMVar>(w));
+
+    {
+        ProgramCache cache(compile, 1, {4, 8}, {1}, {"w"}, {{"out", {{1, {"in", 1}}}}});
+        InOuts outputs = cache.Run(inputs, ChxVMOptions());
+        EXPECT_ARRAY_EQ(a, outputs["out"]->GetArray());
+        EXPECT_ARRAY_EQ(w, outputs["logits"]->GetArray());
+    }
+
+    {
+        // Outputs are padded without `unpad_axes`.
+        ProgramCache cache(compile, 1, {4, 8}, {1}, {"w"});
+        InOuts outputs = cache.Run(inputs, ChxVMOptions());
+        chainerx::Array e = chainerx::testing::BuildArray({1, 4}).WithData<float>({1, 2, 3, 0});
+        EXPECT_ARRAY_EQ(e, outputs["out"]->GetArray());
+        EXPECT_ARRAY_EQ(w, outputs["logits"]->GetArray());
+    }
+}
+
+}  // namespace
+}  // namespace runtime
+}  // namespace chainer_compiler
@@ -0,0 +1,116 @@
+#include "runtime/thread_pool.h"
+
+#include <algorithm>
+#include <atomic>
+#include <exception>
+#include <memory>
+
+#include <common/log.h>
+
+namespace chainer_compiler {
+namespace runtime {
+
+ThreadPool::ThreadPool(int num_threads) {
+    CHECK_LT(0, num_threads);
+    for (int i = 0; i < num_threads; ++i) {
+        threads_.emplace_back([this]() { Loop(); });
+    }
+}
+
+ThreadPool::~ThreadPool() {
+    {
+        std::unique_lock<std::mutex> lock(mu_);
+        should_finish_ = true;
+    }
+    cond_.notify_all();
+    for (std::thread& thread : threads_) {
+        thread.join();
+    }
+}
+
+void ThreadPool::Submit(std::function<void()> task) {
+    {
+        std::unique_lock<std::mutex> lock(mu_);
+        tasks_.push(std::move(task));
+    }
+    cond_.notify_one();
+}
+
+void ThreadPool::Loop() {
+    while (true) {
+        std::function<void()> task;
+        {
+            std::unique_lock<std::mutex> lock(mu_);
+            cond_.wait(lock, [this]() { return should_finish_ || !tasks_.empty(); });
+            if (tasks_.empty()) {
+                return;
+            }
+            task = std::move(tasks_.front());
+            tasks_.pop();
+        }
+        task();
+    }
+}
+
+namespace {
+
+struct ParallelForState {
+    explicit ParallelForState(int64_t n, const std::function<void(int64_t)>& f) : num_tasks(n), func(f) {
+    }
+
+    // Runs remaining tasks until all of them are taken.
+    void Run() {
+        int64_t done = 0;
+        for (int64_t i; (i = next++) < num_tasks;) {
+            try {
+                func(i);
+            } catch (...) {
+                std::lock_guard<std::mutex> lock(mu);
+                if (!error) error = std::current_exception();
+            }
+            ++done;
+        }
+        if (done == 0) return;
+        std::lock_guard<std::mutex> lock(mu);
+        num_done += done;
+        if (num_done == num_tasks) cond.notify_all();
+    }
+
+    const int64_t num_tasks;
+    const std::function<void(int64_t)> func;
+    std::atomic<int64_t> next{0};
+    std::mutex mu;
+    std::condition_variable cond;
+    int64_t num_done{0};
+    std::exception_ptr error;
+};
+
+ThreadPool* GetParallelForPool() {
+    static ThreadPool* pool = new ThreadPool(std::max(1, static_cast<int>(std::thread::hardware_concurrency()) - 1));
+    return pool;
+}
+
+}  // namespace
+
+void ParallelFor(int64_t n, const std::function<void(int64_t)>& func) {
+    if (n <= 1) {
+        for (int64_t i = 0; i < n; ++i) func(i);
+        return;
+    }
+
+    // Helpers may start after all tasks finish so they share the state.
+    auto state = std::make_shared<ParallelForState>(n, func);
+    ThreadPool* pool = GetParallelForPool();
+    const int64_t num_helpers = std::min<int64_t>(pool->num_threads(), n - 1);
+    for (int64_t i = 0; i < num_helpers; ++i) {
+        pool->Submit([state]() { state->Run(); });
+    }
+    state->Run();
+
+    std::unique_lock<std::mutex> lock(state->mu);
+    state->cond.wait(lock, [&state]() { return state->num_done == state->num_tasks; });
+    if (state->error) std::rethrow_exception(state->error);
+}
+
+}  // namespace runtime
+}  // namespace chainer_compiler
@@ -0,0 +1,46 @@
+#pragma once
+
+#include <condition_variable>
+#include <cstdint>
+#include <functional>
+#include <mutex>
+#include <queue>
+#include <thread>
+#include <vector>
+
+namespace chainer_compiler {
+namespace runtime {
+
+// A fixed size pool of threads which run submitted tasks in FIFO order.
+class ThreadPool {
+public:
+    explicit ThreadPool(int num_threads);
+    ~ThreadPool();
+
+    void Submit(std::function<void()> task);
+
+    int num_threads() const {
+        return threads_.size();
+    }
+
+private:
+    ThreadPool(const ThreadPool&) = delete;
+    ThreadPool& operator=(const ThreadPool&) = delete;
+
+    void Loop();
+
+    std::vector<std::thread> threads_;
+    std::mutex mu_;
+    std::condition_variable cond_;
+    std::queue<std::function<void()>> tasks_;
+    bool should_finish_ = false;
+};
+
+// Runs `func(i)` for all `i` in [0, `n`) on the calling thread and a
+// process-wide thread pool. Returns after all calls finish. The caller
+// takes indices too, so this can be called from a thread of another
+// pool. The first exception thrown by `func` is rethrown.
+void ParallelFor(int64_t n, const std::function<void(int64_t)>& func);
+
+}  // namespace runtime
+}  // namespace chainer_compiler
@@ -0,0 +1,51 @@
+#include <atomic>
+#include <stdexcept>
+#include <thread>
+#include <vector>
+
+#include <gtest/gtest.h>
+
+#include <runtime/thread_pool.h>
+
+namespace chainer_compiler {
+namespace runtime {
+namespace {
+
+TEST(ThreadPoolTest, ParallelFor) {
+    std::vector<int> visits(1000);
+    ParallelFor(visits.size(), [&visits](int64_t i) { ++visits[i]; });
+    EXPECT_EQ(std::vector<int>(visits.size(), 1), visits);
+
+    std::atomic<int> num_calls{0};
+    ParallelFor(0, [&num_calls](int64_t i) { ++num_calls; });
+    EXPECT_EQ(0, num_calls);
+}
+
+TEST(ThreadPoolTest, ParallelForInPool) {
+    // The caller runs tasks by itself even if all workers wait.
+    ThreadPool pool(1);
+    std::atomic<int64_t> sum{0};
+    std::atomic<bool> finished{false};
+    pool.Submit([&sum, &finished]() {
+        ParallelFor(100, [&sum](int64_t i) { sum += i; });
+        finished = true;
+    });
+    while (!finished) {
+        std::this_thread::yield();
+    }
+    EXPECT_EQ(4950, sum);
+}
+
+TEST(ThreadPoolTest, ParallelForException) {
+    EXPECT_THROW(
+            ParallelFor(
+                    10,
+                    [](int64_t i) {
+                        if (i == 3) throw std::runtime_error("error");
+                    }),
+            std::runtime_error);
+}
+
+}  // namespace
+}  // namespace runtime
+}  // namespace chainer_compiler
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+#
+# Measures compile time of test models by `run_onnx --compile_only`.
+# The report has the same format as `runtests.py --report_json` so two
+# reports can be compared by compare_benchmark_reports.py.
+#
+# Usage:
+#
+# $ ./scripts/bench_compile_time.py --report_json base.json
+# (change something in the compiler)
+# $ ./scripts/bench_compile_time.py --report_json new.json
+# $ ./scripts/compare_benchmark_reports.py base.json new.json
+#
+# With --show_passes, elapsed times of compiler passes in the last run
+# are shown for each test. For example, the worklist based simplifier
+# can be compared with the full-sweep one by
+#
+# $ ./scripts/bench_compile_time.py 'espnet|large_oc' --show_passes
+# $ ./scripts/bench_compile_time.py 'espnet|large_oc' --show_passes \
+#     -- --simplify_full_sweep
+
+import argparse
+import glob
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(project_root, 'utils'))
+
+import run_onnx_util
+
+
+def has_gradients(test_dir):
+    pattern = os.path.join(test_dir, 'test_data_set_0', 'gradient_*')
+    return bool(glob.glob(pattern))
+
+
+def aggregate_passes(passes):
+    """Sums elapsed times of compiler passes by their names."""
+    elapsed = {}
+    for p in passes:
+        elapsed[p['name']] = elapsed.get(p['name'], 0.0) + p['elapsed_msec']
+    return elapsed
+
+
+def measure(args, test_dir, report_json):
+    cmdline = [os.path.join(args.build_dir, 'tools/run_onnx'),
+               '--test', test_dir, '--compile_only', '--quiet',
+               '--report_json', report_json]
+    if has_gradients(test_dir):
+        cmdline.append('--backprop')
+    cmdline += args.flags
+
+    elapsed_times = []
+    for _ in range(args.warmup + args.iterations):
+        start = time.time()
+        if subprocess.call(cmdline) != 0:
+            return None
+        elapsed_times.append((time.time() - start) * 1000)
+    report = run_onnx_util.summarize_elapsed_times(
+        elapsed_times[args.warmup:], elapsed_times[:args.warmup])
+    with open(report_json) as f:
+        run_onnx_report = json.load(f)
+    report['compile_msec'] = run_onnx_report['compile_msec']
+    report['passes'] = aggregate_passes(run_onnx_report['passes'])
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark compile time of test models')
+    parser.add_argument('test_filter', default='elichika_model_', nargs='?',
+                        help='A regular expression to filter tests in out/')
+    parser.add_argument('--build_dir', '-b',
+                        default=os.path.join(project_root, 'build'))
+    parser.add_argument('--iterations', '-I', type=int, default=3)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--report_json', default=None,
+                        help='Dump reports of all tests in a JSON')
+    parser.add_argument('--show_passes', action='store_true',
+                        help='Show elapsed times of compiler passes')
+    parser.add_argument('flags', nargs=argparse.REMAINDER,
+                        help='Extra flags passed to run_onnx after --')
+    args = parser.parse_args()
+    if args.flags and args.flags[0] == '--':
+        args.flags = args.flags[1:]
+
+    test_filter = re.compile(args.test_filter)
+    test_dirs = sorted(d for d in glob.glob(os.path.join(project_root, 'out',
+                                                         '*'))
+                       if (test_filter.search(os.path.basename(d)) and
+                           os.path.exists(os.path.join(d, 'model.onnx'))))
+    if not test_dirs:
+        raise RuntimeError('No tests found for %s' % args.test_filter)
+
+    reports = {}
+    total = 0.0
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for test_dir in test_dirs:
+            name = os.path.basename(test_dir)
+            report = measure(args, test_dir,
+                             os.path.join(tmpdir, 'report.json'))
+            if report is None:
+                print('%-50s FAIL' % name)
+                continue
+            reports[name] = report
+            total += report['stats']['p50']
+            print('%-50s %10.1f msec' % (name, report['stats']['p50']))
+            if args.show_passes:
+                passes = sorted(report['passes'].items(),
+                                key=lambda p: -p[1])
+                for pass_name, elapsed in passes:
+                    print('    %-46s %10.1f msec' % (pass_name, elapsed))
+    print('Total: %.1f msec for %d tests' % (total, len(reports)))
+
+    if args.report_json is not None:
+        with open(args.report_json, 'w') as f:
+            json.dump(reports, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+#
+# Measures the speedup by running fused element-wise ops with generated
+# C++ code (`--fuse_operations --use_cpu_codegen`) on CPU. Run
+# `./scripts/runtests.py extra_test_elementwise_chain` (and
+# `onnx_real` for ResNet-50) first to generate the tests.
+#
+# Usage:
+#
+# $ ./scripts/bench_cpu_fusion.py
+# $ ./scripts/bench_cpu_fusion.py onnx_real_resnet50 -I 20
+
+import argparse
+import glob
+import json
+import os
+import re
+import subprocess
+import tempfile
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONFIGS = [
+    ('unfused', []),
+    ('cpu_codegen', ['--fuse_operations', '--use_cpu_codegen']),
+]
+
+
+def run(args, test_dir, flags, report_json):
+    cmdline = [os.path.join(args.build_dir, 'tools/run_onnx'),
+               '--test', test_dir, '--quiet',
+               '--iterations', str(args.iterations),
+               '--report_json', report_json]
+    cmdline += flags
+    if subprocess.call(cmdline) != 0:
+        return None
+    with open(report_json) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark fused element-wise ops on CPU')
+    parser.add_argument('test_filter', nargs='?',
+                        default='extra_test_elementwise_chain|'
+                        'onnx_real_resnet50',
+                        help='A regular expression to filter tests in out/')
+    parser.add_argument('--build_dir', '-b',
+                        default=os.path.join(project_root, 'build'))
+    parser.add_argument('--iterations', '-I', type=int, default=10)
+    parser.add_argument('--report_json', default=None,
+                        help='Dump reports of all runs in a JSON')
+    args = parser.parse_args()
+    if args.iterations < 2:
+        raise RuntimeError('--iterations must be larger than 1')
+
+    test_filter = re.compile(args.test_filter)
+    test_dirs = sorted(d for d in glob.glob(os.path.join(project_root, 'out',
+                                                         '*'))
+                       if (test_filter.search(os.path.basename(d)) and
+                           os.path.exists(os.path.join(d, 'model.onnx'))))
+    if not test_dirs:
+        raise RuntimeError('No tests found for %s' % args.test_filter)
+
+    print('%-40s %-12s %10s %10s %14s %8s' %
+          ('test', 'config', 'p50', 'mean', 'peak_bytes', 'speedup'))
+    reports = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for test_dir in test_dirs:
+            name = os.path.basename(test_dir)
+            baseline = None
+            for config, flags in CONFIGS:
+                report_json = os.path.join(tmpdir, 'report.json')
+                report = run(args, test_dir, flags, report_json)
+                if report is None:
+                    print('%-40s %-12s %10s %10s %14s %8s' %
+                          (name, config, '-', '-', '-', '-'))
+                    continue
+                reports.setdefault(name, {})[config] = report
+                stats = report['stats']
+                if baseline is None:
+                    baseline = stats['p50']
+                print('%-40s %-12s %10.3f %10.3f %14s %7.2fx' %
+                      (name, config, stats['p50'], stats['mean'],
+                       report.get('peak_used_bytes', '-'),
+                       baseline / stats['p50']))
+
+    if args.report_json is not None:
+        with open(args.report_json, 'w') as f:
+            json.dump(reports, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+#
+# Measures the peak memory usage reported by `--dump_memory_usage` and
+# the latency with and without in-place execution of element-wise ops
+# and sequence updates (`--disable_in_place_ops`).
+# Run `./scripts/runtests.py onnx_real` first to generate the tests.
+#
+# Usage:
+#
+# $ ./scripts/bench_in_place.py
+# $ ./scripts/bench_in_place.py onnx_real_vgg19 -I 20
+# $ ./scripts/bench_in_place.py extra_test_sequence_append_loop
+
+import argparse
+import glob
+import json
+import os
+import re
+import subprocess
+import tempfile
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONFIGS = [
+    ('copy', ['--disable_in_place_ops']),
+    ('in_place', []),
+]
+
+
+def run(args, test_dir, flags, report_json):
+    cmdline = [os.path.join(args.build_dir, 'tools/run_onnx'),
+               '--test', test_dir, '--quiet',
+               '--iterations', str(args.iterations),
+               '--report_json', report_json,
+               '--dump_memory_usage', '1']
+    cmdline += flags
+    proc = subprocess.run(cmdline, stderr=subprocess.PIPE,
+                          universal_newlines=True)
+    if proc.returncode != 0:
+        print(proc.stderr)
+        return None
+    with open(report_json) as f:
+        report = json.load(f)
+    # The peak size of live variables in MBs reported by ChxVM.
+    peaks = [int(m.group(1)) for m in
+             re.finditer(r'Peak memory usage=(\d+)MB', proc.stderr)]
+    if peaks:
+        report['peak_variable_mbs'] = max(peaks)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark in-place execution of element-wise ops')
+    parser.add_argument('test_filter', nargs='?',
+                        default='onnx_real_(resnet50|vgg19)',
+                        help='A regular expression to filter tests in out/')
+    parser.add_argument('--build_dir', '-b',
+                        default=os.path.join(project_root, 'build'))
+    parser.add_argument('--iterations', '-I', type=int, default=10)
+    parser.add_argument('--report_json', default=None,
+                        help='Dump reports of all runs in a JSON')
+    args = parser.parse_args()
+    if args.iterations < 2:
+        raise RuntimeError('--iterations must be larger than 1')
+
+    test_filter = re.compile(args.test_filter)
+    test_dirs = sorted(d for d in glob.glob(os.path.join(project_root, 'out',
+                                                         '*'))
+                       if (test_filter.search(os.path.basename(d)) and
+                           os.path.exists(os.path.join(d, 'model.onnx'))))
+    if not test_dirs:
+        raise RuntimeError('No tests found for %s' % args.test_filter)
+
+    print('%-40s %-12s %10s %10s %14s %8s %8s' %
+          ('test', 'config', 'p50', 'mean', 'peak_mbs', 'memory',
+           'speedup'))
+    reports = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for test_dir in test_dirs:
+            name = os.path.basename(test_dir)
+            baseline = None
+            baseline_mbs = None
+            for config, flags in CONFIGS:
+                report_json = os.path.join(tmpdir, 'report.json')
+                report = run(args, test_dir, flags, report_json)
+                if report is None:
+                    print('%-40s %-12s %10s %10s %14s %8s %8s' %
+                          (name, config, '-', '-', '-', '-', '-'))
+                    continue
+                reports.setdefault(name, {})[config] = report
+                stats = report['stats']
+                peak_mbs = report.get('peak_variable_mbs')
+                if baseline is None:
+                    baseline = stats['p50']
+                    baseline_mbs = peak_mbs
+                if peak_mbs and baseline_mbs:
+                    memory = '%7.2fx' % (peak_mbs / baseline_mbs)
+                else:
+                    memory = '-'
+                print('%-40s %-12s %10.3f %10.3f %14s %8s %7.2fx' %
+                      (name, config, stats['p50'], stats['mean'],
+                       peak_mbs if peak_mbs is not None else '-',
+                       memory, baseline / stats['p50']))
+
+    if args.report_json is not None:
+        with open(args.report_json, 'w') as f:
+            json.dump(reports, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
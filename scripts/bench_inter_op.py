@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+#
+# Measures the speedup by running independent ops concurrently
+# (`--inter_op_threads`) on CPU. Models with many parallel branches such
+# as GoogLeNet/Inception in the ONNX real tests are used by default.
+# Run `./scripts/runtests.py onnx_real` first to download them.
+#
+# Usage:
+#
+# $ ./scripts/bench_inter_op.py
+# $ ./scripts/bench_inter_op.py onnx_real_squeezenet --threads 1,2,4,8
+
+import argparse
+import glob
+import json
+import os
+import re
+import subprocess
+import tempfile
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(args, test_dir, num_threads, report_json):
+    cmdline = [os.path.join(args.build_dir, 'tools/run_onnx'),
+               '--test', test_dir, '--quiet',
+               '--iterations', str(args.iterations),
+               '--inter_op_threads', str(num_threads),
+               '--report_json', report_json]
+    if subprocess.call(cmdline) != 0:
+        return None
+    with open(report_json) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark inter-op parallelism of ChxVM on CPU')
+    parser.add_argument('test_filter', nargs='?',
+                        default='onnx_real_(inception|googlenet)',
+                        help='A regular expression to filter tests in out/')
+    parser.add_argument('--build_dir', '-b',
+                        default=os.path.join(project_root, 'build'))
+    parser.add_argument('--iterations', '-I', type=int, default=10)
+    parser.add_argument('--threads', default='1,2,4',
+                        help='Comma separated numbers of threads')
+    parser.add_argument('--report_json', default=None,
+                        help='Dump reports of all runs in a JSON')
+    args = parser.parse_args()
+    if args.iterations < 2:
+        raise RuntimeError('--iterations must be larger than 1')
+
+    test_filter = re.compile(args.test_filter)
+    test_dirs = sorted(d for d in glob.glob(os.path.join(project_root, 'out',
+                                                         '*'))
+                       if (test_filter.search(os.path.basename(d)) and
+                           os.path.exists(os.path.join(d, 'model.onnx'))))
+    if not test_dirs:
+        raise RuntimeError('No tests found for %s' % args.test_filter)
+
+    print('%-40s %8s %10s %10s %8s' %
+          ('test', 'threads', 'p50', 'mean', 'speedup'))
+    reports = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for test_dir in test_dirs:
+            name = os.path.basename(test_dir)
+            baseline = None
+            for num_threads in [int(t) for t in args.threads.split(',')]:
+                report_json = os.path.join(tmpdir, 'report.json')
+                report = run(args, test_dir, num_threads, report_json)
+                if report is None:
+                    print('%-40s %8d %10s %10s %8s' %
+                          (name, num_threads, '-', '-', '-'))
+                    continue
+                reports.setdefault(name, {})[str(num_threads)] = report
+                stats = report['stats']
+                if baseline is None:
+                    baseline = stats['p50']
+                print('%-40s %8d %10.3f %10.3f %7.2fx' %
+                      (name, num_threads, stats['p50'], stats['mean'],
+                       baseline / stats['p50']))
+
+    if args.report_json is not None:
+        with open(args.report_json, 'w') as f:
+            json.dump(reports, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+#
+# Measures the latency of NonMaxSuppression on synthetic proposal sets
+# like the ones of FPN and Faster R-CNN, sweeping the numbers of boxes
+# and classes. Models are generated in out/bench_nms_* with outputs
+# computed by NumPy, so run_onnx also checks the results. Pass
+# `--baseline_build_dir` to compare against another build.
+#
+# Usage:
+#
+# $ ./scripts/bench_nms.py
+# $ ./scripts/bench_nms.py --num_boxes 1000,6000 --num_classes 80 -I 20
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(project_root, 'scripts'))
+import onnx_script  # NOQA
+
+
+def gen_proposals(rng, num_batches, num_boxes, num_classes, image_size):
+    # Boxes gather around a few objects as proposals of detectors do.
+    num_objects = max(1, num_boxes // 100)
+    centers = rng.uniform(0, image_size, size=(num_batches, num_objects, 2))
+    which = rng.randint(num_objects, size=(num_batches, num_boxes))
+    center = np.take_along_axis(centers, which[:, :, None], axis=1)
+    center += rng.normal(scale=image_size / 50, size=center.shape)
+    size = rng.uniform(image_size / 20, image_size / 4,
+                       size=(num_batches, num_boxes, 2))
+    boxes = np.concatenate([center - size / 2, center + size / 2], axis=2)
+    scores = rng.uniform(size=(num_batches, num_classes, num_boxes))
+    return boxes.astype(np.float32), scores.astype(np.float32)
+
+
+def iou(box, boxes):
+    tl = np.maximum(box[:2], boxes[:, :2])
+    br = np.minimum(box[2:], boxes[:, 2:])
+    intersection = np.prod(np.maximum(br - tl, 0), axis=1)
+    area = np.prod(box[2:] - box[:2])
+    areas = np.prod(boxes[:, 2:] - boxes[:, :2], axis=1)
+    return intersection / (area + areas - intersection)
+
+
+def nms_reference(boxes, scores, max_boxes, iou_threshold, score_threshold):
+    selected_indices = []
+    for b in range(scores.shape[0]):
+        for c in range(scores.shape[1]):
+            cls_scores = scores[b, c]
+            order = np.argsort(-cls_scores, kind='stable')
+            order = order[cls_scores[order] > score_threshold]
+            selected = []
+            for i in order:
+                if len(selected) >= max_boxes:
+                    break
+                if (selected and
+                        np.any(iou(boxes[b, i], boxes[b, selected]) >
+                               iou_threshold)):
+                    continue
+                selected.append(i)
+                selected_indices.append([b, c, i])
+    return np.array(selected_indices, dtype=np.int64).reshape(-1, 3)
+
+
+def gen_nms_test(test_name, num_batches, num_boxes, num_classes, max_boxes,
+                 iou_threshold, score_threshold):
+    rng = np.random.RandomState(0)
+    boxes, scores = gen_proposals(rng, num_batches, num_boxes, num_classes,
+                                  image_size=800)
+    selected_indices = nms_reference(boxes, scores, max_boxes,
+                                     iou_threshold, score_threshold)
+
+    gb = onnx_script.GraphBuilder(test_name)
+    boxes_v = gb.input('boxes', boxes)
+    scores_v = gb.input('scores', scores)
+    max_boxes_v = gb.const([max_boxes], dtype=np.int64)
+    iou_threshold_v = gb.const([iou_threshold], dtype=np.float32)
+    score_threshold_v = gb.const([score_threshold], dtype=np.float32)
+    selected_indices_v = gb.NonMaxSuppression(
+        [boxes_v, scores_v, max_boxes_v, iou_threshold_v, score_threshold_v])
+    gb.output(selected_indices_v, selected_indices)
+    gb.gen_test()
+
+
+def run(args, build_dir, test_dir, report_json):
+    cmdline = [os.path.join(build_dir, 'tools/run_onnx'),
+               '--test', test_dir, '--quiet',
+               '--iterations', str(args.iterations),
+               '--report_json', report_json]
+    proc = subprocess.run(cmdline, stderr=subprocess.PIPE,
+                          universal_newlines=True)
+    if proc.returncode != 0:
+        print(proc.stderr)
+        return None
+    with open(report_json) as f:
+        return json.load(f)
+
+
+def parse_ints(s):
+    return [int(v) for v in s.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark NonMaxSuppression on synthetic proposals')
+    parser.add_argument('--num_boxes', type=parse_ints,
+                        default=[1000, 6000])
+    parser.add_argument('--num_classes', type=parse_ints,
+                        default=[1, 20, 80])
+    parser.add_argument('--num_batches', type=int, default=1)
+    parser.add_argument('--max_boxes', type=int, default=100,
+                        help='max_output_boxes_per_class')
+    parser.add_argument('--iou_threshold', type=float, default=0.5)
+    parser.add_argument('--score_threshold', type=float, default=0.05)
+    parser.add_argument('--build_dir', '-b',
+                        default=os.path.join(project_root, 'build'))
+    parser.add_argument('--baseline_build_dir', default=None)
+    parser.add_argument('--iterations', '-I', type=int, default=10)
+    parser.add_argument('--report_json', default=None,
+                        help='Dump reports of all runs in a JSON')
+    args = parser.parse_args()
+    if args.iterations < 2:
+        raise RuntimeError('--iterations must be larger than 1')
+
+    builds = [('new', args.build_dir)]
+    if args.baseline_build_dir:
+        builds.insert(0, ('baseline', args.baseline_build_dir))
+
+    # GraphBuilder writes tests to out/ of the current directory.
+    os.chdir(project_root)
+
+    print('%8s %8s %-10s %10s %10s %8s' %
+          ('boxes', 'classes', 'build', 'p50', 'mean', 'speedup'))
+    reports = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for num_boxes in args.num_boxes:
+            for num_classes in args.num_classes:
+                name = 'bench_nms_b%d_c%d' % (num_boxes, num_classes)
+                gen_nms_test(name, args.num_batches, num_boxes, num_classes,
+                             args.max_boxes, args.iou_threshold,
+                             args.score_threshold)
+                test_dir = os.path.join(project_root, 'out', name)
+                baseline = None
+                for build, build_dir in builds:
+                    report_json = os.path.join(tmpdir, 'report.json')
+                    report = run(args, build_dir, test_dir, report_json)
+                    if report is None:
+                        print('%8d %8d %-10s %10s %10s %8s' %
+                              (num_boxes, num_classes, build,
+                               '-', '-', '-'))
+                        continue
+                    reports.setdefault(name, {})[build] = report
+                    stats = report['stats']
+                    if baseline is None:
+                        baseline = stats['p50']
+                    print('%8d %8d %-10s %10.3f %10.3f %7.2fx' %
+                          (num_boxes, num_classes, build, stats['p50'],
+                           stats['mean'], baseline / stats['p50']))
+
+    if args.report_json is not None:
+        with open(args.report_json, 'w') as f:
+            json.dump(reports, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
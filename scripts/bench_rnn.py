@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+#
+# Measures the latency of ONNX LSTM and GRU ops for inference on CPU,
+# sweeping sequence lengths and hidden sizes. Models are generated in
+# out/bench_rnn_* with outputs computed by NumPy, so run_onnx also
+# checks the results. Pass `--baseline_build_dir` to compare against
+# another build, e.g., one without the hoisted input projection.
+#
+# Usage:
+#
+# $ ./scripts/bench_rnn.py
+# $ ./scripts/bench_rnn.py --ops LSTM --seq_lengths 32,128 -I 20
+# $ ./scripts/bench_rnn.py --baseline_build_dir ../baseline/build
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(project_root, 'scripts'))
+import onnx_script  # NOQA
+
+
+def sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+
+def lstm_reference(x, w, r, b):
+    hidden_size = r.shape[2]
+    bias = b[0, :4 * hidden_size] + b[0, 4 * hidden_size:]
+    h = np.zeros((x.shape[1], hidden_size), dtype=x.dtype)
+    c = np.zeros((x.shape[1], hidden_size), dtype=x.dtype)
+    ys = []
+    for xt in x:
+        gates = xt.dot(w[0].T) + h.dot(r[0].T) + bias
+        i, o, f, nc = np.split(gates, 4, axis=1)
+        c = sigmoid(f) * c + sigmoid(i) * np.tanh(nc)
+        h = sigmoid(o) * np.tanh(c)
+        ys.append(h)
+    return np.expand_dims(np.stack(ys), 1)
+
+
+def gru_reference(x, w, r, b):
+    hidden_size = r.shape[2]
+    wb, rb = b[0, :3 * hidden_size], b[0, 3 * hidden_size:]
+    zr = slice(0, 2 * hidden_size)
+    hs = slice(2 * hidden_size, 3 * hidden_size)
+    h = np.zeros((x.shape[1], hidden_size), dtype=x.dtype)
+    ys = []
+    for xt in x:
+        gates = xt.dot(w[0, zr].T) + h.dot(r[0, zr].T) + wb[zr] + rb[zr]
+        z, rg = np.split(sigmoid(gates), 2, axis=1)
+        n = np.tanh(xt.dot(w[0, hs].T) + (rg * h).dot(r[0, hs].T) +
+                    rb[hs] + wb[hs])
+        h = (1 - z) * n + z * h
+        ys.append(h)
+    return np.expand_dims(np.stack(ys), 1)
+
+
+RNNS = {
+    'LSTM': (4, lstm_reference),
+    'GRU': (3, gru_reference),
+}
+
+
+def gen_rnn_test(test_name, op, seq_length, batch_size, input_size,
+                 hidden_size):
+    num_gates, reference = RNNS[op]
+    rng = np.random.RandomState(0)
+
+    def normal(*shape):
+        return (rng.normal(size=shape) * 0.1).astype(np.float32)
+
+    x = normal(seq_length, batch_size, input_size)
+    w = normal(1, num_gates * hidden_size, input_size)
+    r = normal(1, num_gates * hidden_size, hidden_size)
+    b = normal(1, 2 * num_gates * hidden_size)
+    y = reference(x, w, r, b)
+
+    gb = onnx_script.GraphBuilder(test_name)
+    x_v = gb.input('x', x)
+    w_v = gb.param('w', w)
+    r_v = gb.param('r', r)
+    b_v = gb.param('b', b)
+    y_v = gb.make_node(op, inputs=[x_v, w_v, r_v, b_v],
+                       hidden_size=hidden_size)
+    gb.output(y_v, y)
+    gb.gen_test()
+
+
+def run(args, build_dir, test_dir, report_json):
+    cmdline = [os.path.join(build_dir, 'tools/run_onnx'),
+               '--test', test_dir, '--quiet',
+               '--iterations', str(args.iterations),
+               '--rtol', str(args.rtol),
+               '--report_json', report_json]
+    proc = subprocess.run(cmdline, stderr=subprocess.PIPE,
+                          universal_newlines=True)
+    if proc.returncode != 0:
+        print(proc.stderr)
+        return None
+    with open(report_json) as f:
+        return json.load(f)
+
+
+def parse_ints(s):
+    return [int(v) for v in s.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark LSTM and GRU ops on CPU')
+    parser.add_argument('--ops', default='LSTM,GRU',
+                        help='Comma separated RNN ops')
+    parser.add_argument('--seq_lengths', type=parse_ints,
+                        default=[16, 64, 256])
+    parser.add_argument('--hidden_sizes', type=parse_ints,
+                        default=[128, 256, 512])
+    parser.add_argument('--batch_size', type=int, default=16)
+    parser.add_argument('--input_size', type=int, default=None,
+                        help='Defaults to the hidden size')
+    parser.add_argument('--build_dir', '-b',
+                        default=os.path.join(project_root, 'build'))
+    parser.add_argument('--baseline_build_dir', default=None)
+    parser.add_argument('--iterations', '-I', type=int, default=10)
+    parser.add_argument('--rtol', type=float, default=1e-3)
+    parser.add_argument('--report_json', default=None,
+                        help='Dump reports of all runs in a JSON')
+    args = parser.parse_args()
+    if args.iterations < 2:
+        raise RuntimeError('--iterations must be larger than 1')
+
+    builds = [('new', args.build_dir)]
+    if args.baseline_build_dir:
+        builds.insert(0, ('baseline', args.baseline_build_dir))
+
+    # GraphBuilder writes tests to out/ of the current directory.
+    os.chdir(project_root)
+
+    print('%-6s %8s %8s %-10s %10s %10s %12s %8s' %
+          ('op', 'seq_len', 'hidden', 'build', 'p50', 'mean',
+           'usec/step', 'speedup'))
+    reports = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for op in args.ops.split(','):
+            for hidden_size in args.hidden_sizes:
+                for seq_length in args.seq_lengths:
+                    name = 'bench_rnn_%s_t%d_h%d' % (op.lower(), seq_length,
+                                                     hidden_size)
+                    gen_rnn_test(name, op, seq_length, args.batch_size,
+                                 args.input_size or hidden_size,
+                                 hidden_size)
+                    test_dir = os.path.join(project_root, 'out', name)
+                    baseline = None
+                    for build, build_dir in builds:
+                        report_json = os.path.join(tmpdir, 'report.json')
+                        report = run(args, build_dir, test_dir, report_json)
+                        if report is None:
+                            print('%-6s %8d %8d %-10s %10s %10s %12s %8s' %
+                                  (op, seq_length, hidden_size, build,
+                                   '-', '-', '-', '-'))
+                            continue
+                        reports.setdefault(name, {})[build] = report
+                        stats = report['stats']
+                        if baseline is None:
+                            baseline = stats['p50']
+                        print('%-6s %8d %8d %-10s %10.3f %10.3f %12.2f '
+                              '%7.2fx' %
+                              (op, seq_length, hidden_size, build,
+                               stats['p50'], stats['mean'],
+                               stats['p50'] * 1000 / seq_length,
+                               baseline / stats['p50']))
+
+    if args.report_json is not None:
+        with open(args.report_json, 'w') as f:
+            json.dump(reports, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
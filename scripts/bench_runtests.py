@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+#
+# Compares the wall time of the test suite with and without
+# `run_onnx --server`.
+#
+# Usage:
+#
+# $ ./scripts/bench_runtests.py -j 8 onnx_real
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+
+def run_suite(extra_args):
+    runtests = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'runtests.py')
+    cmd = [sys.executable, runtests, '--skip_build'] + extra_args
+    start = time.time()
+    ok = subprocess.call(cmd, stdout=subprocess.DEVNULL) == 0
+    return time.time() - start, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the wall time of runtests.py')
+    parser.add_argument('test_filter', default=None, nargs='?',
+                        help='A regular expression to filter tests')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help='Number of parallel jobs')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='The number of runs for each mode')
+    args = parser.parse_args()
+
+    base_args = []
+    if args.test_filter is not None:
+        base_args.append(args.test_filter)
+    if args.jobs is not None:
+        base_args += ['--jobs', str(args.jobs)]
+
+    results = {}
+    for mode, extra_args in [('process', []), ('server', ['--server'])]:
+        for _ in range(args.repeat):
+            elapsed, ok = run_suite(base_args + extra_args)
+            status = 'OK' if ok else 'FAIL'
+            print('%s: %.1f sec (%s)' % (mode, elapsed, status))
+            results.setdefault(mode, []).append(elapsed)
+
+    best_process = min(results['process'])
+    best_server = min(results['server'])
+    print('Best: process=%.1f sec server=%.1f sec (%.2fx)' %
+          (best_process, best_server, best_process / best_server))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+#
+# Compares peak memory usage of the computation schedulers
+# (`--scheduler`) on test models, the large-model suite by default.
+#
+# Usage:
+#
+# $ ./scripts/bench_scheduler.py --device cuda
+# $ ./scripts/bench_scheduler.py elichika_model_ --schedulers greedy,beam
+
+import argparse
+import glob
+import json
+import os
+import re
+import subprocess
+import tempfile
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCHEDULERS = ['naive', 'greedy', 'beam']
+
+
+def run(args, test_dir, scheduler, report_json):
+    cmdline = [os.path.join(args.build_dir, 'tools/run_onnx'),
+               '--test', test_dir, '--quiet',
+               '--scheduler', scheduler,
+               '--report_json', report_json]
+    if 'backprop' in os.path.basename(test_dir):
+        cmdline.append('--backprop')
+    if args.device:
+        cmdline += ['--device', args.device]
+    if args.beam_width:
+        cmdline += ['--scheduler_beam_width', str(args.beam_width)]
+    if subprocess.call(cmdline) != 0:
+        return None
+    with open(report_json) as f:
+        return json.load(f)
+
+
+def to_mb(report, key):
+    if report is None or key not in report:
+        return '-'
+    return '%.1f' % (report[key] / 1000 / 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare peak memory usage of schedulers')
+    parser.add_argument('test_filter', default='large_oc', nargs='?',
+                        help='A regular expression to filter tests in out/')
+    parser.add_argument('--build_dir', '-b',
+                        default=os.path.join(project_root, 'build'))
+    parser.add_argument('--device', '-d', default=None)
+    parser.add_argument('--schedulers', default=','.join(SCHEDULERS),
+                        help='Comma separated names of schedulers')
+    parser.add_argument('--beam_width', type=int, default=None)
+    parser.add_argument('--report_json', default=None,
+                        help='Dump reports of all runs in a JSON')
+    args = parser.parse_args()
+
+    test_filter = re.compile(args.test_filter)
+    test_dirs = sorted(d for d in glob.glob(os.path.join(project_root, 'out',
+                                                         '*'))
+                       if (test_filter.search(os.path.basename(d)) and
+                           os.path.exists(os.path.join(d, 'model.onnx'))))
+    if not test_dirs:
+        raise RuntimeError('No tests found for %s' % args.test_filter)
+
+    print('%-50s %-8s %14s %14s %10s' %
+          ('test', 'sched', 'simulated(MB)', 'used(MB)', 'msec'))
+    reports = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for test_dir in test_dirs:
+            name = os.path.basename(test_dir)
+            for scheduler in args.schedulers.split(','):
+                report_json = os.path.join(tmpdir, 'report.json')
+                report = run(args, test_dir, scheduler, report_json)
+                if report is not None:
+                    reports.setdefault(name, {})[scheduler] = report
+                used_key = 'peak_used_bytes'
+                if report is not None and used_key not in report:
+                    used_key = 'peak_monitored_bytes'
+                elapsed = '-' if report is None else (
+                    '%.1f' % report['stats']['p50'])
+                print('%-50s %-8s %14s %14s %10s' %
+                      (name, scheduler,
+                       to_mb(report, 'simulated_peak_memory_bytes'),
+                       to_mb(report, used_key), elapsed))
+
+    if args.report_json is not None:
+        with open(args.report_json, 'w') as f:
+            json.dump(reports, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
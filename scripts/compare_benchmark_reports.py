@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+#
+# Compares two benchmark reports generated by `run_onnx --report_json`
+# or `runtests.py --report_json` and fails if there is a regression.
+#
+# Usage:
+#
+# $ ./scripts/runtests.py onnx_real -g --benchmark 10 --report_json base.json
+# (change something)
+# $ ./scripts/runtests.py onnx_real -g --benchmark 10 --report_json new.json
+# $ ./scripts/compare_benchmark_reports.py base.json new.json
+
+import argparse
+import json
+import sys
+
+
+MEMORY_KEYS = ['peak_used_bytes', 'peak_monitored_bytes',
+               'simulated_peak_memory_bytes', 'planned_arena_bytes',
+               'measured_peak_memory_bytes']
+
+
+def load_report(filename):
+    """Loads a report as a dict from a test name to a single report."""
+    with open(filename) as f:
+        report = json.load(f)
+    if 'stats' in report:
+        return {'': report}
+    return report
+
+
+def relative_change(base, new):
+    if base == 0:
+        return 0.0 if new == 0 else float('inf')
+    return (new - base) / base
+
+
+def compare(base_reports, new_reports, args):
+    rows = []
+    regressions = []
+    for name in sorted(set(base_reports) | set(new_reports)):
+        if name not in base_reports or name not in new_reports:
+            rows.append((name, args.metric, None, None, 'missing'))
+            continue
+        base = base_reports[name]
+        new = new_reports[name]
+
+        checks = [(args.metric, base['stats'][args.metric],
+                   new['stats'][args.metric], args.threshold)]
+        for key in MEMORY_KEYS:
+            if key in base and key in new:
+                checks.append((key, base[key], new[key],
+                               args.memory_threshold))
+
+        for key, base_value, new_value, threshold in checks:
+            change = relative_change(base_value, new_value)
+            status = ''
+            if change > threshold:
+                status = 'REGRESSION'
+                regressions.append((name, key, change))
+            elif change < -threshold:
+                status = 'improved'
+            rows.append((name, key, base_value, new_value, status))
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare two benchmark reports')
+    parser.add_argument('base', help='The baseline report JSON')
+    parser.add_argument('new', help='The report JSON to be checked')
+    parser.add_argument('--metric', default='p50',
+                        choices=['mean', 'min', 'max', 'p50', 'p90', 'p99'],
+                        help='The statistic of elapsed times to compare')
+    parser.add_argument('--threshold', type=float, default=0.05,
+                        help='Allowed relative slowdown (0.05 means 5%%)')
+    parser.add_argument('--memory_threshold', type=float, default=0.01,
+                        help='Allowed relative increase of memory usage')
+    parser.add_argument('--allow_missing', action='store_true',
+                        help='Do not fail when tests are missing in a report')
+    args = parser.parse_args()
+
+    base_reports = load_report(args.base)
+    new_reports = load_report(args.new)
+    rows, regressions = compare(base_reports, new_reports, args)
+
+    num_missing = 0
+    for name, key, base_value, new_value, status in rows:
+        if status == 'missing':
+            num_missing += 1
+            print('%-40s %-28s %s' % (name, key, status))
+            continue
+        change = relative_change(base_value, new_value) * 100
+        print('%-40s %-28s %14.3f %14.3f %+8.2f%% %s' %
+              (name, key, base_value, new_value, change, status))
+
+    if regressions:
+        print('%d regression(s) found!' % len(regressions))
+        sys.exit(1)
+    if num_missing and not args.allow_missing:
+        print('%d test(s) are missing in one of the reports' % num_missing)
+        sys.exit(1)
+    print('No regression')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+#
+# Converts tensor files in ONNX test directories between ONNX
+# `TensorProto` (.pb) and NumPy (.npy) formats. `.npy` files are
+# memory-mapped by `run_onnx` and `utils/run_onnx_util.py`, which makes
+# loading large test data cheaper.
+#
+# Usage:
+#
+# $ ./scripts/convert_test_data.py out/large_oc_resnet152_float32 --to npy
+
+import argparse
+import glob
+import os
+
+from chainer_compiler.utils import test_data
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Convert the format of ONNX test data')
+    parser.add_argument('test_dirs', nargs='+',
+                        help='ONNX test directories or test data set dirs')
+    parser.add_argument('--to', default='npy', choices=test_data.DATA_FORMATS,
+                        help='The format to be converted to')
+    parser.add_argument('--keep', action='store_true',
+                        help='Do not remove the original files')
+    args = parser.parse_args()
+
+    for test_dir in args.test_dirs:
+        data_set_dirs = glob.glob(os.path.join(test_dir, 'test_data_set_*'))
+        if not data_set_dirs:
+            data_set_dirs = [test_dir]
+        for data_set_dir in sorted(data_set_dirs):
+            print('Converting %s' % data_set_dir)
+            test_data.convert_test_data_dir(data_set_dir, args.to,
+                                            remove=not args.keep)
+
+
+if __name__ == '__main__':
+    main()
@@ -728,6 +728,37 @@ def gen_sequence_extend_test(test_name):
     gb.gen_test()
 
 
+def gen_sequence_append_loop_test(num_steps):
+    # A decoder-like loop which reads the last element of a list and
+    # appends a new one, as `z_all.append(z_list[-1])` in EspNet's
+    # decoder does.
+    def fn(test_name):
+        gb = onnx_script.GraphBuilder(test_name)
+        init = np.zeros(8, np.float32)
+        init_v = gb.input('init', init)
+        seq_v = gb.SequenceConstruct([init_v])
+
+        bb = onnx_script.GraphBuilder(test_name + '_body')
+        bb.input('iter', np.array(0))
+        bb.input('cond', np.array(True))
+        state_v = bb.input('state', Seq([init]))
+        last_v = bb.SequenceAt([state_v, bb.const(-1)])
+        next_v = bb.Add([last_v, bb.const(np.ones(8, np.float32))])
+        state_v = bb.SequenceInsert([state_v, next_v])
+        bb.output(bb.const(True), np.array(True))
+        bb.output(state_v, Seq([init]))
+
+        out_v = gb.Loop([gb.const(num_steps), gb.const(True), seq_v],
+                        body=bb.make_graph())
+        stack_v = gb.ConcatFromSequence([out_v], axis=0, new_axis=1)
+        expected = np.stack([init + i for i in range(num_steps + 1)])
+        gb.output(stack_v, expected)
+
+        gb.gen_test()
+
+    return fn
+
+
 def gen_sequence_update_test(test_name):
     gb = onnx_script.GraphBuilder(test_name)
     inputs = [4, 2, 3]
@@ -1134,6 +1165,33 @@ def gen_convtranspose_bn(test_name):
     gb.gen_test()
 
 
+def gen_elementwise_chain_test(test_name):
+    # Scale/shift of inference-mode batch normalization followed by ReLU
+    # and a residual connection, which are fused by --fuse_operations.
+    gb = onnx_script.GraphBuilder(test_name)
+    bsize = 4
+    chan = 16
+    size = 32
+
+    x = np.random.normal(size=(bsize, chan, size, size)).astype(np.float32)
+    r = np.random.normal(size=(bsize, chan, size, size)).astype(np.float32)
+    scale = np.random.normal(size=(chan, 1, 1)).astype(np.float32)
+    shift = np.random.normal(size=(chan, 1, 1)).astype(np.float32)
+    h = np.maximum(x * scale + shift, 0) + r
+    y = np.tanh(h) * (1 / (1 + np.exp(-h)))
+
+    x_v = gb.input('x', x)
+    r_v = gb.input('r', r)
+    scale_v = gb.param('scale', scale)
+    shift_v = gb.param('shift', shift)
+    h_v = gb.Add([gb.Relu([gb.Add([gb.Mul([x_v, scale_v]), shift_v])]),
+                  r_v])
+    y_v = gb.Mul([gb.Tanh([h_v]), gb.Sigmoid([h_v])])
+
+    gb.output(y_v, y)
+    gb.gen_test()
+
+
 def gen_unsqueeze_negative_axis(test_name):
     gb = onnx_script.GraphBuilder(test_name)
 
@@ -1229,6 +1287,8 @@ def get_tests():
     test('extra_test_sequence_create', gen_sequence_create_test)
     test('extra_test_sequence_extend', gen_sequence_extend_test)
     test('extra_test_sequence_update', gen_sequence_update_test)
+    test('extra_test_sequence_append_loop',
+         gen_sequence_append_loop_test(1000))
 
     test('extra_test_sentiment_lstm',
          sentiment.gen_rnn_sentiment_test('LSTM'), rtol=0.2)
@@ -1283,6 +1343,8 @@ def get_tests():
 
     test('extra_test_convtranspose_bn', gen_convtranspose_bn)
 
+    test('extra_test_elementwise_chain', gen_elementwise_chain_test)
+
     # TODO(hamaji): ONNX's shape inference for Unsqueeze is probably broken.
     test('extra_test_unsqueeze_negative_axis', gen_unsqueeze_negative_axis,
          skip_shape_inference=True)
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import glob
 import shutil
 
 import chainer
@@ -7,6 +8,7 @@ import numpy as np
 import onnx_chainer
 
 import large_models
+from chainer_compiler.utils import test_data
 
 
 def create_test(test_name, get_fun, dtype):
@@ -29,6 +31,10 @@ def create_test(test_name, get_fun, dtype):
                                  output_grad=output_grad,
                                  train=True,
                                  output_names='loss')
+    # Large inputs and outputs are stored as .npy files so they can be
+    # memory-mapped by test runners.
+    for data_set_dir in glob.glob('%s/test_data_set_*' % test_dir):
+        test_data.convert_test_data_dir(data_set_dir, 'npy')
 
 
 def get_large_tests():
@@ -26,6 +26,10 @@ FLAGS = {
         'type': 'bool',
         'doc': 'Use NVRTC to execute fused operations.'
     },
+    'use_cpu_codegen': {
+        'type': 'bool',
+        'doc': 'Use C++ code compiled by the host compiler to execute fused operations on CPU.'
+    },
 
     'use_cached_model': {
         'type': 'bool',
@@ -162,6 +166,35 @@ FLAGS = {
         'type': 'int',
         'doc': 'Memory budget of GT policy (in MB)'
     },
+
+    'scheduler': {
+        'type': 'std::string',
+        'doc': 'The scheduler of computation (greedy, naive, or beam)'
+    },
+    'scheduler_beam_width': {
+        'type': 'int',
+        'doc': 'The beam width of the beam scheduler (default: 8)'
+    },
+
+    'disable_in_place_ops': {
+        'type': 'bool',
+        'doc': 'Do not run element-wise ops or sequence updates in-place even when their inputs are not used later'
+    },
+
+    'simplify_full_sweep': {
+        'type': 'bool',
+        'doc': 'Simplify by visiting all nodes until nothing changes instead of using a worklist (for benchmarking)'
+    },
+
+    'use_memory_arena': {
+        'type': 'bool',
+        'doc': 'Store outputs of element-wise ops, MatMul, Gemm, and Conv to offsets in a per-run arena planned at compile time.'
+    },
+
+    'compile_cache_dir': {
+        'type': 'std::string',
+        'doc': 'Reuse graphs compiled with the same inputs and flags in this directory'
+    },
 }
 
 
@@ -188,6 +221,9 @@ extern {} g_{};
         '''.format(v['doc'], v['type'], name))
     f.write('''
 
+// Returns a string which contains values of all flags.
+std::string FlagsToString();
+
 }  // namespace chainer_compiler
 ''')
 
@@ -195,6 +231,8 @@ elif args.mode == 'flags.cc':
     f.write('''
 #include "compiler/flags.h"
 
+#include <sstream>
+
 namespace chainer_compiler {
 ''')
     for name, v in FLAGS.items():
@@ -204,6 +242,19 @@ namespace chainer_compiler {
 {} g_{};
 '''.format(v['doc'], v['type'], name))
 
+    f.write('''
+std::string FlagsToString() {
+    std::ostringstream oss;
+''')
+    for name, v in sorted(FLAGS.items()):
+        f.write('''
+    oss << "{}=" << g_{} << ";";
+'''.format(name, name))
+    f.write('''
+    return oss.str();
+}
+''')
+
     f.write('''
 struct Flags {
 ''')
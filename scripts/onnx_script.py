@@ -7,6 +7,8 @@ import numpy as np
 import onnx
 from onnx import numpy_helper
 
+from chainer_compiler.utils import test_data
+
 
 # From onnx/backend/test/case/node/__init__.py
 def _extract_value_info(arr, name):
@@ -47,7 +49,7 @@ def make_constant_sequence_node(name, typ, values):
     return node
 
 
-def gen_test(graph, inputs, outputs, name):
+def gen_test(graph, inputs, outputs, name, data_format='pb'):
     model = onnx.helper.make_model(graph, producer_name='backend-test')
 
     test_dir = os.path.join('out', name)
@@ -63,18 +65,14 @@ def gen_test(graph, inputs, outputs, name):
                 assert value
                 digits = len(str(len(value)))
                 for j, v in enumerate(value):
-                    filename = os.path.join(
+                    test_data.write_tensor(
                         test_data_set_dir,
-                        '%s_%d_%s.pb' % (typ, i, str(j).zfill(digits)))
-                    tensor = numpy_helper.from_array(v, name)
-                    with open(filename, 'wb') as f:
-                        f.write(tensor.SerializeToString())
+                        '%s_%d_%s' % (typ, i, str(j).zfill(digits)),
+                        v, name, data_format=data_format)
             else:
-                filename = os.path.join(test_data_set_dir,
-                                        '%s_%d.pb' % (typ, i))
-                tensor = numpy_helper.from_array(value, name)
-                with open(filename, 'wb') as f:
-                    f.write(tensor.SerializeToString())
+                test_data.write_tensor(test_data_set_dir,
+                                       '%s_%d' % (typ, i),
+                                       value, name, data_format=data_format)
 
 
 class Seq(object):
@@ -191,8 +189,9 @@ class GraphBuilder(object):
                                        initializer=initializer)
         return graph
 
-    def gen_test(self, graph=None):
+    def gen_test(self, graph=None, data_format='pb'):
         if graph is None:
             graph = self.make_graph()
         outputs = self.outputs + self.gradients
-        gen_test(graph, self.inputs, outputs, name=self.graph_name)
+        gen_test(graph, self.inputs, outputs, name=self.graph_name,
+                 data_format=data_format)
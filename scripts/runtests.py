@@ -3,11 +3,14 @@
 import argparse
 import copy
 import glob
+import json
 import multiprocessing
 import os
 import re
+import select
 import sys
 import subprocess
+import time
 
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
@@ -49,6 +52,8 @@ parser.add_argument('--failed', action='store_true',
 parser.add_argument('--failure_log', default='out/failed_tests.log',
                     help='The file where names of failed tests are stored')
 parser.add_argument('--fuse', action='store_true', help='Enable fusion')
+parser.add_argument('--cpu_codegen', action='store_true',
+                    help='Run fused ops by generated code on CPU')
 parser.add_argument('--ngraph', action='store_true', help='Enable nGraph')
 parser.add_argument('--snpe', action='store_true', help='Enable SNPE')
 parser.add_argument('--computation_order', default=None,
@@ -60,6 +65,14 @@ parser.add_argument('--target_opsets',
                     help='Specify target opsets to run with comma separated string')
 parser.add_argument('--only_opset_targetable', action='store_true',
                     help='Run test cases with opset_version is not None')
+parser.add_argument('--benchmark', type=int, default=None,
+                    help='Run each test for the specified number of '
+                    'iterations to measure its performance')
+parser.add_argument('--report_json', default=None,
+                    help='Merge benchmark reports of tests into this file')
+parser.add_argument('--server', action='store_true',
+                    help='Run tests in persistent `run_onnx --server` '
+                    'processes instead of spawning a process per test')
 args = parser.parse_args()
 
 
@@ -977,25 +990,110 @@ class TestRunner(object):
 
             if num_parallel_jobs != 1:
                 _start_output('%s... ' % test_case.name)
-            self.tested.append(test_case)
-            if status == 0:
-                if test_case.fail:
-                    sys.stdout.write('%sOK (unexpected)%s\n' % (YELLOW, RESET))
-                else:
-                    sys.stdout.write('%sOK%s' % (GREEN, RESET))
-                    if not sys.stdout.isatty():
-                        sys.stdout.write('\n')
+            self.report(test_case, status == 0)
+        _start_output('')
+        sys.stdout.write('\n')
+
+    def report(self, test_case, ok):
+        self.tested.append(test_case)
+        if ok:
+            if test_case.fail:
+                sys.stdout.write('%sOK (unexpected)%s\n' % (YELLOW, RESET))
             else:
-                self.failed.append(test_case)
-                sys.stdout.write('%sFAIL%s: %s\n' %
+                sys.stdout.write('%sOK%s' % (GREEN, RESET))
+                if not sys.stdout.isatty():
+                    sys.stdout.write('\n')
+        else:
+            self.failed.append(test_case)
+            sys.stdout.write('%sFAIL%s: %s\n' %
+                             (RED, RESET, test_case.repro_cmdline()))
+        if not ok or self.show_log:
+            sys.stdout.buffer.write(test_case.log_read())
+            if not ok:
+                sys.stdout.write('%s$%s %s\n' %
                                  (RED, RESET, test_case.repro_cmdline()))
-            if status != 0 or self.show_log:
-                sys.stdout.buffer.write(test_case.log_read())
-                if status != 0:
-                    sys.stdout.write('%s$%s %s\n' %
-                                     (RED, RESET, test_case.repro_cmdline()))
 
-            sys.stdout.flush()
+        sys.stdout.flush()
+
+
+class RunONNXServer(object):
+    """A `run_onnx --server` process which runs tests one by one."""
+
+    def __init__(self, run_onnx):
+        self.run_onnx = run_onnx
+        self.proc = None
+        self.test_case = None
+        self.start()
+
+    def start(self):
+        self.proc = subprocess.Popen([self.run_onnx, '--server'],
+                                     stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL)
+
+    def send(self, test_case):
+        assert self.test_case is None
+        self.test_case = test_case
+        # Make sure the log file exists even when the server dies
+        # before opening it.
+        open(test_case.log_filename, 'wb').close()
+        request = [test_case.log_filename] + test_case.args[1:]
+        self.proc.stdin.write(('\t'.join(request) + '\n').encode())
+        self.proc.stdin.flush()
+
+    def receive(self):
+        """Waits for the result of the current test.
+
+        A failed test aborts the server process so it is restarted.
+        """
+        test_case = self.test_case
+        self.test_case = None
+        ok = self.proc.stdout.readline().strip() == b'OK'
+        if not ok:
+            self.proc.wait()
+            self.start()
+        return test_case, ok
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+
+class ServerTestRunner(TestRunner):
+    """Runs tests with persistent `run_onnx --server` processes."""
+
+    def __init__(self, test_cases, show_log, run_onnx):
+        super(ServerTestRunner, self).__init__(test_cases, show_log)
+        self.run_onnx = run_onnx
+
+    def run(self, num_parallel_jobs):
+        tests = list(reversed(self.test_cases))
+        num_servers = min(num_parallel_jobs, len(tests))
+        servers = [RunONNXServer(self.run_onnx) for _ in range(num_servers)]
+        idle = list(servers)
+        busy = {}
+        while tests or busy:
+            if tests and idle:
+                test_case = tests.pop()
+                if num_parallel_jobs == 1:
+                    _start_output('%s... ' % test_case.name)
+                server = idle.pop()
+                server.send(test_case)
+                busy[server.proc.stdout.fileno()] = server
+                continue
+
+            assert busy
+            ready, _, _ = select.select(list(busy.keys()), [], [])
+            for fd in ready:
+                server = busy.pop(fd)
+                test_case, ok = server.receive()
+                idle.append(server)
+                if num_parallel_jobs != 1:
+                    _start_output('%s... ' % test_case.name)
+                self.report(test_case, ok)
+
+        for server in servers:
+            server.close()
         _start_output('')
         sys.stdout.write('\n')
 
@@ -1087,6 +1185,8 @@ def main():
             test_case.args.append('--fuse_operations')
             if is_gpu:
                 test_case.args.append('--use_nvrtc')
+            elif args.cpu_codegen:
+                test_case.args.append('--use_cpu_codegen')
         if args.ngraph:
             test_case.args.append('--fuse_operations')
             test_case.args.append('--use_ngraph')
@@ -1097,6 +1197,15 @@ def main():
         if args.cache:
             test_case.args.append('--use_cached_model')
 
+        if args.benchmark:
+            test_case.args += ['--iterations', str(args.benchmark)]
+        if args.report_json:
+            test_case.report_filename = os.path.join(test_case.log_dirname,
+                                                     'report.json')
+            if os.path.exists(test_case.report_filename):
+                os.unlink(test_case.report_filename)
+            test_case.args += ['--report_json', test_case.report_filename]
+
         if is_gpu:
             gpu_tests.append(test_case)
         else:
@@ -1108,11 +1217,33 @@ def main():
     for test in tests + gpu_tests:
         test.prepare()
 
+    start_time = time.time()
     for tests, num_jobs in [(tests, args.jobs), (gpu_tests, 1)]:
-        runner = TestRunner(tests, args.show_log)
-        runner.run(num_jobs)
-        tested += runner.tested
-        failed += runner.failed
+        if args.server:
+            # Tests for run_onnx_menoh are spawned as usual since it
+            # has no server mode.
+            server_tests = [t for t in tests if t.args[0] == run_onnx]
+            spawned_tests = [t for t in tests if t.args[0] != run_onnx]
+            runners = [ServerTestRunner(server_tests, args.show_log, run_onnx),
+                       TestRunner(spawned_tests, args.show_log)]
+        else:
+            runners = [TestRunner(tests, args.show_log)]
+        for runner in runners:
+            if not runner.test_cases:
+                continue
+            runner.run(num_jobs)
+            tested += runner.tested
+            failed += runner.failed
+    elapsed = time.time() - start_time
+
+    if args.report_json:
+        reports = {}
+        for test in tested:
+            if os.path.exists(test.report_filename):
+                with open(test.report_filename) as f:
+                    reports[test.name] = json.load(f)
+        with open(args.report_json, 'w') as f:
+            json.dump(reports, f, indent=2, sort_keys=True)
 
     if failed:
         with open(args.failure_log, 'wb') as f:
@@ -1121,12 +1252,12 @@ def main():
                 f.write(('$ %s\n' % test.repro_cmdline()).encode())
                 f.write(test.log_read())
                 f.write('\n'.encode())
-        print('%d/%d tests failed! (see %s)' %
-              (len(failed), len(tested), args.failure_log))
+        print('%d/%d tests failed! (see %s) in %.1f sec' %
+              (len(failed), len(tested), args.failure_log, elapsed))
         sys.exit(1)
     else:
-        print('ALL %d tests OK! (%d from ONNX)' %
-              (len(tested), num_official_onnx_tests))
+        print('ALL %d tests OK! (%d from ONNX) in %.1f sec' %
+              (len(tested), num_official_onnx_tests, elapsed))
 
 
 main()
@@ -48,6 +48,7 @@ class TestCase(object):
             self.log_dirname = os.path.join('out', name)
             makedirs(self.log_dirname)
         self.log_filename = os.path.join(self.log_dirname, 'out.txt')
+        self.report_filename = None
 
     def prepare(self):
         if self.prepare_func is not None:
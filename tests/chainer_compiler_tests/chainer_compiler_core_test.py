@@ -1,4 +1,6 @@
+import json
 import os
+import struct
 import sys
 
 import chainerx
@@ -48,6 +50,64 @@ def test_inference():
     assert 'op_type: "ChainerLinear"' in graph.dump()
 
 
+def test_program_cache():
+    graph = _chainer_compiler_core.load('out/ch2o_node_Linear/model.onnx')
+    params = graph.params()
+    input_names = graph.input_names()
+    output_names = graph.output_names()
+
+    cache = graph.compile_cached(
+        2, shape_buckets=[4, 8], bucket_axes=[0],
+        unpad_axes={output_names[0]: {0: (input_names[0], 0)}})
+
+    for batchsize in [3, 4, 5]:
+        inputs = dict(params)
+        t1 = aranges(batchsize, 7)
+        inputs[input_names[0]] = _chainer_compiler_core.value(t1)
+        y1 = (chainerx.dot(t1, params['/l1/W'].array().T) +
+              params['/l1/b'].array())
+
+        outputs = cache.run(inputs)
+        # Outputs computed for padded inputs are sliced back.
+        y = outputs[output_names[0]].array()
+        assert y.shape[0] == batchsize
+        chainerx.testing.assert_allclose(y1, y)
+
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+    assert stats['evictions'] == 0
+    assert stats['size'] == 2
+
+
+def test_profiler():
+    graph = _chainer_compiler_core.load('out/ch2o_node_Linear/model.onnx')
+    params = graph.params()
+    input_names = graph.input_names()
+
+    chxvm = graph.compile()
+    profiler = _chainer_compiler_core.Profiler()
+
+    inputs = dict(params)
+    inputs[input_names[0]] = _chainer_compiler_core.value(aranges(5, 7))
+    for _ in range(3):
+        chxvm.run(inputs, profiler=profiler)
+
+    stats = profiler.stats()
+    assert stats['op_types']
+    assert stats['instructions']
+    for inst in stats['instructions']:
+        assert inst['count'] == 3
+        assert inst['op_type'] in stats['op_types']
+        assert inst['max_usec'] <= inst['total_usec']
+    assert (sum(s['count'] for s in stats['op_types'].values()) ==
+            sum(inst['count'] for inst in stats['instructions']))
+    assert 'op_type' in profiler.table()
+
+    profiler.reset()
+    assert not profiler.stats()['instructions']
+
+
 def test_backprop():
     graph = _chainer_compiler_core.load('out/ch2o_node_Linear_backprop/model.onnx')
     params = graph.params()
@@ -99,6 +159,57 @@ def test_backprop():
         grad_b, bwd_outputs['grad_out@/l1/b'].array())
 
 
+def test_chrome_tracing_prepared_state(tmpdir):
+    graph = _chainer_compiler_core.load(
+        'out/ch2o_node_Linear_backprop/model.onnx')
+    params = graph.params()
+    input_names = graph.input_names()
+    output_names = graph.output_names()
+    fwd_graph, bwd_graph = graph.backward()
+    fwd = fwd_graph.compile()
+    bwd = bwd_graph.compile()
+
+    tracer = _chainer_compiler_core.ChromeTracing()
+    fwd_inputs = dict(params)
+    fwd_inputs[input_names[0]] = _chainer_compiler_core.value(aranges(5, 7))
+    with tracer.scope('Step', 'forward'):
+        fwd_outputs = fwd.run(fwd_inputs, chrome_tracer=tracer)
+    num_fwd_events = tracer.num_events()
+    assert num_fwd_events > 1
+
+    bwd_inputs = {}
+    for name in fwd_graph.output_names():
+        iname = name
+        value = fwd_outputs[name]
+        if name in output_names:
+            iname = 'grad_in@' + name
+            value = _chainer_compiler_core.value(
+                chainerx.ones(value.array().shape, dtype=chainerx.float32))
+        bwd_inputs[iname] = value
+    with tracer.scope('Step', 'backward'):
+        state = bwd.prepare(bwd_inputs, chrome_tracer=tracer)
+        bwd.run(state)
+    assert tracer.num_events() > num_fwd_events + 1
+
+    filename = str(tmpdir.join('trace.json'))
+    tracer.emit(filename)
+    with open(filename) as f:
+        events = json.load(f)
+    assert len(events) == tracer.num_events()
+    names = [e['name'] for e in events if e['cat'] == 'Step']
+    assert names == ['forward', 'backward']
+
+    tracer.clear()
+    assert tracer.num_events() == 0
+
+    # A state prepared with a filename emits its events after runs.
+    filename = str(tmpdir.join('bwd.json'))
+    state = bwd.prepare(bwd_inputs, chrome_tracing=filename)
+    bwd.run(state)
+    with open(filename) as f:
+        assert all(e['cat'] == 'ChxVM' for e in json.load(f))
+
+
 def test_custom_op():
     gb = onnx_script.GraphBuilder('pytest_custom_op')
     a = np.array(13)
@@ -141,3 +252,41 @@ def test_custom_op():
 
     chainerx.testing.assert_allclose(9, outputs['y'].array())
     chainerx.testing.assert_allclose(42, outputs['z'].array())
+
+
+def _write_shard(dirname, labels, height, width):
+    # See feeder/shard.h for the format.
+    num_pixels = 3 * height * width
+    record_size = (8 + num_pixels + 63) // 64 * 64
+    with open(os.path.join(dirname, 'test.shard'), 'wb') as f:
+        f.write(struct.pack('<8siiiiqq24x', b'CHXSHARD', 1, 3, height, width,
+                            len(labels), record_size))
+        for label in labels:
+            record = struct.pack('<i4x', label) + bytes([label]) * num_pixels
+            f.write(record.ljust(record_size, b'\0'))
+    index = os.path.join(dirname, 'test.index')
+    with open(index, 'w') as f:
+        f.write('3 %d %d\n' % (height, width))
+        f.write('test.shard %d\n' % len(labels))
+    return index
+
+
+def test_shard_iterator(tmpdir):
+    index = _write_shard(str(tmpdir), list(range(10)), 4, 6)
+    mean = [1.0] * (3 * 4 * 6)
+    shard_iter = _chainer_compiler_core.ShardIterator(
+        index, 4, mean, 4, 6, num_workers=2, scale=0.5)
+    assert shard_iter.num_records() == 10
+
+    labels = []
+    with _chainer_compiler_core.DeviceFeeder(shard_iter, 'native:0') as feeder:
+        for images, batch_labels in feeder:
+            assert isinstance(images, chainerx.ndarray)
+            assert images.shape[1:] == (3, 4, 6)
+            images = chainerx.to_numpy(images)
+            batch_labels = chainerx.to_numpy(batch_labels)
+            for image, label in zip(images, batch_labels):
+                np.testing.assert_allclose((label - 1) * 0.5, image)
+            labels.extend(batch_labels.tolist())
+    shard_iter.terminate()
+    assert sorted(labels) == list(range(10))
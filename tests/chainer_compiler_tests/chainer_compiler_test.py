@@ -1,3 +1,4 @@
+import json
 import os
 import pytest
 import sys
@@ -449,3 +450,37 @@ def test_partially_differentiable(device_name, translator):
     #     assert e is not None
     #     assert a is not None
     #     _assert_allclose(e, a)
+
+
+@pytest.mark.parametrize('device_name', all_device_names)
+def test_chrome_tracing(device_name, tmpdir):
+    np.random.seed(40)
+    device = chainer.get_device(device_name)
+    device.use()
+
+    mlp = MLP(4, 10)
+    mlp.to_device(device)
+    input = device.xp.array(np.random.rand(3, 5).astype(np.float32))
+    target = device.xp.array(np.random.randint(10, size=3))
+
+    filename = str(tmpdir.join('trace_{step}.json'))
+    mlp_compiled = chainer_compiler.compile(
+        mlp, [input], chrome_tracing=filename, chrome_tracing_steps=2)
+    model = L.Classifier(mlp_compiled)
+    model.to_device(device)
+    for _ in range(3):
+        _run_fwd_bwd(model, [input, target])
+
+    # Forward and backward events of two steps are in a trace.
+    with open(str(tmpdir.join('trace_0.json'))) as f:
+        events = json.load(f)
+    steps = [e['name'] for e in events if e['cat'] == 'CompiledModel']
+    assert steps == ['Forward #0', 'Backward #0', 'Forward #1', 'Backward #1']
+    assert any(e['cat'] == 'ChxVM' for e in events)
+    assert not os.path.exists(str(tmpdir.join('trace_2.json')))
+
+    mlp_compiled.flush_chrome_tracing()
+    with open(str(tmpdir.join('trace_2.json'))) as f:
+        events = json.load(f)
+    steps = [e['name'] for e in events if e['cat'] == 'CompiledModel']
+    assert steps == ['Forward #2', 'Backward #2']
@@ -0,0 +1,197 @@
+// Measures the throughput of training input pipelines with a synthetic
+// in-memory dataset, so this runs on CPU-only machines. A few matmuls
+// on each batch stand in for a model. Modes are
+//
+// - inline: batches are assembled and transferred by the main thread.
+// - iterator: batches are assembled by `DataIterator` and transferred
+//   synchronously, as `train_imagenet` did.
+// - feeder: `DeviceFeeder` transfers the next batch during computation.
+//
+// Usage:
+//
+// $ ./build/tools/bench_feeder -d cuda:0 -B 64
+// $ ./build/tools/bench_feeder --modes iterator,feeder --layers 8
+
+#include <chrono>
+#include <cstdio>
+#include <cstring>
+#include <memory>
+#include <random>
+#include <string>
+#include <vector>
+
+#include <chainerx/array.h>
+#include <chainerx/backprop_mode.h>
+#include <chainerx/context.h>
+#include <chainerx/routines/creation.h>
+#include <chainerx/routines/linalg.h>
+#include <chainerx/routines/math.h>
+#include <chainerx/routines/reduction.h>
+
+#include <common/log.h>
+#include <common/strutil.h>
+#include <feeder/array_pool.h>
+#include <feeder/data_iterator.h>
+#include <feeder/device_feeder.h>
+#include <tools/cmdline.h>
+
+namespace {
+
+// Assembles batches of images and labels by copying random samples in
+// host memory, like loaders of preprocessed datasets.
+class SyntheticDataset {
+public:
+    SyntheticDataset(int num_samples, int batch_size, int height, int width)
+        : batch_size_(batch_size),
+          sample_size_(3 * height * width),
+          height_(height),
+          width_(width),
+          images_(static_cast<size_t>(num_samples) * sample_size_),
+          labels_(num_samples),
+          pool_(&chainerx::GetDefaultContext().GetDevice({"native", 0})) {
+        std::uniform_real_distribution<float> dist(-1, 1);
+        for (float& v : images_) v = dist(mt_);
+        for (int i = 0; i < num_samples; ++i) labels_[i] = i % 1000;
+    }
+
+    std::vector<chainerx::Array> MakeBatch() {
+        chainerx::Array images = pool_.Allocate(chainerx::Dtype::kFloat32, {batch_size_, 3, height_, width_});
+        chainerx::Array labels = pool_.Allocate(chainerx::Dtype::kInt32, {batch_size_});
+        float* image_data = static_cast<float*>(images.raw_data());
+        int32_t* label_data = static_cast<int32_t*>(labels.raw_data());
+        std::uniform_int_distribution<int> dist(0, labels_.size() - 1);
+        for (int i = 0; i < batch_size_; ++i) {
+            const int index = dist(mt_);
+            std::memcpy(image_data + i * sample_size_, &images_[index * sample_size_], sample_size_ * sizeof(float));
+            label_data[i] = labels_[index];
+        }
+        return {images, labels};
+    }
+
+private:
+    const int batch_size_;
+    const int64_t sample_size_;
+    const int height_;
+    const int width_;
+    std::vector<float> images_;
+    std::vector<int32_t> labels_;
+    std::mt19937 mt_;
+    ArrayPool pool_;
+};
+
+class SyntheticIterator : public DataIterator {
+public:
+    SyntheticIterator(SyntheticDataset* dataset, int num_batches) : DataIterator(3), dataset_(dataset), num_batches_(num_batches) {
+    }
+
+    ~SyntheticIterator() override {
+        Terminate();
+    }
+
+    std::vector<chainerx::Array> GetNextImpl() override {
+        if (num_batches_-- == 0) return {};
+        return dataset_->MakeBatch();
+    }
+
+private:
+    SyntheticDataset* dataset_;
+    int num_batches_;
+};
+
+// Runs a stack of matmuls and waits for the result.
+float Compute(const chainerx::Array& images, const std::vector<chainerx::Array>& weights) {
+    chainerx::Array h = images.Reshape({images.shape()[0], -1});
+    for (const chainerx::Array& w : weights) {
+        h = chainerx::Tanh(chainerx::Dot(h, w));
+    }
+    return static_cast<float>(chainerx::AsScalar(chainerx::Sum(h)));
+}
+
+double RunBenchmark(const cmdline::parser& args, const std::string& mode, chainerx::Device* device, size_t* num_buffers) {
+    const int batch_size = args.get<int>("batchsize");
+    const int height = args.get<int>("height");
+    const int width = args.get<int>("width");
+    const int iterations = args.get<int>("iterations");
+    const int hidden = args.get<int>("hidden");
+
+    std::vector<chainerx::Array> weights;
+    int64_t in_size = 3 * height * width;
+    for (int i = 0; i < args.get<int>("layers"); ++i) {
+        weights.push_back(chainerx::Full({in_size, hidden}, 0.01f, chainerx::Dtype::kFloat32, *device));
+        in_size = hidden;
+    }
+
+    SyntheticDataset dataset(args.get<int>("num_samples"), batch_size, height, width);
+    std::unique_ptr<SyntheticIterator> source;
+    std::unique_ptr<DeviceFeeder> feeder;
+    if (mode != "inline") {
+        source.reset(new SyntheticIterator(&dataset, iterations + 1));
+        source->Start();
+    }
+    if (mode == "feeder") {
+        feeder.reset(new DeviceFeeder(source.get(), device));
+        feeder->Start();
+    }
+
+    auto get_next = [&]() -> std::vector<chainerx::Array> {
+        if (feeder) return feeder->GetNext();
+        std::vector<chainerx::Array> data = source ? source->GetNext() : dataset.MakeBatch();
+        for (chainerx::Array& a : data) a = a.ToDevice(*device);
+        return data;
+    };
+
+    // Warmup.
+    Compute(get_next()[0], weights);
+
+    std::chrono::steady_clock::time_point start = std::chrono::steady_clock::now();
+    for (int i = 0; i < iterations; ++i) {
+        std::vector<chainerx::Array> data = get_next();
+        CHECK_EQ(2, data.size());
+        Compute(data[0], weights);
+    }
+    std::chrono::steady_clock::time_point end = std::chrono::steady_clock::now();
+
+    if (feeder) {
+        *num_buffers = feeder->num_buffers();
+        feeder->Terminate();
+    }
+    if (source) source->Terminate();
+    double elapsed = std::chrono::duration_cast<std::chrono::microseconds>(end - start).count() * 1e-6;
+    return batch_size * iterations / elapsed;
+}
+
+void RunMain(int argc, char** argv) {
+    cmdline::parser args;
+    args.add<std::string>("device", 'd', "ChainerX device to be used", false, "native:0");
+    args.add<std::string>("modes", '\0', "Comma separated modes", false, "inline,iterator,feeder");
+    args.add<int>("batchsize", 'B', "Batch size", false, 32);
+    args.add<int>("height", '\0', "Height of images", false, 224);
+    args.add<int>("width", '\0', "Width of images", false, 224);
+    args.add<int>("num_samples", '\0', "Number of samples in the dataset", false, 256);
+    args.add<int>("layers", '\0', "Number of matmuls for each batch", false, 2);
+    args.add<int>("hidden", '\0', "Hidden size of matmuls", false, 256);
+    args.add<int>("iterations", 'I', "Number of iterations", false, 20);
+    args.parse_check(argc, argv);
+
+    chainerx::Context ctx;
+    chainerx::SetGlobalDefaultContext(&ctx);
+    chainerx::NoBackpropModeScope no_backprop;
+    chainerx::Device* device = &ctx.GetDevice(args.get<std::string>("device"));
+    chainerx::SetDefaultDevice(device);
+
+    std::printf("%-10s %12s %8s %8s\n", "mode", "images/sec", "speedup", "buffers");
+    double baseline = 0;
+    for (const std::string& mode : chainer_compiler::SplitString(args.get<std::string>("modes"), ",")) {
+        CHECK(mode == "inline" || mode == "iterator" || mode == "feeder") << "Unknown mode: " << mode;
+        size_t num_buffers = 0;
+        double throughput = RunBenchmark(args, mode, device, &num_buffers);
+        if (baseline == 0) baseline = throughput;
+        std::printf("%-10s %12.1f %7.2fx %8zu\n", mode.c_str(), throughput, throughput / baseline, num_buffers);
+    }
+}
+
+}  // namespace
+
+int main(int argc, char** argv) {
+    RunMain(argc, argv);
+}
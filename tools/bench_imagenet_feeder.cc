@@ -0,0 +1,111 @@
+// Measures the throughput of `ImageNetIterator`, which decodes JPEG
+// files, and `ShardIterator`, which reads shards made by
+// `pack_imagenet`, for numbers of threads. Batches are consumed
+// without computation, so this shows the upper bound of each input
+// pipeline.
+//
+// Usage:
+//
+// $ ./build/tools/bench_imagenet_feeder --list train.txt --index shards/train.index --threads 1,4,16
+
+#include <chrono>
+#include <cstdio>
+#include <iostream>
+#include <memory>
+#include <string>
+#include <vector>
+
+#include <chainerx/array.h>
+#include <chainerx/context.h>
+
+#include <common/log.h>
+#include <common/strutil.h>
+#include <feeder/data_iterator.h>
+#include <feeder/imagenet_iterator.h>
+#include <feeder/shard_iterator.h>
+#include <tools/cmdline.h>
+
+namespace {
+
+double RunBenchmark(const cmdline::parser& args, const std::string& mode, int num_threads) {
+    const int batch_size = args.get<int>("batchsize");
+    const int height = args.get<int>("height");
+    const int width = args.get<int>("width");
+    const int iterations = args.get<int>("iterations");
+    const std::vector<float> mean(3 * height * width, 0.0f);
+
+    std::unique_ptr<DataIterator> iter;
+    if (mode == "jpeg") {
+        ImageNetIteratorOptions options;
+        options.num_workers = num_threads;
+        options.random_crop = args.exist("random_crop");
+        options.random_flip = args.exist("random_flip");
+        iter.reset(new ImageNetIterator(args.get<std::string>("list"), 3, batch_size, mean, height, width, options));
+    } else {
+        ShardIteratorOptions options;
+        options.num_workers = num_threads;
+        options.random_crop = args.exist("random_crop");
+        options.random_flip = args.exist("random_flip");
+        options.num_epochs = 0;
+        iter.reset(new ShardIterator(args.get<std::string>("index"), 3, batch_size, mean, height, width, options));
+    }
+    iter->Start();
+
+    // Warmup.
+    CHECK(!iter->GetNext().empty());
+
+    int64_t num_images = 0;
+    std::chrono::steady_clock::time_point start = std::chrono::steady_clock::now();
+    for (int i = 0; i < iterations; ++i) {
+        std::vector<chainerx::Array> data = iter->GetNext();
+        if (data.empty()) break;
+        CHECK_EQ(2, data.size());
+        num_images += data[1].shape()[0];
+    }
+    std::chrono::steady_clock::time_point end = std::chrono::steady_clock::now();
+    iter->Terminate();
+
+    double elapsed = std::chrono::duration_cast<std::chrono::microseconds>(end - start).count() * 1e-6;
+    return num_images / elapsed;
+}
+
+void RunMain(int argc, char** argv) {
+    cmdline::parser args;
+    args.add<std::string>("list", '\0', "Text file of pairs of an image and a label", false);
+    args.add<std::string>("index", '\0', "Index of shards made by pack_imagenet", false);
+    args.add<std::string>("threads", '\0', "Comma separated numbers of threads", false, "1,4");
+    args.add<int>("batchsize", 'B', "Batch size", false, 32);
+    args.add<int>("height", '\0', "Height of images", false, 224);
+    args.add<int>("width", '\0', "Width of images", false, 224);
+    args.add<int>("iterations", 'I', "Number of iterations", false, 20);
+    args.add("random_crop", '\0', "Crop images at random");
+    args.add("random_flip", '\0', "Flip images horizontally at random");
+    args.parse_check(argc, argv);
+
+    std::vector<std::string> modes;
+    if (!args.get<std::string>("list").empty()) modes.push_back("jpeg");
+    if (!args.get<std::string>("index").empty()) modes.push_back("shard");
+    if (modes.empty()) {
+        std::cerr << args.usage() << std::endl;
+        QFAIL() << "Either --list or --index is required";
+    }
+
+    chainerx::Context ctx;
+    chainerx::SetGlobalDefaultContext(&ctx);
+
+    std::printf("%-8s %8s %12s %8s\n", "mode", "threads", "images/sec", "speedup");
+    double baseline = 0;
+    for (const std::string& mode : modes) {
+        for (const std::string& threads : chainer_compiler::SplitString(args.get<std::string>("threads"), ",")) {
+            double throughput = RunBenchmark(args, mode, std::stoi(threads));
+            if (baseline == 0) baseline = throughput;
+            std::printf("%-8s %8s %12.1f %7.2fx\n", mode.c_str(), threads.c_str(), throughput, throughput / baseline);
+        }
+    }
+}
+
+}  // namespace
+
+int main(int argc, char** argv) {
+    RunMain(argc, argv);
+}
@@ -0,0 +1,50 @@
+#include "tools/benchmark.h"
+
+#include <algorithm>
+#include <cmath>
+#include <numeric>
+
+#include <common/log.h>
+
+namespace chainer_compiler {
+namespace runtime {
+
+double Percentile(std::vector<double> values, double q) {
+    CHECK(!values.empty());
+    CHECK_LE(0, q);
+    CHECK_LE(q, 100);
+    std::sort(values.begin(), values.end());
+    const double rank = q / 100 * (values.size() - 1);
+    const size_t lo = static_cast<size_t>(std::floor(rank));
+    const size_t hi = static_cast<size_t>(std::ceil(rank));
+    return values[lo] + (values[hi] - values[lo]) * (rank - lo);
+}
+
+BenchmarkStats SummarizeElapsedTimes(const std::vector<double>& times, int num_warmups) {
+    CHECK(!times.empty());
+    BenchmarkStats stats;
+    if (num_warmups < 0 || times.size() <= static_cast<size_t>(num_warmups)) {
+        stats.elapsed_times = times;
+    } else {
+        stats.warmup_times.assign(times.begin(), times.begin() + num_warmups);
+        stats.elapsed_times.assign(times.begin() + num_warmups, times.end());
+    }
+
+    const std::vector<double>& elapsed = stats.elapsed_times;
+    const double n = elapsed.size();
+    stats.mean = std::accumulate(elapsed.begin(), elapsed.end(), 0.0) / n;
+    double sq_sum = 0;
+    for (double t : elapsed) {
+        sq_sum += (t - stats.mean) * (t - stats.mean);
+    }
+    stats.stddev = std::sqrt(sq_sum / n);
+    stats.min = *std::min_element(elapsed.begin(), elapsed.end());
+    stats.max = *std::max_element(elapsed.begin(), elapsed.end());
+    stats.p50 = Percentile(elapsed, 50);
+    stats.p90 = Percentile(elapsed, 90);
+    stats.p99 = Percentile(elapsed, 99);
+    return stats;
+}
+
+}  // namespace runtime
+}  // namespace chainer_compiler
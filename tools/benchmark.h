@@ -0,0 +1,32 @@
+#pragma once
+
+#include <string>
+#include <vector>
+
+namespace chainer_compiler {
+namespace runtime {
+
+// Statistics of elapsed times (in msec) of benchmark iterations.
+struct BenchmarkStats {
+    std::vector<double> warmup_times;
+    std::vector<double> elapsed_times;
+    double mean{0};
+    double stddev{0};
+    double min{0};
+    double max{0};
+    double p50{0};
+    double p90{0};
+    double p99{0};
+};
+
+// Returns the `q`-th percentile (0 <= q <= 100) of `values` using
+// linear interpolation, like numpy.percentile does.
+double Percentile(std::vector<double> values, double q);
+
+// Summarizes `times`. The first `num_warmups` elements are treated as
+// warmup iterations and excluded from statistics unless nothing
+// remains.
+BenchmarkStats SummarizeElapsedTimes(const std::vector<double>& times, int num_warmups);
+
+}  // namespace runtime
+}  // namespace chainer_compiler
@@ -0,0 +1,56 @@
+#include <cmath>
+#include <vector>
+
+#include <gtest/gtest.h>
+
+#include <tools/benchmark.h>
+
+namespace chainer_compiler {
+namespace runtime {
+namespace {
+
+TEST(BenchmarkTest, Percentile) {
+    // Unsorted values are sorted.
+    const std::vector<double> values = {4, 1, 3, 2};
+    EXPECT_DOUBLE_EQ(1, Percentile(values, 0));
+    EXPECT_DOUBLE_EQ(2.5, Percentile(values, 50));
+    EXPECT_DOUBLE_EQ(3.7, Percentile(values, 90));
+    EXPECT_DOUBLE_EQ(4, Percentile(values, 100));
+    EXPECT_DOUBLE_EQ(5, Percentile({5}, 90));
+}
+
+TEST(BenchmarkTest, PercentileEmpty) {
+    EXPECT_DEATH(Percentile({}, 50), "");
+}
+
+TEST(BenchmarkTest, SummarizeElapsedTimes) {
+    const BenchmarkStats stats = SummarizeElapsedTimes({100, 1, 2, 3, 4}, 1);
+    EXPECT_EQ(std::vector<double>({100}), stats.warmup_times);
+    EXPECT_EQ(std::vector<double>({1, 2, 3, 4}), stats.elapsed_times);
+    EXPECT_DOUBLE_EQ(2.5, stats.mean);
+    EXPECT_DOUBLE_EQ(std::sqrt(1.25), stats.stddev);
+    EXPECT_DOUBLE_EQ(1, stats.min);
+    EXPECT_DOUBLE_EQ(4, stats.max);
+    EXPECT_DOUBLE_EQ(2.5, stats.p50);
+    EXPECT_DOUBLE_EQ(3.7, stats.p90);
+    EXPECT_DOUBLE_EQ(3.97, stats.p99);
+}
+
+TEST(BenchmarkTest, SummarizeSingleSample) {
+    // Warmups are not excluded when nothing remains.
+    const BenchmarkStats stats = SummarizeElapsedTimes({7}, 1);
+    EXPECT_TRUE(stats.warmup_times.empty());
+    EXPECT_EQ(std::vector<double>({7}), stats.elapsed_times);
+    EXPECT_DOUBLE_EQ(7, stats.mean);
+    EXPECT_DOUBLE_EQ(0, stats.stddev);
+    EXPECT_DOUBLE_EQ(7, stats.p50);
+    EXPECT_DOUBLE_EQ(7, stats.p90);
+}
+
+TEST(BenchmarkTest, SummarizeEmpty) {
+    EXPECT_DEATH(SummarizeElapsedTimes({}, 0), "");
+}
+
+}  // namespace
+}  // namespace runtime
+}  // namespace chainer_compiler
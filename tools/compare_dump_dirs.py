@@ -6,55 +6,264 @@
 # $ build/tools/run_onnx --dump_outputs_dir b  --backprop --test out/backprop_test_mnist_mlp
 # $ python3 tools/compare_dump_dirs.py a b
 #
+# Dumps are memory-mapped and compared in parallel. The first diverging
+# op in the ChxVM program order of the first directory is reported with
+# max absolute/relative errors and the distance in ULPs.
+#
+# With --follow, outputs are compared as they are dumped, e.g.
+#
+# $ python3 tools/compare_dump_dirs.py a b --follow &
+# $ build/tools/run_onnx --dump_outputs_dir b  --backprop --test out/backprop_test_mnist_mlp
+#
 
 import argparse
 import glob
+import multiprocessing
 import os
 import re
 import sys
+import time
 
 import numpy as np
 
 
 def read_dump_dir(d):
+    """Returns a list of (op ID, output name, filename) in program order."""
     filenames = sorted(glob.glob(os.path.join(d, '*.npy')))
     files = []
     for filename in filenames:
         name = os.path.basename(filename)
-        matched = re.match(r'\d+_(.*)\.npy$', name)
+        matched = re.match(r'(\d+)_(.*)\.npy$', name)
         if matched:
-            files.append((matched.group(1), filename))
+            files.append((int(matched.group(1)), matched.group(2), filename))
     return files
 
 
+_ULP_INT_TYPES = {
+    np.dtype(np.float16): np.int16,
+    np.dtype(np.float32): np.int32,
+    np.dtype(np.float64): np.int64,
+}
+
+
+def _ordered_ints(a):
+    """Maps floats to integers which are monotonic in the float order."""
+    int_type = _ULP_INT_TYPES[a.dtype]
+    i = np.ascontiguousarray(a).view(int_type).astype(np.int64)
+    int_min = np.iinfo(int_type).min
+    return np.where(i < 0, int_min - i, i)
+
+
+def ulp_distance(a, b):
+    """Returns the element-wise distance of `a` and `b` in ULPs."""
+    with np.errstate(over='ignore'):
+        d = _ordered_ints(a).astype(np.float64) - _ordered_ints(b)
+    return np.abs(d)
+
+
+class Result(object):
+
+    def __init__(self, op_id, name, ok, message='',
+                 max_abs=0.0, max_rel=0.0, max_ulp=None, num_mismatch=0,
+                 size=0):
+        self.op_id = op_id
+        self.name = name
+        self.ok = ok
+        self.message = message
+        self.max_abs = max_abs
+        self.max_rel = max_rel
+        self.max_ulp = max_ulp
+        self.num_mismatch = num_mismatch
+        self.size = size
+
+
+def compare_arrays(op_id, name, a, b, rtol, atol):
+    if a.shape != b.shape:
+        return Result(op_id, name, False,
+                      'shape mismatch %s vs %s' % (a.shape, b.shape))
+    if a.dtype != b.dtype:
+        return Result(op_id, name, False,
+                      'dtype mismatch %s vs %s' % (a.dtype, b.dtype))
+    if a.size == 0:
+        return Result(op_id, name, True)
+
+    if a.dtype.kind in 'fc':
+        x = a.astype(np.float64)
+        y = b.astype(np.float64)
+    else:
+        x = a.astype(np.int64).astype(np.float64)
+        y = b.astype(np.int64).astype(np.float64)
+    diff = np.abs(x - y)
+    both_nan = np.isnan(x) & np.isnan(y)
+    diff[both_nan] = 0
+    same_inf = np.isinf(x) & (x == y)
+    diff[same_inf] = 0
+    mismatch = ~(diff <= atol + rtol * np.abs(y))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rel = np.where(diff == 0, 0, diff / np.abs(y))
+
+    max_ulp = None
+    if a.dtype in _ULP_INT_TYPES:
+        ulp = ulp_distance(a, b)
+        ulp[both_nan] = 0
+        max_ulp = float(np.max(ulp))
+
+    num_mismatch = int(np.count_nonzero(mismatch))
+    return Result(op_id, name, num_mismatch == 0,
+                  max_abs=float(np.nanmax(diff)),
+                  max_rel=float(np.nanmax(rel)),
+                  max_ulp=max_ulp,
+                  num_mismatch=num_mismatch,
+                  size=a.size)
+
+
+def compare_files(task):
+    op_id, name, filename1, filename2, rtol, atol = task
+    try:
+        a = np.load(filename1, mmap_mode='r')
+        b = np.load(filename2, mmap_mode='r')
+    except (IOError, ValueError) as e:
+        return Result(op_id, name, False, 'failed to load: %s' % e)
+    return compare_arrays(op_id, name, a, b, rtol, atol)
+
+
+def format_result(result):
+    if result.message:
+        return '%05d %s: %s' % (result.op_id, result.name, result.message)
+    ulp = '-' if result.max_ulp is None else '%d' % result.max_ulp
+    return ('%05d %s: %s mismatch=%d/%d max_abs=%g max_rel=%g max_ulp=%s' %
+            (result.op_id, result.name, 'OK' if result.ok else 'NG',
+             result.num_mismatch, result.size,
+             result.max_abs, result.max_rel, ulp))
+
+
+def show_values(filename1, filename2):
+    sys.stderr.write('=== %s ===\n%s\n' % (filename1, np.load(filename1)))
+    sys.stderr.write('=== %s ===\n%s\n' % (filename2, np.load(filename2)))
+
+
+def make_tasks(files1, files2, args):
+    files_map2 = {name: filename for _, name, filename in files2}
+    tasks = []
+    for op_id, name, filename1 in files1:
+        filename2 = files_map2.get(name)
+        if filename2 is None:
+            continue
+        tasks.append((op_id, name, filename1, filename2,
+                      args.rtol, args.atol))
+    return tasks
+
+
+class Reporter(object):
+
+    def __init__(self, args):
+        self.args = args
+        self.results = []
+
+    def add(self, result, task):
+        self.results.append(result)
+        if not result.ok or self.args.verbose:
+            sys.stderr.write('%s\n' % format_result(result))
+        if not result.ok and self.args.show_values and not result.message:
+            show_values(task[2], task[3])
+
+    def summarize(self):
+        failed = sorted([r for r in self.results if not r.ok],
+                        key=lambda r: r.op_id)
+        sys.stderr.write('Compared %d outputs, %d mismatch(es)\n' %
+                         (len(self.results), len(failed)))
+        if not failed:
+            return True
+        sys.stderr.write('First diverging op: %s\n' %
+                         format_result(failed[0]))
+        worst = max(failed, key=lambda r: r.max_abs)
+        sys.stderr.write('Largest abs error: %s\n' % format_result(worst))
+        return False
+
+
+def compare_all(pool, args):
+    files1 = read_dump_dir(args.dir1)
+    files2 = read_dump_dir(args.dir2)
+    tasks = make_tasks(files1, files2, args)
+    reporter = Reporter(args)
+    for task, result in zip(tasks, pool.imap(compare_files, tasks,
+                                             chunksize=args.chunksize)):
+        reporter.add(result, task)
+    return reporter.summarize()
+
+
+def _is_complete(filename, last_sizes):
+    """Checks the size of a dump file is stable between two polls."""
+    size = os.path.getsize(filename)
+    stable = last_sizes.get(filename) == size
+    last_sizes[filename] = size
+    return stable
+
+
+def compare_follow(pool, args):
+    reporter = Reporter(args)
+    done = set()
+    last_sizes = {}
+    pending = []
+    last_update = time.time()
+    while True:
+        tasks = make_tasks(read_dump_dir(args.dir1),
+                           read_dump_dir(args.dir2), args)
+        for task in tasks:
+            key = (task[1], task[2], task[3])
+            if key in done:
+                continue
+            if not (_is_complete(task[2], last_sizes) and
+                    _is_complete(task[3], last_sizes)):
+                continue
+            done.add(key)
+            last_update = time.time()
+            pending.append((task, pool.apply_async(compare_files, (task,))))
+
+        while pending and pending[0][1].ready():
+            task, async_result = pending.pop(0)
+            reporter.add(async_result.get(), task)
+
+        if not pending and time.time() - last_update > args.timeout:
+            break
+        time.sleep(args.interval)
+    return reporter.summarize()
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('dir1')
     parser.add_argument('dir2')
     parser.add_argument('--rtol', type=float, default=1e-7)
     parser.add_argument('--atol', type=float, default=0)
+    parser.add_argument('--jobs', '-j', type=int,
+                        default=multiprocessing.cpu_count(),
+                        help='Number of processes to compare dumps')
+    parser.add_argument('--chunksize', type=int, default=16,
+                        help='Number of dumps sent to a process at once')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help='Show results of matched outputs, too')
+    parser.add_argument('--show_values', action='store_true',
+                        help='Show values of mismatched outputs')
+    parser.add_argument('--follow', action='store_true',
+                        help='Compare dumps as they appear')
+    parser.add_argument('--interval', type=float, default=0.5,
+                        help='Polling interval in seconds for --follow')
+    parser.add_argument('--timeout', type=float, default=10,
+                        help='Stop --follow after no new dumps for this '
+                        'many seconds')
     args = parser.parse_args()
 
-
-    files1 = read_dump_dir(args.dir1)
-    files2 = read_dump_dir(args.dir2)
-
-    files_map2 = dict(files2)
-
-    for name, filename1 in files1:
-        filename2 = files_map2.get(name)
-        if filename2 is None:
-            continue
-        sys.stderr.write('Comparing %s...' % name)
-        n1 = np.load(filename1)
-        n2 = np.load(filename2)
-        try:
-            np.testing.assert_allclose(n1, n2, rtol=args.rtol, atol=args.atol)
-            sys.stderr.write(' OK\n')
-        except AssertionError as e:
-            sys.stderr.write('%s\n\n' % e)
-            sys.stderr.write('=== %s ===\n%s\n' % (filename1, n1))
-            sys.stderr.write('=== %s ===\n%s\n' % (filename2, n2))
+    pool = multiprocessing.Pool(args.jobs)
+    try:
+        if args.follow:
+            ok = compare_follow(pool, args)
+        else:
+            ok = compare_all(pool, args)
+    finally:
+        pool.close()
+        pool.join()
+    sys.exit(0 if ok else 1)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,138 @@
+// Packs images listed in a text file of pairs of an image filename and
+// a label, which `ImageNetIterator` reads, into shards for
+// `ShardIterator`. Images are decoded, resized so their shorter sides
+// fit the record, and cropped at their centers. Records keep the order
+// of the list, as `ShardIterator` shuffles them.
+//
+// Usage:
+//
+// $ ./build/tools/pack_imagenet train.txt shards/train --threads 16
+//
+// This writes shards/train-00000.shard, ... and shards/train.index.
+
+#include <algorithm>
+#include <atomic>
+#include <cmath>
+#include <cstdio>
+#include <fstream>
+#include <iostream>
+#include <memory>
+#include <string>
+#include <thread>
+#include <utility>
+#include <vector>
+
+#include <opencv2/core/core.hpp>
+#include <opencv2/imgproc/imgproc.hpp>
+
+#include <common/log.h>
+#include <feeder/imagenet_iterator.h>
+#include <feeder/shard.h>
+#include <tools/cmdline.h>
+
+namespace {
+
+std::string Basename(const std::string& filename) {
+    size_t found = filename.rfind('/');
+    if (found == std::string::npos) return filename;
+    return filename.substr(found + 1);
+}
+
+// Writes an image as an RGB record of `height` x `width` in CHW.
+void PackImage(const cv::Mat& image, int height, int width, uint8_t* out) {
+    const double scale = std::max(static_cast<double>(height) / image.rows, static_cast<double>(width) / image.cols);
+    const int resized_height = std::max(height, static_cast<int>(std::round(image.rows * scale)));
+    const int resized_width = std::max(width, static_cast<int>(std::round(image.cols * scale)));
+    cv::Mat resized;
+    cv::resize(image, resized, cv::Size(resized_width, resized_height), 0, 0, cv::INTER_AREA);
+    cv::Mat cropped = resized(cv::Rect((resized_width - width) / 2, (resized_height - height) / 2, width, height));
+
+    cv::Mat channels[3];
+    cv::split(cropped, channels);
+    for (int c = 0; c < 3; ++c) {
+        cv::Mat plane(height, width, CV_8U, out + c * height * width);
+        // BGR to RGB.
+        channels[2 - c].copyTo(plane);
+    }
+}
+
+void RunMain(int argc, char** argv) {
+    cmdline::parser args;
+    args.add<int>("height", '\0', "Height of records", false, 256);
+    args.add<int>("width", '\0', "Width of records", false, 256);
+    args.add<int>("records_per_shard", '\0', "Number of records in each shard", false, 10000);
+    args.add<int>("threads", 'j', "Number of threads to decode images", false, 4);
+    args.parse_check(argc, argv);
+    if (args.rest().size() != 2) {
+        std::cerr << args.usage() << std::endl;
+        QFAIL() << "Usage: " << argv[0] << " <train.txt> <output prefix>";
+    }
+
+    const std::string& list_filename = args.rest()[0];
+    const std::string& prefix = args.rest()[1];
+    const int height = args.get<int>("height");
+    const int width = args.get<int>("width");
+    const int records_per_shard = args.get<int>("records_per_shard");
+    CHECK_LT(0, records_per_shard);
+
+    std::vector<std::pair<std::string, int>> dataset;
+    {
+        std::ifstream ifs(list_filename);
+        CHECK(ifs) << "Failed to open: " << list_filename;
+        std::string filename;
+        int label;
+        while (ifs >> filename >> label) {
+            dataset.emplace_back(filename, label);
+        }
+    }
+
+    ShardIndex index;
+    index.height = height;
+    index.width = width;
+    std::vector<std::unique_ptr<Shard>> shards;
+    for (size_t first = 0; first < dataset.size(); first += records_per_shard) {
+        const int64_t num_records = std::min<int64_t>(records_per_shard, dataset.size() - first);
+        char suffix[32];
+        std::snprintf(suffix, sizeof(suffix), "-%05zu.shard", shards.size());
+        const std::string filename = prefix + suffix;
+        shards.emplace_back(new Shard(filename, 3, height, width, num_records));
+        index.shards.emplace_back(Basename(filename), num_records);
+    }
+
+    // Threads fill different records of the mapped shards.
+    std::atomic<size_t> next{0};
+    std::atomic<size_t> num_done{0};
+    auto worker = [&]() {
+        while (true) {
+            const size_t i = next++;
+            if (i >= dataset.size()) break;
+            cv::Mat image = DecodeImage(dataset[i].first);
+            CHECK(!image.empty()) << "Failed to decode: " << dataset[i].first;
+            Shard* shard = shards[i / records_per_shard].get();
+            const int64_t record = i % records_per_shard;
+            shard->set_label(record, dataset[i].second);
+            PackImage(image, height, width, shard->mutable_pixels(record));
+            const size_t done = ++num_done;
+            if (done % 10000 == 0) {
+                std::cerr << done << "/" << dataset.size() << " images" << std::endl;
+            }
+        }
+    };
+    std::vector<std::thread> threads;
+    for (int i = 0; i < args.get<int>("threads"); ++i) {
+        threads.emplace_back(worker);
+    }
+    for (std::thread& thread : threads) {
+        thread.join();
+    }
+    shards.clear();
+
+    SaveShardIndex(prefix + ".index", index);
+    std::cerr << "Packed " << dataset.size() << " images into " << index.shards.size() << " shards" << std::endl;
+}
+
+}  // namespace
+
+int main(int argc, char** argv) {
+    RunMain(argc, argv);
+}
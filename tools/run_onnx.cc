@@ -1,3 +1,10 @@
+#ifndef _WIN32
+#include <errno.h>
+#include <fcntl.h>
+#include <string.h>
+#include <unistd.h>
+#endif
+
 #include <algorithm>
 #include <chrono>
 #include <cstdlib>
@@ -7,6 +14,8 @@
 #include <set>
 #include <string>
 
+#include <nlohmann/json.hpp>
+
 #include <chainerx/array.h>
 #include <chainerx/backprop_mode.h>
 #include <chainerx/context.h>
@@ -26,8 +35,11 @@
 #include <compiler/gradient.h>
 #include <compiler/gradient_with_order.h>
 #include <compiler/graph.h>
+#include <compiler/memory_planner.h>
+#include <compiler/memory_simulator.h>
 #include <compiler/model.h>
 #include <compiler/onnx.h>
+#include <compiler/pass_stats.h>
 #include <compiler/passes.h>
 #include <compiler/tensor.h>
 #include <compiler/util.h>
@@ -38,6 +50,9 @@
 #include <runtime/chxvm.pb.h>
 #include <runtime/chxvm_var.h>
 #include <runtime/meminfo.h>
+#include <runtime/profiler.h>
+#include <runtime/program_cache.h>
+#include <tools/benchmark.h>
 #include <tools/cmdline.h>
 #include <tools/compiler_flags.h>
 #include <tools/log.h>
@@ -62,6 +77,63 @@ void GenerateFixedInput(const Model& model, const std::set<std::string>& initial
     }
 }
 
+nlohmann::json PassStatsToJSON(const PassStats& pass_stats) {
+    nlohmann::json passes = nlohmann::json::array();
+    for (const PassStat& stat : pass_stats.stats()) {
+        passes.push_back({{"name", stat.name},
+                          {"graph", stat.graph},
+                          {"elapsed_msec", stat.elapsed_msec},
+                          {"num_nodes_before", stat.num_nodes_before},
+                          {"num_nodes_after", stat.num_nodes_after},
+                          {"num_values_before", stat.num_values_before},
+                          {"num_values_after", stat.num_values_after}});
+    }
+    return passes;
+}
+
+std::vector<int64_t> ParseInts(const std::string& str) {
+    std::vector<int64_t> ints;
+    for (const std::string& tok : SplitString(str, ",")) {
+        if (!tok.empty()) {
+            ints.push_back(std::stoll(tok));
+        }
+    }
+    return ints;
+}
+
+nlohmann::json ProfileStatsToJSON(const ChxVMProfiler::Stats& stats) {
+    return {{"count", stats.count},
+            {"total_usec", stats.total_usec},
+            {"mean_usec", stats.mean_usec()},
+            {"max_usec", stats.max_usec},
+            {"flops", stats.flops},
+            {"gflops_per_sec", stats.gflops_per_sec()},
+            {"output_bytes", stats.output_bytes}};
+}
+
+nlohmann::json ProfilerToJSON(const ChxVMProfiler& profiler) {
+    nlohmann::json op_types = nlohmann::json::object();
+    for (const auto& p : profiler.op_type_stats()) {
+        op_types[p.first] = ProfileStatsToJSON(p.second);
+    }
+    nlohmann::json instructions = nlohmann::json::array();
+    for (const auto& p : profiler.instruction_stats()) {
+        nlohmann::json inst = ProfileStatsToJSON(p.second);
+        inst["id"] = p.second.id;
+        inst["pc"] = p.second.pc;
+        inst["op_type"] = p.second.op_type;
+        inst["debug_info"] = p.second.debug_info;
+        instructions.push_back(inst);
+    }
+    return {{"total_usec", profiler.total_usec()}, {"op_types", op_types}, {"instructions", instructions}};
+}
+
+void WriteReport(const std::string& report_json, const nlohmann::json& report) {
+    std::ofstream ofs(report_json);
+    CHECK(ofs) << "Failed to open report JSON: " << report_json;
+    ofs << report.dump(2) << std::endl;
+}
+
 chainerx::Array StageArray(chainerx::Array a) {
     // TODO(hamaji): Figure out a better way to identify host inputs.
     if (a.dtype() != chainerx::Dtype::kInt64) return a.ToDevice(chainerx::GetDefaultDevice());
@@ -94,6 +166,7 @@ public:
     ModelRunner(const cmdline::parser& args, int64_t initial_used_bytes, std::unique_ptr<Model> model)
         : args_(args), initial_used_bytes_(initial_used_bytes) {
         if (args.exist("backprop_two_phase")) {
+            CHECK_EQ(0, args.get<int>("program_cache_size")) << "--program_cache_size is not supported with --backprop_two_phase";
             Model backprop_model(*model, model->graph().name() + "_backprop");
             RunDefaultPassesBeforeGradient(model->mutable_graph());
 
@@ -111,25 +184,30 @@ public:
             g_skip_inference = true;
 
             LOG() << "Constructing model (forward)..." << std::endl;
-            RunDefaultPasses(model->mutable_graph(), false, skip_scheduling);
+            RunDefaultPasses(model->mutable_graph(), false, skip_scheduling, &pass_stats_);
             CompileModel(model.get(), &chxvm_);
             LOG() << "Constructing model (backward)..." << std::endl;
-            RunDefaultPasses(backprop_model.mutable_graph(), false, skip_scheduling);
+            RunDefaultPasses(backprop_model.mutable_graph(), false, skip_scheduling, &pass_stats_);
             CompileModel(&backprop_model, &chxvm_bp_, "bp");
             for (Value* value : backprop_model.graph().input_values()) {
                 backprop_ins_.push_back(value->name());
             }
             flops_ += CalculateTotalFlops(backprop_model.graph(), &num_unknown_ops_);
+            EstimateMemory(backprop_model.graph());
 
             // TODO(hamaji): Set `ordered_output_names_` in two-phase mode.
         } else {
+            if (args_.get<int>("program_cache_size") > 0) {
+                InitProgramCache(*model);
+            }
             LOG() << "Constructing model..." << std::endl;
-            RunDefaultPasses(model->mutable_graph(), args_.exist("backprop"));
+            RunDefaultPasses(model->mutable_graph(), args_.exist("backprop"), false /* skip_scheduling */, &pass_stats_);
             CompileModel(model.get(), &chxvm_);
 
             ordered_output_names_ = GetOrderedOutputNames(model->graph());
         }
         flops_ += CalculateTotalFlops(model->graph(), &num_unknown_ops_);
+        EstimateMemory(model->graph());
 
         for (const std::string& op_name : SplitString(args_.get<std::string>("verbose_ops"), ",")) {
             ChxVMInstructionProto::Op op;
@@ -142,12 +220,20 @@ public:
         chxvm_opts_.check_nans = args_.exist("check_nans");
         chxvm_opts_.check_infs = args_.exist("check_infs");
         chxvm_opts_.catch_exception = !args_.exist("no_catch");
-        chxvm_opts_.dump_memory_usage = args_.exist("trace") ? 2 : 0;
+        chxvm_opts_.dump_memory_usage = args_.exist("trace") ? 2 : args_.get<int>("dump_memory_usage");
         chxvm_opts_.base_memory_usage = initial_used_bytes_;
         chxvm_opts_.dump_outputs_dir = args_.get<std::string>("dump_outputs_dir");
+        chxvm_opts_.num_inter_op_threads = args_.get<int>("inter_op_threads");
         if (!args_.get<std::string>("chrome_tracing").empty()) {
             chxvm_opts_.chrome_tracing = new ChromeTracingEmitter();
         }
+        if (args_.exist("profile")) {
+            profiler_.reset(new ChxVMProfiler());
+            chxvm_opts_.profiler = profiler_.get();
+        }
+        if (chxvm_opts_.dump_memory_usage >= 1) {
+            chxvm_opts_.memory_stats = &memory_stats_;
+        }
 
         chxvm_->Init();
         if (chxvm_bp_) {
@@ -201,9 +287,62 @@ public:
             CHECK(chxvm_prog.SerializeToOstream(&ofs));
         }
 
+        arena_bytes_ += chxvm_prog.arena_size();
         chxvm->reset(new ChxVM(chxvm_prog, false /* should_init */));
     }
 
+    // Sets up a cache of programs specialized for shapes of inputs.
+    void InitProgramCache(const Model& model) {
+        auto xmodel = std::make_shared<onnx::ModelProto>();
+        model.ToONNX(xmodel.get());
+        std::set<std::string> initializer_names;
+        for (const Value* input : model.graph().input_values()) {
+            if (input->initializer()) {
+                initializer_names.insert(input->name());
+            }
+        }
+        const bool gen_backprop = args_.exist("backprop");
+        const bool dump_value_names = trace_level() > 0;
+        auto compile = [xmodel, gen_backprop, dump_value_names](const ProgramCache::InputShapes& shapes) {
+            std::map<std::string, std::vector<int64_t>> dims;
+            for (const auto& p : shapes) {
+                dims.emplace(p.first, std::vector<int64_t>(p.second.begin(), p.second.end()));
+            }
+            onnx::ModelProto specialized(*xmodel);
+            SpecializeInputShapes(dims, specialized.mutable_graph());
+            Model model(specialized);
+            LOG() << "Constructing model for new input shapes..." << std::endl;
+            RunDefaultPasses(model.mutable_graph(), gen_backprop);
+            ChxVMProgramProto chxvm_prog;
+            chxvm::Emit(model, &chxvm_prog, dump_value_names);
+            return std::make_shared<ChxVM>(chxvm_prog);
+        };
+
+        std::set<int> bucket_axes;
+        for (int64_t axis : ParseInts(args_.get<std::string>("bucket_axes"))) {
+            bucket_axes.insert(axis);
+        }
+        // Each entry looks like "output:axis=input:axis".
+        ProgramCache::UnpadAxes unpad_axes;
+        for (const std::string& tok : SplitString(args_.get<std::string>("unpad_axes"), ",")) {
+            if (tok.empty()) continue;
+            const std::vector<std::string> pair = SplitString(tok, "=");
+            CHECK_EQ(2, pair.size()) << "Invalid --unpad_axes: " << tok;
+            const std::vector<std::string> output = SplitString(pair[0], ":");
+            const std::vector<std::string> input = SplitString(pair[1], ":");
+            CHECK_EQ(2, output.size()) << "Invalid --unpad_axes: " << tok;
+            CHECK_EQ(2, input.size()) << "Invalid --unpad_axes: " << tok;
+            unpad_axes[output[0]][std::stoi(output[1])] = std::make_pair(input[0], std::stoi(input[1]));
+        }
+        program_cache_.reset(new ProgramCache(
+                compile,
+                args_.get<int>("program_cache_size"),
+                ParseInts(args_.get<std::string>("shape_buckets")),
+                bucket_axes,
+                initializer_names,
+                unpad_axes));
+    }
+
     ~ModelRunner() {
         if (chxvm_opts_.chrome_tracing) {
             chxvm_opts_.chrome_tracing->Emit(args_.get<std::string>("chrome_tracing"));
@@ -212,7 +351,7 @@ public:
 
     InOuts Run(const InOuts& inputs) {
         if (trace_level()) std::cerr << "Running ChxVM..." << std::endl;
-        InOuts outputs = chxvm_->Run(inputs, chxvm_opts_);
+        InOuts outputs = program_cache_ ? program_cache_->Run(inputs, chxvm_opts_) : chxvm_->Run(inputs, chxvm_opts_);
         MaybeShowGPUMemory();
         if (chxvm_bp_.get()) {
             if (trace_level()) std::cerr << "Running ChxVM for backward..." << std::endl;
@@ -257,14 +396,64 @@ public:
         return ordered_output_names_;
     }
 
+    int64_t param_bytes() const {
+        return param_bytes_;
+    }
+
+    int64_t peak_used_bytes() const {
+        return peak_used_bytes_;
+    }
+
+    int64_t simulated_peak_memory() const {
+        return simulated_peak_memory_;
+    }
+
+    int64_t planned_arena_bytes() const {
+        return planned_arena_bytes_;
+    }
+
+    // The total size of arenas allocated by `--use_memory_arena`.
+    int64_t arena_bytes() const {
+        return arena_bytes_;
+    }
+
+    // Memory usage measured while running, available only with
+    // `--dump_memory_usage`.
+    const ChxVMMemoryStats* memory_stats() const {
+        return chxvm_opts_.memory_stats;
+    }
+
+    const PassStats& pass_stats() const {
+        return pass_stats_;
+    }
+
+    const ProgramCache* program_cache() const {
+        return program_cache_.get();
+    }
+
+    ChxVMProfiler* profiler() const {
+        return profiler_.get();
+    }
+
 private:
     int trace_level() const {
         return args_.exist("verbose") ? 2 : args_.exist("trace") ? 1 : 0;
     }
 
-    void MaybeShowGPUMemory() const {
+    // Estimates are only reported and planning the memory takes long
+    // for large graphs, so they are skipped unless they are reported.
+    void EstimateMemory(const Graph& graph) {
+        if (args_.get<std::string>("report_json").empty() && !args_.exist("trace") && args_.get<int>("dump_memory_usage") == 0) {
+            return;
+        }
+        simulated_peak_memory_ += SimulateMemoryUsage(graph).peak;
+        planned_arena_bytes_ += PlanMemory(graph).arena_size;
+    }
+
+    void MaybeShowGPUMemory() {
         if (initial_used_bytes_ >= 0) {
             size_t used_bytes = GetUsedMemory() - initial_used_bytes_;
+            peak_used_bytes_ = std::max<int64_t>(peak_used_bytes_, used_bytes);
             size_t param_mbs = param_bytes_ / 1000 / 1000;
             size_t used_mbs = used_bytes / 1000 / 1000;
             LOG() << "GPU memory: param=" << param_mbs << "MB used=" << used_mbs << "MB" << std::endl;
@@ -280,63 +469,84 @@ private:
 
     std::unique_ptr<ChxVM> chxvm_bp_;
     std::vector<std::string> backprop_ins_;
+    std::unique_ptr<ProgramCache> program_cache_;
+    std::unique_ptr<ChxVMProfiler> profiler_;
     int64_t flops_{0};
     int num_unknown_ops_{0};
+    int64_t simulated_peak_memory_{0};
+    int64_t planned_arena_bytes_{0};
+    int64_t arena_bytes_{0};
+    ChxVMMemoryStats memory_stats_;
+    int64_t peak_used_bytes_{-1};
+    PassStats pass_stats_;
     std::vector<std::string> ordered_output_names_;
 };
 
-void RunMain(const std::vector<std::string>& argv) {
-    cmdline::parser args;
-    args.add<std::string>("chrome_tracing", '\0', "Output chrome tracing profile", false);
-    args.add<std::string>("backend", '\0', "The name of the backend", false, "chxvm");
-    args.add<std::string>("test", '\0', "ONNX's backend test directory", false);
-    args.add<std::string>("onnx", '\0', "ONNX model", false);
-    args.add<std::string>("device", 'd', "ChainerX device to be used", false);
-    args.add<std::string>("out_onnx", '\0', "Output ONNX model after optimization", false);
-    args.add<std::string>("out_chxvm", '\0', "Output ChxVM program", false);
-    args.add<std::string>("dump_outputs_dir", '\0', "Dump each output of ChxVM ops to this directory", false);
-    args.add<std::string>("report_json", '\0', "Dump report in a JSON", false);
-    args.add<int>("iterations", 'I', "The number of iteartions", false, 1);
-    args.add<double>("rtol", '\0', "rtol of AllClose", false, 1e-4);
-    args.add<double>("atol", '\0', "atol of AllClose", false, 1e-6);
-    args.add("equal_nan", '\0', "Treats NaN equal");
-    args.add("no_catch", '\0', "Do not catch the exception in ChxVM for better GDB experience");
-    args.add("no_check_values", '\0', "Disable value checking of node output");
-    args.add("always_show_diff", '\0', "Show diff even though value check is skipped");
-    args.add("skip_runtime_type_check", '\0', "Skip runtime type check");
-    args.add("check_nans", '\0', "Check for NaNs after each operation");
-    args.add("check_infs", '\0', "Check for infinities after each operation");
-    args.add("compile_only", '\0', "Exit after compilation");
-    args.add("dump_onnx", '\0', "Dump ONNX model after optimization");
-    args.add("dump_chxvm", '\0', "Dump ChxVM program");
-    args.add("backprop", 'b', "Add backprop outputs");
-    args.add("backprop_two_phase", '\0', "Backprop using different graphs for forward and backward");
-    args.add("skip_shape_inference", '\0', "Skip shape inference");
-    args.add("strip_chxvm", '\0', "Strip ChxVM proto");
-    args.add("trace", 't', "Tracing mode");
-    args.add("verbose", 'v', "Verbose mode");
-    args.add<std::string>("verbose_ops", '\0', "Show verbose outputs for specific ops", false);
-    args.add("quiet", 'q', "Quiet mode");
-    AddCompilerFlags(&args);
-    args.parse_check(argv);
+void AddRunONNXFlags(cmdline::parser* args) {
+    args->add<std::string>("chrome_tracing", '\0', "Output chrome tracing profile", false);
+    args->add<std::string>("backend", '\0', "The name of the backend", false, "chxvm");
+    args->add<std::string>("test", '\0', "ONNX's backend test directory", false);
+    args->add<std::string>("onnx", '\0', "ONNX model", false);
+    args->add<std::string>("device", 'd', "ChainerX device to be used", false);
+    args->add<std::string>("out_onnx", '\0', "Output ONNX model after optimization", false);
+    args->add<std::string>("out_chxvm", '\0', "Output ChxVM program", false);
+    args->add<std::string>("dump_outputs_dir", '\0', "Dump each output of ChxVM ops to this directory", false);
+    args->add<std::string>("report_json", '\0', "Dump report in a JSON", false);
+    args->add<int>("iterations", 'I', "The number of iteartions", false, 1);
+    args->add<int>("warmup", '\0', "The number of warmup iterations excluded from statistics", false, 1);
+    args->add<int>("inter_op_threads", '\0', "The number of threads to run independent ops concurrently", false, 0);
+    args->add<int>("program_cache_size", '\0', "Cache this number of programs specialized for input shapes", false, 0);
+    args->add<std::string>("shape_buckets", '\0', "Pad inputs to these comma-separated sizes to share cached programs", false);
+    args->add<std::string>("bucket_axes", '\0', "Comma-separated axes of inputs padded by --shape_buckets", false, "1");
+    args->add<std::string>(
+            "unpad_axes", '\0', "Comma-separated output:axis=input:axis to slice padding of --shape_buckets off outputs", false);
+    args->add<int>("dump_memory_usage", '\0', "Dump memory usage (1: peak only, 2: after each op)", false, 0);
+    args->add<double>("rtol", '\0', "rtol of AllClose", false, 1e-4);
+    args->add<double>("atol", '\0', "atol of AllClose", false, 1e-6);
+    args->add("equal_nan", '\0', "Treats NaN equal");
+    args->add("no_catch", '\0', "Do not catch the exception in ChxVM for better GDB experience");
+    args->add("no_check_values", '\0', "Disable value checking of node output");
+    args->add("always_show_diff", '\0', "Show diff even though value check is skipped");
+    args->add("skip_runtime_type_check", '\0', "Skip runtime type check");
+    args->add("check_nans", '\0', "Check for NaNs after each operation");
+    args->add("check_infs", '\0', "Check for infinities after each operation");
+    args->add("compile_only", '\0', "Exit after compilation");
+    args->add("profile", '\0', "Show elapsed times aggregated per op type and per instruction");
+    args->add("dump_onnx", '\0', "Dump ONNX model after optimization");
+    args->add("dump_chxvm", '\0', "Dump ChxVM program");
+    args->add("backprop", 'b', "Add backprop outputs");
+    args->add("backprop_two_phase", '\0', "Backprop using different graphs for forward and backward");
+    args->add("skip_shape_inference", '\0', "Skip shape inference");
+    args->add("strip_chxvm", '\0', "Strip ChxVM proto");
+    args->add("server", '\0', "Run tests requested from stdin in a single process (see RunServer)");
+    args->add("trace", 't', "Tracing mode");
+    args->add("verbose", 'v', "Verbose mode");
+    args->add<std::string>("verbose_ops", '\0', "Show verbose outputs for specific ops", false);
+    args->add("quiet", 'q', "Quiet mode");
+    AddCompilerFlags(args);
+}
+
+// Updates global variables by `args` and decides the paths of the
+// ONNX model and the test directory.
+void ApplyFlags(const cmdline::parser& args, std::string* onnx_path, std::string* test_path) {
     ApplyCompilerFlags(args);
     g_compiler_log |= args.exist("trace") || args.exist("verbose");
     g_backend_name = args.get<std::string>("backend");
     g_quiet = args.exist("quiet");
 
-    std::string onnx_path = args.get<std::string>("onnx");
-    std::string test_path = args.get<std::string>("test");
+    *onnx_path = args.get<std::string>("onnx");
+    *test_path = args.get<std::string>("test");
 
-    if (onnx_path.empty() && test_path.empty()) {
+    if (onnx_path->empty() && test_path->empty()) {
         if (args.rest().empty()) {
             std::cerr << args.usage() << std::endl;
             QFAIL() << "No target testdir/onnx is specified";
         } else if (args.rest().size() == 1) {
             const std::string& filename = args.rest()[0];
             if (IsDir(filename)) {
-                test_path = filename;
+                *test_path = filename;
             } else {
-                onnx_path = filename;
+                *onnx_path = filename;
             }
         } else {
             std::cerr << args.usage() << std::endl;
@@ -346,11 +556,11 @@ void RunMain(const std::vector<std::string>& argv) {
         std::cerr << args.usage() << std::endl;
         QFAIL() << "Unknown extra arguments specified";
     }
+}
 
-    LOG() << "Initializing ChainerX..." << std::endl;
-    chainerx::Context ctx;
-    chainerx::ContextScope ctx_scope(ctx);
-    chainerx::NoBackpropModeScope no_backprop;
+// Runs a model with the parsed `args`. A ChainerX context must be
+// set up by the caller.
+void RunTest(const cmdline::parser& args, std::string onnx_path, const std::string& test_path) {
     const std::string device_spec = args.get<std::string>("device");
     if (!device_spec.empty()) {
         chainerx::Device* device = &chainerx::GetDefaultContext().GetDevice(device_spec);
@@ -358,7 +568,7 @@ void RunMain(const std::vector<std::string>& argv) {
         if (IsCudaDevice(device)) {
             g_use_cuda = true;
             g_meminfo_enabled = true;
-            if (args.exist("trace")) {
+            if (args.exist("trace") || !args.get<std::string>("report_json").empty()) {
                 InitializeMemoryMonitoring(device);
             }
         }
@@ -420,14 +630,27 @@ void RunMain(const std::vector<std::string>& argv) {
 
     ModelRunner model_runner(args, initial_used_bytes, std::move(model));
 
-    if (args.exist("compile_only")) return;
+    const std::string& report_json = args.get<std::string>("report_json");
+    if (args.exist("compile_only")) {
+        if (!report_json.empty()) {
+            nlohmann::json report;
+            report["compile_msec"] = model_runner.pass_stats().GetTotalElapsedMsec();
+            report["passes"] = PassStatsToJSON(model_runner.pass_stats());
+            WriteReport(report_json, report);
+        }
+        return;
+    }
 
     std::vector<double> elapsed_times;
-    double total_elapsed = 0;
-    double best_elapsed = 0;
     int test_cnt = 0;
     for (const std::unique_ptr<TestCase>& test_case : test_cases) {
         LOG() << "Running for " << test_case->name << std::endl;
+        // Warmup runs are excluded from the profile as well.
+        const int num_warmups = args.get<int>("warmup");
+        if (model_runner.profiler() && num_warmups > 0 && iterations > num_warmups &&
+            elapsed_times.size() == static_cast<size_t>(num_warmups)) {
+            model_runner.profiler()->Reset();
+        }
         InOuts inputs(model_runner.params());
         for (const auto& p : test_case->inputs) {
             ChxVMVar* v = StageVar(p.second.get());
@@ -472,38 +695,194 @@ void RunMain(const std::vector<std::string>& argv) {
         std::chrono::system_clock::time_point end = std::chrono::system_clock::now();
         double elapsed = std::chrono::duration_cast<std::chrono::microseconds>(end - start).count() * 0.001;
         LOG() << "Elapsed: " << elapsed << " msec" << std::endl;
-
-        // The first iteration is for warm up.
-        if (test_case != test_cases.front()) total_elapsed += elapsed;
-        if (best_elapsed == 0 || best_elapsed > elapsed) best_elapsed = elapsed;
         elapsed_times.push_back(elapsed);
     }
     if (test_cnt) LOG() << GREEN << "OK!" << RESET << std::endl;
 
-    if (elapsed_times.size() > 1) {
-        elapsed_times.erase(elapsed_times.begin());
+    if (const ProgramCache* cache = model_runner.program_cache()) {
+        LOG() << "Program cache: hits=" << cache->num_hits() << " misses=" << cache->num_misses() << " evictions=" << cache->num_evictions()
+              << std::endl;
+    }
+
+    if (const ChxVMProfiler* profiler = model_runner.profiler()) {
+        std::cerr << profiler->ToTable();
     }
 
+    if (const ChxVMMemoryStats* memory_stats = model_runner.memory_stats()) {
+        LOG() << "Memory: measured_peak=" << memory_stats->peak_bytes << " simulated_peak=" << model_runner.simulated_peak_memory()
+              << " arena=" << model_runner.arena_bytes() << " allocations=" << memory_stats->num_allocations
+              << " arena_outputs=" << memory_stats->num_arena_outputs << std::endl;
+    }
+
+    const BenchmarkStats stats = SummarizeElapsedTimes(elapsed_times, args.get<int>("warmup"));
+    const int64_t flops = model_runner.flops();
     if (iterations > 1) {
-        // The first iteration is for warm up.
-        double average_elapsed = total_elapsed / (iterations - 1);
-        if (int64_t flops = model_runner.flops()) {
-            double average_gflops_sec = flops / average_elapsed / 1000 / 1000;
-            std::cerr << "Average elapsed: " << average_elapsed << " msec (" << average_gflops_sec << " GFLOPs/sec)" << std::endl;
-            double best_gflops_sec = flops / best_elapsed / 1000 / 1000;
-            std::cerr << "Best elapsed: " << best_elapsed << " msec (" << best_gflops_sec << " GFLOPs/sec)" << std::endl;
+        if (flops) {
+            double average_gflops_sec = flops / stats.mean / 1000 / 1000;
+            std::cerr << "Average elapsed: " << stats.mean << " msec (" << average_gflops_sec << " GFLOPs/sec)" << std::endl;
+            double best_gflops_sec = flops / stats.min / 1000 / 1000;
+            std::cerr << "Best elapsed: " << stats.min << " msec (" << best_gflops_sec << " GFLOPs/sec)" << std::endl;
         } else {
-            std::cerr << "Average elapsed: " << average_elapsed << " msec" << std::endl;
-            std::cerr << "Best elapsed: " << best_elapsed << " msec" << std::endl;
+            std::cerr << "Average elapsed: " << stats.mean << " msec" << std::endl;
+            std::cerr << "Best elapsed: " << stats.min << " msec" << std::endl;
         }
+        std::cerr << "Percentiles: p50=" << stats.p50 << " p90=" << stats.p90 << " p99=" << stats.p99 << " stddev=" << stats.stddev
+                  << " msec" << std::endl;
     }
 
-    const std::string& report_json = args.get<std::string>("report_json");
     if (!report_json.empty()) {
-        std::ofstream ofs(report_json);
-        // TODO(hamaji): Output more information using nlohmann/json.
-        ofs << "{\"elapsed_times\": [ " << JoinString(MapToString(elapsed_times, [](double t) { return StrCat(t); })) << " ]}";
+        nlohmann::json report;
+        report["elapsed_times"] = stats.elapsed_times;
+        report["warmup_times"] = stats.warmup_times;
+        report["stats"] = {{"mean", stats.mean},
+                           {"stddev", stats.stddev},
+                           {"min", stats.min},
+                           {"max", stats.max},
+                           {"p50", stats.p50},
+                           {"p90", stats.p90},
+                           {"p99", stats.p99}};
+        report["flops"] = flops;
+        if (flops) {
+            report["gflops_per_sec"] = flops / stats.p50 / 1000 / 1000;
+        }
+        report["param_bytes"] = model_runner.param_bytes();
+        report["simulated_peak_memory_bytes"] = model_runner.simulated_peak_memory();
+        report["planned_arena_bytes"] = model_runner.planned_arena_bytes();
+        report["arena_bytes"] = model_runner.arena_bytes();
+        if (const ChxVMMemoryStats* memory_stats = model_runner.memory_stats()) {
+            report["measured_peak_memory_bytes"] = memory_stats->peak_bytes;
+            report["num_allocations"] = memory_stats->num_allocations;
+            report["num_arena_outputs"] = memory_stats->num_arena_outputs;
+        }
+        if (model_runner.peak_used_bytes() >= 0) {
+            report["peak_used_bytes"] = model_runner.peak_used_bytes();
+        }
+        if (g_meminfo_enabled) {
+            report["peak_monitored_bytes"] = GetPeakMemory();
+        }
+        report["compile_msec"] = model_runner.pass_stats().GetTotalElapsedMsec();
+        report["passes"] = PassStatsToJSON(model_runner.pass_stats());
+        if (const ProgramCache* cache = model_runner.program_cache()) {
+            report["program_cache"] = {{"hits", cache->num_hits()},
+                                       {"misses", cache->num_misses()},
+                                       {"evictions", cache->num_evictions()},
+                                       {"size", cache->size()}};
+        }
+        if (const ChxVMProfiler* profiler = model_runner.profiler()) {
+            report["profile"] = ProfilerToJSON(*profiler);
+        }
+        WriteReport(report_json, report);
+    }
+}
+
+#ifndef _WIN32
+
+// Redirects stdout and stderr to a file while the object is alive.
+class ScopedOutputRedirect {
+public:
+    explicit ScopedOutputRedirect(const std::string& filename) {
+        std::cout.flush();
+        std::cerr.flush();
+        fflush(stdout);
+        int fd = open(filename.c_str(), O_WRONLY | O_CREAT | O_TRUNC, 0644);
+        CHECK_LE(0, fd) << "Failed to open " << filename << ": " << strerror(errno);
+        saved_stdout_ = dup(STDOUT_FILENO);
+        saved_stderr_ = dup(STDERR_FILENO);
+        CHECK_LE(0, dup2(fd, STDOUT_FILENO));
+        CHECK_LE(0, dup2(fd, STDERR_FILENO));
+        close(fd);
+    }
+
+    ~ScopedOutputRedirect() {
+        std::cout.flush();
+        std::cerr.flush();
+        fflush(stdout);
+        dup2(saved_stdout_, STDOUT_FILENO);
+        dup2(saved_stderr_, STDERR_FILENO);
+        close(saved_stdout_);
+        close(saved_stderr_);
     }
+
+private:
+    int saved_stdout_;
+    int saved_stderr_;
+};
+
+// Runs tests requested from stdin in a single process so the cost of
+// process startup and ChainerX initialization is paid only once.
+//
+// Each request is a line of tab-separated fields. The first field is
+// the name of a log file which receives stdout and stderr of the test
+// and the rest are the flags of run_onnx. "OK" is written to stdout
+// after each successful test. A request without a log file is answered
+// by a line which starts with "ERROR". As a failed CHECK aborts the
+// server, the client should treat EOF as a failure and restart the
+// server.
+void RunServer(const std::string& program_name) {
+    chainerx::Context ctx;
+    chainerx::ContextScope ctx_scope(ctx);
+    chainerx::NoBackpropModeScope no_backprop;
+    chainerx::Device& default_device = chainerx::GetDefaultDevice();
+
+    std::string line;
+    while (std::getline(std::cin, line)) {
+        if (line.empty()) continue;
+        std::vector<std::string> fields = SplitString(line, "\t");
+        if (fields.empty() || fields[0].empty()) {
+            std::cout << "ERROR: no log file in the request" << std::endl;
+            continue;
+        }
+        std::vector<std::string> argv = {program_name};
+        argv.insert(argv.end(), fields.begin() + 1, fields.end());
+
+        {
+            ScopedOutputRedirect redirect(fields[0]);
+            cmdline::parser args;
+            AddRunONNXFlags(&args);
+            args.parse_check(argv);
+            CHECK(!args.exist("server")) << "Nested server is not allowed";
+
+            // Reset global states which may be modified by the
+            // previous test.
+            g_meminfo_enabled = false;
+            chainerx::SetDefaultDevice(&default_device);
+
+            std::string onnx_path, test_path;
+            ApplyFlags(args, &onnx_path, &test_path);
+            RunTest(args, onnx_path, test_path);
+            chainerx::GetDefaultDevice().Synchronize();
+        }
+        chainerx::SetDefaultDevice(&default_device);
+        std::cout << "OK" << std::endl;
+    }
+}
+
+#else
+
+void RunServer(const std::string& program_name) {
+    QFAIL() << "--server is not supported on this platform";
+}
+
+#endif  // _WIN32
+
+void RunMain(const std::vector<std::string>& argv) {
+    cmdline::parser args;
+    AddRunONNXFlags(&args);
+    args.parse_check(argv);
+
+    if (args.exist("server")) {
+        RunServer(argv[0]);
+        return;
+    }
+
+    std::string onnx_path, test_path;
+    ApplyFlags(args, &onnx_path, &test_path);
+
+    LOG() << "Initializing ChainerX..." << std::endl;
+    chainerx::Context ctx;
+    chainerx::ContextScope ctx_scope(ctx);
+    chainerx::NoBackpropModeScope no_backprop;
+    RunTest(args, onnx_path, test_path);
 }
 
 }  // namespace
@@ -30,6 +30,7 @@
 #include <runtime/chxvm.h>
 #include <runtime/chxvm.pb.h>
 #include <runtime/chxvm_var.h>
+#include <runtime/npy.h>
 #include <tools/cmdline.h>
 #include <tools/compiler_flags.h>
 #include <tools/log.h>
@@ -67,6 +68,23 @@ chainerx::Array MakeArrayFromONNX(const onnx::TensorProto& xtensor) {
     return array;
 }
 
+namespace {
+
+// Reads `names.txt` which maps .npy filenames to tensor names.
+std::map<std::string, std::string> ReadNpyNames(const std::string& data_set_dir) {
+    std::map<std::string, std::string> names;
+    std::ifstream ifs(data_set_dir + "/names.txt");
+    std::string line;
+    while (std::getline(ifs, line)) {
+        size_t found = line.find('\t');
+        CHECK_NE(std::string::npos, found) << "Broken names.txt in " << data_set_dir << ": " << line;
+        names[line.substr(0, found)] = line.substr(found + 1);
+    }
+    return names;
+}
+
+}  // namespace
+
 void ReadTestDir(
         const std::string& test_path,
         const std::vector<std::string>& input_names,
@@ -81,12 +99,19 @@ void ReadTestDir(
         size_t input_index = 0;
         size_t output_index = 0;
 
+        const std::map<std::string, std::string> npy_names = ReadNpyNames(data_set_dir);
         std::vector<std::tuple<std::string, std::string, chainerx::Array>> all_tensors;
-        for (const std::string& tensor_pb : ListDir(data_set_dir)) {
-            if (!HasSuffix(tensor_pb, ".pb")) continue;
-            onnx::TensorProto xtensor(LoadLargeProto<onnx::TensorProto>(tensor_pb));
-            chainerx::Array tensor(MakeArrayFromONNX(xtensor));
-            all_tensors.emplace_back(Basename(tensor_pb), xtensor.name(), tensor);
+        for (const std::string& tensor_file : ListDir(data_set_dir)) {
+            if (HasSuffix(tensor_file, ".pb")) {
+                onnx::TensorProto xtensor(LoadLargeProto<onnx::TensorProto>(tensor_file));
+                chainerx::Array tensor(MakeArrayFromONNX(xtensor));
+                all_tensors.emplace_back(Basename(tensor_file), xtensor.name(), tensor);
+            } else if (HasSuffix(tensor_file, ".npy")) {
+                const std::string basename = Basename(tensor_file);
+                auto found = npy_names.find(basename);
+                const std::string name = found == npy_names.end() ? "" : found->second;
+                all_tensors.emplace_back(basename, name, LoadNpy(tensor_file));
+            }
         }
 
         std::vector<std::tuple<std::string, std::string, ChxVMVar*>> all_vars;
@@ -1,6 +1,8 @@
 #include "tools/train_imagenet.h"
 
 #include <chrono>
+#include <functional>
+#include <memory>
 #include <set>
 
 #include <compiler/onnx.h>
@@ -24,7 +26,9 @@
 #include <compiler/tensor.h>
 #include <compiler/util.h>
 #include <compiler/value.h>
+#include <feeder/device_feeder.h>
 #include <feeder/imagenet_iterator.h>
+#include <feeder/shard_iterator.h>
 #include <runtime/chainerx_util.h>
 #include <runtime/chrome_tracing.h>
 #include <runtime/chxvm.h>
@@ -59,6 +63,9 @@ void RunMain(const std::vector<std::string>& argv) {
     args.add<std::string>("chrome_tracing", '\0', "Output chrome tracing profile", false);
     args.add<int>("chrome_tracing_frequency", '\0', "Output chrome tracing every this itearation", false, 100);
     args.add<int>("iterations", 'I', "Number of iterations to train", false, 100);
+    args.add<int>("feeder_threads", '\0', "Number of threads to load images", false, 4);
+    args.add("random_crop", '\0', "Crop random regions of images and resize them");
+    args.add("random_flip", '\0', "Flip images horizontally at random");
     args.add("skip_runtime_type_check", '\0', "Skip runtime type check");
     args.add("check_nans", '\0', "Check for NaNs after each operation");
     args.add("check_infs", '\0', "Check for infinities after each operation");
@@ -74,7 +81,7 @@ void RunMain(const std::vector<std::string>& argv) {
 
     if (args.rest().size() != 3) {
         std::cerr << args.usage() << std::endl;
-        QFAIL() << "Usage: " << argv[0] << " <onnx> <train.txt> <mean.bin>";
+        QFAIL() << "Usage: " << argv[0] << " <onnx> <train.txt or train.index> <mean.bin>";
     }
 
     g_quiet = args.exist("quiet");
@@ -157,8 +164,30 @@ void RunMain(const std::vector<std::string>& argv) {
         }
     }
     const std::vector<float>& mean = LoadMean(args.rest()[2], height, width);
-    ImageNetIterator train_iter(args.rest()[1], 3, batch_size, mean, height, width);
-    train_iter.Start();
+    std::unique_ptr<DataIterator> train_iter;
+    std::function<std::string()> train_status;
+    if (HasSuffix(args.rest()[1], ".index")) {
+        // Shards made by `pack_imagenet`.
+        ShardIteratorOptions feeder_opts;
+        feeder_opts.num_workers = args.get<int>("feeder_threads");
+        feeder_opts.random_crop = args.exist("random_crop");
+        feeder_opts.random_flip = args.exist("random_flip");
+        ShardIterator* iter = new ShardIterator(args.rest()[1], 3, batch_size, mean, height, width, feeder_opts);
+        train_iter.reset(iter);
+        train_status = [iter]() { return iter->GetStatus(); };
+    } else {
+        ImageNetIteratorOptions feeder_opts;
+        feeder_opts.num_workers = args.get<int>("feeder_threads");
+        feeder_opts.random_crop = args.exist("random_crop");
+        feeder_opts.random_flip = args.exist("random_flip");
+        ImageNetIterator* iter = new ImageNetIterator(args.rest()[1], 3, batch_size, mean, height, width, feeder_opts);
+        train_iter.reset(iter);
+        train_status = [iter]() { return iter->GetStatus(); };
+    }
+    train_iter->Start();
+    // Transfers the next batch while the current batch is running.
+    DeviceFeeder device_iter(train_iter.get(), &chainerx::GetDefaultDevice());
+    device_iter.Start();
 
     std::chrono::system_clock::time_point start = std::chrono::system_clock::now();
     LOG() << "Start training!" << std::endl;
@@ -173,15 +202,15 @@ void RunMain(const std::vector<std::string>& argv) {
         {
             ChromeTracingEmitter::ScopedEvent se(chxvm_opts.chrome_tracing, "Trainer", "Prepare");
 
-            std::vector<chainerx::Array> data = train_iter.GetNext();
+            std::vector<chainerx::Array> data = device_iter.GetNext();
             if (data.empty()) break;
 
             inputs = params;
             if (expects_onehot) {
                 CHECK_EQ(2, data.size());
                 CHECK_EQ(3, infeed_values.size());
-                inputs.emplace("Input_0", std::shared_ptr<ChxVMVar>(new ChxVMVar(data[0].ToDevice(chainerx::GetDefaultDevice()))));
-                chainerx::Array labels = data[1].ToDevice(chainerx::GetDefaultDevice()).AsType(chainerx::Dtype::kInt64);
+                inputs.emplace("Input_0", std::shared_ptr<ChxVMVar>(new ChxVMVar(data[0])));
+                chainerx::Array labels = data[1].AsType(chainerx::Dtype::kInt64);
                 chainerx::Array onehot = chainerx::Eye(1000, absl::nullopt, absl::nullopt, chainerx::Dtype::kFloat32)
                                                  .Take(labels, 0, chainerx::IndexBoundsMode::kDefault);
                 inputs.emplace("Input_1", std::shared_ptr<ChxVMVar>(new ChxVMVar(onehot)));
@@ -190,9 +219,8 @@ void RunMain(const std::vector<std::string>& argv) {
             } else {
                 CHECK_EQ(2, data.size());
                 CHECK_EQ(2, infeed_values.size());
-                inputs.emplace(
-                        infeed_values[0]->name(), std::shared_ptr<ChxVMVar>(new ChxVMVar(data[0].ToDevice(chainerx::GetDefaultDevice()))));
-                chainerx::Array labels = data[1].ToDevice(chainerx::GetDefaultDevice()).AsType(chainerx::Dtype::kInt64);
+                inputs.emplace(infeed_values[0]->name(), std::shared_ptr<ChxVMVar>(new ChxVMVar(data[0])));
+                chainerx::Array labels = data[1].AsType(chainerx::Dtype::kInt64);
                 inputs.emplace(infeed_values[1]->name(), std::shared_ptr<ChxVMVar>(new ChxVMVar(labels)));
             }
         }
@@ -228,7 +256,7 @@ void RunMain(const std::vector<std::string>& argv) {
         std::chrono::system_clock::time_point end = std::chrono::system_clock::now();
         double elapsed = std::chrono::duration_cast<std::chrono::microseconds>(end - start).count() * 0.001;
         start = end;
-        std::cout << train_iter.GetStatus() << " loss=" << loss << " elapsed=" << elapsed << "ms";
+        std::cout << train_status() << " loss=" << loss << " elapsed=" << elapsed << "ms";
         if (initial_used_bytes >= 0) {
             size_t used_bytes = GetUsedMemory() - initial_used_bytes;
             size_t param_mbs = param_bytes / 1000 / 1000;
@@ -244,7 +272,8 @@ void RunMain(const std::vector<std::string>& argv) {
         }
     }
 
-    train_iter.Terminate();
+    device_iter.Terminate();
+    train_iter->Terminate();
 }
 
 }  // namespace
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+#
+# Runs an ONNX test directory with all locally available backends and
+# shows a table of latencies. Outputs of each backend are verified with
+# the test data. Backends which are not installed are skipped.
+#
+# Usage:
+#
+# $ python3 utils/run_onnx_all.py data/shufflenet -I 20
+
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import run_onnx_util
+
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A list of (name, module name of the runner, extra flags). ChxVM
+# backends use `run_onnx` instead of Python runners.
+BACKENDS = [
+    ('chxvm', None, []),
+    ('chxvm_fuse', None, ['--fuse_operations']),
+    ('onnxruntime', 'run_onnx_onnxruntime', []),
+    ('ngraph', 'run_onnx_ngraph', []),
+    ('tf', 'run_onnx_tf', []),
+    ('tvm', 'run_onnx_tvm', []),
+    ('tensorrt', 'run_onnx_tensorrt', []),
+    ('dldt', 'run_onnx_dldt', []),
+]
+
+BASELINE = 'chxvm'
+
+
+class BackendResult(object):
+
+    def __init__(self, name, status, report=None):
+        self.name = name
+        self.status = status
+        self.report = report
+
+
+def _load_report(filename):
+    if not os.path.exists(filename):
+        return None
+    with open(filename) as f:
+        return json.load(f)
+
+
+def run_chxvm(args, name, extra_flags, report_json):
+    run_onnx = os.path.join(args.build_dir, 'tools/run_onnx')
+    if not os.path.exists(run_onnx):
+        return BackendResult(name, 'skipped (%s not found)' % run_onnx)
+
+    cmdline = [run_onnx, '--test', args.test_dir,
+               '--onnx', os.path.join(args.test_dir, args.model_file)]
+    cmdline += extra_flags
+    if args.device:
+        cmdline += ['--device', args.device]
+        if 'cuda' in args.device and '--fuse_operations' in extra_flags:
+            cmdline.append('--use_nvrtc')
+
+    # run_onnx does not verify outputs with multiple iterations.
+    if subprocess.call(cmdline + ['--quiet']) != 0:
+        return BackendResult(name, 'mismatch')
+    cmdline += ['--iterations', str(args.iterations),
+                '--report_json', report_json]
+    if subprocess.call(cmdline + ['--quiet']) != 0:
+        return BackendResult(name, 'error')
+    return BackendResult(name, 'ok', _load_report(report_json))
+
+
+def run_python(args, name, module_name, extra_flags, report_json):
+    try:
+        module = importlib.import_module(module_name)
+        runner_args = module.get_args([args.test_dir,
+                                       '--model_file', args.model_file,
+                                       '--iterations', str(args.iterations),
+                                       '--report_json', report_json] +
+                                      extra_flags)
+    except ImportError as e:
+        return BackendResult(name, 'skipped (%s)' % e)
+
+    try:
+        module.run(runner_args)
+    except ImportError as e:
+        return BackendResult(name, 'skipped (%s)' % e)
+    except AssertionError:
+        return BackendResult(name, 'mismatch')
+    except Exception as e:
+        return BackendResult(name, 'error (%s)' % e)
+    return BackendResult(name, 'ok', _load_report(report_json))
+
+
+def show_table(results):
+    baseline = None
+    for result in results:
+        if result.name == BASELINE and result.report is not None:
+            baseline = result.report['stats']['p50']
+
+    print('%-12s %10s %10s %10s %10s %8s  %s' %
+          ('backend', 'p50', 'p90', 'p99', 'mean', 'speedup', 'status'))
+    for result in results:
+        if result.report is None:
+            print('%-12s %10s %10s %10s %10s %8s  %s' %
+                  (result.name, '-', '-', '-', '-', '-', result.status))
+            continue
+        stats = result.report['stats']
+        speedup = '-'
+        if baseline is not None:
+            speedup = '%.2fx' % (baseline / stats['p50'])
+        print('%-12s %10.3f %10.3f %10.3f %10.3f %8s  %s' %
+              (result.name, stats['p50'], stats['p90'], stats['p99'],
+               stats['mean'], speedup, result.status))
+
+
+def get_args(args=None):
+    parser = argparse.ArgumentParser(
+        description='Run ONNX by all available backends')
+    parser.add_argument('test_dir')
+    parser.add_argument('--iterations', '-I', type=int, default=10)
+    parser.add_argument('--model_file', default='model.onnx')
+    parser.add_argument('--build_dir', '-b',
+                        default=os.path.join(project_root, 'build'))
+    parser.add_argument('--device', '-d', default=None,
+                        help='ChainerX device to be used by ChxVM')
+    parser.add_argument('--backends', default=None,
+                        help='Comma separated names of backends to run')
+    parser.add_argument('--report_json', default=None,
+                        help='Dump reports of all backends in a JSON')
+    return parser.parse_args(args=args)
+
+
+def main():
+    args = get_args()
+    if args.iterations < 2:
+        raise RuntimeError('--iterations must be larger than 1')
+
+    backends = BACKENDS
+    if args.backends is not None:
+        names = args.backends.split(',')
+        backends = [b for b in BACKENDS if b[0] in names]
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, module_name, extra_flags in backends:
+            sys.stderr.write('=== %s ===\n' % name)
+            report_json = os.path.join(tmpdir, name + '.json')
+            if module_name is None:
+                result = run_chxvm(args, name, extra_flags, report_json)
+            else:
+                result = run_python(args, name, module_name, extra_flags,
+                                    report_json)
+            results.append(result)
+
+    show_table(results)
+
+    if args.report_json is not None:
+        reports = {}
+        for result in results:
+            if result.report is not None:
+                reports[result.name] = result.report
+        with open(args.report_json, 'w') as f:
+            json.dump(reports, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -53,7 +53,8 @@ def inference(args, model_xml, model_bin, inputs, outputs):
     def compute():
         exec_net.infer(inputs=ie_inputs)
 
-    return run_onnx_util.run_benchmark(compute, args.iterations)
+    return run_onnx_util.run_benchmark(compute, args.iterations,
+                                       args.report_json)
 
 
 def run(args):
@@ -96,10 +97,9 @@ def run(args):
 def get_args(args=None):
     from mo.utils.cli_parser import get_onnx_cli_parser
     parser = get_onnx_cli_parser(parser=None)  # setup for mo
-    parser.add_argument('test_dir')
+    run_onnx_util.add_common_args(parser)
     parser.add_argument('--debug', '-g', action='store_true')
     parser.add_argument('--force_mo', action='store_true')
-    parser.add_argument('--iterations', '-I', type=int, default=1)
     # for inference-engine
     parser.add_argument(
         '--device', choices=['CPU', 'GPU', 'MYRIAD'], default='CPU')
@@ -110,7 +110,6 @@ def get_args(args=None):
         'MKLDNN (CPU)-targeted custom layers. Absolute path to a shared '
         'library with the kernels implementations', default=None
     )
-    parser.add_argument('--model_file', default='model.onnx')
     args = parser.parse_args(args=args)
 
     args.framework = 'onnx'
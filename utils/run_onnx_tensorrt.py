@@ -27,12 +27,8 @@ def to_cpu(arrays):
 
 
 def run(args):
-    onnx_filename = os.path.join(args.test_dir, args.model_file)
-    input_names, output_names = run_onnx_util.onnx_input_output_names(
-        onnx_filename)
-    test_data_dir = os.path.join(args.test_dir, 'test_data_set_0')
-    inputs, outputs = run_onnx_util.load_test_data(
-        test_data_dir, input_names, output_names)
+    onnx_filename, input_names, output_names, inputs, outputs = (
+        run_onnx_util.load_test_dir(args.test_dir, args.model_file))
 
     with open(onnx_filename, 'rb') as f:
         onnx_proto = f.read()
@@ -88,19 +84,18 @@ def run(args):
         context.execute(args.batch_size, bindings)
         cupy.cuda.device.Device().synchronize()
 
-    return run_onnx_util.run_benchmark(compute, args.iterations)
+    return run_onnx_util.run_benchmark(compute, args.iterations,
+                                       args.report_json)
 
 
 def get_args(args=None):
     parser = argparse.ArgumentParser(description='Run ONNX by TensorRT')
-    parser.add_argument('test_dir')
+    run_onnx_util.add_common_args(parser)
     parser.add_argument('--batch_size', type=int, default=1)
     parser.add_argument('--debug', '-g', action='store_true')
-    parser.add_argument('--iterations', '-I', type=int, default=1)
     parser.add_argument('--fp16_mode', action='store_true')
     parser.add_argument('--rtol', type=float, default=1e-3)
     parser.add_argument('--atol', type=float, default=1e-4)
-    parser.add_argument('--model_file', default='model.onnx')
     return parser.parse_args(args=args)
 
 
@@ -13,12 +13,8 @@ import run_onnx_util
 
 
 def run(args):
-    onnx_filename = os.path.join(args.test_dir, args.model_file)
-    input_names, output_names = run_onnx_util.onnx_input_output_names(
-        onnx_filename)
-    test_data_dir = os.path.join(args.test_dir, 'test_data_set_0')
-    inputs, outputs = run_onnx_util.load_test_data(
-        test_data_dir, input_names, output_names)
+    onnx_filename, input_names, output_names, inputs, outputs = (
+        run_onnx_util.load_test_dir(args.test_dir, args.model_file))
 
     model = onnx.load(onnx_filename)
     tf_model = onnx_tf.backend.prepare(model)
@@ -38,14 +34,13 @@ def run(args):
     def compute():
         tf_model.run(inputs)
 
-    return run_onnx_util.run_benchmark(compute, args.iterations)
+    return run_onnx_util.run_benchmark(compute, args.iterations,
+                                       args.report_json)
 
 
 def get_args(args=None):
     parser = argparse.ArgumentParser(description='Run ONNX by nGraph')
-    parser.add_argument('test_dir')
-    parser.add_argument('--iterations', '-I', type=int, default=1)
-    parser.add_argument('--model_file', default='model.onnx')
+    run_onnx_util.add_common_args(parser)
     return parser.parse_args(args=args)
 
 
@@ -107,12 +107,8 @@ def run(args):
     onnx_model = onnx.load_model(os.path.join(args.test_dir, args.model_file))
     ctx = tvm.gpu()
 
-    input_names, output_names = run_onnx_util.onnx_input_output_names(
-        os.path.join(args.test_dir, args.model_file))
-
-    test_data_dir = os.path.join(args.test_dir, 'test_data_set_0')
-    inputs, outputs = run_onnx_util.load_test_data(
-        test_data_dir, input_names, output_names)
+    _, input_names, output_names, inputs, outputs = (
+        run_onnx_util.load_test_dir(args.test_dir, args.model_file))
 
     inputs = dict(inputs)
     graph_module = None
@@ -137,20 +133,19 @@ def run(args):
         graph_module.run()
         cupy.cuda.device.Device().synchronize()
 
-    return run_onnx_util.run_benchmark(compute, args.iterations)
+    return run_onnx_util.run_benchmark(compute, args.iterations,
+                                       args.report_json)
 
 
 def get_args(args=None):
     parser = argparse.ArgumentParser(description='Run ONNX by TVM')
-    parser.add_argument('test_dir')
+    run_onnx_util.add_common_args(parser)
     parser.add_argument('--frontend', type=str, default='relay')
     parser.add_argument('--dump_frontend', action='store_true')
     parser.add_argument('--target', type=str, default='cuda')
     parser.add_argument('--debug', '-g', action='store_true')
-    parser.add_argument('--iterations', '-I', type=int, default=1)
     parser.add_argument('--opt_level', '-O', type=int, default=3)
     parser.add_argument('--autotvm_log', type=str)
-    parser.add_argument('--model_file', default='model.onnx')
     return parser.parse_args(args=args)
 
 
@@ -1,10 +1,57 @@
 import glob
+import json
+import math
 import onnx
 import os
+import sys
 import time
 
+# `chainer_compiler/__init__.py` imports Chainer, which runners for
+# other frameworks may not have, so the module is imported directly.
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(project_root, 'chainer_compiler', 'utils'))
 
-def run_benchmark(fn, iterations):
+import test_data  # noqa
+
+
+def percentile(values, q):
+    """Returns the `q`-th percentile like `numpy.percentile` does."""
+    values = sorted(values)
+    rank = q / 100 * (len(values) - 1)
+    lo = int(math.floor(rank))
+    hi = int(math.ceil(rank))
+    return values[lo] + (values[hi] - values[lo]) * (rank - lo)
+
+
+def summarize_elapsed_times(elapsed_times, warmup_times=()):
+    """Creates a benchmark report in the format of `run_onnx --report_json`.
+
+    All times are in msec.
+    """
+    n = len(elapsed_times)
+    mean = sum(elapsed_times) / n
+    stddev = math.sqrt(sum((t - mean) ** 2 for t in elapsed_times) / n)
+    return {
+        'elapsed_times': list(elapsed_times),
+        'warmup_times': list(warmup_times),
+        'stats': {
+            'mean': mean,
+            'stddev': stddev,
+            'min': min(elapsed_times),
+            'max': max(elapsed_times),
+            'p50': percentile(elapsed_times, 50),
+            'p90': percentile(elapsed_times, 90),
+            'p99': percentile(elapsed_times, 99),
+        },
+    }
+
+
+def run_benchmark(fn, iterations, report_json=None):
+    """Runs `fn` `iterations - 1` times and returns the elapsed times in sec.
+
+    The first iteration is expected to be done by the caller as a warm
+    up. If `report_json` is given, the summary is written to the file.
+    """
     elapsed_times = []
     if iterations > 1:
         num_iterations = iterations - 1
@@ -13,28 +60,59 @@ def run_benchmark(fn, iterations):
             fn()
             elapsed_times.append(time.time() - start)
         print('Elapsed: %.3f msec' % (sum(elapsed_times) * 1000 / num_iterations))
+        report = summarize_elapsed_times([t * 1000 for t in elapsed_times])
+        stats = report['stats']
+        print('Percentiles: p50=%.3f p90=%.3f p99=%.3f stddev=%.3f msec' %
+              (stats['p50'], stats['p90'], stats['p99'], stats['stddev']))
+        if report_json is not None:
+            with open(report_json, 'w') as f:
+                json.dump(report, f, indent=2)
     return elapsed_times
 
 
 def load_test_data(data_dir, input_names, output_names):
+    npy_names = test_data.load_npy_names(data_dir)
     inout_values = []
     for kind, names in [('input', input_names), ('output', output_names)]:
         names = list(names)
         values = []
-        for pb in sorted(glob.glob(os.path.join(data_dir, '%s_*.pb' % kind))):
-            with open(pb, 'rb') as f:
-                tensor = onnx.TensorProto()
-                tensor.ParseFromString(f.read())
-            if tensor.name in names:
-                name = tensor.name
+        filenames = (glob.glob(os.path.join(data_dir, '%s_*.pb' % kind)) +
+                     glob.glob(os.path.join(data_dir, '%s_*.npy' % kind)))
+        for filename in sorted(filenames):
+            # .npy files are memory-mapped and read lazily.
+            tensor_name, value = test_data.load_tensor(filename, npy_names)
+            if tensor_name in names:
+                name = tensor_name
                 names.remove(name)
             else:
                 name = names.pop(0)
-            values.append((name, onnx.numpy_helper.to_array(tensor)))
+            values.append((name, value))
         inout_values.append(values)
     return tuple(inout_values)
 
 
+def add_common_args(parser):
+    """Adds command line flags shared by all `run_onnx_*.py` runners."""
+    parser.add_argument('test_dir')
+    parser.add_argument('--iterations', '-I', type=int, default=1)
+    parser.add_argument('--model_file', default='model.onnx')
+    parser.add_argument('--report_json', default=None,
+                        help='Dump the benchmark report in a JSON')
+
+
+def load_test_dir(test_dir, model_file='model.onnx'):
+    """Loads names and the first test data set of an ONNX test directory.
+
+    Returns a tuple of the ONNX filename, input names, output names,
+    inputs and outputs.
+    """
+    onnx_filename = os.path.join(test_dir, model_file)
+    input_names, output_names = onnx_input_output_names(onnx_filename)
+    test_data_dir = os.path.join(test_dir, 'test_data_set_0')
+    inputs, outputs = load_test_data(test_data_dir, input_names, output_names)
+    return onnx_filename, input_names, output_names, inputs, outputs
+
+
 def onnx_input_output_names(onnx_filename):
     onnx_model = onnx.load(onnx_filename)
     initializer_names = set()